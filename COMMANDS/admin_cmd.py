@@ -2,7 +2,7 @@ from HELPERS.app_instance import get_app
 from HELPERS.logger import send_to_user, send_to_logger, send_to_all, send_error_to_user
 from pyrogram import filters, enums
 from pyrogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-from HELPERS.safe_messeger import safe_send_message, safe_send_message_with_auto_delete, safe_edit_message_text, safe_delete_messages, fake_message
+from HELPERS.safe_messeger import safe_send_message, safe_send_message_with_auto_delete, safe_edit_message_text, safe_delete_messages, schedule_delete_message, fake_message
 from CONFIG.config import Config
 from CONFIG.messages import Messages, safe_get_messages
 from datetime import datetime
@@ -15,7 +15,7 @@ import re
 from typing import Optional
 import threading
 # from DATABASE.cache_db import reload_firebase_cache, get_from_local_cache  # moved to lazy imports
-from DATABASE.firebase_init import db
+from DATABASE.firebase_init import db, membership_index
 from URL_PARSERS.youtube import is_youtube_url, youtube_to_short_url, youtube_to_long_url
 from URL_PARSERS.normalizer import normalize_url_for_cache, get_clean_playlist_url
 from HELPERS.limitter import TimeFormatter, is_user_in_channel
@@ -29,6 +29,14 @@ from HELPERS.channel_guard import (
 # from DATABASE.cache_db import get_url_hash, db_child_by_path  # moved to lazy imports
 from HELPERS.logger import logger
 from HELPERS.decorators import background_handler
+from HELPERS.broadcast_job import (
+    start_broadcast,
+    control_broadcast,
+    get_broadcast_status,
+    get_store as get_broadcast_store,
+    status_text as broadcast_status_text,
+    status_keyboard as broadcast_status_keyboard,
+)
 
 # Global variable for bot start time
 starting_point = [time.time()]
@@ -100,11 +108,7 @@ def reload_firebase_cache_command(app, message):
             else:
                 safe_edit_message_text(message.chat.id, status_msg.id, error_msg)
                 # Schedule deletion after 60 seconds for real messages
-                def delete_msg():
-                    messages = safe_get_messages(message.chat.id)
-                    time.sleep(60)
-                    safe_delete_messages(message.chat.id, [status_msg.id])
-                threading.Thread(target=delete_msg, daemon=True).start()
+                schedule_delete_message(message.chat.id, status_msg.id, delete_after_seconds=60)
                 from HELPERS.logger import log_error_to_channel
                 log_error_to_channel(message, error_msg)
                 send_to_logger(message, safe_get_messages(message.chat.id).ADMIN_ERROR_RUNNING_SCRIPT_LOG_MSG.format(script_path=script_path, stdout=result.stdout, stderr=result.stderr))
@@ -128,10 +132,7 @@ def reload_firebase_cache_command(app, message):
             else:
                 safe_edit_message_text(message.chat.id, status_msg.id, final_msg)
                 # Schedule deletion after 60 seconds for real messages
-                def delete_msg():
-                    time.sleep(60)
-                    safe_delete_messages(message.chat.id, [status_msg.id])
-                threading.Thread(target=delete_msg, daemon=True).start()
+                schedule_delete_message(message.chat.id, status_msg.id, delete_after_seconds=60)
                 send_to_logger(message, safe_get_messages(message.chat.id).ADMIN_CACHE_RELOADED_ADMIN_LOG_MSG)
         else:
             cache_file = getattr(Config, 'FIREBASE_CACHE_FILE', 'firebase_cache.json')
@@ -144,10 +145,7 @@ def reload_firebase_cache_command(app, message):
             else:
                 safe_edit_message_text(message.chat.id, status_msg.id, final_msg)
                 # Schedule deletion after 60 seconds for real messages
-                def delete_msg():
-                    time.sleep(60)
-                    safe_delete_messages(message.chat.id, [status_msg.id])
-                threading.Thread(target=delete_msg, daemon=True).start()
+                schedule_delete_message(message.chat.id, status_msg.id, delete_after_seconds=60)
                 from HELPERS.logger import log_error_to_channel
                 log_error_to_channel(message, final_msg)
     except Exception as e:
@@ -166,10 +164,7 @@ def reload_firebase_cache_command(app, message):
         if 'status_msg' in locals() and status_msg and not is_fake_message:
             safe_edit_message_text(message.chat.id, status_msg.id, error_msg)
             # Schedule deletion after 60 seconds
-            def delete_msg():
-                time.sleep(60)
-                safe_delete_messages(message.chat.id, [status_msg.id])
-            threading.Thread(target=delete_msg, daemon=True).start()
+            schedule_delete_message(message.chat.id, status_msg.id, delete_after_seconds=60)
         else:
             # For fake messages, do not send to chat; only log
             if not is_fake_message:
@@ -182,22 +177,6 @@ def reload_firebase_cache_command(app, message):
 
 def send_promo_message(app, message):
     messages = safe_get_messages(message.chat.id)
-    # We get a list of users from the base
-    user_nodes = db.child("bot").child(Config.BOT_NAME_FOR_USERS).child("users").get().each()
-    user_nodes = user_nodes or []
-    user_lst = []
-    for user in user_nodes:
-        try:
-            key = user.key()
-            if key is not None:
-                user_lst.append(int(key))
-        except Exception:
-            continue
-    # Add administrators if they are not on the list
-    for admin in Config.ADMIN:
-        if admin not in user_lst:
-            user_lst.append(admin)
-
     # We extract the text of Boadcast. If the message contains lines transfers, take all the lines after the first.
     lines = message.text.splitlines()
     if len(lines) > 1:
@@ -205,59 +184,69 @@ def send_promo_message(app, message):
     else:
         broadcast_text = message.text[len(Config.BROADCAST_MESSAGE):].strip()
 
-    # If the message is a reference, we get it
+    # If the message is a reference, it is copied to every user (any content type)
     reply = message.reply_to_message if message.reply_to_message else None
+    if not reply and not broadcast_text:
+        send_error_to_user(message, safe_get_messages(message.chat.id).ADMIN_CANNOT_SEND_PROMO_MSG)
+        return
 
     send_to_logger(message, safe_get_messages(message.chat.id).ADMIN_BROADCAST_INITIATED_LOG_MSG.format(broadcast_text=broadcast_text))
 
     try:
-        # We send a message to all users
-        for user in user_lst:
-            try:
-                if user != 0:
-                    # If the message is a reference, send it (depending on the type of content)
-                    if reply:
-                        try:
-                            if reply.text:
-                                safe_send_message(user, reply.text)
-                            elif reply.video:
-                                app.send_video(user, reply.video.file_id, caption=reply.caption)
-                            elif reply.photo:
-                                try:
-                                    # Use supported API: take the largest available size's file_id
-                                    largest = reply.photo.sizes[-1] if getattr(reply.photo, 'sizes', None) else None
-                                    file_id = largest.file_id if largest else None
-                                except Exception:
-                                    file_id = None
-                                if file_id:
-                                    app.send_photo(user, file_id, caption=reply.caption)
-                                else:
-                                    # Fallback: try to forward original message with photo
-                                    try:
-                                        app.copy_message(chat_id=user, from_chat_id=message.chat.id, message_id=reply.id)
-                                    except Exception:
-                                        pass
-                            elif reply.sticker:
-                                app.send_sticker(user, reply.sticker.file_id)
-                            elif reply.document:
-                                app.send_document(user, reply.document.file_id, caption=reply.caption)
-                            elif reply.audio:
-                                app.send_audio(user, reply.audio.file_id, caption=reply.caption)
-                            elif reply.animation:
-                                app.send_animation(user, reply.animation.file_id, caption=reply.caption)
-                        except AttributeError as e:
-                            logger.error(safe_get_messages(message.chat.id).ADMIN_ERROR_PROCESSING_REPLY_MSG.format(user=user, error=e))
-                            continue
-                    # If there is an additional text, we send it
-                    if broadcast_text:
-                        safe_send_message(user, broadcast_text)
-            except Exception as e:
-                logger.error(safe_get_messages(message.chat.id).ADMIN_ERROR_SENDING_BROADCAST_MSG.format(user=user, error=e))
-        send_to_all(message, safe_get_messages(message.chat.id).ADMIN_PROMO_SENT_MSG)
-        send_to_logger(message, safe_get_messages(message.chat.id).ADMIN_BROADCAST_SENT_LOG_MSG)
+        # Sent in the background; progress and controls come in a status message
+        job = start_broadcast(app, message, broadcast_text, reply)
     except Exception as e:
         send_error_to_user(message, safe_get_messages(message.chat.id).ADMIN_CANNOT_SEND_PROMO_MSG)
         send_to_logger(message, safe_get_messages(message.chat.id).ADMIN_BROADCAST_FAILED_LOG_MSG.format(error=str(e)))
+        return
+    if job is None:
+        active = get_broadcast_status()
+        send_to_user(message, messages.BROADCAST_JOB_BUSY_MSG.format(job_id=active["id"] if active else "?", command=Config.BROADCAST_JOB_COMMAND))
+
+
+# Broadcast status / pause / resume / cancel
+
+def broadcast_job_command(app, message):
+    messages = safe_get_messages(message.chat.id)
+    if int(message.chat.id) not in Config.ADMIN:
+        send_to_all(message, messages.ADMIN_NOT_ADMIN_MSG)
+        return
+    parts = (message.text or "").strip().split(maxsplit=1)
+    action = parts[1].strip().lower() if len(parts) > 1 else "status"
+    if action not in ("status", "pause", "resume", "cancel"):
+        send_to_user(message, messages.BROADCAST_JOB_USAGE_MSG.format(command=Config.BROADCAST_JOB_COMMAND))
+        return
+    job = get_broadcast_status() if action == "status" else control_broadcast(action)
+    if job is None:
+        send_to_user(message, messages.BROADCAST_JOB_NONE_MSG)
+        return
+    counts = job.get("counts") or get_broadcast_store().counts(job["id"])
+    safe_send_message(message.chat.id, broadcast_status_text(job, counts), reply_markup=broadcast_status_keyboard(job), message=message)
+
+
+@app.on_callback_query(filters.regex(r"^bcast\|"))
+def broadcast_job_callback(app, callback_query):
+    user_id = callback_query.from_user.id
+    messages = safe_get_messages(user_id)
+    if int(user_id) not in Config.ADMIN:
+        callback_query.answer(messages.ADMIN_ACCESS_DENIED_MSG, show_alert=True)
+        return
+    try:
+        _, action, job_id = callback_query.data.split("|")
+        job = control_broadcast(action, job_id=int(job_id))
+    except ValueError:
+        job = None
+    if job is None:
+        callback_query.answer(messages.BROADCAST_JOB_NONE_MSG)
+        return
+    callback_query.answer()
+    try:
+        callback_query.edit_message_text(
+            broadcast_status_text(job, get_broadcast_store().counts(job["id"])),
+            reply_markup=broadcast_status_keyboard(job),
+        )
+    except Exception as e:
+        logger.debug(f"[BROADCAST] Failed to update status message: {e}")
 
 
 # Getting the User Logs
@@ -567,13 +556,8 @@ def block_user(app, message):
                     safe_send_message(message.chat.id, messages.CHANNEL_GUARD_PENDING_EMPTY_MSG, message=message)
                     return
                 
-                # Check who is already blocked
-                snapshot = db.child(f"{Config.BOT_DB_PATH}/blocked_users").get()
-                all_blocked_users = snapshot.each() if snapshot else []
-                blocked_ids = {int(str(b_user.key())) for b_user in (all_blocked_users or []) if b_user is not None}
-                
                 # Keep only users who are not blocked yet
-                to_block_ids = [uid for uid in leave_user_ids if uid not in blocked_ids]
+                to_block_ids = [uid for uid in leave_user_ids if not membership_index.is_blocked(uid)]
                 
                 if not to_block_ids:
                     safe_send_message(
@@ -637,11 +621,7 @@ def block_user(app, message):
         except Exception:
             pass
 
-        snapshot = db.child(f"{Config.BOT_DB_PATH}/blocked_users").get()
-        all_blocked_users = snapshot.each() if snapshot else []
-        b_users = [str(b_user.key()) for b_user in (all_blocked_users or []) if b_user is not None]
-
-        if b_user_id not in b_users:
+        if not membership_index.is_blocked(b_user_id):
             data = {"ID": b_user_id, "timestamp": str(dt)}
             db.child(f"{Config.BOT_DB_PATH}/blocked_users/{b_user_id}").set(data)
             send_to_user(message, safe_get_messages(message.chat.id).ADMIN_USER_BLOCKED_MSG.format(user_id=b_user_id, date=datetime.fromtimestamp(dt)))
@@ -689,11 +669,7 @@ def unblock_user(app, message):
             )
             return
 
-        snapshot = db.child(f"{Config.BOT_DB_PATH}/blocked_users").get()
-        all_blocked_users = snapshot.each() if snapshot else []
-        b_users = [str(b_user.key()) for b_user in (all_blocked_users or []) if b_user is not None]
-
-        if ub_user_id in b_users:
+        if membership_index.is_blocked(ub_user_id):
             dt = math.floor(time.time())
 
             data = {"ID": ub_user_id, "timestamp": str(dt)}
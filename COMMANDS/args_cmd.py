@@ -16,6 +16,7 @@ from HELPERS.app_instance import get_app
 from HELPERS.logger import logger, send_to_user, send_error_to_user
 from HELPERS.limitter import check_user, is_user_in_channel
 from HELPERS.safe_messeger import safe_send_message
+from HELPERS.user_settings import user_settings, get_user_settings
 from HELPERS.decorators import background_handler
 from CONFIG.config import Config
 from CONFIG.messages import Messages, get_messages_instance, safe_get_messages
@@ -486,28 +487,15 @@ def validate_input(value: str, param_name: str, user_id: int = None) -> tuple[bo
 
 def get_user_args(user_id: int) -> Dict[str, Any]:
     """Get user's saved args settings"""
-    user_dir = os.path.join("users", str(user_id))
-    args_file = os.path.join(user_dir, ARGS_FILE)
-    
-    if not os.path.exists(args_file):
-        return {}
-    
-    try:
-        with open(args_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        logger.error(LoggerMsg.ARGS_ERROR_READING_USER_ARGS_LOG_MSG.format(user_id=user_id, error=e))
-        return {}
+    settings = get_user_settings(user_id)
+    if settings.args_error is not None:
+        logger.error(LoggerMsg.ARGS_ERROR_READING_USER_ARGS_LOG_MSG.format(user_id=user_id, error=settings.args_error))
+    return settings.get_args()
 
 def save_user_args(user_id: int, args: Dict[str, Any]) -> bool:
     """Save user's args settings"""
     try:
-        user_dir = os.path.join("users", str(user_id))
-        os.makedirs(user_dir, exist_ok=True)
-        
-        args_file = os.path.join(user_dir, ARGS_FILE)
-        with open(args_file, 'w', encoding='utf-8') as f:
-            json.dump(args, f, ensure_ascii=False, indent=2)
+        user_settings.write_json(user_id, ARGS_FILE, args)
         return True
     except Exception as e:
         logger.error(LoggerMsg.ARGS_ERROR_SAVING_USER_ARGS_LOG_MSG.format(user_id=user_id, error=e))
@@ -13,6 +13,7 @@ from HELPERS.limitter import is_user_in_channel
 from HELPERS.logger import send_to_logger, logger, send_to_user, send_to_all
 from HELPERS.filesystem_hlp import create_directory
 from HELPERS.safe_messeger import fake_message, safe_send_message, safe_edit_message_text
+from HELPERS.user_settings import user_settings, FLOOD_WAIT
 from pyrogram.errors import FloodWait
 import subprocess
 import os
@@ -715,10 +716,7 @@ def download_cookie_callback(app, callback_query):
         try:
             cookies_from_browser(app, fake_message("/cookies_from_browser", user_id))
         except FloodWait as e:
-            user_dir = os.path.join("users", str(user_id))
-            os.makedirs(user_dir, exist_ok=True)
-            with open(os.path.join(user_dir, "flood_wait.txt"), 'w') as f:
-                f.write(str(e.value))
+            user_settings.write(user_id, FLOOD_WAIT, str(e.value))
             try:
                 app.answer_callback_query(callback_query.id, safe_get_messages(user_id).COOKIES_FLOOD_LIMIT_MSG, show_alert=False)
             except Exception:
@@ -9,6 +9,7 @@ from pyrogram.types import InlineKeyboardMarkup, InlineKeyboardButton, ReplyPara
 from HELPERS.app_instance import get_app
 from HELPERS.logger import send_to_logger, logger
 from HELPERS.filesystem_hlp import create_directory
+from HELPERS.user_settings import user_settings, FORMAT
 from HELPERS.limitter import is_user_in_channel
 from HELPERS.safe_messeger import safe_send_message, safe_edit_message_text
 from HELPERS.decorators import background_handler
@@ -152,8 +153,7 @@ def set_format(app, message):
         # Check for special arguments
         if arg.lower() == "ask":
             # Set to Always Ask mode
-            with open(os.path.join(user_dir, "format.txt"), "w", encoding="utf-8") as f:
-                f.write("ALWAYS_ASK")
+            user_settings.write(user_id, FORMAT, "ALWAYS_ASK")
             safe_send_message(user_id, safe_get_messages(user_id).FORMAT_ALWAYS_ASK_SET_MSG, message=message)
             send_to_logger(message, safe_get_messages(user_id).FORMAT_ALWAYS_ASK_SET_LOG_MSG)
             return
@@ -212,8 +212,7 @@ def set_format(app, message):
             safe_send_message(user_id, safe_get_messages(user_id).FORMAT_CUSTOM_UPDATED_MSG.format(format=custom_format), message=message)
             send_to_logger(message, safe_get_messages(user_id).FORMAT_UPDATED_CUSTOM_LOG_MSG.format(format=custom_format))
         
-        with open(os.path.join(user_dir, "format.txt"), "w", encoding="utf-8") as f:
-            f.write(custom_format)
+        user_settings.write(user_id, FORMAT, custom_format)
     else:
         # Main Menu with A Few Popular Options, Plus The Others Button
         main_keyboard = InlineKeyboardMarkup([
@@ -425,10 +424,7 @@ safe_get_messages(user_id).FORMAT_CUSTOM_HINT_MSG,
         chosen_format = data
 
     # Save The Selected Format
-    user_dir = os.path.join("users", str(user_id))
-    create_directory(user_dir)
-    with open(os.path.join(user_dir, "format.txt"), "w", encoding="utf-8") as f:
-        f.write(chosen_format)
+    user_settings.write(user_id, FORMAT, chosen_format)
     safe_edit_message_text(callback_query.message.chat.id, callback_query.message.id, safe_get_messages(user_id).FORMAT_UPDATED_MSG.format(format=chosen_format))
     try:
         callback_query.answer(safe_get_messages(user_id).FORMAT_SAVED_MSG)
@@ -437,10 +433,7 @@ safe_get_messages(user_id).FORMAT_CUSTOM_HINT_MSG,
     send_to_logger(callback_query.message, safe_get_messages(user_id).FORMAT_UPDATED_CALLBACK_LOG_MSG.format(format=chosen_format))
 
     if data == "alwaysask":
-        user_dir = os.path.join("users", str(user_id))
-        create_directory(user_dir)
-        with open(os.path.join(user_dir, "format.txt"), "w", encoding="utf-8") as f:
-            f.write("ALWAYS_ASK")
+        user_settings.write(user_id, FORMAT, "ALWAYS_ASK")
         safe_edit_message_text(callback_query.message.chat.id, callback_query.message.id,
                                safe_get_messages(user_id).FORMAT_ALWAYS_ASK_CONFIRM_MSG)
         send_to_logger(callback_query.message, safe_get_messages(user_id).FORMAT_ALWAYS_ASK_SET_CALLBACK_LOG_MSG)
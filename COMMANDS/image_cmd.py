@@ -1,5 +1,6 @@
 # ===================== /img command =====================
 import os
+import queue
 import re
 import subprocess
 import tempfile
@@ -23,6 +24,8 @@ from DOWN_AND_UP.gallery_dl_hook import (
     get_total_media_count,
     download_image_range,
     download_image_range_cli,
+    download_image_range_session,
+    close_image_session,
 )
 from HELPERS.filesystem_hlp import create_directory
 from COMMANDS.proxy_cmd import is_proxy_enabled
@@ -1640,14 +1643,30 @@ def image_command(app, message):
         last_activity_time = time.time()  # Track last time we found new files
         max_inactivity_time = LimitsConfig.MAX_IMG_INACTIVITY_TIME
         
-        # helper to run one range and wait for files to appear
-        def run_and_collect(next_end: int):
+        # Completion channel: the downloader reports every file as soon as it is written,
+        # followed by a (_RANGE_DONE, result) marker when the range has finished
+        completed_files = queue.Queue()
+        _RANGE_DONE = object()
+        range_thread = None  # range being downloaded in the background
+        range_info = {}
+        last_range_full = False
+
+        # helper to download one range: the user's in-process gallery-dl session
+        # keeps its extractor between batches; the CLI is used if it is unavailable
+        def download_range(range_expr: str):
+            result = download_image_range_session(url, range_expr, user_id, use_proxy, output_dir=run_dir, on_file=completed_files.put)
+            if result is None:
+                result = download_image_range_cli(url, range_expr, user_id, use_proxy, output_dir=run_dir, on_file=completed_files.put)
+            return result
+
+        # helper to run one range; files are picked up from completed_files
+        def run_and_collect(current_start: int, next_end: int):
             messages = safe_get_messages(user_id)
             # For single item or when total is small, use range 1-1 to avoid API issues
             # Only use 1-1 when we're actually starting from 1 and it's a single item
             if (current_start == next_end and current_start == 1) or (detected_total and detected_total <= 10 and current_start == 1):
                 logger.info(LoggerMsg.IMG_DOWNLOADING_RANGE_1_1_LOG_MSG.format(detected_total=detected_total, current_start=current_start, next_end=next_end))
-                result = download_image_range_cli(url, "1-1", user_id, use_proxy, output_dir=run_dir)
+                result = download_range("1-1")
                 if isinstance(result, str):  # 401 Unauthorized error message
                     return result
                 if not result:
@@ -1665,7 +1684,7 @@ def image_command(app, message):
                     range_expr = f"{current_start}-{next_end}"
                 # Prefer CLI to enforce strict range behavior across gallery-dl versions
                 logger.info(LoggerMsg.IMG_PREPARED_RANGE_LOG_MSG.format(range_expr=range_expr))
-                result = download_image_range_cli(url, range_expr, user_id, use_proxy, output_dir=run_dir)
+                result = download_range(range_expr)
                 if isinstance(result, str):  # 401 Unauthorized error message
                     return result
                 if not result:
@@ -1688,7 +1707,7 @@ def image_command(app, message):
                 for idx in range(start, end - 1, -1):
                     range_expr = f"{idx}-{idx}"
                     logger.info(f"[IMG REVERSE] Downloading single item: {range_expr}")
-                    result = download_image_range_cli(url, range_expr, user_id, use_proxy, output_dir=run_dir)
+                    result = download_range(range_expr)
                     if isinstance(result, str):  # 401 Unauthorized error message
                         return result
                     if not result:
@@ -1696,13 +1715,56 @@ def image_command(app, message):
                         result = download_image_range(url, range_expr, user_id, use_proxy, run_dir)
                         if isinstance(result, str):  # 401 Unauthorized error message
                             return result
-                    # Small delay between requests
-                    time.sleep(0.5)
             else:
                 # If start <= end, this is not reverse order (should not happen)
                 logger.warning(f"[IMG REVERSE] start ({start}) <= end ({end}), this should not happen for reverse order")
             return True
 
+        # Start a range download in the background; its files flow into the upload
+        # stage while it is still running
+        def start_range(target, *args):
+            def run():
+                result = False
+                try:
+                    result = target(*args)
+                except Exception as e:
+                    logger.error(f"[IMG BATCH] Range download failed: {e}")
+                finally:
+                    completed_files.put((_RANGE_DONE, result))
+            thread = threading.Thread(target=run, daemon=True, name="IMG-Range")
+            thread.start()
+            return thread
+
+        # Wait until the downloader reports files (or the range ends) and return
+        # them grouped like os.walk() output: [(root, [], [file, ...]), ...]
+        def wait_for_files(timeout: float):
+            nonlocal range_thread
+            paths = []
+            range_finished = False
+            range_result = None
+            block = range_thread is not None
+            while True:
+                try:
+                    item = completed_files.get(timeout=max(0.1, timeout)) if block else completed_files.get_nowait()
+                except queue.Empty:
+                    break
+                block = False
+                if isinstance(item, tuple) and item and item[0] is _RANGE_DONE:
+                    range_thread = None
+                    range_finished = True
+                    range_result = item[1]
+                    break
+                paths.append(item)
+            if range_finished:
+                # Catch files written without a completion report (API fallback)
+                for root, _, files in os.walk(gallery_dl_dir):
+                    paths.extend(os.path.join(root, f) for f in files)
+            groups = {}
+            for path in paths:
+                path = os.path.normpath(path)
+                groups.setdefault(os.path.dirname(path), []).append(os.path.basename(path))
+            return [(root, [], files) for root, files in groups.items()], range_finished, range_result
+
         consecutive_empty_searches = 0  # Counter for consecutive searches with no new files
         max_consecutive_empty_searches = 3  # Exit after 3 consecutive searches with no new files
         
@@ -1719,18 +1781,19 @@ def image_command(app, message):
                 logger.warning(LoggerMsg.IMG_BATCH_INACTIVITY_TIMEOUT_LOG_MSG.format(max_inactivity_time=max_inactivity_time, inactivity_elapsed=inactivity_elapsed))
                 break
                 
-            # Only download next range if buffer is empty (strict batching)
-            if len(photos_videos_buffer) == 0:
-                upper_cap = manual_end_cap or total_expected
-                # Reverse-order stopping condition (negative indices or start > end)
-                if is_reverse_order_img:
-                    # Reverse order: stop when we reach the end
-                    if upper_cap and current_start < upper_cap:
-                        break
-                else:
-                    # Forward order
-                    if upper_cap and current_start > upper_cap:
-                        break
+            # Start the next range when none is downloading and either the buffer is empty
+            # (strict batching) or the previous range was complete, so that downloading
+            # the next range overlaps with sending the current albums
+            upper_cap = manual_end_cap or total_expected
+            if is_reverse_order_img:
+                # Reverse order: stop when we reach the end
+                ranges_left = not (upper_cap and current_start < upper_cap)
+            else:
+                # Forward order
+                ranges_left = not (upper_cap and current_start > upper_cap)
+            if range_thread is None and (len(photos_videos_buffer) == 0 or (last_range_full and ranges_left)):
+                if not ranges_left:
+                    break
                 
                 if is_reverse_order_img:
                     # Reverse order: download from higher to lower
@@ -1744,116 +1807,76 @@ def image_command(app, message):
                         next_end = min(next_end, upper_cap)
                 logger.info(LoggerMsg.IMG_BATCH_STARTING_DOWNLOAD_RANGE_LOG_MSG.format(current_start=current_start, next_end=next_end))
                 
-                # Build range_expr correctly for reverse order
-                if is_reverse_order_img and current_start > next_end:
-                    range_expr = f"{next_end}-{current_start}"
-                else:
-                    range_expr = f"{current_start}-{next_end}"
-                
                 # Reset range timer
                 range_start_time = time.time()
                 
-                # Count files before download
-                files_before = len(seen_files)
-                # Save original current_start for expected_files calculation
-                original_current_start = current_start
-                # Use the correct range_expr for downloading
+                # Count files before download; save original current_start for expected_files calculation
+                range_info = {"files_before": len(seen_files), "start": current_start, "end": next_end}
                 if is_reverse_order_img:
                     # Reverse order: gallery-dl may not support this directly
                     # Download items one by one in reverse order
-                    result = run_and_collect_reverse(current_start, next_end, batch_size)
+                    range_thread = start_range(run_and_collect_reverse, current_start, next_end, batch_size)
                     # Update current_start for reverse order
                     current_start = next_end - 1
                 else:
-                    result = run_and_collect(next_end)
+                    range_thread = start_range(run_and_collect, current_start, next_end)
                     # Update current_start for forward order
                     current_start = next_end + 1
+            
+            # Pick up files as the downloader reports them (no fixed sleeps / rescans)
+            wait_budget = min(
+                max_inactivity_time - (time.time() - last_activity_time),
+                max_total_wait_time - (time.time() - total_start_time),
+            )
+            new_file_groups, range_finished, result = wait_for_files(wait_budget)
+            if range_finished and not is_reverse_order_img:
+                # Debug: Log the result type and content
+                logger.info(f"[IMG DEBUG] run_and_collect result: type={type(result)}, value={result}")
+                
+                # Check for fatal errors
+                if isinstance(result, str) and ":" in result and any(error_type in result for error_type in [
+                    "Authentication Error", "Account Not Found", "Account Unavailable", 
+                    "Rate Limit Exceeded", "Network Error", "Content Unavailable",
+                    "Geographic Restrictions", "Verification Required", "Policy Violation",
+                    "Unknown Error", "Fatal Error", "Critical Error", "Unexpected Error"
+                ]):
+                    logger.error(LoggerMsg.IMG_FATAL_ERROR_DETECTED_LOG_MSG.format(result=result))
+                    logger.info(f"[IMG DEBUG] Processing fatal error: status_msg={status_msg}, status_msg.id={status_msg.id if status_msg else 'None'}")
+                    # Send error message to user and stop downloading
+                    error_type = result.split(':')[0]
+                    error_details = result.split(':', 1)[1].strip()
                     
-                    # Debug: Log the result type and content
-                    logger.info(f"[IMG DEBUG] run_and_collect result: type={type(result)}, value={result}")
-                    
-                    # Check for fatal errors
-                    if isinstance(result, str) and ":" in result and any(error_type in result for error_type in [
-                        "Authentication Error", "Account Not Found", "Account Unavailable", 
-                        "Rate Limit Exceeded", "Network Error", "Content Unavailable",
-                        "Geographic Restrictions", "Verification Required", "Policy Violation",
-                        "Unknown Error", "Fatal Error", "Critical Error", "Unexpected Error"
-                    ]):
-                        logger.error(LoggerMsg.IMG_FATAL_ERROR_DETECTED_LOG_MSG.format(result=result))
-                        logger.info(f"[IMG DEBUG] Processing fatal error: status_msg={status_msg}, status_msg.id={status_msg.id if status_msg else 'None'}")
-                        # Send error message to user and stop downloading
-                        error_type = result.split(':')[0]
-                        error_details = result.split(':', 1)[1].strip()
-                        
-                        # Use appropriate error message based on error type
-                        if "Instagram" in error_details or "instagram" in error_details.lower():
-                            error_msg = safe_get_messages(user_id).IMG_INSTAGRAM_AUTH_ERROR_MSG.format(
-                                error_type=error_type,
-                                url=url,
-                                error_details=error_details
-                            )
-                        else:
-                            # Generic error message for other platforms
-                            error_msg = f"❌ <b>{error_type}</b>\n\n<b>URL:</b> <code>{url}</code>\n\n<b>Details:</b> {error_details}\n\nDownload stopped due to critical error."
-                        
-                        logger.info(f"[IMG DEBUG] Updating status message with error: {error_msg[:100]}...")
-                        safe_edit_message_text(
-                            status_msg.chat.id, status_msg.id,
-                            error_msg,
-                            parse_mode=enums.ParseMode.HTML
+                    # Use appropriate error message based on error type
+                    if "Instagram" in error_details or "instagram" in error_details.lower():
+                        error_msg = safe_get_messages(user_id).IMG_INSTAGRAM_AUTH_ERROR_MSG.format(
+                            error_type=error_type,
+                            url=url,
+                            error_details=error_details
                         )
-                        log_error_to_channel(message, f"Fatal error in image download: {result}", url)
-                        return
-                    
-                    # Wait for download to complete before processing files
-                    time.sleep(2)
-                    
-                    # Give additional time for file processing if this is the first range
-                    if current_start == 1:
-                        time.sleep(3)  # Extra wait for first range
-                    
-                    # Count files after download
-                    files_after = len(seen_files)
-                    files_downloaded_in_range = files_after - files_before
-                    # Correct expected_files calculation for reverse order
-                    # Use original_current_start saved above
-                    if is_reverse_order_img:
-                        expected_files = abs(original_current_start - next_end) + 1
                     else:
-                        expected_files = next_end - original_current_start + 1
+                        # Generic error message for other platforms
+                        error_msg = f"❌ <b>{error_type}</b>\n\n<b>URL:</b> <code>{url}</code>\n\n<b>Details:</b> {error_details}\n\nDownload stopped due to critical error."
                     
-                    elapsed_time = time.time() - range_start_time
-                    logger.info(LoggerMsg.IMG_BATCH_DOWNLOADED_FILES_LOG_MSG.format(files_downloaded_in_range=files_downloaded_in_range, current_start=original_current_start, next_end=next_end, expected_files=expected_files, elapsed_time=elapsed_time))
-                    
-                    # Check if we got no files at all (gallery-dl found nothing)
-                    # Always proceed to file search - don't break early
-                    # current_start was updated above; do not update it again
-                    if files_downloaded_in_range == 0:
-                        logger.info(LoggerMsg.IMG_BATCH_NO_FILES_DOWNLOADED_LOG_MSG.format(current_start=original_current_start, next_end=next_end))
-                    else:
-                        logger.info(LoggerMsg.IMG_BATCH_FOUND_FILES_LOG_MSG.format(files_downloaded_in_range=files_downloaded_in_range))
-                    
-                    # Check if we got significantly fewer files than expected (less than 50% of expected)
-                    # This indicates the media has ended
-                    # current_start was updated above; do not update it again
-                    if files_downloaded_in_range and files_downloaded_in_range < expected_files * 0.5 and files_downloaded_in_range > 0:
-                        logger.info(LoggerMsg.IMG_BATCH_MEDIA_ENDED_LOG_MSG.format(files_downloaded_in_range=files_downloaded_in_range, expected_files=expected_files))
-            
-            # Find new files - search in the actual download directory structure
-            # gallery-dl creates subdirectories like instagram/username/ so we need to search deeper
+                    logger.info(f"[IMG DEBUG] Updating status message with error: {error_msg[:100]}...")
+                    safe_edit_message_text(
+                        status_msg.chat.id, status_msg.id,
+                        error_msg,
+                        parse_mode=enums.ParseMode.HTML
+                    )
+                    log_error_to_channel(message, f"Fatal error in image download: {result}", url)
+                    return
+
+            # Process the new files - gallery-dl creates subdirectories like instagram/username/
             search_dir = gallery_dl_dir
             logger.info(LoggerMsg.IMG_BATCH_SEARCHING_FILES_LOG_MSG.format(search_dir=search_dir))
             
             files_found_in_this_search = 0  # Count files found in this search iteration
             
-            if os.path.exists(search_dir):
-                # Debug: list all subdirectories
-                for root, dirs, files in os.walk(search_dir):
+            if new_file_groups:
+                for root, _, files in new_file_groups:
                     if files:
                         logger.info(LoggerMsg.IMG_BATCH_FOUND_FILES_IN_DIR_LOG_MSG.format(file_count=len(files), root=root))
-                    if dirs:
-                        logger.info(LoggerMsg.IMG_BATCH_FOUND_SUBDIRS_LOG_MSG.format(dirs=dirs))
-                for root, _, files in os.walk(search_dir):
+                for root, _, files in new_file_groups:
                     for file in files:
                         file_path = os.path.join(root, file)
                         # Skip special thumbs/covers generated for Telegram
@@ -3036,9 +3059,33 @@ def image_command(app, message):
                         if not is_admin and total_sent >= total_limit:
                             break
 
+            if range_finished:
+                files_downloaded_in_range = len(seen_files) - range_info["files_before"]
+                original_current_start, next_end = range_info["start"], range_info["end"]
+                # Correct expected_files calculation for reverse order
+                if is_reverse_order_img:
+                    expected_files = abs(original_current_start - next_end) + 1
+                else:
+                    expected_files = next_end - original_current_start + 1
+                last_range_full = files_downloaded_in_range >= expected_files
+                
+                elapsed_time = time.time() - range_start_time
+                logger.info(LoggerMsg.IMG_BATCH_DOWNLOADED_FILES_LOG_MSG.format(files_downloaded_in_range=files_downloaded_in_range, current_start=original_current_start, next_end=next_end, expected_files=expected_files, elapsed_time=elapsed_time))
+                
+                # Check if we got no files at all (gallery-dl found nothing)
+                if files_downloaded_in_range == 0:
+                    logger.info(LoggerMsg.IMG_BATCH_NO_FILES_DOWNLOADED_LOG_MSG.format(current_start=original_current_start, next_end=next_end))
+                else:
+                    logger.info(LoggerMsg.IMG_BATCH_FOUND_FILES_LOG_MSG.format(files_downloaded_in_range=files_downloaded_in_range))
+                
+                # Check if we got significantly fewer files than expected (less than 50% of expected)
+                # This indicates the media has ended
+                if files_downloaded_in_range and files_downloaded_in_range < expected_files * 0.5 and files_downloaded_in_range > 0:
+                    logger.info(LoggerMsg.IMG_BATCH_MEDIA_ENDED_LOG_MSG.format(files_downloaded_in_range=files_downloaded_in_range, expected_files=expected_files))
+
             # Flush remainder if no more ranges pending
             upper_cap = manual_end_cap or total_expected
-            if (upper_cap and (total_sent >= upper_cap or current_start > upper_cap)) or (not is_admin and total_sent >= total_limit):
+            if (range_thread is None and upper_cap and (total_sent >= upper_cap or current_start > upper_cap)) or (not is_admin and total_sent >= total_limit):
                 # Send remaining media groups
                 if photos_videos_buffer:
                     group = photos_videos_buffer[:batch_size]
@@ -3769,19 +3816,18 @@ def image_command(app, message):
                 logger.warning(f"[IMG BATCH] Range timeout reached ({max_range_wait_time}s), no new files found in current range")
                 break
 
-            # Check if we found any new files in this search iteration
-            if files_found_in_this_search == 0:
+            # Check if we found any new files in this search iteration (a range still
+            # downloading is not an empty search: wait_for_files() blocks on it)
+            if files_found_in_this_search == 0 and range_thread is None:
                 consecutive_empty_searches += 1
                 logger.info(f"[IMG BATCH] No new files found in search iteration {consecutive_empty_searches}/{max_consecutive_empty_searches}")
                 if consecutive_empty_searches >= max_consecutive_empty_searches:
                     logger.info(f"[IMG BATCH] Exiting loop after {consecutive_empty_searches} consecutive empty searches")
                     break
-            else:
+            elif files_found_in_this_search:
                 consecutive_empty_searches = 0  # Reset counter when we find files
                 logger.info(f"[IMG BATCH] Found {files_found_in_this_search} new files, resetting empty search counter")
 
-            time.sleep(0.5)
-
         # Update status to show completion
         try:
             if not completion_sent:
@@ -3970,6 +4016,8 @@ def image_command(app, message):
         except Exception as e:
             logger.warning(f"[IMG CLEANUP] Failed to perform final cleanup: {e}")
 
+        close_image_session(user_id, url)
+
         # Remove protection file after successful download
         from HELPERS.filesystem_hlp import remove_protection_file
         remove_protection_file(run_dir)
@@ -4053,6 +4101,7 @@ def image_command(app, message):
             logger.info(f"[IMG CLEANUP ERROR] Final cleanup completed")
         except Exception as cleanup_final_e:
             logger.warning(f"[IMG CLEANUP ERROR] Failed to perform final cleanup: {cleanup_final_e}")
+        close_image_session(user_id, url)
         
         safe_edit_message_text(
             user_id, status_msg.id,
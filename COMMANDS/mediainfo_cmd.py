@@ -8,6 +8,7 @@ from pyrogram.types import InlineKeyboardMarkup, InlineKeyboardButton, ReplyPara
 
 from HELPERS.app_instance import get_app
 from HELPERS.filesystem_hlp import create_directory
+from HELPERS.user_settings import user_settings, get_user_settings, MEDIAINFO
 from HELPERS.logger import send_to_logger, logger, send_to_all, send_error_to_user
 from HELPERS.safe_messeger import safe_send_message, safe_edit_message_text
 from HELPERS.decorators import background_handler
@@ -40,10 +41,8 @@ def mediainfo_command(app, message):
         parts = (message.text or "").split()
         if len(parts) >= 2:
             arg = parts[1].lower()
-            mediainfo_file = os.path.join(user_dir, "mediainfo.txt")
             if arg in ("on", "off"):
-                with open(mediainfo_file, "w", encoding="utf-8") as f:
-                    f.write("ON" if arg == "on" else "OFF")
+                user_settings.write(user_id, MEDIAINFO, "ON" if arg == "on" else "OFF")
                 safe_send_message(user_id, safe_get_messages(user_id).MEDIAINFO_ENABLED_MSG.format(status='enabled' if arg=='on' else 'disabled'), message=message)
                 send_to_logger(message, safe_get_messages(user_id).MEDIAINFO_SET_COMMAND_LOG_MSG.format(arg=arg))
                 return
@@ -70,9 +69,6 @@ def mediainfo_option_callback(app, callback_query):
     messages = safe_get_messages(user_id)
     logger.info(safe_get_messages(user_id).MEDIAINFO_CALLBACK_MSG.format(callback_data=callback_query.data))
     data = callback_query.data.split("|")[1]
-    user_dir = os.path.join("users", str(user_id))
-    create_directory(user_dir)
-    mediainfo_file = os.path.join(user_dir, "mediainfo.txt")
     if callback_query.data == "mediainfo_option|close":
         try:
             callback_query.message.delete()
@@ -85,8 +81,7 @@ def mediainfo_option_callback(app, callback_query):
         send_to_logger(callback_query.message, safe_get_messages(user_id).MEDIAINFO_MENU_CLOSED_LOG_MSG)
         return
     if data == "on":
-        with open(mediainfo_file, "w", encoding="utf-8") as f:
-            f.write("ON")
+        user_settings.write(user_id, MEDIAINFO, "ON")
         safe_edit_message_text(callback_query.message.chat.id, callback_query.message.id, safe_get_messages(user_id).MEDIAINFO_ENABLED_CONFIRM_MSG)
         send_to_logger(callback_query.message, safe_get_messages(user_id).MEDIAINFO_ENABLED_LOG_MSG)
         try:
@@ -95,8 +90,7 @@ def mediainfo_option_callback(app, callback_query):
             pass
         return
     if data == "off":
-        with open(mediainfo_file, "w", encoding="utf-8") as f:
-            f.write("OFF")
+        user_settings.write(user_id, MEDIAINFO, "OFF")
         safe_edit_message_text(callback_query.message.chat.id, callback_query.message.id, safe_get_messages(user_id).MEDIAINFO_DISABLED_MSG)
         send_to_logger(callback_query.message, safe_get_messages(user_id).MEDIAINFO_DISABLED_LOG_MSG)
         try:
@@ -108,15 +102,7 @@ def mediainfo_option_callback(app, callback_query):
 
 def is_mediainfo_enabled(user_id):
     messages = safe_get_messages(user_id)
-    user_dir = os.path.join("users", str(user_id))
-    mediainfo_file = os.path.join(user_dir, "mediainfo.txt")
-    if not os.path.exists(mediainfo_file):
-        return False
-    try:
-        with open(mediainfo_file, "r", encoding="utf-8") as f:
-            return f.read().strip().upper() == "ON"
-    except Exception:
-        return False
+    return get_user_settings(user_id).mediainfo
 
 
 def get_mediainfo_cli(file_path):
@@ -7,6 +7,7 @@ from pyrogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
 from HELPERS.app_instance import get_app
 from HELPERS.filesystem_hlp import create_directory
+from HELPERS.user_settings import user_settings, get_user_settings, NSFW_BLUR
 from HELPERS.logger import send_to_logger, logger
 from CONFIG.logger_msg import LoggerMsg
 from HELPERS.safe_messeger import safe_send_message, safe_edit_message_text
@@ -47,10 +48,8 @@ def nsfw_command(app, message):
         parts = (message.text or "").split()
         if len(parts) >= 2:
             arg = parts[1].lower()
-            nsfw_file = os.path.join(user_dir, "nsfw_blur.txt")
             if arg in ("on", "off"):
-                with open(nsfw_file, "w", encoding="utf-8") as f:
-                    f.write("ON" if arg == "on" else "OFF")
+                user_settings.write(storage_id, NSFW_BLUR, "ON" if arg == "on" else "OFF")
                 
                 if arg == "on":
                     safe_send_message(chat_id, safe_get_messages(user_id).NSFW_ON_MSG, parse_mode=enums.ParseMode.HTML, message=message)
@@ -99,9 +98,6 @@ def nsfw_option_callback(app, callback_query):
     chat_id = getattr(chat, "id", None) if chat else user_id
     # Store per-chat: in groups use chat_id (negative), in private chat_id == user id
     storage_id = chat_id
-    user_dir = os.path.join("users", str(storage_id))
-    create_directory(user_dir)
-    nsfw_file = os.path.join(user_dir, "nsfw_blur.txt")
     
     if callback_query.data == "nsfw_option|close":
         try:
@@ -116,8 +112,7 @@ def nsfw_option_callback(app, callback_query):
         return
     
     if data == "on":
-        with open(nsfw_file, "w", encoding="utf-8") as f:
-            f.write("ON")
+        user_settings.write(storage_id, NSFW_BLUR, "ON")
         safe_edit_message_text(callback_query.message.chat.id, callback_query.message.id, safe_get_messages(user_id).NSFW_ON_MSG, parse_mode=enums.ParseMode.HTML)
         send_to_logger(callback_query.message, safe_get_messages(user_id).NSFW_BLUR_DISABLED_MSG)
         try:
@@ -127,8 +122,7 @@ def nsfw_option_callback(app, callback_query):
         return
     
     if data == "off":
-        with open(nsfw_file, "w", encoding="utf-8") as f:
-            f.write("OFF")
+        user_settings.write(storage_id, NSFW_BLUR, "OFF")
         safe_edit_message_text(callback_query.message.chat.id, callback_query.message.id, safe_get_messages(user_id).NSFW_OFF_MSG, parse_mode=enums.ParseMode.HTML)
         send_to_logger(callback_query.message, safe_get_messages(user_id).NSFW_BLUR_ENABLED_MSG)
         try:
@@ -145,17 +139,8 @@ def is_nsfw_blur_enabled(user_id):
     Returns True if blur should be applied (default behavior).
     Returns False if blur should be disabled.
     """
-    user_dir = os.path.join("users", str(user_id))
-    nsfw_file = os.path.join(user_dir, "nsfw_blur.txt")
-    if not os.path.exists(nsfw_file):
-        return True  # Default: blur enabled
-    
-    try:
-        with open(nsfw_file, "r", encoding="utf-8") as f:
-            content = f.read().strip().upper()
-            return content != "ON"  # If file contains "ON", blur is disabled
-    except Exception:
-        return True  # Default: blur enabled on error
+    # If file contains "ON", blur is disabled; enabled when missing or unreadable
+    return get_user_settings(user_id).nsfw_blur
 
 
 def should_apply_spoiler(user_id, is_nsfw, is_private_chat):
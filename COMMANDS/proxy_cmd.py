@@ -1,6 +1,5 @@
 # /Proxy Command
 import os
-import tempfile
 from pyrogram import filters
 from CONFIG.config import Config
 from CONFIG.messages import Messages, safe_get_messages
@@ -9,6 +8,7 @@ from pyrogram.types import InlineKeyboardMarkup, InlineKeyboardButton, ReplyPara
 
 from HELPERS.app_instance import get_app
 from HELPERS.filesystem_hlp import create_directory
+from HELPERS.user_settings import user_settings, get_user_settings, PROXY
 from HELPERS.logger import send_to_logger, logger, send_to_all
 from HELPERS.safe_messeger import safe_send_message, safe_edit_message_text
 from HELPERS.decorators import background_handler
@@ -17,33 +17,17 @@ from HELPERS.limitter import is_user_in_channel
 # Get app instance for decorators
 app = get_app()
 
-def safe_write_file(file_path, content):
-    """Safely write content to file with atomic operation"""
+def save_proxy_setting(user_id, value):
+    """Persist proxy.txt ("ON"/"OFF") through the user settings store"""
+    proxy_file = os.path.join(user_settings.user_dir(user_id), PROXY)
     try:
-        # Create directory if it doesn't exist
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        
-        # Write to temporary file first, then rename (atomic operation)
-        temp_dir = os.path.dirname(file_path)
-        with tempfile.NamedTemporaryFile(mode='w', encoding='utf-8', dir=temp_dir, delete=False) as temp_file:
-            temp_file.write(content)
-            temp_file.flush()
-            temp_path = temp_file.name
-        
-        # Atomic rename
-        os.rename(temp_path, file_path)
+        user_settings.write(user_id, PROXY, value)
         return True
     except OSError as e:
-        logger.error(LoggerMsg.PROXY_CMD_ERROR_WRITING_FILE_LOG_MSG.format(file_path=file_path, error=e))
-        # Clean up temp file if it exists
-        try:
-            if 'temp_path' in locals() and os.path.exists(temp_path):
-                os.unlink(temp_path)
-        except Exception:
-            pass
+        logger.error(LoggerMsg.PROXY_CMD_ERROR_WRITING_FILE_LOG_MSG.format(file_path=proxy_file, error=e))
         return False
     except Exception as e:
-        logger.error(LoggerMsg.PROXY_CMD_UNEXPECTED_ERROR_WRITING_FILE_LOG_MSG.format(file_path=file_path, error=e))
+        logger.error(LoggerMsg.PROXY_CMD_UNEXPECTED_ERROR_WRITING_FILE_LOG_MSG.format(file_path=proxy_file, error=e))
         return False
 
 @app.on_message(filters.command("proxy") & filters.private)
@@ -70,9 +54,8 @@ def proxy_command(app, message):
         parts = (message.text or "").split()
         if len(parts) >= 2:
             arg = parts[1].lower()
-            proxy_file = os.path.join(user_dir, "proxy.txt")
             if arg in ("on", "off"):
-                if safe_write_file(proxy_file, "ON" if arg == "on" else "OFF"):
+                if save_proxy_setting(user_id, "ON" if arg == "on" else "OFF"):
                     safe_send_message(user_id, safe_get_messages(user_id).PROXY_ENABLED_MSG.format(status='enabled' if arg=='on' else 'disabled'), message=message)
                     send_to_logger(message, safe_get_messages(user_id).PROXY_SET_COMMAND_LOG_MSG.format(arg=arg))
                     return
@@ -114,10 +97,6 @@ def proxy_option_callback(app, callback_query):
     messages = safe_get_messages(user_id)
     logger.info(LoggerMsg.PROXY_CMD_CALLBACK_LOG_MSG.format(callback_data=callback_query.data))
     data = callback_query.data.split("|")[1]
-    user_dir = os.path.join("users", str(user_id))
-    create_directory(user_dir)
-    proxy_file = os.path.join(user_dir, "proxy.txt")
-    
     if callback_query.data == "proxy_option|close":
         try:
             callback_query.message.delete()
@@ -131,7 +110,7 @@ def proxy_option_callback(app, callback_query):
         return
     
     if data == "on":
-        if not safe_write_file(proxy_file, "ON"):
+        if not save_proxy_setting(user_id, "ON"):
             try:
                 callback_query.answer(safe_get_messages(user_id).PROXY_ERROR_SAVING_CALLBACK_MSG)
             except Exception:
@@ -156,7 +135,7 @@ def proxy_option_callback(app, callback_query):
         return
     
     if data == "off":
-        if not safe_write_file(proxy_file, "OFF"):
+        if not save_proxy_setting(user_id, "OFF"):
             try:
                 callback_query.answer(safe_get_messages(user_id).PROXY_ERROR_SAVING_CALLBACK_MSG)
             except Exception:
@@ -175,20 +154,7 @@ def proxy_option_callback(app, callback_query):
 def is_proxy_enabled(user_id):
     messages = safe_get_messages(user_id)
     """Check if proxy is enabled for user"""
-    user_dir = os.path.join("users", str(user_id))
-    proxy_file = os.path.join(user_dir, "proxy.txt")
-    if not os.path.exists(proxy_file):
-        return False
-    try:
-        with open(proxy_file, "r", encoding="utf-8") as f:
-            content = f.read().strip().upper()
-            return content == "ON"
-    except OSError as e:
-        logger.error(LoggerMsg.PROXY_CMD_ERROR_READING_FILE_LOG_MSG.format(proxy_file=proxy_file, error=e))
-        return False
-    except Exception as e:
-        logger.error(LoggerMsg.PROXY_CMD_UNEXPECTED_ERROR_READING_FILE_LOG_MSG.format(proxy_file=proxy_file, error=e))
-        return False
+    return get_user_settings(user_id).proxy
 
 
 def get_proxy_config():
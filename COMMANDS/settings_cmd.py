@@ -11,6 +11,7 @@ from HELPERS.limitter import is_user_in_channel
 from HELPERS.app_instance import get_app
 from HELPERS.safe_messeger import fake_message, safe_send_message, safe_edit_message_text
 from HELPERS.decorators import background_handler
+from HELPERS.user_settings import user_settings, FLOOD_WAIT
 from pyrogram.errors import FloodWait
 import os
 # Lazy imports to avoid circular dependency - import url_distractor inside functions
@@ -106,10 +107,7 @@ def settings_menu_callback(app, callback_query: CallbackQuery):
         try:
             lang_command(app, fake_message("/lang", user_id))
         except FloodWait as e:
-            user_dir = os.path.join("users", str(user_id))
-            os.makedirs(user_dir, exist_ok=True)
-            with open(os.path.join(user_dir, "flood_wait.txt"), 'w') as f:
-                f.write(str(e.value))
+            user_settings.write(user_id, FLOOD_WAIT, str(e.value))
             try:
                 callback_query.answer(safe_get_messages(user_id).SETTINGS_FLOOD_LIMIT_MSG, show_alert=False)
             except Exception:
@@ -331,10 +329,7 @@ def settings_cmd_callback(app, callback_query: CallbackQuery):
         try:
             url_distractor(app, fake_message("/cookie", user_id))
         except FloodWait as e:
-            user_dir = os.path.join("users", str(user_id))
-            os.makedirs(user_dir, exist_ok=True)
-            with open(os.path.join(user_dir, "flood_wait.txt"), 'w') as f:
-                f.write(str(e.value))
+            user_settings.write(user_id, FLOOD_WAIT, str(e.value))
             try:
                 callback_query.answer(safe_get_messages(user_id).SETTINGS_FLOOD_LIMIT_MSG, show_alert=False)
             except Exception:
@@ -349,10 +344,7 @@ def settings_cmd_callback(app, callback_query: CallbackQuery):
         try:
             cookies_from_browser(app, fake_message("/cookies_from_browser", user_id))
         except FloodWait as e:
-            user_dir = os.path.join("users", str(user_id))
-            os.makedirs(user_dir, exist_ok=True)
-            with open(os.path.join(user_dir, "flood_wait.txt"), 'w') as f:
-                f.write(str(e.value))
+            user_settings.write(user_id, FLOOD_WAIT, str(e.value))
             try:
                 callback_query.answer(safe_get_messages(user_id).SETTINGS_FLOOD_LIMIT_MSG, show_alert=False)
             except Exception:
@@ -367,10 +359,7 @@ def settings_cmd_callback(app, callback_query: CallbackQuery):
         try:
             url_distractor(app, fake_message("/check_cookie", user_id))
         except FloodWait as e:
-            user_dir = os.path.join("users", str(user_id))
-            os.makedirs(user_dir, exist_ok=True)
-            with open(os.path.join(user_dir, "flood_wait.txt"), 'w') as f:
-                f.write(str(e.value))
+            user_settings.write(user_id, FLOOD_WAIT, str(e.value))
             try:
                 callback_query.answer(safe_get_messages(user_id).SETTINGS_FLOOD_LIMIT_MSG, show_alert=False)
             except Exception:
@@ -399,10 +388,7 @@ def settings_cmd_callback(app, callback_query: CallbackQuery):
         try:
             set_format(app, fake_message("/format", user_id, command=["format"]))
         except FloodWait as e:
-            user_dir = os.path.join("users", str(user_id))
-            os.makedirs(user_dir, exist_ok=True)
-            with open(os.path.join(user_dir, "flood_wait.txt"), 'w') as f:
-                f.write(str(e.value))
+            user_settings.write(user_id, FLOOD_WAIT, str(e.value))
             callback_query.answer(safe_get_messages(user_id).SETTINGS_FLOOD_WAIT_ACTIVE_MSG, show_alert=False)
             return
 
@@ -418,10 +404,7 @@ def settings_cmd_callback(app, callback_query: CallbackQuery):
         try:
             subs_command(app, fake_message("/subs", user_id))
         except FloodWait as e:
-            user_dir = os.path.join("users", str(user_id))
-            os.makedirs(user_dir, exist_ok=True)
-            with open(os.path.join(user_dir, "flood_wait.txt"), 'w') as f:
-                f.write(str(e.value))
+            user_settings.write(user_id, FLOOD_WAIT, str(e.value))
             callback_query.answer(safe_get_messages(user_id).SETTINGS_FLOOD_WAIT_ACTIVE_MSG, show_alert=False)
             return
 
@@ -436,10 +419,7 @@ def settings_cmd_callback(app, callback_query: CallbackQuery):
         try:
             mediainfo_command(app, fake_message("/mediainfo", user_id))
         except FloodWait as e:
-            user_dir = os.path.join("users", str(user_id))
-            os.makedirs(user_dir, exist_ok=True)
-            with open(os.path.join(user_dir, "flood_wait.txt"), 'w') as f:
-                f.write(str(e.value))
+            user_settings.write(user_id, FLOOD_WAIT, str(e.value))
             callback_query.answer(safe_get_messages(user_id).SETTINGS_FLOOD_WAIT_ACTIVE_MSG, show_alert=False)
             return
 
@@ -453,10 +433,7 @@ def settings_cmd_callback(app, callback_query: CallbackQuery):
         try:
             split_command(app, fake_message("/split", user_id))
         except FloodWait as e:
-            user_dir = os.path.join("users", str(user_id))
-            os.makedirs(user_dir, exist_ok=True)
-            with open(os.path.join(user_dir, "flood_wait.txt"), 'w') as f:
-                f.write(str(e.value))
+            user_settings.write(user_id, FLOOD_WAIT, str(e.value))
             callback_query.answer(safe_get_messages(user_id).SETTINGS_FLOOD_WAIT_ACTIVE_MSG, show_alert=False)
             return
         callback_query.answer(safe_get_messages(user_id).SETTINGS_COMMAND_EXECUTED_MSG)
@@ -482,10 +459,7 @@ def settings_cmd_callback(app, callback_query: CallbackQuery):
         try:
             tags_command(app, fake_message("/tags", user_id))
         except FloodWait as e:
-            user_dir = os.path.join("users", str(user_id))
-            os.makedirs(user_dir, exist_ok=True)
-            with open(os.path.join(user_dir, "flood_wait.txt"), 'w') as f:
-                f.write(str(e.value))
+            user_settings.write(user_id, FLOOD_WAIT, str(e.value))
             callback_query.answer(safe_get_messages(user_id).SETTINGS_FLOOD_WAIT_ACTIVE_MSG, show_alert=False)
             return
 
@@ -499,10 +473,7 @@ def settings_cmd_callback(app, callback_query: CallbackQuery):
             res = command2(app, fake_message("/help", user_id))
 
         except FloodWait as e:
-            user_dir = os.path.join("users", str(user_id))
-            os.makedirs(user_dir, exist_ok=True)
-            with open(os.path.join(user_dir, "flood_wait.txt"), 'w') as f:
-                f.write(str(e.value))
+            user_settings.write(user_id, FLOOD_WAIT, str(e.value))
 
             try:
                 callback_query.answer(safe_get_messages(user_id).SETTINGS_FLOOD_LIMIT_MSG, show_alert=False)
@@ -526,10 +497,7 @@ def settings_cmd_callback(app, callback_query: CallbackQuery):
         try:
             url_distractor(app, fake_message("/usage", user_id))
         except FloodWait as e:
-            user_dir = os.path.join("users", str(user_id))
-            os.makedirs(user_dir, exist_ok=True)
-            with open(os.path.join(user_dir, "flood_wait.txt"), 'w') as f:
-                f.write(str(e.value))
+            user_settings.write(user_id, FLOOD_WAIT, str(e.value))
 
             try:
                 callback_query.answer(safe_get_messages(user_id).SETTINGS_FLOOD_LIMIT_MSG, show_alert=False)
@@ -546,10 +514,7 @@ def settings_cmd_callback(app, callback_query: CallbackQuery):
         try:
             playlist_command(app, fake_message("/playlist", user_id))
         except FloodWait as e:
-            user_dir = os.path.join("users", str(user_id))
-            os.makedirs(user_dir, exist_ok=True)
-            with open(os.path.join(user_dir, "flood_wait.txt"), 'w') as f:
-                f.write(str(e.value))
+            user_settings.write(user_id, FLOOD_WAIT, str(e.value))
 
             try:
                 callback_query.answer(safe_get_messages(user_id).SETTINGS_FLOOD_LIMIT_MSG, show_alert=False)
@@ -599,10 +564,7 @@ def settings_cmd_callback(app, callback_query: CallbackQuery):
         try:
             url_distractor(app, fake_message("/proxy", user_id))
         except FloodWait as e:
-            user_dir = os.path.join("users", str(user_id))
-            os.makedirs(user_dir, exist_ok=True)
-            with open(os.path.join(user_dir, "flood_wait.txt"), 'w') as f:
-                f.write(str(e.value))
+            user_settings.write(user_id, FLOOD_WAIT, str(e.value))
             try:
                 callback_query.answer(safe_get_messages(user_id).SETTINGS_FLOOD_LIMIT_MSG, show_alert=False)
             except Exception:
@@ -617,10 +579,7 @@ def settings_cmd_callback(app, callback_query: CallbackQuery):
         try:
             url_distractor(app, fake_message("/keyboard", user_id))
         except FloodWait as e:
-            user_dir = os.path.join("users", str(user_id))
-            os.makedirs(user_dir, exist_ok=True)
-            with open(os.path.join(user_dir, "flood_wait.txt"), 'w') as f:
-                f.write(str(e.value))
+            user_settings.write(user_id, FLOOD_WAIT, str(e.value))
             try:
                 callback_query.answer(safe_get_messages(user_id).SETTINGS_FLOOD_LIMIT_MSG, show_alert=False)
             except Exception:
@@ -673,10 +632,7 @@ def settings_cmd_callback(app, callback_query: CallbackQuery):
         try:
             url_distractor(app, fake_message("/add_bot_to_group", user_id))
         except FloodWait as e:
-            user_dir = os.path.join("users", str(user_id))
-            os.makedirs(user_dir, exist_ok=True)
-            with open(os.path.join(user_dir, "flood_wait.txt"), 'w') as f:
-                f.write(str(e.value))
+            user_settings.write(user_id, FLOOD_WAIT, str(e.value))
             try:
                 callback_query.answer(safe_get_messages(user_id).SETTINGS_FLOOD_LIMIT_MSG, show_alert=False)
             except Exception:
@@ -692,10 +648,7 @@ def settings_cmd_callback(app, callback_query: CallbackQuery):
             from COMMANDS.args_cmd import args_command
             args_command(app, fake_message("/args", user_id))
         except FloodWait as e:
-            user_dir = os.path.join("users", str(user_id))
-            os.makedirs(user_dir, exist_ok=True)
-            with open(os.path.join(user_dir, "flood_wait.txt"), 'w') as f:
-                f.write(str(e.value))
+            user_settings.write(user_id, FLOOD_WAIT, str(e.value))
             try:
                 callback_query.answer(safe_get_messages(user_id).SETTINGS_FLOOD_LIMIT_MSG, show_alert=False)
             except Exception:
@@ -711,10 +664,7 @@ def settings_cmd_callback(app, callback_query: CallbackQuery):
             from COMMANDS.nsfw_cmd import nsfw_command
             nsfw_command(app, fake_message("/nsfw", user_id))
         except FloodWait as e:
-            user_dir = os.path.join("users", str(user_id))
-            os.makedirs(user_dir, exist_ok=True)
-            with open(os.path.join(user_dir, "flood_wait.txt"), 'w') as f:
-                f.write(str(e.value))
+            user_settings.write(user_id, FLOOD_WAIT, str(e.value))
             try:
                 callback_query.answer(safe_get_messages(user_id).SETTINGS_FLOOD_LIMIT_MSG, show_alert=False)
             except Exception:
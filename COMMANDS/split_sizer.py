@@ -5,6 +5,7 @@ import os
 
 from HELPERS.app_instance import get_app
 from HELPERS.filesystem_hlp import create_directory
+from HELPERS.user_settings import user_settings, get_user_settings, SPLIT
 from HELPERS.logger import send_to_logger, logger
 from HELPERS.safe_messeger import safe_send_message, safe_edit_message_text
 from HELPERS.decorators import background_handler
@@ -74,11 +75,7 @@ def split_command(app, message):
         size = parse_size_argument(arg)
         if size:
             # Apply size directly
-            user_dir = os.path.join("users", str(user_id))
-            create_directory(user_dir)
-            split_file = os.path.join(user_dir, "split.txt")
-            with open(split_file, "w", encoding="utf-8") as f:
-                f.write(str(size))
+            user_settings.write(user_id, SPLIT, str(size))
             
             safe_send_message(user_id, safe_get_messages(user_id).SPLIT_SIZE_SET_MSG.format(size=humanbytes(size)), message=message)
             send_to_logger(message, safe_get_messages(user_id).SPLIT_SIZE_SET_ARGUMENT_LOG_MSG.format(size=size))
@@ -148,25 +145,13 @@ def split_size_callback(app, callback_query):
     except Exception:
         callback_query.answer(safe_get_messages(user_id).SPLIT_INVALID_SIZE_CALLBACK_MSG)
         return
-    user_dir = os.path.join("users", str(user_id))
-    create_directory(user_dir)
-    split_file = os.path.join(user_dir, "split.txt")
-    with open(split_file, "w", encoding="utf-8") as f:
-        f.write(str(size))
+    user_settings.write(user_id, SPLIT, str(size))
     safe_edit_message_text(callback_query.message.chat.id, callback_query.message.id, safe_get_messages(user_id).SPLIT_SIZE_SET_MSG.format(size=humanbytes(size)))
     send_to_logger(callback_query.message, safe_get_messages(user_id).SPLIT_SIZE_SET_CALLBACK_LOG_MSG.format(size=size))
 
 # --- Function for reading split.txt ---
 def get_user_split_size(user_id):
     messages = safe_get_messages(user_id)
-    user_dir = os.path.join("users", str(user_id))
-    split_file = os.path.join(user_dir, "split.txt")
-    if os.path.exists(split_file):
-        try:
-            with open(split_file, "r", encoding="utf-8") as f:
-                size = int(f.read().strip())
-                return size
-        except Exception:
-            pass
-    return 1950 * 1024 * 1024  # default 1.95GB
+    # default 1.95GB when split.txt is missing or invalid
+    return get_user_settings(user_id).split_size
 
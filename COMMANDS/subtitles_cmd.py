@@ -7,6 +7,7 @@ import random
 import json
 from HELPERS.app_instance import get_app
 from HELPERS.filesystem_hlp import create_directory
+from HELPERS.user_settings import user_settings, get_user_settings, SUBS, SUBS_AUTO, SUBS_ALWAYS_ASK
 from HELPERS.decorators import reply_with_keyboard, background_handler
 from HELPERS.logger import logger, send_to_logger
 from HELPERS.limitter import is_user_in_channel
@@ -754,12 +755,7 @@ def ensure_utf8_srt(srt_path):
 def get_user_subs_language(user_id):
     messages = safe_get_messages(user_id)
     """Get user's preferred subtitle language"""
-    user_dir = os.path.join("users", str(user_id))
-    subs_file = os.path.join(user_dir, "subs.txt")
-    if os.path.exists(subs_file):
-        with open(subs_file, "r", encoding="utf-8") as f:
-            return f.read().strip()
-    return None
+    return get_user_settings(user_id).subs_language
 
 def is_subs_enabled(user_id):
     messages = safe_get_messages(user_id)
@@ -769,67 +765,37 @@ def is_subs_enabled(user_id):
 def save_subs_always_ask(user_id, enabled: bool):
     messages = safe_get_messages(user_id)
     """Persist Always Ask mode for subtitles (controls 💬 SUBS button in Always Ask)."""
-    user_dir = os.path.join("users", str(user_id))
-    create_directory(user_dir)
-    path = os.path.join(user_dir, "subs_always_ask.txt")
     if enabled:
-        with open(path, "w", encoding="utf-8") as f:
-            f.write("ON")
+        user_settings.write(user_id, SUBS_ALWAYS_ASK, "ON")
     else:
-        if os.path.exists(path):
-            os.remove(path)
+        user_settings.remove(user_id, SUBS_ALWAYS_ASK)
 
 def is_subs_always_ask(user_id) -> bool:
-    user_dir = os.path.join("users", str(user_id))
-    path = os.path.join(user_dir, "subs_always_ask.txt")
-    if os.path.exists(path):
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                return f.read().strip().upper() == "ON"
-        except Exception:
-            return False
-    return False
+    return get_user_settings(user_id).subs_always_ask
 
 def save_user_subs_language(user_id, lang_code):
     messages = safe_get_messages(user_id)
     """Save user's subtitle language preference"""
-    user_dir = os.path.join("users", str(user_id))
-    create_directory(user_dir)
-    subs_file = os.path.join(user_dir, "subs.txt")
     if lang_code in ["OFF", None]:
-        if os.path.exists(subs_file):
-            os.remove(subs_file)
-        subs_auto_file = os.path.join(user_dir, "subs_auto.txt")
-        if os.path.exists(subs_auto_file):
-            os.remove(subs_auto_file)
+        user_settings.remove(user_id, SUBS)
+        user_settings.remove(user_id, SUBS_AUTO)
         clear_subs_check_cache()
     else:
-        with open(subs_file, "w", encoding="utf-8") as f:
-            f.write(lang_code)
+        user_settings.write(user_id, SUBS, lang_code)
     clear_subs_check_cache()
 
 def get_user_subs_auto_mode(user_id):
     messages = safe_get_messages(user_id)
     """Get user's AUTO mode setting for subtitles"""
-    user_dir = os.path.join("users", str(user_id))
-    auto_file = os.path.join(user_dir, "subs_auto.txt")
-    if os.path.exists(auto_file):
-        with open(auto_file, "r", encoding="utf-8") as f:
-            return f.read().strip() == "ON"
-    return False
+    return get_user_settings(user_id).subs_auto
 
 def save_user_subs_auto_mode(user_id, auto_enabled):
     messages = safe_get_messages(user_id)
     """Save user's AUTO mode setting for subtitles"""
-    user_dir = os.path.join("users", str(user_id))
-    create_directory(user_dir)
-    auto_file = os.path.join(user_dir, "subs_auto.txt")
     if auto_enabled:
-        with open(auto_file, "w", encoding="utf-8") as f:
-            f.write("ON")
+        user_settings.write(user_id, SUBS_AUTO, "ON")
     else:
-        if os.path.exists(auto_file):
-            os.remove(auto_file)
+        user_settings.remove(user_id, SUBS_AUTO)
     clear_subs_check_cache()
 
 
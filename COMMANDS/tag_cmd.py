@@ -7,6 +7,7 @@ from HELPERS.decorators import background_handler
 from CONFIG.config import Config
 from HELPERS.logger import send_to_logger
 from HELPERS.limitter import is_user_in_channel
+from HELPERS.user_settings import get_user_settings
 from CONFIG.messages import Messages, safe_get_messages
 
 # Get app instance for decorators
@@ -21,15 +22,7 @@ def tags_command(app, message):
     # Subscription check for non-admins
     if int(user_id) not in Config.ADMIN and not is_user_in_channel(app, message):
         return
-    user_dir = os.path.join("users", str(user_id))
-    tags_file = os.path.join(user_dir, "tags.txt")
-    if not os.path.exists(tags_file):
-        reply_text = safe_get_messages(user_id).TAGS_NO_TAGS_MSG
-        safe_send_message(user_id, reply_text, reply_parameters=ReplyParameters(message_id=message.id))
-        send_to_logger(message, reply_text)
-        return
-    with open(tags_file, "r", encoding="utf-8") as f:
-        tags = [line.strip() for line in f if line.strip()]
+    tags = get_user_settings(user_id).tags
     if not tags:
         reply_text = safe_get_messages(user_id).TAGS_NO_TAGS_MSG
         safe_send_message(user_id, reply_text, reply_parameters=ReplyParameters(message_id=message.id))
@@ -26,6 +26,7 @@ class LanguageRouter:
         }
         self.default_language = 'en'
         self._cached_messages = {}
+        self._get_user_settings = None
         
     def get_user_language(self, user_id: int) -> str:
         """
@@ -33,14 +34,14 @@ class LanguageRouter:
         Returns default language if not set
         """
         try:
-            user_dir = f'./users/{str(user_id)}'
-            lang_file = os.path.join(user_dir, 'lang.txt')
-            
-            if os.path.exists(lang_file):
-                with open(lang_file, 'r', encoding='utf-8') as f:
-                    lang_code = f.read().strip()
-                    if lang_code in self.available_languages:
-                        return lang_code
+            get_user_settings = self._get_user_settings
+            if get_user_settings is None:
+                # Imported on first use: HELPERS imports CONFIG at startup
+                from HELPERS.user_settings import get_user_settings
+                self._get_user_settings = get_user_settings
+            lang_code = get_user_settings(user_id).lang
+            if lang_code in self.available_languages:
+                return lang_code
         except Exception as e:
             print(f"Error reading user language for {user_id}: {e}")
         
@@ -55,18 +56,9 @@ class LanguageRouter:
             return False
             
         try:
-            # Create user directory if it doesn't exist
-            user_dir = f'./users/{str(user_id)}'
-            os.makedirs(user_dir, exist_ok=True)
-            
-            # Save language preference to lang.txt
-            lang_file = os.path.join(user_dir, 'lang.txt')
-            with open(lang_file, 'w', encoding='utf-8') as f:
-                f.write(language_code)
-            
-            # Clear cache for this user to force reload with new language
-            if language_code in self._cached_messages:
-                del self._cached_messages[language_code]
+            # Save language preference to users/<id>/lang.txt
+            from HELPERS.user_settings import user_settings, LANG
+            user_settings.write(user_id, LANG, language_code)
             
             return True
         except Exception as e:
@@ -307,6 +299,10 @@ class LanguageRouter:
         """Clear cached messages"""
         self._cached_messages.clear()
 
+    def is_loaded(self, messages: Dict[str, Any]) -> bool:
+        """Whether a messages dict is the currently cached one of some language"""
+        return any(cached is messages for cached in list(self._cached_messages.values()))
+
 # Global instance
 language_router = LanguageRouter()
 
@@ -321,6 +317,12 @@ def get_messages(user_id: int = None, language_code: str = None) -> Dict[str, An
         
     return language_router.load_messages(language_code)
 
+def get_user_language(user_id: int) -> str:
+    """
+    Convenience function to get user language
+    """
+    return language_router.get_user_language(user_id)
+
 def get_message(message_key: str, user_id: int = None, language_code: str = None) -> str:
     """
     Convenience function to get a specific message
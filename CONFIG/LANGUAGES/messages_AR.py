@@ -767,6 +767,17 @@ class Messages(object):
     ADMIN_ERROR_SCRIPT_MSG = "❌ خطأ في تشغيل {script_path}:\n{stdout}\n{stderr}"
     ADMIN_PROMO_SENT_MSG = "<b>✅ تم إرسال رسالة الترويج لجميع المستخدمين الآخرين</b>"
     ADMIN_CANNOT_SEND_PROMO_MSG = "<b>❌ لا يمكن إرسال رسالة الترويج. جرب الرد على رسالة\nأو حدث خطأ ما</b>"
+    BROADCAST_JOB_PROGRESS_MSG = "<b>📣 البث #{job_id}</b> — {status}\n✅ تم التسليم: {sent}\n❌ فشل: {failed}\n🚫 حظروا البوت: {blocked}\n⏳ متبقي: {pending} من {total}"
+    BROADCAST_JOB_STATUS_RUNNING_MSG = "قيد الإرسال"
+    BROADCAST_JOB_STATUS_PAUSED_MSG = "متوقف مؤقتًا"
+    BROADCAST_JOB_STATUS_CANCELLED_MSG = "ملغى"
+    BROADCAST_JOB_STATUS_COMPLETED_MSG = "مكتمل"
+    BROADCAST_JOB_PAUSE_BUTTON_MSG = "⏸ إيقاف مؤقت"
+    BROADCAST_JOB_RESUME_BUTTON_MSG = "▶️ استئناف"
+    BROADCAST_JOB_CANCEL_BUTTON_MSG = "✖️ إلغاء"
+    BROADCAST_JOB_NONE_MSG = "لا يوجد بث قيد التشغيل أو متوقف مؤقتًا"
+    BROADCAST_JOB_BUSY_MSG = "<b>❌ البث #{job_id} لم ينته بعد.</b>\nألغه باستخدام <code>{command} cancel</code> أو انتظر حتى يكتمل"
+    BROADCAST_JOB_USAGE_MSG = "الاستخدام: <code>{command} [pause|resume|cancel]</code>"
     ADMIN_USER_NO_DOWNLOADS_MSG = "<b>❌ المستخدم لم يحمل أي محتوى بعد...</b> غير موجود في السجلات"
     ADMIN_INVALID_COMMAND_MSG = "❌ أمر غير صحيح"
     ADMIN_NO_DATA_FOUND_MSG = f"❌ لم يتم العثور على بيانات في التخزين المؤقت لـ <code>{{path}}</code>"
@@ -1687,6 +1698,10 @@ class Messages(object):
     DOWNLOAD_STATUS_HOURGLASS_EMOJIS = ["⏳", "⌛"]
     DOWNLOAD_STATUS_DOWNLOADING_HLS_MSG = "📥 جاري تحميل تيار HLS:"
     DOWNLOAD_STATUS_WAITING_FRAGMENTS_MSG = "انتظار الأجزاء"
+    DOWNLOAD_QUEUE_POSITION_MSG = "⏳ تحميلك في قائمة الانتظار: الموضع {position} من {total}"
+    DOWNLOAD_QUEUE_DRAINING_MSG = "🔄 يتم إعادة تشغيل البوت، يرجى إرسال الرابط مرة أخرى بعد دقيقة"
+    DOWNLOAD_COALESCED_WAITING_MSG = "⏳ هذا الفيديو موجود بالفعل في قائمة انتظار التحميل، ستحصل عليه بمجرد أن يصبح جاهزًا"
+    DOWNLOAD_COALESCED_STARTED_MSG = "📥 يتم تحميل هذا الفيديو الآن، ستحصل عليه بمجرد أن يصبح جاهزًا"
     
     # Restore from backup messages
     RESTORE_BACKUP_NOT_FOUND_MSG = "❌ لم يتم العثور على النسخة الاحتياطية {ts} في _backup/"
@@ -767,6 +767,17 @@ Use:
     ADMIN_ERROR_SCRIPT_MSG = "❌ Error running {script_path}:\n{stdout}\n{stderr}"
     ADMIN_PROMO_SENT_MSG = "<b>✅ Promo message sent to all other users</b>"
     ADMIN_CANNOT_SEND_PROMO_MSG = "<b>❌ Cannot send the promo message. Try replying to a message\nOr some error occurred</b>"
+    BROADCAST_JOB_PROGRESS_MSG = "<b>📣 Broadcast #{job_id}</b> — {status}\n✅ Delivered: {sent}\n❌ Failed: {failed}\n🚫 Blocked the bot: {blocked}\n⏳ Pending: {pending} of {total}"
+    BROADCAST_JOB_STATUS_RUNNING_MSG = "sending"
+    BROADCAST_JOB_STATUS_PAUSED_MSG = "paused"
+    BROADCAST_JOB_STATUS_CANCELLED_MSG = "cancelled"
+    BROADCAST_JOB_STATUS_COMPLETED_MSG = "completed"
+    BROADCAST_JOB_PAUSE_BUTTON_MSG = "⏸ Pause"
+    BROADCAST_JOB_RESUME_BUTTON_MSG = "▶️ Resume"
+    BROADCAST_JOB_CANCEL_BUTTON_MSG = "✖️ Cancel"
+    BROADCAST_JOB_NONE_MSG = "No broadcast is running or paused"
+    BROADCAST_JOB_BUSY_MSG = "<b>❌ Broadcast #{job_id} is not finished yet.</b>\nCancel it with <code>{command} cancel</code> or wait until it completes"
+    BROADCAST_JOB_USAGE_MSG = "Usage: <code>{command} [pause|resume|cancel]</code>"
     ADMIN_USER_NO_DOWNLOADS_MSG = "<b>❌ User did not download any content yet...</b> Not exist in logs"
     ADMIN_INVALID_COMMAND_MSG = "❌ Invalid command"
     ADMIN_NO_DATA_FOUND_MSG = f"❌ No data found in cache for <code>{{path}}</code>"
@@ -1709,6 +1720,10 @@ Use:
     DOWNLOAD_STATUS_HOURGLASS_EMOJIS = ["⏳", "⌛"]
     DOWNLOAD_STATUS_DOWNLOADING_HLS_MSG = "📥 Downloading HLS stream:"
     DOWNLOAD_STATUS_WAITING_FRAGMENTS_MSG = "waiting for fragments"
+    DOWNLOAD_QUEUE_POSITION_MSG = "⏳ Your download is queued: position {position} of {total}"
+    DOWNLOAD_QUEUE_DRAINING_MSG = "🔄 The bot is restarting, please send your link again in a minute"
+    DOWNLOAD_COALESCED_WAITING_MSG = "⏳ This video is already queued for download, you will get it as soon as it is ready"
+    DOWNLOAD_COALESCED_STARTED_MSG = "📥 This video is being downloaded now, you will get it as soon as it is ready"
     
     # Restore from backup messages
     RESTORE_BACKUP_NOT_FOUND_MSG = "❌ Backup {ts} not found in _backup/"
@@ -767,6 +767,17 @@ class Messages(object):
     ADMIN_ERROR_SCRIPT_MSG = "❌ {script_path} चलाने में त्रुटि:\n{stdout}\n{stderr}"
     ADMIN_PROMO_SENT_MSG = "<b>✅ प्रोमो संदेश सभी अन्य उपयोगकर्ताओं को भेजा गया</b>"
     ADMIN_CANNOT_SEND_PROMO_MSG = "<b>❌ प्रोमो संदेश नहीं भेज सकते। किसी संदेश का जवाब देने का प्रयास करें\nया कोई त्रुटि हुई</b>"
+    BROADCAST_JOB_PROGRESS_MSG = "<b>📣 ब्रॉडकास्ट #{job_id}</b> — {status}\n✅ पहुँचाया गया: {sent}\n❌ विफल: {failed}\n🚫 बॉट को ब्लॉक किया: {blocked}\n⏳ शेष: {total} में से {pending}"
+    BROADCAST_JOB_STATUS_RUNNING_MSG = "भेजा जा रहा है"
+    BROADCAST_JOB_STATUS_PAUSED_MSG = "रोका गया"
+    BROADCAST_JOB_STATUS_CANCELLED_MSG = "रद्द"
+    BROADCAST_JOB_STATUS_COMPLETED_MSG = "पूर्ण"
+    BROADCAST_JOB_PAUSE_BUTTON_MSG = "⏸ रोकें"
+    BROADCAST_JOB_RESUME_BUTTON_MSG = "▶️ जारी रखें"
+    BROADCAST_JOB_CANCEL_BUTTON_MSG = "✖️ रद्द करें"
+    BROADCAST_JOB_NONE_MSG = "कोई ब्रॉडकास्ट चल नहीं रहा है या रुका नहीं है"
+    BROADCAST_JOB_BUSY_MSG = "<b>❌ ब्रॉडकास्ट #{job_id} अभी पूरा नहीं हुआ है।</b>\n<code>{command} cancel</code> से इसे रद्द करें या पूरा होने तक प्रतीक्षा करें"
+    BROADCAST_JOB_USAGE_MSG = "उपयोग: <code>{command} [pause|resume|cancel]</code>"
     ADMIN_USER_NO_DOWNLOADS_MSG = "<b>❌ उपयोगकर्ता ने अभी तक कोई सामग्री डाउनलोड नहीं की...</b> लॉग में मौजूद नहीं"
     ADMIN_INVALID_COMMAND_MSG = "❌ अमान्य कमांड"
     ADMIN_NO_DATA_FOUND_MSG = f"❌ कैश में <code>{{path}}</code> के लिए कोई डेटा नहीं मिला"
@@ -1687,6 +1698,10 @@ class Messages(object):
     DOWNLOAD_STATUS_HOURGLASS_EMOJIS = ["⏳", "⌛"]
     DOWNLOAD_STATUS_DOWNLOADING_HLS_MSG = "📥 HLS स्ट्रीम डाउनलोड हो रहा है:"
     DOWNLOAD_STATUS_WAITING_FRAGMENTS_MSG = "फ्रैगमेंट्स का इंतजार है"
+    DOWNLOAD_QUEUE_POSITION_MSG = "⏳ आपका डाउनलोड कतार में है: स्थान {position} / {total}"
+    DOWNLOAD_QUEUE_DRAINING_MSG = "🔄 बॉट पुनः आरंभ हो रहा है, कृपया एक मिनट बाद लिंक फिर से भेजें"
+    DOWNLOAD_COALESCED_WAITING_MSG = "⏳ यह वीडियो पहले से डाउनलोड कतार में है, तैयार होते ही आपको मिल जाएगा"
+    DOWNLOAD_COALESCED_STARTED_MSG = "📥 यह वीडियो अभी डाउनलोड हो रहा है, तैयार होते ही आपको मिल जाएगा"
     
     # Restore from backup messages
     RESTORE_BACKUP_NOT_FOUND_MSG = "❌ बैकअप {ts} _backup/ में नहीं मिला"
@@ -766,6 +766,17 @@ class Messages(object):
     ADMIN_ERROR_SCRIPT_MSG = "❌ {script_path}の実行中にエラーが発生しました:\n{stdout}\n{stderr}"
     ADMIN_PROMO_SENT_MSG = "<b>✅ プロモーションメッセージが他のすべてのユーザーに送信されました</b>"
     ADMIN_CANNOT_SEND_PROMO_MSG = "<b>❌ プロモーションメッセージを送信できません。メッセージに返信してみてください\nまたはエラーが発生しました</b>"
+    BROADCAST_JOB_PROGRESS_MSG = "<b>📣 ブロードキャスト #{job_id}</b> — {status}\n✅ 配信済み: {sent}\n❌ 失敗: {failed}\n🚫 ボットをブロック: {blocked}\n⏳ 残り: {pending} / {total}"
+    BROADCAST_JOB_STATUS_RUNNING_MSG = "送信中"
+    BROADCAST_JOB_STATUS_PAUSED_MSG = "一時停止中"
+    BROADCAST_JOB_STATUS_CANCELLED_MSG = "キャンセル済み"
+    BROADCAST_JOB_STATUS_COMPLETED_MSG = "完了"
+    BROADCAST_JOB_PAUSE_BUTTON_MSG = "⏸ 一時停止"
+    BROADCAST_JOB_RESUME_BUTTON_MSG = "▶️ 再開"
+    BROADCAST_JOB_CANCEL_BUTTON_MSG = "✖️ キャンセル"
+    BROADCAST_JOB_NONE_MSG = "実行中または一時停止中のブロードキャストはありません"
+    BROADCAST_JOB_BUSY_MSG = "<b>❌ ブロードキャスト #{job_id} はまだ終了していません。</b>\n<code>{command} cancel</code> でキャンセルするか、完了するまでお待ちください"
+    BROADCAST_JOB_USAGE_MSG = "使い方: <code>{command} [pause|resume|cancel]</code>"
     ADMIN_USER_NO_DOWNLOADS_MSG = "<b>❌ ユーザーはまだコンテンツをダウンロードしていません...</b> ログに存在しません"
     ADMIN_INVALID_COMMAND_MSG = "❌ 無効なコマンド"
     ADMIN_NO_DATA_FOUND_MSG = f"❌ <code>{{path}}</code>のキャッシュにデータが見つかりません"
@@ -1708,6 +1719,10 @@ class Messages(object):
     DOWNLOAD_STATUS_HOURGLASS_EMOJIS = ["⏳", "⌛"]
     DOWNLOAD_STATUS_DOWNLOADING_HLS_MSG = "📥 HLSストリームをダウンロードしています:"
     DOWNLOAD_STATUS_WAITING_FRAGMENTS_MSG = "フラグメントを待っています"
+    DOWNLOAD_QUEUE_POSITION_MSG = "⏳ ダウンロードは待機中です: {total}件中{position}番目"
+    DOWNLOAD_QUEUE_DRAINING_MSG = "🔄 ボットを再起動しています。1分後にもう一度リンクを送信してください"
+    DOWNLOAD_COALESCED_WAITING_MSG = "⏳ この動画はすでにダウンロード待ちです。準備ができ次第お届けします"
+    DOWNLOAD_COALESCED_STARTED_MSG = "📥 この動画は現在ダウンロード中です。準備ができ次第お届けします"
     
     # Restore from backup messages
     RESTORE_BACKUP_NOT_FOUND_MSG = "❌ バックアップ{ts}が_backup/に見つかりません"
@@ -767,6 +767,17 @@ class Messages(object):
     ADMIN_ERROR_SCRIPT_MSG = "❌ Ошибка выполнения {script_path}:\n{stdout}\n{stderr}"
     ADMIN_PROMO_SENT_MSG = "<b>✅ Промо сообщение отправлено всем остальным пользователям</b>"
     ADMIN_CANNOT_SEND_PROMO_MSG = "<b>❌ Не удалось отправить промо сообщение. Попробуйте ответить на сообщение\nИли произошла ошибка</b>"
+    BROADCAST_JOB_PROGRESS_MSG = "<b>📣 Рассылка #{job_id}</b> — {status}\n✅ Доставлено: {sent}\n❌ Ошибки: {failed}\n🚫 Заблокировали бота: {blocked}\n⏳ Осталось: {pending} из {total}"
+    BROADCAST_JOB_STATUS_RUNNING_MSG = "отправляется"
+    BROADCAST_JOB_STATUS_PAUSED_MSG = "на паузе"
+    BROADCAST_JOB_STATUS_CANCELLED_MSG = "отменена"
+    BROADCAST_JOB_STATUS_COMPLETED_MSG = "завершена"
+    BROADCAST_JOB_PAUSE_BUTTON_MSG = "⏸ Пауза"
+    BROADCAST_JOB_RESUME_BUTTON_MSG = "▶️ Продолжить"
+    BROADCAST_JOB_CANCEL_BUTTON_MSG = "✖️ Отменить"
+    BROADCAST_JOB_NONE_MSG = "Нет активной или приостановленной рассылки"
+    BROADCAST_JOB_BUSY_MSG = "<b>❌ Рассылка #{job_id} ещё не завершена.</b>\nОтмените её командой <code>{command} cancel</code> или дождитесь окончания"
+    BROADCAST_JOB_USAGE_MSG = "Использование: <code>{command} [pause|resume|cancel]</code>"
     ADMIN_USER_NO_DOWNLOADS_MSG = "<b>❌ Пользователь еще не скачивал контент...</b> Не существует в логах"
     ADMIN_INVALID_COMMAND_MSG = "❌ Неверная команда"
     ADMIN_NO_DATA_FOUND_MSG = f"❌ Данные не найдены в кэше для <code>{{path}}</code>"
@@ -1709,6 +1720,10 @@ class Messages(object):
     DOWNLOAD_STATUS_HOURGLASS_EMOJIS = ["⏳", "⌛"]
     DOWNLOAD_STATUS_DOWNLOADING_HLS_MSG = "📥 Скачивание HLS потока:"
     DOWNLOAD_STATUS_WAITING_FRAGMENTS_MSG = "ожидание фрагментов"
+    DOWNLOAD_QUEUE_POSITION_MSG = "⏳ Ваша загрузка в очереди: позиция {position} из {total}"
+    DOWNLOAD_QUEUE_DRAINING_MSG = "🔄 Бот перезапускается, отправьте ссылку снова через минуту"
+    DOWNLOAD_COALESCED_WAITING_MSG = "⏳ Это видео уже в очереди на скачивание, вы получите его, как только оно будет готово"
+    DOWNLOAD_COALESCED_STARTED_MSG = "📥 Это видео сейчас скачивается, вы получите его, как только оно будет готово"
     
     # Restore from backup messages
     RESTORE_BACKUP_NOT_FOUND_MSG = "❌ Резервная копия {ts} не найдена в _backup/"
@@ -764,6 +764,17 @@ Use:
     ADMIN_ERROR_SCRIPT_MSG = "❌ Error running {script_path}:\n{stdout}\n{stderr}"
     ADMIN_PROMO_SENT_MSG = "<b>✅ Promo message sent to all other users</b>"
     ADMIN_CANNOT_SEND_PROMO_MSG = "<b>❌ Cannot send the promo message. Try replying to a message\nOr some error occurred</b>"
+    BROADCAST_JOB_PROGRESS_MSG = "<b>📣 广播 #{job_id}</b> — {status}\n✅ 已送达: {sent}\n❌ 失败: {failed}\n🚫 已屏蔽机器人: {blocked}\n⏳ 待发送: {pending} / {total}"
+    BROADCAST_JOB_STATUS_RUNNING_MSG = "发送中"
+    BROADCAST_JOB_STATUS_PAUSED_MSG = "已暂停"
+    BROADCAST_JOB_STATUS_CANCELLED_MSG = "已取消"
+    BROADCAST_JOB_STATUS_COMPLETED_MSG = "已完成"
+    BROADCAST_JOB_PAUSE_BUTTON_MSG = "⏸ 暂停"
+    BROADCAST_JOB_RESUME_BUTTON_MSG = "▶️ 继续"
+    BROADCAST_JOB_CANCEL_BUTTON_MSG = "✖️ 取消"
+    BROADCAST_JOB_NONE_MSG = "没有正在运行或已暂停的广播"
+    BROADCAST_JOB_BUSY_MSG = "<b>❌ 广播 #{job_id} 尚未完成。</b>\n使用 <code>{command} cancel</code> 取消它，或等待其完成"
+    BROADCAST_JOB_USAGE_MSG = "用法: <code>{command} [pause|resume|cancel]</code>"
     ADMIN_USER_NO_DOWNLOADS_MSG = "<b>❌ User did not download any content yet...</b> Not exist in logs"
     ADMIN_INVALID_COMMAND_MSG = "❌ Invalid command"
     ADMIN_NO_DATA_FOUND_MSG = f"❌ No data found in cache for <code>{{path}}</code>"
@@ -1647,6 +1658,10 @@ Use:
     DOWNLOAD_STATUS_HOURGLASS_EMOJIS = ["⏳", "⌛"]
     DOWNLOAD_STATUS_DOWNLOADING_HLS_MSG = "📥 Downloading HLS stream:"
     DOWNLOAD_STATUS_WAITING_FRAGMENTS_MSG = "waiting for fragments"
+    DOWNLOAD_QUEUE_POSITION_MSG = "⏳ Your download is queued: position {position} of {total}"
+    DOWNLOAD_QUEUE_DRAINING_MSG = "🔄 The bot is restarting, please send your link again in a minute"
+    DOWNLOAD_COALESCED_WAITING_MSG = "⏳ This video is already queued for download, you will get it as soon as it is ready"
+    DOWNLOAD_COALESCED_STARTED_MSG = "📥 This video is being downloaded now, you will get it as soon as it is ready"
     
     # Restore from backup messages
     RESTORE_BACKUP_NOT_FOUND_MSG = "❌ Backup {ts} not found in _backup/"
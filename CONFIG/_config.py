@@ -58,6 +58,19 @@ class Config(object):
     ###########################################################
     # Firebase initialization
     USE_FIREBASE = False
+    # Local mode storage engine (USE_FIREBASE = False):
+    # "journal" - in-memory tree + append-only journal, compacted into FIREBASE_CACHE_FILE in background
+    # "sqlite"  - indexed SQLite tables in LOCAL_DB_SQLITE_FILE (FIREBASE_CACHE_FILE is imported once when empty)
+    # "json"    - legacy: every write re-reads and rewrites the whole FIREBASE_CACHE_FILE
+    LOCAL_DB_ENGINE = "journal"
+    LOCAL_DB_SQLITE_FILE = "dump.sqlite3"
+    # Broadcast jobs and their per-recipient delivery state (survives restarts)
+    BROADCAST_DB_FILE = "broadcasts.sqlite3"
+    # Scheduled message deletions (survive restarts)
+    DELETE_SCHEDULE_FILE = "scheduled_deletes.sqlite3"
+    LOCAL_DB_COMPACT_INTERVAL = 60  # seconds between snapshot compactions
+    LOCAL_DB_COMPACT_BYTES = 64 * 1024 * 1024  # compact earlier once the journal grows past this size
+    LOCAL_DB_FSYNC = False  # fsync the journal after every write (safer, slower)
     # your firebase DB path
     BOT_DB_PATH = f"bot/{BOT_NAME_FOR_USERS}/"
     VIDEO_CACHE_DB_PATH = f"bot/video_cache"
@@ -114,9 +127,23 @@ class Config(object):
     # Do not chanege this
     PIC_FILE_PATH = "pic.jpg"
     FIREBASE_CACHE_FILE = "dump.json"
-    RELOAD_CACHE_EVERY = 1 # in hours
+    RELOAD_CACHE_EVERY = 1 # in hours; only used with FIREBASE_INCREMENTAL_SYNC = False
     DOWNLOAD_FIREBASE_SCRIPT_PATH = "DATABASE/download_firebase.py"
     AUTO_CACHE_RELOAD_ENABLED = True # Enable/disable automatic cache reloading
+    # Instead of scheduled full reloads, fetch only new/removed keys of the cache, users and logs subtrees
+    # (the full dump is still loaded at startup, on /reload_cache and after failed sync passes)
+    FIREBASE_INCREMENTAL_SYNC = True
+    FIREBASE_SYNC_INTERVAL_MINUTES = 10 # in minutes
+    FIREBASE_SYNC_RECOVERY_PASSES = 3 # failed sync passes in a row before the full dump is reloaded
+    FIREBASE_SYNC_MAX_FETCH = 200 # above this many new keys per subtree, fetch the subtree at once
+    FIREBASE_SYNC_MAX_PARENTS = 200 # known entries per subtree re-checked for new leaves each pass (round robin)
+    # REST mode: send set/update/remove/push in the background as batched multi-path PATCH requests
+    FIREBASE_WRITE_QUEUE_ENABLED = True
+    FIREBASE_WRITE_QUEUE_MAX_BATCH = 500 # flush when this many paths are pending
+    FIREBASE_WRITE_QUEUE_FLUSH_INTERVAL = 1.0 # in seconds after the first pending write
+    FIREBASE_WRITE_QUEUE_MAX_RETRIES = 5 # failed batches are retried with exponential backoff
+    # Registered/blocked user ids are kept in memory; re-read this often to see changes made by other processes
+    MEMBERSHIP_REFRESH_INTERVAL = 300 # in seconds
     ########################################################
     # Proxy configuration
     PROXY_TYPE="http" # http, https, socks4, socks5, socks5h
@@ -166,6 +193,7 @@ class Config(object):
     USAGE_COMMAND = CommandsConfig.USAGE_COMMAND
     TAGS_COMMAND = CommandsConfig.TAGS_COMMAND
     BROADCAST_MESSAGE = CommandsConfig.BROADCAST_MESSAGE
+    BROADCAST_JOB_COMMAND = CommandsConfig.BROADCAST_JOB_COMMAND
     GET_USER_DETAILS_COMMAND = CommandsConfig.GET_USER_DETAILS_COMMAND
     SPLIT_COMMAND = CommandsConfig.SPLIT_COMMAND
     RELOAD_CACHE_COMMAND = CommandsConfig.RELOAD_CACHE_COMMAND
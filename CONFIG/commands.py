@@ -23,6 +23,8 @@ class CommandsConfig(object):
     USAGE_COMMAND = "/usage"
     TAGS_COMMAND = "/tags"
     BROADCAST_MESSAGE = "/broadcast"
+    # /broadcast_job [pause|resume|cancel] - status and control of the running broadcast
+    BROADCAST_JOB_COMMAND = "/broadcast_job"
     # this is a main cmd - to user /get_user_details_users
     GET_USER_DETAILS_COMMAND = "/all"
     SPLIT_COMMAND = "/split"
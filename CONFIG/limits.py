@@ -38,6 +38,53 @@ class LimitsConfig(object):
     SPLIT_LIVE_STREAM_BY_HOURS = 1
     MAX_LIVE_STREAM_DURATION = 36000 # 10 hours
     #######################################################
+    # Download queue
+    #######################################################
+    # Downloads running at once over all users; the rest wait in a queue
+    DOWNLOAD_MAX_ACTIVE = 4
+    # Downloads running at once from one site (youtube.com, tiktok.com, ...)
+    DOWNLOAD_MAX_PER_HOST = 2
+    # Downloads running at once for one user
+    DOWNLOAD_MAX_PER_USER = 1
+    # Share of download slots per lane while users wait: admins, NSFW (paid) jobs, everyone else
+    DOWNLOAD_LANE_WEIGHTS = {"admin": 8, "paid": 4, "default": 1}
+    # On shutdown, queued downloads are dropped and running ones get this long to finish
+    # (keep it below systemd's TimeoutStopSec, 90s by default)
+    DOWNLOAD_DRAIN_TIMEOUT = 60 # in seconds
+    #######################################################
+    # Admin broadcast (/broadcast)
+    #######################################################
+    # Messages per second sent to recipients (Telegram allows about 30 over all chats)
+    BROADCAST_RATE = 20
+    # The admin's broadcast status message is edited at most this often
+    BROADCAST_PROGRESS_INTERVAL = 10 # in seconds
+    #######################################################
+    # Outbound messages (per-chat queues, HELPERS/send_dispatcher.py)
+    #######################################################
+    # Threads sending queued messages
+    SEND_WORKERS = 8
+    # Messages per second for the whole bot and burst size (rate + burst stays under Telegram's ~30 per second)
+    SEND_GLOBAL_RATE = 25
+    SEND_GLOBAL_BURST = 5
+    # Minimum spacing of messages to one chat (prevents RANDOM_ID_DUPLICATE)
+    SEND_CHAT_INTERVAL = 0.25 # in seconds
+    # Shorter FloodWaits are waited out in the chat's queue; longer ones fail the chat's messages
+    SEND_FLOOD_RETRY_MAX = 10 # in seconds
+    #######################################################
+    # Progress messages (one renderer, HELPERS/progress_renderer.py)
+    #######################################################
+    # Progress message edits per second for the whole bot and burst size;
+    # when more messages are due, the ones edited longest ago go first
+    PROGRESS_EDIT_RATE = 10
+    PROGRESS_EDIT_BURST = 10
+    #######################################################
+    # Scheduled message deletion (timer wheel, HELPERS/delete_scheduler.py)
+    #######################################################
+    # Resolution of scheduled deletions; deletions due in the same tick are batched per chat
+    DELETE_WHEEL_TICK = 1.0 # in seconds
+    # Wheel size; deletions further ahead than DELETE_WHEEL_SLOTS ticks wait extra rounds
+    DELETE_WHEEL_SLOTS = 512
+    #######################################################
     # Animation and HTTP connection limits (prevents hanging)
     #######################################################
     # Maximum animation duration (4 hours) - after this time animation is forcefully stopped
@@ -48,6 +95,47 @@ class LimitsConfig(object):
     
     # HTTP session timeout for individual requests
     HTTP_REQUEST_TIMEOUT = 60  # 60 seconds
+    
+    # "pooled": keep-alive per-host pools with DNS cache and idle reaping; "close": Connection: close on every request
+    HTTP_POOL_MODE = "pooled"
+    # Number of per-host pools kept per session and keep-alive connections per host
+    HTTP_POOL_HOSTS = 32
+    HTTP_POOL_MAXSIZE = 16
+    # Pooled connections idle longer than this are closed (prevents CLOSE-WAIT sockets)
+    HTTP_POOL_IDLE_TIMEOUT = 60  # 60 seconds
+    # Resolved host addresses are reused for this long (0 disables the DNS cache)
+    HTTP_DNS_CACHE_TTL = 300  # 5 minutes
+    #######################################################
+    # Shared yt-dlp extraction cache (single videos, all users)
+    #######################################################
+    EXTRACTION_CACHE_ENABLED = True
+    # Maximum age of a cached extraction; capped by the expiry of its format URLs
+    EXTRACTION_CACHE_TTL = 300  # 5 minutes
+    # Format URLs must stay valid at least this long after a cache hit
+    EXTRACTION_CACHE_EXPIRY_MARGIN = 60  # 1 minute
+    EXTRACTION_CACHE_MAX_ENTRIES = 128
+    #######################################################
+    # Always Ask menu format tables (kept in memory per open menu)
+    #######################################################
+    # Open menus whose format table stays resident; least recently used are evicted first
+    ASK_MENU_CACHE_MAX_ENTRIES = 256
+    #######################################################
+    # /img in-process gallery-dl sessions (one extractor per user and URL)
+    #######################################################
+    # Serve /img batches and media counting from a long-lived extractor instead of one gallery-dl process per batch
+    GALLERY_DL_SESSION_ENABLED = True
+    # Sessions unused for this long are closed
+    GALLERY_DL_SESSION_IDLE_TIMEOUT = 600  # 10 minutes
+    GALLERY_DL_SESSION_MAX_SESSIONS = 32
+    # Maximum wait for one range to download (same as the CLI range timeout)
+    GALLERY_DL_SESSION_RANGE_TIMEOUT = 600
+    #######################################################
+    # Per-user settings cache (users/<id>/*.txt setting files)
+    #######################################################
+    # Users whose settings stay in memory; least recently used are evicted first
+    USER_SETTINGS_CACHE_MAX_USERS = 4096
+    # Cached settings are re-read after this long (picks up edits made outside the bot process)
+    USER_SETTINGS_CACHE_TTL = 300  # 5 minutes
     #######################################################
     # Cookie cache configuration
     #######################################################
@@ -77,6 +165,8 @@ class LimitsConfig(object):
     RATE_LIMIT_COOLDOWN_MINUTE = 300  # 5 minutes
     RATE_LIMIT_COOLDOWN_HOUR = 3600   # 1 hour
     RATE_LIMIT_COOLDOWN_DAY = 86400   # 1 day
+    # Rate limit counters are saved to CONFIG/.rate_limits.json this often (when changed) and on exit
+    RATE_LIMIT_SAVE_INTERVAL = 30  # in seconds
     #######################################################
     # Command spam protection
     #######################################################
@@ -1,13 +1,15 @@
 # Messages Configuration
 import sys
 import os
+import threading
 
 # Add the LANGUAGES directory to the path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'LANGUAGES'))
 
 try:
-    from language_router import get_messages, get_message, set_user_language
+    from language_router import get_messages, get_message, set_user_language, get_user_language, language_router
 except ImportError:
+    language_router = None
     # Fallback if language router is not available
     def get_messages(user_id=None, language_code=None):
         return {}
@@ -15,26 +17,40 @@ except ImportError:
         return f"[{message_key}]"
     def set_user_language(user_id, language_code):
         return False
+    def get_user_language(user_id):
+        return None
 
 class Messages(object):
     def __init__(self, user_id=None, language_code=None):
         """
-        Initialize Messages with user-specific language
+        Initialize Messages with user-specific language.
+        Messages are formatted once here and stored as plain instance attributes,
+        so lookups are ordinary attribute reads; instances are read-only.
         """
-        self.user_id = user_id
-        self.language_code = language_code
-        self._messages = get_messages(user_id, language_code)
+        object.__setattr__(self, 'user_id', user_id)
+        object.__setattr__(self, 'language_code', language_code)
+        raw_messages = get_messages(user_id, language_code)
+        formatted = _format_messages(raw_messages)
+        if formatted is not None:
+            self.__dict__.update(formatted)
+            object.__setattr__(self, '_formatted', True)
+        else:
+            # Config is not importable yet (startup): format on access
+            object.__setattr__(self, '_formatted', False)
+        object.__setattr__(self, '_messages', raw_messages)
     
     def __getattr__(self, name):
         """
         Get message by name from user's selected language ONLY
+        (only reached for names that are not pre-formatted attributes)
         """
         if name.startswith('_'):
             return super().__getattribute__(name)
         
         # STRICT: Only use language-specific messages, NO fallback to English
-        if hasattr(self, '_messages') and self._messages and name in self._messages:
-            value = self._messages[name]
+        messages = self.__dict__.get('_messages')
+        if not self.__dict__.get('_formatted') and messages and name in messages:
+            value = messages[name]
             if isinstance(value, str):
                 return _format_message(value)
             return value
@@ -42,6 +58,12 @@ class Messages(object):
         # If message not found in selected language, return placeholder
         return f"[{name}]"
 
+    def __setattr__(self, name, value):
+        raise AttributeError("Messages objects are read-only")
+
+    def __delattr__(self, name):
+        raise AttributeError("Messages objects are read-only")
+
     # All messages are now loaded dynamically from language-specific files
     # through the language router. No static variables needed here.
 
@@ -60,6 +82,14 @@ def _get_message_placeholders():
     Return a dict of placeholders used by translations.
     Must not import Config at module import time (CONFIG/_config.py imports this module).
     """
+    return _load_message_placeholders()[0]
+
+
+def _load_message_placeholders():
+    """
+    Return (placeholders, final). final is False while Config is only partially
+    imported (startup), i.e. the placeholders may still change.
+    """
     defaults = {
         # Defaults preserve original upstream branding unless overridden in Config.
         "required_channel": "@tg_ytdlp",
@@ -69,7 +99,12 @@ def _get_message_placeholders():
 
     try:
         from CONFIG.config import Config  # local import to avoid circular import at startup
+    except ModuleNotFoundError:
+        return defaults, True
+    except Exception:
+        return defaults, False
 
+    try:
         required_channel = getattr(Config, "REQUIRED_CHANNEL_MENTION", None)
         if not required_channel:
             # Best-effort derive from SUBSCRIBE_CHANNEL_URL if it looks like a t.me link
@@ -86,7 +121,7 @@ def _get_message_placeholders():
     except Exception:
         pass
 
-    return defaults
+    return defaults, True
 
 
 def _format_message(template: str) -> str:
@@ -95,12 +130,73 @@ def _format_message(template: str) -> str:
     except Exception:
         return template
 
+
+# Formatted message dicts, keyed by id() of the language dict they were built from;
+# entries of dicts the router no longer holds (reloaded languages) are dropped
+_formatted_cache = {}
+_formatted_lock = threading.Lock()
+
+
+def _format_messages(raw_messages):
+    """
+    Return the messages of one language with all placeholders filled in,
+    built once per loaded language. None while Config is not importable yet.
+    """
+    if not raw_messages:
+        return {}
+    entry = _formatted_cache.get(id(raw_messages))
+    if entry is not None and entry[0] is raw_messages:
+        return entry[1]
+    with _formatted_lock:
+        entry = _formatted_cache.get(id(raw_messages))
+        if entry is not None and entry[0] is raw_messages:
+            return entry[1]
+        placeholders, final = _load_message_placeholders()
+        if not final:
+            return None
+        mapping = _SafeFormatDict(placeholders)
+        formatted = {}
+        for name, value in raw_messages.items():
+            if name.startswith('_'):
+                continue
+            if isinstance(value, str):
+                try:
+                    value = value.format_map(mapping)
+                except Exception:
+                    pass
+            formatted[name] = value
+        if language_router is not None:
+            for key, (source, _) in list(_formatted_cache.items()):
+                if not language_router.is_loaded(source):
+                    del _formatted_cache[key]
+        # Keep a reference to the source dict so its id() cannot be reused
+        _formatted_cache[id(raw_messages)] = (raw_messages, formatted)
+        return formatted
+
+
+# One shared read-only Messages object per language
+_instances = {}
+_instances_lock = threading.Lock()
+
+
 # Global function to get Messages instance with user language
 def get_messages_instance(user_id=None, language_code=None):
     """
-    Get Messages instance with user-specific language
+    Get Messages instance with user-specific language.
+    Instances are shared per language (the user's language is looked up in the
+    cached user settings), so this is cheap enough to call per message.
     """
-    return Messages(user_id, language_code)
+    if language_code is None and user_id is not None:
+        language_code = get_user_language(user_id)
+    raw_messages = get_messages(None, language_code)
+    instance = _instances.get(language_code)
+    if instance is not None and instance._messages is raw_messages:
+        return instance
+    instance = Messages(None, language_code)
+    if instance._formatted and instance._messages is raw_messages:
+        with _instances_lock:
+            _instances[language_code] = instance
+    return instance
 
 # GLOBAL PROTECTION: Safe function that NEVER fails
 def safe_get_messages(user_id=None, language_code=None):
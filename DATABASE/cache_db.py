@@ -27,6 +27,8 @@ from DATABASE.firebase_init import db
 from HELPERS.qualifier import ceil_to_popular
 from DATABASE.firebase_init import db_child_by_path
 from DATABASE.download_firebase import download_firebase_dump
+from DATABASE.dump_reader import load_dump
+from DATABASE.video_cache_index import video_cache_index
 
 # Get app instance
 app = get_app()
@@ -40,13 +42,48 @@ auto_cache_thread = None
 reload_interval_hours = getattr(Config, 'RELOAD_CACHE_EVERY', 4)
 _thread_lock = threading.RLock()
 
+# Incremental sync instead of scheduled full reloads (Firebase mode only)
+incremental_sync_enabled = getattr(Config, 'FIREBASE_INCREMENTAL_SYNC', True)
+incremental_sync_minutes = getattr(Config, 'FIREBASE_SYNC_INTERVAL_MINUTES', 10)
+# Failed sync passes in a row after which the full dump is downloaded again
+incremental_sync_recovery_passes = getattr(Config, 'FIREBASE_SYNC_RECOVERY_PASSES', 3)
+incremental_sync_thread = None
+_incremental_sync = None
+
 ###################################################
 
+def _get_local_journal_store():
+    """Return the journaled local store when local mode runs on the journal engine."""
+    use_firebase = getattr(Config, 'USE_FIREBASE', True)
+    if use_firebase or getattr(Config, 'LOCAL_DB_ENGINE', 'journal') != "journal":
+        return None
+    from DATABASE.journal_store import get_journaled_store
+    return get_journaled_store(getattr(Config, 'FIREBASE_CACHE_FILE', 'dump.json'))
+
+def _get_local_sqlite_store():
+    """Return the SQLite local store when local mode runs on the sqlite engine."""
+    use_firebase = getattr(Config, 'USE_FIREBASE', True)
+    if use_firebase or getattr(Config, 'LOCAL_DB_ENGINE', 'journal') != "sqlite":
+        return None
+    from DATABASE.sqlite_store import get_sqlite_store
+    return get_sqlite_store(getattr(Config, 'LOCAL_DB_SQLITE_FILE', 'dump.sqlite3'))
+
+def _get_local_store():
+    """Return the journaled or SQLite local store, None outside local mode."""
+    return _get_local_journal_store() or _get_local_sqlite_store()
+
+def _local_store_owns_cache():
+    """True when lookups go straight to the local store (journal or SQLite) instead of firebase_cache."""
+    return _get_local_store() is not None
+
 def _sync_local_cache_to_file():
     """Sync local cache to file (used when USE_FIREBASE=False)."""
     global firebase_cache
     use_firebase = getattr(Config, 'USE_FIREBASE', True)
     if not use_firebase:
+        if _local_store_owns_cache():
+            # Writes already went through the journaled/SQLite db adapter
+            return
         try:
             cache_file = getattr(Config, 'FIREBASE_CACHE_FILE', 'dump.json')
             with open(cache_file, "w", encoding="utf-8") as f:
@@ -60,17 +97,42 @@ def get_from_local_cache(path_parts):
     For example: get_from_local_cache (['Bot', 'Video_cache', 'Hash123', '720p'])
     """
     global firebase_cache
-    current = firebase_cache
-    for part in path_parts:
-        if isinstance(current, dict) and part in current:
-            current = current[part]
-        else:
-            log_firebase_access_attempt(path_parts, success=False)
-            return None
-    
+    local_store = _get_local_store()
+    if local_store is not None:
+        # The store reads under its own lock (the journaled tree changes with every
+        # db write), and SQLite answers with one indexed query
+        value = local_store.get("/".join(str(p) for p in path_parts))
+        log_firebase_access_attempt(path_parts, success=value is not None)
+        return value
+    with _thread_lock:
+        current = firebase_cache
+        found = True
+        for part in path_parts:
+            if isinstance(current, dict) and part in current:
+                current = current[part]
+            else:
+                found = False
+                break
+    if not found:
+        log_firebase_access_attempt(path_parts, success=False)
+        return None
+
     log_firebase_access_attempt(path_parts, success=True)
     return current
 
+def _rebuild_video_cache_index():
+    """Rebuild the canonical video cache index from the freshly loaded cache."""
+    try:
+        local_store = _get_local_store()
+        if local_store is not None:
+            video_cache = local_store.get("bot/video_cache")
+        else:
+            video_cache = (firebase_cache.get("bot") or {}).get("video_cache")
+        count = video_cache_index.rebuild(video_cache)
+        logger.info(f"Video cache index rebuilt: {count} URL hashes")
+    except Exception as e:
+        logger.error(f"Failed to rebuild video cache index: {e}")
+
 def log_firebase_access_attempt(path_parts, success=True):
     """
     Logs attempts to turn to a local cache (to track the remaining .get () calls)
@@ -91,9 +153,18 @@ def load_firebase_cache():
     try:
         cache_file = getattr(Config, 'FIREBASE_CACHE_FILE', 'dump.json')
         use_firebase = getattr(Config, 'USE_FIREBASE', True)
-        if os.path.exists(cache_file):
-            with open(cache_file, "r", encoding="utf-8") as f:
-                firebase_cache = json.load(f)
+        journal_store = _get_local_journal_store()
+        if journal_store is not None:
+            # Lookups read the journaled store directly, so db writes are visible immediately
+            firebase_cache = {}
+            print(f"✅ Local cache served from journaled store {cache_file}")
+        elif _get_local_sqlite_store() is not None:
+            # Lookups go straight to SQLite; keep only write mirrors in memory
+            firebase_cache = {}
+            print(f"✅ Local cache served from SQLite ({getattr(Config, 'LOCAL_DB_SQLITE_FILE', 'dump.sqlite3')})")
+        elif os.path.exists(cache_file):
+            # Private copy: firebase_cache is modified in place, the shared parse is not
+            firebase_cache = load_dump(cache_file, private=True)
             if use_firebase:
                 print(safe_get_messages().DB_FIREBASE_CACHE_LOADED_MSG.format(count=len(firebase_cache)))
             else:
@@ -111,6 +182,7 @@ def load_firebase_cache():
         else:
             print(f"⚠️ Error loading local cache: {e}")
         firebase_cache = {}
+    _rebuild_video_cache_index()
 
 def reload_firebase_cache():
     messages = safe_get_messages(None)
@@ -118,9 +190,16 @@ def reload_firebase_cache():
     global firebase_cache
     try:
         cache_file = getattr(Config, 'FIREBASE_CACHE_FILE', 'firebase_cache.json')
+        if _get_local_store() is not None:
+            # The journaled/SQLite store is always current; dump.json may lag behind it
+            _rebuild_video_cache_index()
+            return True
         if os.path.exists(cache_file):
-            with open(cache_file, "r", encoding="utf-8") as f:
-                firebase_cache = json.load(f)
+            # Parse outside the lock; only the swap has to wait for incremental merges
+            loaded = load_dump(cache_file, private=True)
+            with _thread_lock:
+                firebase_cache = loaded
+            _rebuild_video_cache_index()
             print(safe_get_messages().DB_FIREBASE_CACHE_RELOADED_MSG.format(count=len(firebase_cache)))
             return True
         else:
@@ -234,6 +313,69 @@ def auto_reload_firebase_cache():
                     print(safe_get_messages().DB_ALL_RETRY_ATTEMPTS_FAILED_MSG)
                     import traceback; traceback.print_exc()
 
+def run_incremental_sync() -> dict:
+    """Merge new/removed Firebase children into firebase_cache without a full dump."""
+    global _incremental_sync
+    from DATABASE.firebase_sync import IncrementalCacheSync
+    if _incremental_sync is None:
+        _incremental_sync = IncrementalCacheSync(
+            db,
+            getattr(Config, 'FIREBASE_SYNC_MAX_FETCH', 200),
+            getattr(Config, 'FIREBASE_SYNC_MAX_PARENTS', 200),
+            lock=_thread_lock,
+        )
+    # Merges run under _thread_lock and stop if a full reload swaps the cache meanwhile
+    totals = _incremental_sync.sync(lambda: firebase_cache)
+    if totals["fetched"] or totals["removed"]:
+        _rebuild_video_cache_index()
+    return totals
+
+def incremental_sync_loop():
+    """Background thread that syncs changed subtrees every few minutes.
+
+    Passes that keep failing fall back to a full dump download and reload.
+    """
+    failed_passes = 0
+    while auto_cache_enabled and incremental_sync_enabled:
+        end_time = time.time() + max(1, int(incremental_sync_minutes)) * 60
+        while auto_cache_enabled and time.time() < end_time:
+            time.sleep(min(1, max(0, end_time - time.time())))
+        if not auto_cache_enabled:
+            return
+        try:
+            totals = run_incremental_sync()
+            if totals["fetched"] or totals["removed"]:
+                print(
+                    f"🔄 Incremental Firebase sync: +{totals['fetched']} / -{totals['removed']} keys "
+                    f"in {_incremental_sync.stats['last_duration']:.2f}s"
+                )
+            failed = totals["failed"] > 0
+        except Exception as e:
+            logger.error(f"Incremental Firebase sync failed: {e}")
+            failed = True
+        failed_passes = failed_passes + 1 if failed else 0
+        if failed_passes >= max(1, int(incremental_sync_recovery_passes)):
+            logger.warning(f"Incremental Firebase sync failed {failed_passes} passes in a row; reloading the full dump")
+            if _download_and_reload_cache():
+                failed_passes = 0
+
+def start_incremental_sync():
+    """Start the incremental sync thread (idempotent, Firebase mode only)."""
+    global incremental_sync_thread
+    if not getattr(Config, 'USE_FIREBASE', True) or not incremental_sync_enabled:
+        return None
+    with _thread_lock:
+        if incremental_sync_thread is not None and incremental_sync_thread.is_alive():
+            return incremental_sync_thread
+        incremental_sync_thread = threading.Thread(
+            target=incremental_sync_loop,
+            daemon=True,
+            name="Firebase-IncrementalSync"
+        )
+        incremental_sync_thread.start()
+        print(f"🚀 Incremental Firebase sync started (every {max(1, int(incremental_sync_minutes))} min)")
+    return incremental_sync_thread
+
 def start_auto_cache_reloader():
     """Start the auto-reload background thread (idempotent)."""
     global auto_cache_thread, auto_cache_enabled
@@ -244,6 +386,11 @@ def start_auto_cache_reloader():
             return auto_cache_thread
             
         if auto_cache_enabled:
+            if getattr(Config, 'USE_FIREBASE', True) and incremental_sync_enabled:
+                # The sync keeps the cache current; the full dump is only loaded
+                # at startup, on /reload_cache and when the sync keeps failing
+                auto_cache_thread = start_incremental_sync()
+                return auto_cache_thread
             auto_cache_thread = threading.Thread(
                 target=auto_reload_firebase_cache,
                 daemon=True
@@ -490,9 +637,9 @@ def save_to_playlist_cache(playlist_url: str, quality_key: str, video_indices: l
             if clear:
                 db_child_by_path(db, f"{Config.PLAYLIST_CACHE_DB_PATH}/{url_hash}/{quality_key}").remove()
                 logger.info(f"Cleared playlist cache for hash={url_hash}, quality={quality_key}")
-                # Update local cache
+                # Update local cache (the journaled/SQLite store already applied the remove)
                 use_firebase = getattr(Config, 'USE_FIREBASE', True)
-                if not use_firebase:
+                if not use_firebase and not _local_store_owns_cache():
                     path_parts_clear = ["bot", "video_cache", "playlists", url_hash, quality_key]
                     current = firebase_cache
                     for i, part in enumerate(path_parts_clear[:-1]):
@@ -524,14 +671,15 @@ def save_to_playlist_cache(playlist_url: str, quality_key: str, video_indices: l
                 db_child_by_path(db, "/".join(path_parts)).set(str(msg_id))
                 logger.info(f"Saved to playlist cache: path={path_parts}, msg_id={msg_id}")
                 
-                # Update local cache for immediate access (both Firebase and local mode)
-                current = firebase_cache
-                for part in path_parts_local:
-                    if part not in current:
-                        current[part] = {}
-                    current = current[part]
-                current[encoded_index] = str(msg_id)
-                logger.info(f"✅ [CACHE] Local cache updated: path={path_parts_local}, msg_id={msg_id}")
+                # Update local cache for immediate access (the journaled/SQLite store already applied the set)
+                if not _local_store_owns_cache():
+                    current = firebase_cache
+                    for part in path_parts_local[:-1]:
+                        if part not in current:
+                            current[part] = {}
+                        current = current[part]
+                    current[encoded_index] = str(msg_id)
+                    logger.info(f"✅ [CACHE] Local cache updated: path={path_parts_local}, msg_id={msg_id}")
 
         logger.info(f"✅ Saved to playlist cache for hash={url_hash}, quality={quality_key}, indices={video_indices}, message_ids={message_ids}")
         
@@ -704,17 +852,9 @@ def is_any_playlist_index_cached(playlist_url, quality_key, indices):
 
 def get_cached_qualities(url: str) -> set:
     """He gets all the castle qualities for the URL."""
-    from URL_PARSERS.normalizer import normalize_url_for_cache
     try:
-        url_hash = get_url_hash(normalize_url_for_cache(url))
-        
-        # We use local cache instead of Firebase
-        path_parts = ["bot", "video_cache", url_hash]
-        data = get_from_local_cache(path_parts)
-        
-        if data and isinstance(data, dict):
-            return set(data.keys())
-        return set()
+        # Canonical index: every URL variant of the video, no per-call hashing/logging
+        return video_cache_index.qualities(url)
     except Exception as e:
         logger.error(f"Failed to get cached qualities: {e}")
         return set()
@@ -880,9 +1020,9 @@ def save_to_image_cache(url: str, post_index: int, message_ids: list):
                     logger.error(f"[IMG CACHE] Fallback write failed: {inner2}")
             logger.info(f"[IMG CACHE] Saved album to cache: {path_dbg_parent}/{int(post_index)}")
             
-            # Update local cache for immediate access
+            # Update local cache for immediate access (the journaled/SQLite store already applied the set)
             use_firebase = getattr(Config, 'USE_FIREBASE', True)
-            if not use_firebase:
+            if not use_firebase and not _local_store_owns_cache():
                 current = firebase_cache
                 for part in local_path_parts[:-1]:  # Everything except the last part (post_index)
                     if part not in current:
@@ -1066,9 +1206,10 @@ def save_to_video_cache(url: str, quality_key: str, message_ids: list, clear: bo
             if clear:
                 logger.info(f"Clearing cache for URL hash {url_hash}, quality {quality_key}")
                 db.child(*path_parts).child(quality_key).remove()
-                # Update local cache
+                video_cache_index.remove_entry(url_hash, quality_key)
+                # Update local cache (the journaled/SQLite store already applied the remove)
                 use_firebase = getattr(Config, 'USE_FIREBASE', True)
-                if not use_firebase:
+                if not use_firebase and not _local_store_owns_cache():
                     current = firebase_cache
                     for part in ["bot", "video_cache", url_hash]:
                         if part in current and isinstance(current[part], dict):
@@ -1096,9 +1237,9 @@ def save_to_video_cache(url: str, quality_key: str, message_ids: list, clear: bo
             if len(message_ids) == 1:
                 cache_ref.child(quality_key).set(str(message_ids[0]))
                 logger.info(f"Saved single video to cache: hash={url_hash}, quality={quality_key}, msg_id={message_ids[0]}")
-                # Update local cache
+                # Update local cache (the journaled/SQLite store already applied the set)
                 use_firebase = getattr(Config, 'USE_FIREBASE', True)
-                if not use_firebase:
+                if not use_firebase and not _local_store_owns_cache():
                     current = firebase_cache
                     for part in ["bot", "video_cache", url_hash]:
                         if part not in current:
@@ -1109,15 +1250,16 @@ def save_to_video_cache(url: str, quality_key: str, message_ids: list, clear: bo
                 ids_string = ",".join(map(str, message_ids))
                 cache_ref.child(quality_key).set(ids_string)
                 logger.info(f"Saved split video to cache: hash={url_hash}, quality={quality_key}, msg_ids={ids_string}")
-                # Update local cache
+                # Update local cache (the journaled/SQLite store already applied the set)
                 use_firebase = getattr(Config, 'USE_FIREBASE', True)
-                if not use_firebase:
+                if not use_firebase and not _local_store_owns_cache():
                     current = firebase_cache
                     for part in ["bot", "video_cache", url_hash]:
                         if part not in current:
                             current[part] = {}
                         current = current[part]
                     current[quality_key] = ids_string
+            video_cache_index.set_entry(url_hash, quality_key, message_ids)
             
             # Sync local cache to file when USE_FIREBASE=False
             use_firebase = getattr(Config, 'USE_FIREBASE', True)
@@ -1130,40 +1272,12 @@ def save_to_video_cache(url: str, quality_key: str, message_ids: list, clear: bo
 
 def get_cached_message_ids(url: str, quality_key: str) -> list:
     """Searches cache for both versions of YouTube link (long/short)."""
-    messages = safe_get_messages(None)
-    from URL_PARSERS.normalizer import normalize_url_for_cache
-    from URL_PARSERS.youtube import is_youtube_url, youtube_to_short_url, youtube_to_long_url
-    logger.info(f"get_cached_message_ids called: url={url}, quality_key={quality_key}")
     if not quality_key:
         logger.warning(f"get_cached_message_ids: quality_key is empty for URL: {url}")
         return None
     try:
-        urls = [normalize_url_for_cache(url)]
-        if is_youtube_url(url):
-            short_url = youtube_to_short_url(url)
-            long_url = youtube_to_long_url(url)
-            urls.append(normalize_url_for_cache(short_url))
-            urls.append(normalize_url_for_cache(long_url))
-            logger.info(f"get_cached_message_ids: original={url}, short={short_url}, long={long_url}")
-        logger.info(f"get_cached_message_ids: checking URLs: {urls}")
-        for u in set(urls):
-            url_hash = get_url_hash(u)
-            logger.info(f"get_cached_message_ids: checking hash {url_hash} for quality {quality_key}")
-            
-            # We use local cache instead of Firebase
-            path_parts = ["bot", "video_cache", url_hash, quality_key]
-            ids_string = get_from_local_cache(path_parts)
-            
-            logger.info(f"get_cached_message_ids: raw value from local cache: {ids_string} (type: {type(ids_string)})")
-            if ids_string:
-                result = [int(msg_id) for msg_id in ids_string.split(',')]
-                logger.info(
-                    f"get_cached_message_ids: found cached message_ids {result} for URL: {url}, quality: {quality_key}")
-                return result
-            else:
-                logger.info(safe_get_messages().DB_GET_CACHED_MESSAGE_IDS_NO_CACHE_MSG.format(url_hash=url_hash, quality_key=quality_key))
-        logger.info(safe_get_messages().DB_GET_CACHED_MESSAGE_IDS_NO_CACHE_ANY_VARIANT_MSG)
-        return None
+        # Canonical index covers long/short/shorts variants with one lookup
+        return video_cache_index.get(url, quality_key)
     except Exception as e:
         logger.error(f"Failed to get from cache: {e}")
         return None
@@ -0,0 +1,264 @@
+"""
+Shared reader for the dump.json snapshot.
+
+- load_dump(path): full parse, cached process-wide by (mtime, size) so
+  cache_db and the stats collector never parse the same file twice. The
+  cached tree is shared and read-only; load_dump(path, private=True) returns
+  a copy for callers that modify it (cache_db merges writes into its cache).
+- get_dump_subtrees(path, [subpaths]): streaming extraction of selected
+  subtrees (e.g. "bot/<name>/logs/<uid>") without materialising the rest of
+  the document. Skipped siblings are decoded one child at a time, so peak
+  memory is bounded by the extracted subtrees plus the largest such child.
+  If the full dump is already cached for the current mtime, it is used instead.
+
+Only the standard library is used (json's C scanner for the actual decoding).
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_DECODER = json.JSONDecoder()
+_WS = re.compile(r"[ \t\n\r]*")
+_CHUNK_SIZE = 1 << 20
+# Skipped objects are walked this many levels deep before children are decoded whole
+# (1 keeps json.load speed; every extra level costs ~3x more Python calls)
+_SKIP_DEPTH = 1
+
+
+class _NeedMoreData(Exception):
+    pass
+
+
+class _StreamReader:
+    """Minimal pull reader over a text file for the subtree walker."""
+
+    def __init__(self, fh):
+        self._fh = fh
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, min_size: int = _CHUNK_SIZE) -> bool:
+        if self.pos:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        data = self._fh.read(max(_CHUNK_SIZE, min_size))
+        if not data:
+            self.eof = True
+            return False
+        self.buf += data
+        return True
+
+    def peek(self) -> str:
+        while True:
+            self.pos = _WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"Malformed dump: expected {char!r} at offset {self.pos}")
+        self.pos += 1
+
+    def decode(self) -> Any:
+        """Decode one complete JSON value, reading more data as needed."""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+                # A number/literal ending exactly at the buffer end may continue in the next chunk
+                if end >= len(self.buf) and not self.eof:
+                    raise _NeedMoreData()
+                self.pos = end
+                return value
+            except (json.JSONDecodeError, _NeedMoreData):
+                if self.eof:
+                    raise
+                # Grow geometrically so a large value is re-scanned O(log n) times
+                if not self._fill(len(self.buf) - self.pos):
+                    continue
+
+    def skip(self, depth: int = _SKIP_DEPTH) -> None:
+        """Skip one value; objects are walked `depth` levels so memory stays bounded."""
+        if depth <= 0 or self.peek() != "{":
+            self.decode()
+            return
+        self.pos += 1
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            self.decode()
+            self.expect(":")
+            self.skip(depth - 1)
+            char = self.peek()
+            self.pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                raise ValueError(f"Malformed dump: unexpected {char!r} at offset {self.pos}")
+
+
+def _split(path: str) -> Tuple[str, ...]:
+    return tuple(p for p in str(path).strip("/").split("/") if p)
+
+
+def _walk_object(reader: _StreamReader, node: Tuple[str, ...], wanted: List[Tuple[str, ...]],
+                 out: Dict[str, Any], remaining: set) -> None:
+    reader.expect("{")
+    if reader.peek() == "}":
+        reader.pos += 1
+        return
+    while True:
+        key = reader.decode()
+        reader.expect(":")
+        child = node + (key,)
+        if child in remaining:
+            out[key] = reader.decode()
+            remaining.discard(child)
+        elif reader.peek() == "{" and any(w[:len(child)] == child and len(w) > len(child) for w in wanted):
+            _walk_object(reader, child, wanted, out.setdefault(key, {}), remaining)
+        else:
+            reader.skip()
+        if not remaining:
+            # Everything requested was found; no need to read the rest of the file
+            return
+        char = reader.peek()
+        reader.pos += 1
+        if char == "}":
+            return
+        if char != ",":
+            raise ValueError(f"Malformed dump: unexpected {char!r} at offset {reader.pos}")
+
+
+def _navigate(tree: Any, parts: Tuple[str, ...]) -> Any:
+    for part in parts:
+        if not isinstance(tree, dict) or part not in tree:
+            return None
+        tree = tree[part]
+    return tree
+
+
+def stream_dump_subtrees(path: str, subpaths: Iterable[str]) -> Dict[str, Any]:
+    """Extract the given subtrees from a dump file without parsing the rest."""
+    wanted = [_split(p) for p in subpaths]
+    if any(not w for w in wanted):
+        # The root was requested: nothing to skip
+        data = _read_full(path)
+        return {"/".join(w): _navigate(data, w) for w in wanted}
+    result: Dict[str, Any] = {}
+    tree: Dict[str, Any] = {}
+    with open(path, "r", encoding="utf-8") as fh:
+        reader = _StreamReader(fh)
+        if reader.peek() == "{":
+            _walk_object(reader, (), wanted, tree, set(wanted))
+    for w in wanted:
+        result["/".join(w)] = _navigate(tree, w)
+    return result
+
+
+def _read_full(path: str) -> Any:
+    with open(path, "r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+# ------------------------------------------------------------------
+# Process-wide cache keyed by file mtime/size
+# ------------------------------------------------------------------
+
+_cache_lock = threading.Lock()
+_cache: Dict[str, Dict[str, Any]] = {}
+
+
+def _stamp(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _entry(path: str, stamp: Tuple[int, int]) -> Dict[str, Any]:
+    key = os.path.abspath(path)
+    entry = _cache.get(key)
+    if entry is None or entry["stamp"] != stamp:
+        # Only the current version of each file is kept
+        entry = {"stamp": stamp, "full": None, "subtrees": {}}
+        _cache[key] = entry
+    return entry
+
+
+def _copy_tree(value: Any) -> Any:
+    """Copy the dicts and lists of a parsed dump; JSON leaves are immutable and shared."""
+    if isinstance(value, dict):
+        return {key: _copy_tree(child) for key, child in value.items()}
+    if isinstance(value, list):
+        return [_copy_tree(child) for child in value]
+    return value
+
+
+def load_dump(path: str, private: bool = False) -> Any:
+    """Parse the whole dump once per file version and share the result.
+
+    The shared tree also answers get_dump_subtrees() and must not be modified;
+    pass private=True to get a copy the caller owns.
+    """
+    stamp = _stamp(path)
+    if stamp is None:
+        raise FileNotFoundError(path)
+    with _cache_lock:
+        entry = _entry(path, stamp)
+        data = entry["full"]
+    if data is None:
+        data = _read_full(path)
+        with _cache_lock:
+            entry = _entry(path, stamp)
+            entry["full"] = data
+            entry["subtrees"] = {}
+    return _copy_tree(data) if private else data
+
+
+def get_dump_subtrees(path: str, subpaths: Iterable[str], cache: bool = True) -> Dict[str, Any]:
+    """Return {subpath: value} for the current dump, parsing only what is missing."""
+    stamp = _stamp(path)
+    wanted = ["/".join(_split(p)) for p in subpaths]
+    if stamp is None:
+        return {p: None for p in wanted}
+    result: Dict[str, Any] = {}
+    missing: List[str] = []
+    with _cache_lock:
+        entry = _entry(path, stamp)
+        for p in wanted:
+            parts = _split(p)
+            if entry["full"] is not None:
+                result[p] = _navigate(entry["full"], parts)
+                continue
+            for cached_path, value in entry["subtrees"].items():
+                cached_parts = _split(cached_path)
+                if parts[:len(cached_parts)] == cached_parts:
+                    result[p] = _navigate(value, parts[len(cached_parts):])
+                    break
+            else:
+                missing.append(p)
+    if missing:
+        extracted = stream_dump_subtrees(path, missing)
+        result.update(extracted)
+        if cache:
+            with _cache_lock:
+                entry = _entry(path, stamp)
+                entry["subtrees"].update(extracted)
+    return result
+
+
+def get_dump_subtree(path: str, subpath: str, cache: bool = True) -> Any:
+    """Single-subtree shortcut for get_dump_subtrees()."""
+    key = "/".join(_split(subpath))
+    return get_dump_subtrees(path, [key], cache=cache).get(key)
@@ -16,7 +16,8 @@ from CONFIG.messages import Messages, safe_get_messages
 from HELPERS.logger import logger
 from HELPERS.filesystem_hlp import create_directory
 from HELPERS.logger import send_to_all
-from services.stats_events import emit_download_event, wrap_db_adapter
+from services.stats_events import add_db_listener, emit_download_event, wrap_db_adapter
+from DATABASE.membership_index import MembershipIndex
 
 # Global variable for timing
 starting_point = []
@@ -136,6 +137,14 @@ class FirebaseDBAdapter:
     def remove(self) -> None:
         return self._ref().delete()
 
+    def get_shallow(self) -> Any:
+        """Return only the child keys of the current path (values become True)."""
+        return self._ref().get(shallow=True)
+
+    def get_from_key(self, start_key: str) -> Any:
+        """Return children whose key sorts at or after start_key."""
+        return self._ref().order_by_key().start_at(start_key).get()
+
 
 class RestDBAdapter:
     """Pyrebase-like adapter using Firebase Realtime Database REST API with idToken.
@@ -241,29 +250,101 @@ class RestDBAdapter:
     def _url(self) -> str:
         return f"{self._database_url}{self._path}.json"
 
+    def _write_queue(self):
+        """Shared write-behind queue, or None when writes go out synchronously."""
+        if not getattr(Config, 'FIREBASE_WRITE_QUEUE_ENABLED', True) or self._path.strip("/") == "":
+            # Root writes replace the whole database: keep them synchronous
+            return None
+        with self._shared["lock"]:
+            queue = self._shared.get("write_queue")
+            if queue is None:
+                from DATABASE.write_queue import FirebaseWriteQueue
+                queue = FirebaseWriteQueue(
+                    self._send_batch,
+                    max_batch=getattr(Config, 'FIREBASE_WRITE_QUEUE_MAX_BATCH', 500),
+                    flush_interval=getattr(Config, 'FIREBASE_WRITE_QUEUE_FLUSH_INTERVAL', 1.0),
+                    max_retries=getattr(Config, 'FIREBASE_WRITE_QUEUE_MAX_RETRIES', 5),
+                )
+                self._shared["write_queue"] = queue
+        return queue
+
+    def _send_batch(self, batch: Dict[str, Any]) -> None:
+        """Multi-location update at the root: {"a/b": value, "c/d": None}."""
+        r = self._session.patch(f"{self._database_url}/.json", params=self._auth_params(), json=batch, timeout=60)
+        r.raise_for_status()
+
+    def _flush_writes(self) -> None:
+        # Reads must observe writes still waiting in the queue
+        queue = self._shared.get("write_queue")
+        if queue is not None:
+            queue.flush()
+
+    def flush_writes(self) -> bool:
+        """Send all queued writes now; returns False if a batch failed."""
+        queue = self._shared.get("write_queue")
+        return queue.flush() if queue is not None else True
+
+    def get_write_queue_stats(self) -> Dict[str, Any]:
+        """Queue depth and flush latency metrics of the write-behind queue."""
+        queue = self._shared.get("write_queue")
+        return queue.stats() if queue is not None else {}
+
     def set(self, data: Any) -> None:
+        queue = self._write_queue()
+        if queue is not None:
+            queue.set(self._path, data)
+            return
         r = self._session.put(self._url(), params=self._auth_params(), json=data, timeout=60)
         r.raise_for_status()
 
     def update(self, data: Dict[str, Any]) -> None:
+        queue = self._write_queue()
+        if queue is not None:
+            queue.update(self._path, data)
+            return
         r = self._session.patch(self._url(), params=self._auth_params(), json=data, timeout=60)
         r.raise_for_status()
 
     def remove(self) -> None:
+        queue = self._write_queue()
+        if queue is not None:
+            queue.remove(self._path)
+            return
         r = self._session.delete(self._url(), params=self._auth_params(), timeout=60)
         r.raise_for_status()
 
     def push(self, data: Any):
+        queue = self._write_queue()
+        if queue is not None:
+            # Key generated client-side, same format as the server's {"name": key} reply
+            return {"name": queue.push(self._path, data)}
         parent_url = f"{self._database_url}{self._path}.json"
         r = self._session.post(parent_url, params=self._auth_params(), json=data, timeout=60)
         r.raise_for_status()
         return r.json()
 
     def get(self) -> _SnapshotCompat:
+        self._flush_writes()
         r = self._session.get(self._url(), params=self._auth_params(), timeout=60)
         r.raise_for_status()
         return _SnapshotCompat(r.json())
 
+    def get_shallow(self) -> Any:
+        """Return only the child keys of the current path (values become True)."""
+        self._flush_writes()
+        params = {**self._auth_params(), "shallow": "true"}
+        r = self._session.get(self._url(), params=params, timeout=60)
+        r.raise_for_status()
+        return r.json()
+
+    def get_from_key(self, start_key: str) -> Any:
+        """Return children whose key sorts at or after start_key."""
+        self._flush_writes()
+        params = {**self._auth_params(), "orderBy": '"$key"', "startAt": json.dumps(str(start_key))}
+        r = self._session.get(self._url(), params=params, timeout=60)
+        r.raise_for_status()
+        return r.json()
+
     def close(self):
         messages = safe_get_messages(None)
         """Close network resources only on the root adapter.
@@ -271,6 +352,10 @@ class RestDBAdapter:
         """
         if self._is_child:
             return
+        queue = self._shared.get("write_queue")
+        if queue is not None:
+            # Drain queued writes while the session is still open
+            queue.close()
         try:
             if hasattr(self, '_session') and self._session:
                 for adapter in self._session.adapters.values():
@@ -296,14 +381,19 @@ class LocalDBAdapter:
     """Local adapter that works with a JSON file instead of Firebase.
     
     Mimics the Pyrebase API for compatibility with existing code.
-    All read/write operations are performed against a local JSON file.
+    With LOCAL_DB_ENGINE = "journal" the data is kept in memory and every
+    write is appended to a journal (see DATABASE/journal_store.py), with
+    "sqlite" it is stored in indexed tables (see DATABASE/sqlite_store.py);
+    with "json" every operation re-reads and rewrites the whole JSON file.
     """
     
-    def __init__(self, cache_file: str, path: str = "/"):
+    def __init__(self, cache_file: str, path: str = "/", store=None):
         self._cache_file = cache_file
         self._path = path if path.startswith("/") else f"/{path}"
         self._lock = threading.RLock()
-        self._ensure_cache_file()
+        self._store = store
+        if self._store is None:
+            self._ensure_cache_file()
     
     def _ensure_cache_file(self):
         """Create the cache file if it does not exist."""
@@ -385,10 +475,12 @@ class LocalDBAdapter:
             if not part:
                 continue
             path = f"{path}/{part}"
-        return LocalDBAdapter(self._cache_file, path)
+        return LocalDBAdapter(self._cache_file, path, store=self._store)
     
     def set(self, data: Any) -> None:
         """Set a value at the current path."""
+        if self._store is not None:
+            return self._store.set(self._path, data)
         with self._lock:
             cache = self._load_cache()
             self._set_path_value(cache, self._path, data)
@@ -396,6 +488,8 @@ class LocalDBAdapter:
     
     def update(self, data: Dict[str, Any]) -> None:
         """Update values at the current path."""
+        if self._store is not None:
+            return self._store.update(self._path, data)
         with self._lock:
             cache = self._load_cache()
             current = self._get_path_value(cache, self._path)
@@ -408,6 +502,8 @@ class LocalDBAdapter:
     
     def remove(self) -> None:
         """Remove a value at the current path."""
+        if self._store is not None:
+            return self._store.remove(self._path)
         with self._lock:
             cache = self._load_cache()
             self._remove_path_value(cache, self._path)
@@ -415,6 +511,8 @@ class LocalDBAdapter:
     
     def push(self, data: Any):
         """Append to a list-like dict (generates a timestamp key)."""
+        if self._store is not None:
+            return self._store.push(self._path, data)
         with self._lock:
             cache = self._load_cache()
             current = self._get_path_value(cache, self._path)
@@ -428,14 +526,17 @@ class LocalDBAdapter:
     
     def get(self) -> _SnapshotCompat:
         """Get a value at the current path."""
+        if self._store is not None:
+            return _SnapshotCompat(self._store.get(self._path))
         with self._lock:
             cache = self._load_cache()
             value = self._get_path_value(cache, self._path)
             return _SnapshotCompat(value)
     
     def close(self):
-        """Close the adapter (no-op for local mode)."""
-        pass
+        """Flush the journal/WAL of the local store (no-op for the plain JSON engine)."""
+        if self._store is not None and self._path == "/":
+            self._store.close()
 
 
 # Initialize db adapter (admin, REST fallback, or local)
@@ -443,8 +544,17 @@ use_firebase = getattr(Config, 'USE_FIREBASE', True)
 if not use_firebase:
     # Local mode: use JSON cache file
     cache_file = getattr(Config, 'FIREBASE_CACHE_FILE', 'dump.json')
-    db = LocalDBAdapter(cache_file, "/")
-    logger.info(f"✅ Local mode enabled (cache: {cache_file})")
+    local_engine = getattr(Config, 'LOCAL_DB_ENGINE', 'journal')
+    if local_engine == "journal":
+        from DATABASE.journal_store import get_journaled_store
+        db = LocalDBAdapter(cache_file, "/", store=get_journaled_store(cache_file))
+    elif local_engine == "sqlite":
+        from DATABASE.sqlite_store import get_sqlite_store
+        sqlite_file = getattr(Config, 'LOCAL_DB_SQLITE_FILE', 'dump.sqlite3')
+        db = LocalDBAdapter(cache_file, "/", store=get_sqlite_store(sqlite_file, import_from=cache_file))
+    else:
+        db = LocalDBAdapter(cache_file, "/")
+    logger.info(f"✅ Local mode enabled (cache: {cache_file}, engine: {local_engine})")
 else:
     # Firebase mode: use cloud database
     use_admin = _init_firebase_admin_if_needed()
@@ -487,6 +597,28 @@ def db_child_by_path(db_adapter, path: str):
     return db_adapter
 
 
+def _load_membership_keys(section: str):
+    """User ids (keys) of bot/<BOT_NAME_FOR_USERS>/<section>, without their values where possible."""
+    if getattr(Config, 'USE_FIREBASE', True):
+        ref = db.child("bot").child(Config.BOT_NAME_FOR_USERS).child(section)
+        get_shallow = getattr(ref, "get_shallow", None)
+        data = get_shallow() if get_shallow else ref.get().val()
+    else:
+        # Local mode: check via local cache
+        from DATABASE.cache_db import get_from_local_cache
+        data = get_from_local_cache(["bot", Config.BOT_NAME_FOR_USERS, section])
+    return data.keys() if isinstance(data, dict) else ()
+
+
+# Registered and blocked users, kept up to date by every write through db
+membership_index = MembershipIndex(
+    Config.BOT_NAME_FOR_USERS,
+    _load_membership_keys,
+    refresh_interval=getattr(Config, 'MEMBERSHIP_REFRESH_INTERVAL', 300),
+)
+add_db_listener(membership_index.handle_db_event)
+
+
 # Cheking Users are in Main User Directory in DB
 def check_user(message):
     user_id_str = str(message.chat.id)
@@ -505,37 +637,14 @@ def check_user(message):
         shutil.copy(cookie_src, cookie_dest)
 
     # Register the User in the Database if Not Already Registered
-    use_firebase = getattr(Config, 'USE_FIREBASE', True)
-    if use_firebase:
-        user_db = db.child("bot").child(Config.BOT_NAME_FOR_USERS).child("users").get().each()
-        users = [user.key() for user in user_db] if user_db else []
-        if user_id_str not in users:
-            data = {"ID": message.chat.id, "timestamp": math.floor(time.time())}
-            db.child("bot").child(Config.BOT_NAME_FOR_USERS).child("users").child(user_id_str).set(data)
-    else:
-        # Local mode: check via local cache
-        from DATABASE.cache_db import get_from_local_cache
-        users_data = get_from_local_cache(["bot", Config.BOT_NAME_FOR_USERS, "users"])
-        users = list(users_data.keys()) if isinstance(users_data, dict) else []
-        if user_id_str not in users:
-            data = {"ID": message.chat.id, "timestamp": math.floor(time.time())}
-            db.child("bot").child(Config.BOT_NAME_FOR_USERS).child("users").child(user_id_str).set(data)
+    if not membership_index.is_registered(user_id_str):
+        data = {"ID": message.chat.id, "timestamp": math.floor(time.time())}
+        db.child("bot").child(Config.BOT_NAME_FOR_USERS).child("users").child(user_id_str).set(data)
 
 
 # Checking user is Blocked or not
 def is_user_blocked(message):
-    messages = safe_get_messages(message.chat.id)
-    use_firebase = getattr(Config, 'USE_FIREBASE', True)
-    if use_firebase:
-        blocked = db.child("bot").child(Config.BOT_NAME_FOR_USERS).child("blocked_users").get().each()
-        blocked_users = [int(b_user.key()) for b_user in blocked] if blocked else []
-    else:
-        # Local mode: check via local cache
-        from DATABASE.cache_db import get_from_local_cache
-        blocked_data = get_from_local_cache(["bot", Config.BOT_NAME_FOR_USERS, "blocked_users"])
-        blocked_users = [int(k) for k in blocked_data.keys()] if isinstance(blocked_data, dict) else []
-    
-    if int(message.chat.id) in blocked_users:
+    if membership_index.is_blocked(message.chat.id):
         send_to_all(message, safe_get_messages().DB_USER_BANNED_MSG)
         return True
     else:
@@ -0,0 +1,239 @@
+"""
+Incremental Firebase -> local cache sync.
+
+Instead of downloading the whole Realtime Database (`/.json`) every
+RELOAD_CACHE_EVERY hours, each tracked subtree is compared against the
+in-memory firebase_cache:
+  - a shallow (keys only) query of the subtree finds first-level keys that
+    were added or removed; removed keys are dropped, new ones are fetched,
+  - a per-subtree high-water mark (largest key seen, in Firebase key order)
+    lets monotonic keys be fetched with one orderBy="$key"&startAt query,
+  - below the first level, up to FIREBASE_SYNC_MAX_PARENTS known entries per
+    subtree and pass (round robin) are re-checked down to their leaves:
+    timestamped leaves (logs/<uid>/<ts>) with one orderBy="$key"&startAt=<last
+    leaf key> query, other leaves (video_cache/<hash>/<quality>,
+    playlists/<hash>/<quality>/<index>) with a shallow query.
+Deltas are merged in place under the cache lock; there is no global swap.
+
+There is no scheduled full reload next to the sync: the dump is loaded at
+startup, on /reload_cache, and again when FIREBASE_SYNC_RECOVERY_PASSES passes
+in a row fail. Changes to values of already-known leaves are only picked up
+by such a full reload.
+"""
+
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from CONFIG.config import Config
+from HELPERS.logger import logger
+from DATABASE.firebase_init import db_child_by_path
+
+# Keys Firebase orders as numbers: 32-bit integers without leading zeros
+_INT_KEY = re.compile(r"-?(0|[1-9][0-9]*)")
+
+
+def _split(path: str) -> List[str]:
+    return [p for p in str(path).strip("/").split("/") if p]
+
+
+def _key_order(key: str) -> Tuple[int, int, str]:
+    """Sort key matching orderBy="$key": 32-bit integer keys first, numerically, then strings."""
+    if _INT_KEY.fullmatch(key) and -2 ** 31 <= int(key) < 2 ** 31:
+        return (0, int(key), "")
+    return (1, 0, key)
+
+
+def get_tracked_subtrees() -> List[Tuple[str, int, bool]]:
+    """(path, leaf depth, timestamped leaves) of the subtrees kept in sync incrementally."""
+    bot_db = str(getattr(Config, 'BOT_DB_PATH', f"bot/{Config.BOT_NAME_FOR_USERS}/")).strip("/")
+    subtrees = [
+        (getattr(Config, 'VIDEO_CACHE_DB_PATH', 'bot/video_cache'), 2, False),
+        (getattr(Config, 'PLAYLIST_CACHE_DB_PATH', 'bot/video_cache/playlists'), 3, False),
+        (getattr(Config, 'IMAGE_CACHE_DB_PATH', 'bot/video_cache/images'), 2, False),
+        (f"{bot_db}/users", 1, False),
+        (f"{bot_db}/blocked_users", 1, False),
+        (f"{bot_db}/unblocked_users", 1, False),
+        (f"{bot_db}/logs", 2, True),
+    ]
+    return [("/".join(_split(path)), depth, ordered) for path, depth, ordered in subtrees]
+
+
+class _CacheReplaced(Exception):
+    """firebase_cache was swapped by a full reload during the pass."""
+
+
+class IncrementalCacheSync:
+    """Merges new/removed Firebase children into the local cache dict."""
+
+    def __init__(self, db_adapter, max_fetch_per_subtree: int = 200, max_parents_per_subtree: int = 200,
+                 lock=None):
+        self._db = db_adapter
+        self._max_fetch = max(1, int(max_fetch_per_subtree))
+        self._max_parents = max(0, int(max_parents_per_subtree))
+        self._lock = lock or threading.RLock()
+        # High-water mark per subtree: largest first-level key seen on the last run
+        self._hwm: Dict[str, str] = {}
+        # Last first-level key re-checked below the first level, per subtree
+        self._cursor: Dict[str, str] = {}
+        self._cache: Dict[str, Any] = {}
+        self._get_cache: Callable[[], Dict[str, Any]] = lambda: self._cache
+        self.stats = {
+            "runs": 0,
+            "fetched_keys": 0,
+            "removed_keys": 0,
+            "range_queries": 0,
+            "full_fetches": 0,
+            "parent_checks": 0,
+            "last_duration": 0.0,
+        }
+
+    def sync(self, get_cache: Callable[[], Dict[str, Any]]) -> Dict[str, int]:
+        """Run one incremental pass over all tracked subtrees of the cache get_cache() returns."""
+        started = time.time()
+        self._get_cache = get_cache
+        with self._lock:
+            self._cache = get_cache()
+        tracked = get_tracked_subtrees()
+        # failed: subtrees this pass could not sync
+        totals = {"fetched": 0, "removed": 0, "failed": 0}
+        for path, depth, ordered in tracked:
+            # Nested tracked subtrees (video_cache/playlists) are synced on their own
+            skip = {p[len(path) + 1:].split("/")[0] for p, _, _ in tracked if p.startswith(path + "/")}
+            try:
+                fetched, removed = self._sync_subtree(path, depth, ordered, skip)
+                totals["fetched"] += fetched
+                totals["removed"] += removed
+            except _CacheReplaced:
+                logger.info("Firebase cache was reloaded during the incremental sync; stopping this pass")
+                break
+            except Exception as e:
+                totals["failed"] += 1
+                logger.warning(f"Incremental sync failed for {path}: {e}")
+        self.stats["runs"] += 1
+        self.stats["fetched_keys"] += totals["fetched"]
+        self.stats["removed_keys"] += totals["removed"]
+        self.stats["last_duration"] = time.time() - started
+        return totals
+
+    @contextmanager
+    def _locked(self):
+        """Hold the cache lock, failing the pass if a full reload replaced the cache."""
+        with self._lock:
+            if self._get_cache() is not self._cache:
+                raise _CacheReplaced()
+            yield
+
+    def _sync_subtree(self, path: str, depth: int, ordered: bool, skip: Set[str]) -> Tuple[int, int]:
+        ref = db_child_by_path(self._db, path)
+        with self._locked():
+            local = self._cache
+            for part in _split(path):
+                if not isinstance(local.get(part), dict):
+                    local[part] = {}
+                local = local[part]
+        remote_keys, new_keys, removed = self._sync_level(ref, local, skip, self._hwm.get(path))
+        if remote_keys:
+            self._hwm[path] = max(remote_keys, key=_key_order)
+        fetched, dropped = len(new_keys), len(removed)
+        if depth > 1:
+            # New first-level keys were fetched whole; re-check known ones down to the leaves
+            for key in self._next_parents(path, remote_keys - new_keys):
+                with self._locked():
+                    child = local.get(key)
+                if not isinstance(child, dict):
+                    continue
+                self.stats["parent_checks"] += 1
+                child_fetched, child_removed = self._sync_nested(ref.child(key), child, depth - 1, ordered)
+                fetched += child_fetched
+                dropped += child_removed
+        return fetched, dropped
+
+    def _next_parents(self, path: str, known: Set[str]) -> List[str]:
+        """Up to max_parents known keys after the subtree's cursor, wrapping around."""
+        if not known or not self._max_parents:
+            return []
+        keys = sorted(known, key=_key_order)
+        cursor = self._cursor.get(path)
+        if cursor is not None:
+            cursor_order = _key_order(cursor)
+            start = next((i for i, key in enumerate(keys) if _key_order(key) > cursor_order), 0)
+            keys = keys[start:] + keys[:start]
+        batch = keys[:self._max_parents]
+        self._cursor[path] = batch[-1]
+        return batch
+
+    def _sync_nested(self, ref, local: Dict[str, Any], depth: int, ordered: bool) -> Tuple[int, int]:
+        """Sync the children of a known entry; depth 1 means they are leaves."""
+        with self._locked():
+            local_keys = list(local)
+        hwm = max(local_keys, key=_key_order) if local_keys else None
+        if depth == 1 and ordered and hwm is not None:
+            # Timestamped leaves only grow: everything after the last one we have
+            self.stats["range_queries"] += 1
+            data = ref.get_from_key(hwm)
+            hwm_order = _key_order(hwm)
+            new = {key: value for key, value in (data or {}).items()
+                   if _key_order(key) > hwm_order} if isinstance(data, dict) else {}
+            if new:
+                with self._locked():
+                    local.update(new)
+            return len(new), 0
+        remote_keys, new_keys, removed = self._sync_level(ref, local, set(), hwm)
+        fetched, dropped = len(new_keys), len(removed)
+        if depth > 1:
+            for key in sorted(remote_keys - new_keys, key=_key_order):
+                with self._locked():
+                    child = local.get(key)
+                if isinstance(child, dict):
+                    child_fetched, child_removed = self._sync_nested(ref.child(key), child, depth - 1, ordered)
+                    fetched += child_fetched
+                    dropped += child_removed
+        return fetched, dropped
+
+    def _sync_level(self, ref, local: Dict[str, Any], skip: Set[str], hwm: Optional[str]):
+        """Shallow-compare one level: drop removed keys, merge new ones. Returns (remote, new, removed) keys."""
+        remote = ref.get_shallow()
+        remote_keys = set(remote.keys()) - skip if isinstance(remote, dict) else set()
+        with self._locked():
+            local_keys = set(local.keys()) - skip
+        removed = local_keys - remote_keys
+        new_keys = remote_keys - local_keys
+        fetched = self._fetch_new(ref, new_keys, hwm) if new_keys else {}
+        if removed or fetched:
+            with self._locked():
+                for key in removed:
+                    local.pop(key, None)
+                local.update(fetched)
+        return remote_keys, set(fetched), removed
+
+    def _fetch_new(self, ref, new_keys: Set[str], hwm: Optional[str]) -> Dict[str, Any]:
+        pending = set(new_keys)
+        found: Dict[str, Any] = {}
+        first = min(pending, key=_key_order)
+        if hwm is not None and _key_order(first) > _key_order(hwm):
+            # All new keys sort after the mark: one range query fetches them
+            self.stats["range_queries"] += 1
+            data = ref.get_from_key(first)
+            if isinstance(data, dict):
+                for key, value in data.items():
+                    if key in pending:
+                        found[key] = value
+                        pending.discard(key)
+        if not pending:
+            return found
+        if len(pending) > self._max_fetch:
+            self.stats["full_fetches"] += 1
+            data = ref.get().val()
+            if isinstance(data, dict):
+                for key in pending:
+                    if key in data:
+                        found[key] = data[key]
+            return found
+        for key in sorted(pending, key=_key_order):
+            value = ref.child(key).get().val()
+            if value is not None:
+                found[key] = value
+        return found
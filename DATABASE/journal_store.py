@@ -0,0 +1,273 @@
+"""
+Append-only journaled storage engine for local mode (USE_FIREBASE=False).
+
+The whole tree lives in memory. Every path-level mutation is appended as one
+JSON line to a write-ahead journal (<cache_file>.wal) and a background thread
+periodically compacts the tree into the regular dump.json snapshot, so existing
+dump readers (load_firebase_cache, StatsCollector.reload_from_dump) keep working.
+
+Journal replay is idempotent (set/update/remove with explicit keys), so a crash
+at any point of the compaction just replays a few already-snapshotted entries.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# Not HELPERS.logger: sqlite_store imports this module and is also used by the dashboard process
+logger = logging.getLogger(__name__)
+
+
+def split_path(path: str) -> List[str]:
+    """Split a '/a/b/c' path into its non-empty parts."""
+    return [p for p in str(path).strip("/").split("/") if p]
+
+
+class JournaledStore:
+    """In-memory tree with a write-ahead journal and background compaction."""
+
+    def __init__(self, snapshot_file: str, journal_file: Optional[str] = None,
+                 compact_interval: int = 60, compact_bytes: int = 64 * 1024 * 1024,
+                 fsync: bool = False):
+        self.snapshot_file = snapshot_file
+        self.journal_file = journal_file or f"{snapshot_file}.wal"
+        self._rotated_file = f"{self.journal_file}.old"
+        self.compact_interval = max(1, int(compact_interval))
+        self.compact_bytes = max(1024, int(compact_bytes))
+        self.fsync = bool(fsync)
+
+        self._lock = threading.RLock()
+        self._compact_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._journal_fh = None
+        self._journal_size = 0
+        self._pending_ops = 0
+        self._last_push_ms = 0
+
+        self.tree: Dict[str, Any] = {}
+        self._load()
+        self._open_journal()
+
+        self._thread = threading.Thread(target=self._compaction_worker, daemon=True,
+                                        name="LocalDB-Compactor")
+        self._thread.start()
+        atexit.register(self.close)
+
+    # ------------------------------------------------------------------
+    # Loading / journal replay
+    # ------------------------------------------------------------------
+
+    def _load(self) -> None:
+        if os.path.exists(self.snapshot_file):
+            try:
+                with open(self.snapshot_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self.tree = data if isinstance(data, dict) else {}
+            except Exception as e:
+                logger.error(f"Error loading local snapshot {self.snapshot_file}: {e}")
+                self.tree = {}
+        replayed = 0
+        # Rotated journal first (left over from an interrupted compaction), then the live one
+        for path in (self._rotated_file, self.journal_file):
+            replayed += self._replay(path)
+        self._pending_ops = replayed
+        if replayed:
+            logger.info(f"✅ Local journal replayed: {replayed} entries")
+
+    def _replay(self, path: str) -> int:
+        if not os.path.exists(path):
+            return 0
+        count = 0
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Torn last line after a crash - everything before it is intact
+                    logger.warning(f"Skipping corrupted journal entry in {path}")
+                    continue
+                self._apply(entry.get("op"), split_path(entry.get("path", "/")), entry.get("value"))
+                count += 1
+        return count
+
+    def _open_journal(self) -> None:
+        self._journal_fh = open(self.journal_file, "a", encoding="utf-8")
+        self._journal_size = self._journal_fh.tell()
+
+    # ------------------------------------------------------------------
+    # Tree operations
+    # ------------------------------------------------------------------
+
+    def _apply(self, op: str, parts: List[str], value: Any) -> None:
+        if op == "set":
+            if not parts:
+                if not isinstance(value, dict):
+                    raise ValueError("Root path value must be a dict")
+                self.tree.update(value)
+                return
+            parent = self._walk(parts[:-1], create=True)
+            parent[parts[-1]] = value
+        elif op == "update":
+            current = self._walk(parts, create=False)
+            if isinstance(current, dict):
+                current.update(value or {})
+            elif not parts:
+                self.tree.update(value or {})
+            else:
+                parent = self._walk(parts[:-1], create=True)
+                parent[parts[-1]] = dict(value or {})
+        elif op == "remove":
+            if not parts:
+                self.tree.clear()
+                return
+            parent = self._walk(parts[:-1], create=False)
+            if isinstance(parent, dict):
+                parent.pop(parts[-1], None)
+
+    def _walk(self, parts: List[str], create: bool) -> Any:
+        current: Any = self.tree
+        for part in parts:
+            if isinstance(current, dict) and isinstance(current.get(part), dict):
+                current = current[part]
+            elif create and isinstance(current, dict):
+                current[part] = {}
+                current = current[part]
+            else:
+                return None
+        return current
+
+    def _write(self, op: str, path: str, value: Any = None) -> None:
+        parts = split_path(path)
+        line = json.dumps({"op": op, "path": "/".join(parts), "value": value},
+                          ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._apply(op, parts, copy.deepcopy(value))
+            self._journal_fh.write(line + "\n")
+            self._journal_fh.flush()
+            if self.fsync:
+                os.fsync(self._journal_fh.fileno())
+            self._journal_size += len(line) + 1
+            self._pending_ops += 1
+            if self._journal_size >= self.compact_bytes:
+                self._wake.set()
+
+    def get(self, path: str) -> Any:
+        with self._lock:
+            parts = split_path(path)
+            if not parts:
+                return copy.deepcopy(self.tree)
+            parent = self._walk(parts[:-1], create=False)
+            if not isinstance(parent, dict):
+                return None
+            return copy.deepcopy(parent.get(parts[-1]))
+
+    def set(self, path: str, value: Any) -> None:
+        self._write("set", path, value)
+
+    def update(self, path: str, value: Dict[str, Any]) -> None:
+        self._write("update", path, value)
+
+    def remove(self, path: str) -> None:
+        self._write("remove", path)
+
+    def push(self, path: str, value: Any) -> str:
+        with self._lock:
+            # Millisecond timestamp keys like the legacy adapter, kept strictly increasing
+            key_ms = max(int(time.time() * 1000), self._last_push_ms + 1)
+            self._last_push_ms = key_ms
+            key = str(key_ms)
+            self._write("set", f"{path.rstrip('/')}/{key}", value)
+        return key
+
+    # ------------------------------------------------------------------
+    # Compaction
+    # ------------------------------------------------------------------
+
+    def compact(self) -> bool:
+        """Write the in-memory tree to the snapshot file and drop compacted journal entries."""
+        with self._compact_lock:
+            with self._lock:
+                if self._pending_ops == 0 and not os.path.exists(self._rotated_file):
+                    return False
+                # Rotate the journal so writers continue while the snapshot is written
+                self._journal_fh.close()
+                if os.path.exists(self._rotated_file):
+                    # Previous compaction failed: keep both journals in order
+                    with open(self._rotated_file, "a", encoding="utf-8") as dst, \
+                            open(self.journal_file, "r", encoding="utf-8") as src:
+                        for line in src:
+                            dst.write(line)
+                    os.remove(self.journal_file)
+                else:
+                    os.replace(self.journal_file, self._rotated_file)
+                self._open_journal()
+                self._pending_ops = 0
+                # Serialising is the only step that has to hold the lock
+                payload = json.dumps(self.tree, ensure_ascii=False, separators=(",", ":"))
+            tmp_file = f"{self.snapshot_file}.tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.snapshot_file)
+            os.remove(self._rotated_file)
+            return True
+
+    def _compaction_worker(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.compact_interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                started = time.time()
+                if self.compact():
+                    logger.debug(f"Local DB compacted in {time.time() - started:.2f}s")
+            except Exception as e:
+                logger.error(f"Local DB compaction failed: {e}")
+
+    def close(self) -> None:
+        """Stop the compactor and flush a final snapshot.
+
+        The journal stays open, so late writes during shutdown are still
+        recorded and replayed on the next start.
+        """
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._wake.set()
+        try:
+            self.compact()
+        except Exception as e:
+            logger.error(f"Local DB final compaction failed: {e}")
+
+
+# One store per snapshot file for the whole process
+_stores: Dict[str, JournaledStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_journaled_store(snapshot_file: str) -> JournaledStore:
+    """Return the process-wide journaled store for a snapshot file."""
+    from CONFIG.config import Config
+    key = os.path.abspath(snapshot_file)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = JournaledStore(
+                snapshot_file,
+                compact_interval=getattr(Config, 'LOCAL_DB_COMPACT_INTERVAL', 60),
+                compact_bytes=getattr(Config, 'LOCAL_DB_COMPACT_BYTES', 64 * 1024 * 1024),
+                fsync=getattr(Config, 'LOCAL_DB_FSYNC', False),
+            )
+            _stores[key] = store
+        return store
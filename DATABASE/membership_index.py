@@ -0,0 +1,147 @@
+"""
+In-memory index of registered and blocked user ids.
+
+check_user() and is_user_blocked() run for incoming messages and used to
+fetch the whole users / blocked_users subtree every time. The index loads
+the keys of both subtrees once and answers membership from sets:
+  - writes made through the db adapter (registration, /block_user,
+    /unblock_user, channel guard, dashboard) update it immediately,
+  - a background thread re-reads the keys every MEMBERSHIP_REFRESH_INTERVAL
+    seconds to pick up changes made outside this process. Writes seen while
+    a refresh is in flight are replayed on top of its result.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from HELPERS.logger import logger
+
+SECTIONS = ("users", "blocked_users")
+
+
+class MembershipIndex:
+    """Sets of user id keys per section of bot/<bot_name>, loaded by load_keys(section)."""
+
+    def __init__(self, bot_name: str, load_keys: Callable[[str], Optional[Iterable[str]]], refresh_interval: float = 300):
+        self._bot_name = str(bot_name)
+        self._load_keys = load_keys
+        self._refresh_interval = refresh_interval
+        self._sets: Dict[str, set] = {section: set() for section in SECTIONS}
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        # Changes seen while a reload is running: (section, key or None for the whole section, keys/present)
+        self._changes: Optional[List[Tuple[str, Optional[str], Any]]] = None
+        self._refresher: Optional[threading.Thread] = None
+        self.stats = {"loads": 0, "last_load_duration": 0.0, "load_errors": 0}
+
+    def is_registered(self, user_id) -> bool:
+        self._ensure_loaded()
+        return str(user_id) in self._sets["users"]
+
+    def is_blocked(self, user_id) -> bool:
+        self._ensure_loaded()
+        return str(user_id) in self._sets["blocked_users"]
+
+    def registered_ids(self) -> List[str]:
+        self._ensure_loaded()
+        with self._lock:
+            return list(self._sets["users"])
+
+    def blocked_ids(self) -> List[str]:
+        self._ensure_loaded()
+        with self._lock:
+            return list(self._sets["blocked_users"])
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "users": len(self._sets["users"]),
+                "blocked_users": len(self._sets["blocked_users"]),
+            }
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        self.reload(initial=True)
+        if self._refresher is None and self._refresh_interval > 0:
+            with self._lock:
+                if self._refresher is None:
+                    self._refresher = threading.Thread(target=self._refresh_loop, name="membership-index", daemon=True)
+                    self._refresher.start()
+
+    def reload(self, initial: bool = False) -> None:
+        """Re-read both sections; on a failed read the section keeps its current keys."""
+        with self._load_lock:
+            if initial and self._loaded:
+                # Loaded by another thread while this one waited
+                return
+            started = time.time()
+            with self._lock:
+                self._changes = []
+            fresh = {}
+            for section in SECTIONS:
+                try:
+                    keys = self._load_keys(section)
+                    fresh[section] = {str(key) for key in (keys or ())}
+                except Exception as e:
+                    self.stats["load_errors"] += 1
+                    logger.warning(f"[MEMBERSHIP] Failed to load {section}: {e}")
+            with self._lock:
+                for section, keys in fresh.items():
+                    self._sets[section] = keys
+                for change in self._changes:
+                    self._apply(*change)
+                self._changes = None
+                # Until both sections could be read once, the next check tries again
+                self._loaded = self._loaded or len(fresh) == len(SECTIONS)
+                self.stats["loads"] += 1
+                self.stats["last_load_duration"] = time.time() - started
+
+    def _refresh_loop(self) -> None:
+        while True:
+            time.sleep(self._refresh_interval)
+            try:
+                self.reload()
+            except Exception as e:
+                logger.warning(f"[MEMBERSHIP] Refresh failed: {e}")
+
+    def handle_db_event(self, path: str, operation: str, payload: Any) -> None:
+        """Follow a write to <BOT_DB_PATH>/<section>[/<user id>] (db adapter write listener)."""
+        parts = [segment for segment in str(path).strip("/").split("/") if segment]
+        if len(parts) < 3 or parts[0] != "bot" or parts[1] != self._bot_name:
+            return
+        section, rest = parts[2], parts[3:]
+        if section == "unblocked_users":
+            # Unblocking writes unblocked_users/<id> next to removing blocked_users/<id>
+            if not rest or operation == "remove":
+                return
+            section, present = "blocked_users", False
+        elif section in SECTIONS:
+            # Removing a field of users/<id> keeps the user
+            present = operation != "remove" or len(rest) > 1
+        else:
+            return
+        if rest:
+            change = (section, rest[0], present)
+        elif operation == "update" and isinstance(payload, dict):
+            for key, value in payload.items():
+                self.handle_db_event(f"{path.rstrip('/')}/{key}", "remove" if value is None else "set", value)
+            return
+        else:
+            keys = set(payload.keys()) if present and isinstance(payload, dict) else set()
+            change = (section, None, keys)
+        with self._lock:
+            self._apply(*change)
+            if self._changes is not None:
+                self._changes.append(change)
+
+    def _apply(self, section: str, key: Optional[str], value: Any) -> None:
+        if key is None:
+            self._sets[section] = {str(k) for k in value}
+        elif value:
+            self._sets[section].add(str(key))
+        else:
+            self._sets[section].discard(str(key))
@@ -0,0 +1,373 @@
+"""
+SQLite storage engine for local mode (USE_FIREBASE=False, LOCAL_DB_ENGINE="sqlite").
+
+Hot subtrees get real tables with composite primary keys:
+  video_cache    - <VIDEO_CACHE_DB_PATH>/<url_hash>/<quality>
+  playlist_cache - <PLAYLIST_CACHE_DB_PATH>/<url_hash>/<quality>/<index>
+  image_cache    - <IMAGE_CACHE_DB_PATH>/<url_hash>/<post_index>
+  logs           - bot/<BOT_NAME_FOR_USERS>/logs/<user_id>/<timestamp>
+Everything else is stored as flattened leaves in the `nodes` table keyed by path.
+
+The store exposes the same path API as JournaledStore (get/set/update/remove/push),
+so LocalDBAdapter and the child(...).get()/.set() callers do not change.
+A lookup at row depth is one primary-key query and a write touches one row.
+dump.json is not written in this mode: StatsCollector (also in the dashboard
+process) reads the database directly.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Allow running as a script: python DATABASE/sqlite_store.py dump.json dump.sqlite3
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from DATABASE.journal_store import split_path
+
+# Not HELPERS.logger: the stats collector reads the store from the dashboard process
+logger = logging.getLogger(__name__)
+
+
+class _Table:
+    """A typed table mapping <prefix>/<key1>/.../<keyN> to one JSON value."""
+
+    def __init__(self, name: str, prefix: str, keys: Tuple[str, ...], indexes: Tuple[Tuple[str, ...], ...] = ()):
+        self.name = name
+        self.prefix = split_path(prefix)
+        self.keys = keys
+        self.indexes = indexes
+        self.depth = len(self.prefix) + len(self.keys)
+
+    def schema(self) -> List[str]:
+        cols = ", ".join(f"{k} TEXT NOT NULL" for k in self.keys)
+        pk = ", ".join(self.keys)
+        sql = [f"CREATE TABLE IF NOT EXISTS {self.name} ({cols}, value TEXT NOT NULL, PRIMARY KEY ({pk})) WITHOUT ROWID"]
+        for cols_idx in self.indexes:
+            sql.append(
+                f"CREATE INDEX IF NOT EXISTS idx_{self.name}_{'_'.join(cols_idx)} "
+                f"ON {self.name} ({', '.join(cols_idx)})"
+            )
+        return sql
+
+    def where(self, count: int) -> str:
+        return " AND ".join(f"{k} = ?" for k in self.keys[:count]) or "1"
+
+
+def _descend(value: Any, parts: List[str]) -> Any:
+    for part in parts:
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def _insert(tree: Dict[str, Any], parts: List[str], value: Any) -> None:
+    current = tree
+    for part in parts[:-1]:
+        if not isinstance(current.get(part), dict):
+            current[part] = {}
+        current = current[part]
+    current[parts[-1]] = value
+
+
+class SQLiteStore:
+    """Path-addressed store on SQLite in WAL mode."""
+
+    def __init__(self, db_file: str, tables: List[_Table]):
+        self.db_file = db_file
+        self._tables = tables
+        self._local = threading.local()
+        self._write_lock = threading.RLock()
+        self._last_push_ms = 0
+        conn = self._conn()
+        with conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS nodes (path TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            for table in self._tables:
+                for sql in table.schema():
+                    conn.execute(sql)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_file, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _owner(self, parts: List[str]) -> Optional[_Table]:
+        """Typed table whose row (or a value inside it) the path points to."""
+        best = None
+        for table in self._tables:
+            plen = len(table.prefix)
+            if parts[:plen] == table.prefix and (best is None or plen > len(best.prefix)):
+                best = table
+        # Nested prefixes (playlists/ and images/ under video_cache/) belong to the
+        # longest one; a path above its row depth is a subtree, not a row
+        if best is None or len(parts) < best.depth:
+            return None
+        return best
+
+    def _subtree_tables(self, parts: List[str]) -> List[_Table]:
+        """Typed tables holding rows under the path, skipping ones a nested table shadows there."""
+        tables = []
+        for table in self._tables:
+            plen = len(table.prefix)
+            if len(parts) <= plen:
+                if table.prefix[:len(parts)] == parts:
+                    tables.append(table)
+            elif parts[:plen] == table.prefix and not any(
+                len(other.prefix) > plen and parts[:len(other.prefix)] == other.prefix for other in self._tables
+            ):
+                tables.append(table)
+        return tables
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def get(self, path: str) -> Any:
+        parts = split_path(path)
+        conn = self._conn()
+        owner = self._owner(parts)
+        if owner is not None:
+            keys = parts[len(owner.prefix):owner.depth]
+            row = conn.execute(
+                f"SELECT value FROM {owner.name} WHERE {owner.where(len(keys))}", keys
+            ).fetchone()
+            if row is None:
+                return None
+            return _descend(json.loads(row[0]), parts[owner.depth:])
+
+        tree: Dict[str, Any] = {}
+        for table in self._subtree_tables(parts):
+            for row in self._select_rows(conn, table, parts):
+                _insert(tree, table.prefix + list(row[:-1]), json.loads(row[-1]))
+        for node_path, value in self._select_nodes(conn, parts):
+            _insert(tree, split_path(node_path), json.loads(value))
+        return _descend(tree, parts)
+
+    def _select_rows(self, conn, table: _Table, parts: List[str]):
+        plen = len(table.prefix)
+        cols = ", ".join(table.keys)
+        if len(parts) <= plen:
+            if table.prefix[:len(parts)] != parts:
+                return []
+            return conn.execute(f"SELECT {cols}, value FROM {table.name}").fetchall()
+        if parts[:plen] != table.prefix:
+            return []
+        keys = parts[plen:]
+        return conn.execute(
+            f"SELECT {cols}, value FROM {table.name} WHERE {table.where(len(keys))}", keys
+        ).fetchall()
+
+    def _select_nodes(self, conn, parts: List[str]):
+        if not parts:
+            return conn.execute("SELECT path, value FROM nodes").fetchall()
+        node_path = "/".join(parts)
+        ancestors = ["/".join(parts[:i]) for i in range(1, len(parts) + 1)]
+        placeholders = ", ".join("?" for _ in ancestors)
+        # '0' sorts right after '/', so [path/, path0) is exactly the subtree
+        return conn.execute(
+            f"SELECT path, value FROM nodes WHERE path IN ({placeholders}) OR (path >= ? AND path < ?)",
+            [*ancestors, f"{node_path}/", f"{node_path}0"],
+        ).fetchall()
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def set(self, path: str, value: Any) -> None:
+        parts = split_path(path)
+        if not parts:
+            if not isinstance(value, dict):
+                raise ValueError("Root path value must be a dict")
+            # Root set merges like the JSON adapter does
+            return self.update("/", value)
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                self._set(conn, parts, value)
+
+    def update(self, path: str, value: Dict[str, Any]) -> None:
+        parts = split_path(path)
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                for key, child_value in (value or {}).items():
+                    self._set(conn, parts + split_path(key), child_value)
+
+    def remove(self, path: str) -> None:
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                self._remove(conn, split_path(path))
+
+    def push(self, path: str, value: Any) -> str:
+        with self._write_lock:
+            key_ms = max(int(time.time() * 1000), self._last_push_ms + 1)
+            self._last_push_ms = key_ms
+            key = str(key_ms)
+            self.set(f"{path.rstrip('/')}/{key}", value)
+        return key
+
+    def _set(self, conn, parts: List[str], value: Any) -> None:
+        owner = self._owner(parts)
+        if owner is not None and len(parts) == owner.depth:
+            keys = parts[len(owner.prefix):]
+            if value is None:
+                conn.execute(f"DELETE FROM {owner.name} WHERE {owner.where(len(keys))}", keys)
+            else:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {owner.name} ({', '.join(owner.keys)}, value) "
+                    f"VALUES ({', '.join('?' for _ in owner.keys)}, ?)",
+                    [*keys, json.dumps(value, ensure_ascii=False)],
+                )
+            return
+        if owner is not None:
+            self._update_inside_row(conn, owner, parts, value)
+            return
+        self._remove(conn, parts)
+        ancestors = ["/".join(parts[:i]) for i in range(1, len(parts))]
+        if ancestors:
+            conn.execute(f"DELETE FROM nodes WHERE path IN ({', '.join('?' for _ in ancestors)})", ancestors)
+        self._insert_value(conn, parts, value)
+
+    def _insert_value(self, conn, parts: List[str], value: Any) -> None:
+        owner = self._owner(parts)
+        if owner is not None and len(parts) == owner.depth:
+            self._set(conn, parts, value)
+        elif isinstance(value, dict):
+            for key, child_value in value.items():
+                self._insert_value(conn, parts + split_path(key), child_value)
+        elif value is not None:
+            conn.execute(
+                "INSERT OR REPLACE INTO nodes (path, value) VALUES (?, ?)",
+                ["/".join(parts), json.dumps(value, ensure_ascii=False)],
+            )
+
+    def _update_inside_row(self, conn, owner: _Table, parts: List[str], value: Any) -> None:
+        keys = parts[len(owner.prefix):owner.depth]
+        row = conn.execute(f"SELECT value FROM {owner.name} WHERE {owner.where(len(keys))}", keys).fetchone()
+        current = json.loads(row[0]) if row else {}
+        if not isinstance(current, dict):
+            current = {}
+        inner = parts[owner.depth:]
+        if value is None:
+            parent = _descend(current, inner[:-1])
+            if isinstance(parent, dict):
+                parent.pop(inner[-1], None)
+        else:
+            _insert(current, inner, value)
+        self._set(conn, parts[:owner.depth], current or None)
+
+    def _remove(self, conn, parts: List[str]) -> None:
+        owner = self._owner(parts)
+        if owner is not None:
+            if len(parts) == owner.depth:
+                self._set(conn, parts, None)
+            else:
+                self._update_inside_row(conn, owner, parts, None)
+            return
+        for table in self._subtree_tables(parts):
+            plen = len(table.prefix)
+            if len(parts) <= plen:
+                if table.prefix[:len(parts)] == parts:
+                    conn.execute(f"DELETE FROM {table.name}")
+            elif parts[:plen] == table.prefix:
+                keys = parts[plen:]
+                conn.execute(f"DELETE FROM {table.name} WHERE {table.where(len(keys))}", keys)
+        if not parts:
+            conn.execute("DELETE FROM nodes")
+            return
+        node_path = "/".join(parts)
+        conn.execute(
+            "DELETE FROM nodes WHERE path = ? OR (path >= ? AND path < ?)",
+            [node_path, f"{node_path}/", f"{node_path}0"],
+        )
+
+    # ------------------------------------------------------------------
+    # Import / maintenance
+    # ------------------------------------------------------------------
+
+    def is_empty(self) -> bool:
+        conn = self._conn()
+        for name in ["nodes"] + [t.name for t in self._tables]:
+            if conn.execute(f"SELECT 1 FROM {name} LIMIT 1").fetchone():
+                return False
+        return True
+
+    def import_dump(self, dump_file: str) -> bool:
+        """One-shot import of an existing dump.json into the tables."""
+        if not os.path.exists(dump_file):
+            return False
+        started = time.time()
+        with open(dump_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            return False
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                self._insert_value(conn, [], data)
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('imported_from', ?)",
+                    [f"{os.path.abspath(dump_file)}@{int(started)}"],
+                )
+        logger.info(f"✅ Imported {dump_file} into {self.db_file} in {time.time() - started:.1f}s")
+        return True
+
+    def close(self) -> None:
+        """Checkpoint the WAL so the main database file is self-contained."""
+        try:
+            self._conn().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except Exception as e:
+            logger.error(f"SQLite checkpoint failed: {e}")
+
+
+def _default_tables() -> List[_Table]:
+    from CONFIG.config import Config
+    bot_name = getattr(Config, 'BOT_NAME_FOR_USERS', 'tgytdlp_bot')
+    return [
+        _Table("video_cache", getattr(Config, 'VIDEO_CACHE_DB_PATH', 'bot/video_cache'), ("url_hash", "quality")),
+        _Table("playlist_cache", getattr(Config, 'PLAYLIST_CACHE_DB_PATH', 'bot/video_cache/playlists'),
+               ("url_hash", "quality", "idx"), indexes=(("url_hash", "idx"),)),
+        _Table("image_cache", getattr(Config, 'IMAGE_CACHE_DB_PATH', 'bot/video_cache/images'),
+               ("url_hash", "post_index")),
+        _Table("logs", f"bot/{bot_name}/logs", ("user_id", "ts"), indexes=(("ts",),)),
+    ]
+
+
+_stores: Dict[str, SQLiteStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_sqlite_store(db_file: str, import_from: Optional[str] = None) -> SQLiteStore:
+    """Return the process-wide SQLite store, importing `import_from` into an empty database once."""
+    key = os.path.abspath(db_file)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = SQLiteStore(db_file, _default_tables())
+            if import_from and store.is_empty():
+                try:
+                    store.import_dump(import_from)
+                except Exception as e:
+                    logger.error(f"Failed to import {import_from} into SQLite: {e}")
+            _stores[key] = store
+        return store
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python DATABASE/sqlite_store.py <dump.json> <database.sqlite3>")
+        sys.exit(1)
+    logging.basicConfig(level=logging.INFO)
+    ok = SQLiteStore(sys.argv[2], _default_tables()).import_dump(sys.argv[1])
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,155 @@
+"""
+In-memory index over the video cache (bot/video_cache/<url_hash>/<quality>).
+
+Every URL form of the same video (youtu.be/ID, watch?v=ID, shorts/ID, ...)
+resolves to one canonical key - ("youtube", ID) or ("url", normalized_url) -
+whose value is the merged {quality: [message_ids]} map of all URL-hash
+variants stored in the database.
+
+- rebuild(video_cache) is called whenever firebase_cache is (re)loaded,
+- set_entry()/remove_entry() are called write-through by save_to_video_cache,
+- get()/qualities() are dict lookups: URL resolution is memoized per raw URL
+  and nothing is logged, so they are safe to call while rendering menus.
+"""
+
+import hashlib
+import re
+import threading
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+# Children of bot/video_cache that are other caches, not URL hashes
+_NESTED_CACHES = {"playlists", "images"}
+
+_YOUTUBE_ID = re.compile(r"(?:youtu\.be/|/shorts/|[?&]v=)([A-Za-z0-9_-]+)")
+
+CanonicalKey = Tuple[str, str]
+
+
+def _md5(value: str) -> str:
+    return hashlib.md5(value.encode()).hexdigest()
+
+
+def parse_message_ids(value: Any) -> Optional[List[int]]:
+    """Parse a stored "id" / "id1,id2" value into a list of ints."""
+    if value is None or value == "":
+        return None
+    try:
+        ids = [int(part) for part in str(value).split(",") if part.strip()]
+    except ValueError:
+        return None
+    return ids or None
+
+
+@lru_cache(maxsize=8192)
+def resolve_url(url: str) -> Tuple[CanonicalKey, FrozenSet[str]]:
+    """Return (canonical key, hashes of every cache key variant) for a URL."""
+    from URL_PARSERS.normalizer import normalize_url_for_cache
+    from URL_PARSERS.youtube import is_youtube_url, youtube_to_short_url, youtube_to_long_url
+
+    normalized = normalize_url_for_cache(url)
+    variants = {normalized}
+    if is_youtube_url(url):
+        # Same variants save_to_video_cache writes
+        variants.add(normalize_url_for_cache(youtube_to_short_url(url)))
+        variants.add(normalize_url_for_cache(youtube_to_long_url(url)))
+        match = _YOUTUBE_ID.search(normalized)
+        if match:
+            video_id = match.group(1)
+            # Forms written for any input link of this video
+            variants.add(f"https://youtu.be/{video_id}")
+            variants.add(f"https://www.youtube.com/watch?v={video_id}")
+            return ("youtube", video_id), frozenset(_md5(v) for v in variants)
+    return ("url", normalized), frozenset(_md5(v) for v in variants)
+
+
+class VideoCacheIndex:
+    """Canonical-key index over the video cache subtree."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._by_hash: Dict[str, Dict[str, List[int]]] = {}
+        self._by_key: Dict[CanonicalKey, Dict[str, List[int]]] = {}
+        self._key_hashes: Dict[CanonicalKey, FrozenSet[str]] = {}
+        self._hash_keys: Dict[str, Set[CanonicalKey]] = {}
+
+    def rebuild(self, video_cache: Any) -> int:
+        """Replace the index with the contents of a bot/video_cache subtree."""
+        by_hash: Dict[str, Dict[str, List[int]]] = {}
+        if isinstance(video_cache, dict):
+            for url_hash, qualities in video_cache.items():
+                if url_hash in _NESTED_CACHES or not isinstance(qualities, dict):
+                    continue
+                entry = {}
+                for quality_key, value in qualities.items():
+                    ids = parse_message_ids(value)
+                    if ids:
+                        entry[quality_key] = ids
+                if entry:
+                    by_hash[url_hash] = entry
+        with self._lock:
+            self._by_hash = by_hash
+            self._by_key = {}
+            self._key_hashes = {}
+            self._hash_keys = {}
+        return len(by_hash)
+
+    def _merge(self, hashes: FrozenSet[str]) -> Dict[str, List[int]]:
+        merged: Dict[str, List[int]] = {}
+        for url_hash in sorted(hashes):
+            for quality_key, ids in self._by_hash.get(url_hash, {}).items():
+                merged.setdefault(quality_key, ids)
+        return merged
+
+    def _entry(self, url: str) -> Dict[str, List[int]]:
+        key, hashes = resolve_url(url)
+        entry = self._by_key.get(key)
+        known = self._key_hashes.get(key)
+        if entry is not None and known is not None and hashes <= known:
+            return entry
+        with self._lock:
+            known = (self._key_hashes.get(key) or frozenset()) | hashes
+            entry = self._merge(known)
+            self._key_hashes[key] = known
+            self._by_key[key] = entry
+            for url_hash in known:
+                self._hash_keys.setdefault(url_hash, set()).add(key)
+        return entry
+
+    def get(self, url: str, quality_key: str) -> Optional[List[int]]:
+        """Cached message ids of a URL in the given quality, or None."""
+        ids = self._entry(url).get(quality_key)
+        return list(ids) if ids else None
+
+    def qualities(self, url: str) -> Set[str]:
+        """All cached quality keys of a URL."""
+        return set(self._entry(url).keys())
+
+    def _refresh_keys(self, url_hash: str) -> None:
+        for key in self._hash_keys.get(url_hash, ()):
+            self._by_key[key] = self._merge(self._key_hashes[key])
+
+    def set_entry(self, url_hash: str, quality_key: str, message_ids: List[int]) -> None:
+        """Write-through of a saved bot/video_cache/<url_hash>/<quality_key> value."""
+        ids = parse_message_ids(",".join(map(str, message_ids)))
+        if not ids:
+            return
+        with self._lock:
+            self._by_hash.setdefault(url_hash, {})[quality_key] = ids
+            self._refresh_keys(url_hash)
+
+    def remove_entry(self, url_hash: str, quality_key: str) -> None:
+        """Write-through of a removed bot/video_cache/<url_hash>/<quality_key> value."""
+        with self._lock:
+            entry = self._by_hash.get(url_hash)
+            if not entry or entry.pop(quality_key, None) is None:
+                return
+            if not entry:
+                del self._by_hash[url_hash]
+            self._refresh_keys(url_hash)
+
+    def __len__(self) -> int:
+        return len(self._by_hash)
+
+
+video_cache_index = VideoCacheIndex()
@@ -0,0 +1,276 @@
+"""
+Write-behind queue for the Firebase REST adapter.
+
+set/update/remove/push calls are recorded as path -> value entries and sent by
+a background thread as one multi-location PATCH at the database root
+({"a/b": v, "c/d": None}). Pending writes are coalesced so the batch never
+contains a path together with one of its ancestors (Firebase rejects that):
+a write below a pending path is merged into that path's value, a write above
+pending paths replaces them.
+
+A batch is flushed when it reaches max_batch entries or flush_interval seconds
+after the first pending write. Failed batches are retried with exponential
+backoff, newer writes to the same paths taking precedence.
+"""
+
+import atexit
+import copy
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from HELPERS.logger import logger
+
+_PUSH_CHARS = "-0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz"
+_push_lock = threading.Lock()
+_last_push_ms = 0
+_last_rand_chars: List[int] = []
+
+
+def generate_push_id() -> str:
+    """Generate a chronologically sortable Firebase-style push key client-side."""
+    global _last_push_ms, _last_rand_chars
+    with _push_lock:
+        now = int(time.time() * 1000)
+        duplicate = now == _last_push_ms
+        _last_push_ms = now
+        ts_chars = []
+        for _ in range(8):
+            ts_chars.append(_PUSH_CHARS[now % 64])
+            now //= 64
+        if not duplicate or not _last_rand_chars:
+            _last_rand_chars = [random.randrange(64) for _ in range(12)]
+        else:
+            # Same millisecond: increment the random part to keep keys ordered
+            i = 11
+            while i >= 0 and _last_rand_chars[i] == 63:
+                _last_rand_chars[i] = 0
+                i -= 1
+            if i >= 0:
+                _last_rand_chars[i] += 1
+        return "".join(reversed(ts_chars)) + "".join(_PUSH_CHARS[c] for c in _last_rand_chars)
+
+
+def _split(path: str) -> List[str]:
+    return [p for p in str(path).strip("/").split("/") if p]
+
+
+class FirebaseWriteQueue:
+    """Coalescing write-behind queue sending multi-path root PATCH requests."""
+
+    def __init__(self, send_batch: Callable[[Dict[str, Any]], None], max_batch: int = 500,
+                 flush_interval: float = 1.0, max_retries: int = 5, backoff_base: float = 1.0,
+                 backoff_max: float = 60.0):
+        self._send_batch = send_batch
+        self.max_batch = max(1, int(max_batch))
+        self.flush_interval = max(0.05, float(flush_interval))
+        self.max_retries = max(0, int(max_retries))
+        self.backoff_base = max(0.1, float(backoff_base))
+        self.backoff_max = max(self.backoff_base, float(backoff_max))
+
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._flush_lock = threading.Lock()
+        self._pending: Dict[str, Any] = {}
+        self._first_pending_at: Optional[float] = None
+        self._retry_batch: Optional[Dict[str, Any]] = None
+        self._retry_attempt = 0
+        self._retry_at = 0.0
+        self._stopped = False
+
+        self._stats = {
+            "enqueued": 0,
+            "coalesced": 0,
+            "batches": 0,
+            "writes_sent": 0,
+            "failures": 0,
+            "dropped": 0,
+            "last_flush_latency": 0.0,
+            "max_flush_latency": 0.0,
+            "total_flush_latency": 0.0,
+        }
+
+        self._thread = threading.Thread(target=self._worker, daemon=True, name="Firebase-WriteQueue")
+        self._thread.start()
+        atexit.register(self.close)
+
+    # ------------------------------------------------------------------
+    # Enqueueing
+    # ------------------------------------------------------------------
+
+    def set(self, path: str, value: Any) -> None:
+        self._enqueue([(path, value)])
+
+    def remove(self, path: str) -> None:
+        self._enqueue([(path, None)])
+
+    def update(self, path: str, data: Dict[str, Any]) -> None:
+        base = "/".join(_split(path))
+        self._enqueue([(f"{base}/{key}" if base else str(key), value) for key, value in (data or {}).items()])
+
+    def push(self, path: str, value: Any) -> str:
+        key = generate_push_id()
+        base = "/".join(_split(path))
+        self._enqueue([(f"{base}/{key}" if base else key, value)])
+        return key
+
+    def _enqueue(self, writes: List[Tuple[str, Any]]) -> None:
+        writes = [(_split(path), copy.deepcopy(value)) for path, value in writes]
+        if not writes:
+            return
+        if any(not parts for parts, _ in writes):
+            raise ValueError("Queued writes to the database root are not supported")
+        with self._lock:
+            for parts, value in writes:
+                if self._put(self._pending, parts, value):
+                    self._stats["coalesced"] += 1
+                self._stats["enqueued"] += 1
+            if self._first_pending_at is None:
+                self._first_pending_at = time.time()
+            if len(self._pending) >= self.max_batch:
+                self._wake.notify()
+
+    @staticmethod
+    def _put(pending: Dict[str, Any], parts: List[str], value: Any) -> bool:
+        """Insert a write keeping pending paths prefix-free; True if it coalesced."""
+        for i in range(1, len(parts)):
+            ancestor = "/".join(parts[:i])
+            if ancestor in pending:
+                # Merge into the pending ancestor's value
+                node = pending[ancestor]
+                if not isinstance(node, dict):
+                    node = {}
+                    pending[ancestor] = node
+                for part in parts[i:-1]:
+                    if not isinstance(node.get(part), dict):
+                        node[part] = {}
+                    node = node[part]
+                if value is None:
+                    node.pop(parts[-1], None)
+                else:
+                    node[parts[-1]] = value
+                return True
+        path = "/".join(parts)
+        coalesced = path in pending
+        prefix = path + "/"
+        for other in [p for p in pending if p.startswith(prefix)]:
+            del pending[other]
+            coalesced = True
+        pending[path] = value
+        return coalesced
+
+    # ------------------------------------------------------------------
+    # Flushing
+    # ------------------------------------------------------------------
+
+    def _due(self, now: float) -> bool:
+        if self._retry_batch is not None:
+            return now >= self._retry_at
+        if not self._pending:
+            return False
+        return (len(self._pending) >= self.max_batch
+                or now - self._first_pending_at >= self.flush_interval)
+
+    def _take_batch(self) -> Dict[str, Any]:
+        """Take the next batch (retried writes first, newer writes on top)."""
+        batch: Dict[str, Any] = {}
+        if self._retry_batch is not None:
+            batch = self._retry_batch
+            self._retry_batch = None
+        for path in list(self._pending):
+            if len(batch) >= self.max_batch and path not in batch:
+                break
+            self._put(batch, _split(path), self._pending.pop(path))
+        self._first_pending_at = time.time() if self._pending else None
+        return batch
+
+    def flush(self, retry: bool = True) -> bool:
+        """Send all pending writes now; returns False if a batch failed."""
+        ok = True
+        while True:
+            with self._flush_lock:
+                with self._lock:
+                    if self._retry_batch is None and not self._pending:
+                        return ok
+                    batch = self._take_batch()
+                    attempt = self._retry_attempt
+                if not self._send(batch, attempt, retry):
+                    return False
+
+    def _send(self, batch: Dict[str, Any], attempt: int, retry: bool) -> bool:
+        started = time.time()
+        try:
+            self._send_batch(batch)
+        except Exception as e:
+            with self._lock:
+                self._stats["failures"] += 1
+                if not retry or attempt >= self.max_retries:
+                    self._stats["dropped"] += len(batch)
+                    self._retry_attempt = 0
+                    logger.error(f"Firebase write queue: dropping {len(batch)} writes after {attempt + 1} attempts: {e}")
+                    return False
+                # Retried before anything newer; _take_batch() lays newer writes on top
+                self._retry_batch = batch
+                self._retry_attempt = attempt + 1
+                delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+                self._retry_at = time.time() + delay * random.uniform(0.8, 1.2)
+                logger.warning(f"Firebase write queue: batch of {len(batch)} failed ({e}), retry {attempt + 1} in {delay:.1f}s")
+            return False
+        latency = time.time() - started
+        with self._lock:
+            self._retry_attempt = 0
+            self._stats["batches"] += 1
+            self._stats["writes_sent"] += len(batch)
+            self._stats["last_flush_latency"] = latency
+            self._stats["max_flush_latency"] = max(self._stats["max_flush_latency"], latency)
+            self._stats["total_flush_latency"] += latency
+        return True
+
+    def _worker(self) -> None:
+        while True:
+            with self._lock:
+                while not self._stopped and not self._due(time.time()):
+                    if self._retry_batch is not None:
+                        timeout = self._retry_at - time.time()
+                    elif self._pending:
+                        timeout = self._first_pending_at + self.flush_interval - time.time()
+                    else:
+                        timeout = None
+                    self._wake.wait(None if timeout is None else max(0.01, timeout))
+                if self._stopped:
+                    return
+            with self._flush_lock:
+                with self._lock:
+                    if not self._due(time.time()):
+                        continue
+                    batch = self._take_batch()
+                    attempt = self._retry_attempt
+                self._send(batch, attempt, retry=True)
+
+    # ------------------------------------------------------------------
+    # Metrics / shutdown
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, throughput and flush latency counters."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["queue_depth"] = len(self._pending) + len(self._retry_batch or {})
+            stats["retry_attempt"] = self._retry_attempt
+        batches = stats["batches"]
+        stats["avg_flush_latency"] = stats.pop("total_flush_latency") / batches if batches else 0.0
+        return stats
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Stop the worker and try to send what is still pending."""
+        with self._lock:
+            if self._stopped:
+                return
+            self._stopped = True
+            self._wake.notify_all()
+        self._thread.join(timeout)
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.flush(retry=False):
+                return
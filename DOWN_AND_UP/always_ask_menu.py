@@ -46,6 +46,7 @@ from DATABASE.cache_db import (
 )
 
 from DOWN_AND_UP.yt_dlp_hook import get_video_formats
+from DOWN_AND_UP.ask_format_table import ask_menu_cache
 from HELPERS.pot_helper import build_cli_extractor_args
 from COMMANDS.format_cmd import set_session_mkv_override
 from DOWN_AND_UP.down_and_audio import down_and_audio
@@ -62,20 +63,11 @@ from URL_PARSERS.thumbnail_downloader import download_thumbnail as download_univ
 # Import function to get user args
 def get_user_args(user_id: int):
     """Get user's saved args settings"""
-    import os
-    import json
-    user_dir = os.path.join("users", str(user_id))
-    args_file = os.path.join(user_dir, "args.txt")
-    
-    if not os.path.exists(args_file):
-        return {}
-    
-    try:
-        with open(args_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        logger.error(LoggerMsg.ALWAYS_ASK_ERROR_READING_USER_ARGS_LOG_MSG.format(user_id=user_id, error=e))
-        return {}
+    from HELPERS.user_settings import get_user_settings
+    settings = get_user_settings(user_id)
+    if settings.args_error is not None:
+        logger.error(LoggerMsg.ALWAYS_ASK_ERROR_READING_USER_ARGS_LOG_MSG.format(user_id=user_id, error=settings.args_error))
+    return settings.get_args()
 from COMMANDS.image_cmd import image_command
 from HELPERS.safe_messeger import fake_message
 
@@ -512,69 +504,72 @@ def delete_subs_langs_cache(user_id: int, url: str) -> None:
     except Exception:
         pass
 
+def _ask_cache_file(user_id, download_dir=None):
+    """ask_formats.json in the session download directory, else in the user directory."""
+    if download_dir and os.path.exists(download_dir):
+        return os.path.join(download_dir, _ASK_INFO_CACHE_FILE)
+    return _ask_cache_path(user_id)
+
 def save_ask_info(user_id, url, info, download_dir=None):
+    entry = {
+        "title": info.get("title"),
+        "id": info.get("id"),
+        "formats": info.get("formats", [])
+    }
+    # Keep the open menu's formats in memory as a pre-digested table
+    ask_menu_cache.put(user_id, url, entry)
     try:
         # Use stored download directory if not provided
         if download_dir is None:
             download_dir = get_user_download_dir(user_id)
-        
-        # Create ask_formats.json directly in download directory if available
-        if download_dir and os.path.exists(download_dir):
-            download_ask_file = os.path.join(download_dir, _ASK_INFO_CACHE_FILE)
-            data = {}
-            if os.path.exists(download_ask_file):
-                with open(download_ask_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-            data[url] = {
-                "title": info.get("title"),
-                "id": info.get("id"),
-                "formats": info.get("formats", [])
-            }
-            with open(download_ask_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            logger.info(f"Created ask_formats.json in download directory: {download_ask_file}")
-        else:
-            # Fallback to user root directory if download directory not available
-            path = _ask_cache_path(user_id)
-            data = {}
-            if os.path.exists(path):
-                with open(path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-            data[url] = {
-                "title": info.get("title"),
-                "id": info.get("id"),
-                "formats": info.get("formats", [])
-            }
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            logger.info(f"Created ask_formats.json in user directory: {path}")
+        # The file only serves menus reopened after eviction/restart: write it compact
+        path = _ask_cache_file(user_id, download_dir)
+        data = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        data[url] = entry
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        logger.info(f"Created ask_formats.json: {path}")
     except Exception as e:
         logger.warning(f"Failed to save ask_formats.json: {e}")
 
 def load_ask_info(user_id, url):
+    info = ask_menu_cache.get_info(user_id, url)
+    if info is not None:
+        return info
     try:
-        # First try to find ask_formats.json in download directory
+        # First try to find ask_formats.json in download directory, then user root directory
         download_dir = get_user_download_dir(user_id)
-        if download_dir and os.path.exists(download_dir):
-            download_cache_file = os.path.join(download_dir, _ASK_INFO_CACHE_FILE)
-            if os.path.exists(download_cache_file):
-                with open(download_cache_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                logger.info(f"Using ask_formats.json from download directory: {download_cache_file}")
-                return data.get(url)
-        
-        # Fallback to user root directory
-        path = _ask_cache_path(user_id)
+        path = _ask_cache_file(user_id, download_dir)
+        if not os.path.exists(path) and download_dir:
+            path = _ask_cache_path(user_id)
         if os.path.exists(path):
             with open(path, "r", encoding="utf-8") as f:
                 data = json.load(f)
-            logger.info(f"Using ask_formats.json from user directory: {path}")
-            return data.get(url)
+            logger.info(f"Using ask_formats.json: {path}")
+            entry = data.get(url)
+            if isinstance(entry, dict):
+                ask_menu_cache.put(user_id, url, entry)
+                return dict(entry)
+            return entry
     except Exception as e:
         logger.warning(f"Failed to load ask_formats.json: {e}")
         return None
     return None
 
+def get_ask_format_table(user_id, url):
+    """FormatTable of the user's menu for url, loading ask_formats.json once if needed."""
+    table = ask_menu_cache.get_table(user_id, url)
+    if table is None and load_ask_info(user_id, url):
+        table = ask_menu_cache.get_table(user_id, url)
+    return table
+
+def evict_ask_info(user_id, url=None):
+    """Drop the in-memory format table(s) of a closed menu."""
+    ask_menu_cache.evict(user_id, url)
+
 # --- DUBS flag resolver (robust) ---
 _DUBS_FLAG_OVERRIDES = {
     'de': '🇩🇪',
@@ -800,57 +795,12 @@ def ask_filter_callback(app, callback_query):
             pass
 
 def get_available_formats_from_cache(user_id, url, download_dir=None):
-    """Get available codecs and formats from ask_formats.json cache"""
+    """Get available codecs and formats from the menu's format table"""
     try:
-        # First try to find ask_formats.json in download directory
-        cache_file = None
-        if download_dir and os.path.exists(download_dir):
-            download_cache_file = os.path.join(download_dir, _ASK_INFO_CACHE_FILE)
-            if os.path.exists(download_cache_file):
-                cache_file = download_cache_file
-                logger.info(f"Using ask_formats.json from download directory: {download_cache_file}")
-        
-        # Fallback to user root directory
-        if not cache_file:
-            user_dir = os.path.join("users", str(user_id))
-            cache_file = os.path.join(user_dir, _ASK_INFO_CACHE_FILE)
-            if os.path.exists(cache_file):
-                logger.info(f"Using ask_formats.json from user directory: {cache_file}")
-        
-        if not cache_file or not os.path.exists(cache_file):
+        table = get_ask_format_table(user_id, url)
+        if table is None:
             return {"codecs": set(), "formats": set()}
-        
-        with open(cache_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        available_codecs = set()
-        available_formats = set()
-        
-        # Check if this URL matches the cached data
-        if data.get('url') == url:
-            formats = data.get('formats', [])
-            
-            for format_line in formats:
-                # Extract codecs and formats using our existing function
-                extracted = extract_button_data(format_line)
-                
-                for item in extracted:
-                    # Check for codecs
-                    if item.lower() in ['avc1', 'avc', 'h264']:
-                        available_codecs.add('avc1')
-                    elif item.lower() in ['av1', 'av01']:
-                        available_codecs.add('av01')
-                    elif item.lower() in ['vp9', 'vp09']:
-                        available_codecs.add('vp9')
-                    
-                    # Check for formats
-                    if item.lower() in ['mp4']:
-                        available_formats.add('mp4')
-                    elif item.lower() in ['mkv', 'webm', 'avi', 'mov', 'flv', 'wmv', '3gp', 'ogv', 'ts', 'mts', 'm2ts']:
-                        # These formats can be converted to MKV by ffmpeg
-                        available_formats.add('mkv')
-        
-        return {"codecs": available_codecs, "formats": available_formats}
+        return {"codecs": table.codecs(), "formats": table.containers()}
     except Exception as e:
         logger.warning(f"{LoggerMsg.ALWAYS_ASK_ERROR_READING_AVAILABLE_FORMATS_FROM_CACHE_LOG_MSG}: {e}")
         return {"codecs": set(), "formats": set()}
@@ -863,60 +813,12 @@ def filter_qualities_by_codec_format(user_id, url, qualities, download_dir=None)
         selected_codec = f.get("codec", "avc1")
         selected_format = f.get("ext", "mp4")
         
-        # Get available formats from cache
-        user_download_dir = get_user_download_dir(user_id) if download_dir is None else download_dir
-        available_formats = get_available_formats_from_cache(user_id, url, user_download_dir)
-        
+        table = get_ask_format_table(user_id, url)
         # If no cache or no specific formats available, return all qualities
-        if not available_formats["codecs"] and not available_formats["formats"]:
-            return qualities
-        
-        # Get all format lines from cache
-        user_dir = os.path.join("users", str(user_id))
-        cache_file = os.path.join(user_dir, _ASK_INFO_CACHE_FILE)
-        
-        if not os.path.exists(cache_file):
+        if table is None or (not table.codecs() and not table.containers()):
             return qualities
         
-        with open(cache_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        if data.get('url') != url:
-            return qualities
-        
-        formats = data.get('formats', [])
-        filtered_qualities = set()
-        
-        for format_line in formats:
-            extracted = extract_button_data(format_line)
-            
-            # Check if this format matches selected codec and format
-            has_codec = False
-            has_format = False
-            
-            for item in extracted:
-                # Check codec
-                if selected_codec == 'avc1' and item.lower() in ['avc1', 'avc', 'h264']:
-                    has_codec = True
-                elif selected_codec == 'av01' and item.lower() in ['av1', 'av01']:
-                    has_codec = True
-                elif selected_codec == 'vp9' and item.lower() in ['vp9', 'vp09']:
-                    has_codec = True
-                
-                # Check format
-                if selected_format == 'mp4' and item.lower() == 'mp4':
-                    has_format = True
-                elif selected_format == 'mkv' and item.lower() in ['mkv', 'webm', 'avi', 'mov', 'flv', 'wmv', '3gp', 'ogv', 'ts', 'mts', 'm2ts']:
-                    has_format = True
-            
-            # If both codec and format match, extract quality
-            if has_codec and has_format:
-                for item in extracted:
-                    # Look for quality patterns (e.g., 720p, 1080p)
-                    if 'p' in item and any(char.isdigit() for char in item):
-                        quality_match = re.search(r'(\d+p\d*)', item)
-                        if quality_match:
-                            filtered_qualities.add(quality_match.group(1))
+        filtered_qualities = table.qualities_for(selected_codec, selected_format)
         
         # Return intersection of available qualities and filtered qualities
         if filtered_qualities:
@@ -933,12 +835,8 @@ def get_link_mode(user_id):
     Get the user's LINK mode state.
     """
     try:
-        user_dir = os.path.join("users", str(user_id))
-        link_mode_file = os.path.join(user_dir, "link_mode.txt")
-        if os.path.exists(link_mode_file):
-            with open(link_mode_file, 'r') as f:
-                return f.read().strip() == "enabled"
-        return False
+        from HELPERS.user_settings import get_user_settings
+        return get_user_settings(user_id).link_mode
     except Exception:
         return False
 
@@ -947,11 +845,8 @@ def set_link_mode(user_id, enabled):
     Set the user's LINK mode state.
     """
     try:
-        user_dir = os.path.join("users", str(user_id))
-        create_directory(user_dir)
-        link_mode_file = os.path.join(user_dir, "link_mode.txt")
-        with open(link_mode_file, 'w') as f:
-            f.write("enabled" if enabled else "disabled")
+        from HELPERS.user_settings import user_settings, LINK_MODE
+        user_settings.write(user_id, LINK_MODE, "enabled" if enabled else "disabled")
         return True
     except Exception as e:
         logger.error(f"{LoggerMsg.ALWAYS_ASK_ERROR_SETTING_LINK_MODE_LOG_MSG} {user_id}: {e}")
@@ -1149,6 +1044,7 @@ def askq_callback(app, callback_query):
     # Get processing message from cache (created in ask_quality_menu)
     proc_msg = get_user_proc_msg(user_id)
     if data == "close":
+        evict_ask_info(user_id)
         # Clean up old format cache files before closing menu
         try:
             user_dir = os.path.join("users", str(user_id))
@@ -3691,14 +3587,10 @@ def ask_quality_menu(app, message, url, tags, playlist_start_index=1, cb=None, d
     
     # Early FloodWait check: if there is a saved waiting time, inform user and try to clear on success
     try:
-        user_dir = os.path.join("users", str(user_id))
-        flood_time_file = os.path.join(user_dir, "flood_wait.txt")
-        if os.path.exists(flood_time_file):
-            with open(flood_time_file, 'r') as f:
-                try:
-                    wait_time = int(f.read().strip())
-                except Exception:
-                    wait_time = None
+        from HELPERS.user_settings import user_settings, get_user_settings, FLOOD_WAIT
+        flood_settings = get_user_settings(user_id)
+        if flood_settings.exists(FLOOD_WAIT):
+            wait_time = flood_settings.flood_wait
             if wait_time is not None:
                 hours = wait_time // 3600
                 minutes = (wait_time % 3600) // 60
@@ -3714,14 +3606,11 @@ def ask_quality_menu(app, message, url, tags, playlist_start_index=1, cb=None, d
                     schedule_delete_message(user_id, proc_msg.id, delete_after_seconds=5)
                 except Exception:
                     pass
-                if os.path.exists(flood_time_file):
-                    os.remove(flood_time_file)
+                user_settings.remove(user_id, FLOOD_WAIT)
             except FloodWait as e:
                 # Keep/refresh timer and exit early
                 try:
-                    os.makedirs(user_dir, exist_ok=True)
-                    with open(flood_time_file, 'w') as f:
-                        f.write(str(e.value))
+                    user_settings.write(user_id, FLOOD_WAIT, str(e.value))
                 except Exception:
                     pass
                 return
@@ -5454,11 +5343,8 @@ def ask_quality_menu(app, message, url, tags, playlist_start_index=1, cb=None, d
         send_to_logger(message, safe_get_messages(user_id).ALWAYS_ASK_MENU_SENT_LOG_MSG.format(url=url))
     except FloodWait as e:
         wait_time = e.value
-        user_dir = os.path.join("users", str(user_id))
-        create_directory(user_dir)
-        flood_time_file = os.path.join(user_dir, "flood_wait.txt")
-        with open(flood_time_file, 'w') as f:
-            f.write(str(wait_time))
+        from HELPERS.user_settings import user_settings, FLOOD_WAIT
+        user_settings.write(user_id, FLOOD_WAIT, str(wait_time))
         hours = wait_time // 3600
         minutes = (wait_time % 3600) // 60
         seconds = wait_time % 60
@@ -6090,12 +5976,10 @@ def down_and_up_with_format(app, message, url, fmt, tags_text, quality_key=None,
     # Pass cached video info to avoid redundant API calls
     # Delete processing message before starting download
     delete_processing_message(app, user_id, proc_msg)
-    down_and_up(app, message, url, playlist_name, video_count, video_start_with, tags_text, force_no_title=is_tiktok, format_override=fmt, quality_key=quality_key, cookies_already_checked=True, cached_video_info=info)
-    # Cleanup temp subs languages cache after we kicked off download
-    try:
-        delete_subs_langs_cache(message.chat.id, url)
-    except Exception:
-        pass
+    # down_and_up only queues the download: the temp subs languages cache is
+    # cleaned up by the queued job once it is done
+    down_and_up(app, message, url, playlist_name, video_count, video_start_with, tags_text, force_no_title=is_tiktok, format_override=fmt, quality_key=quality_key, cookies_already_checked=True, cached_video_info=info,
+                on_done=lambda: delete_subs_langs_cache(message.chat.id, url))
 
     # Save detected qualities per filters to a per-user file for all services
     try:
@@ -0,0 +1,211 @@
+"""
+Compact per-menu format tables for the Always Ask menu.
+
+When a quality menu is opened the yt-dlp formats list is digested once into a
+columnar FormatTable (width, height, filesize, codec family, container and
+format_id per format, numeric columns in array.array). Filter rows and quality
+buttons are rendered from the table; the raw info dict is kept alongside it
+only for the code paths that need extra format fields.
+
+Entries are keyed by (user_id, url), live as long as the menu is open and are
+evicted when it is closed (or when more than ASK_MENU_CACHE_MAX_ENTRIES menus
+are open, least recently used first).
+"""
+
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from CONFIG.limits import LimitsConfig
+from HELPERS.qualifier import get_quality_by_min_side
+
+# Codec families offered by the CODEC filter row
+_CODEC_FAMILIES = (
+    ("avc1", ("avc1", "avc", "h264")),
+    ("av01", ("av01", "av1")),
+    ("vp9", ("vp09", "vp9")),
+)
+# Containers ffmpeg can remux into MKV
+_MKV_CONVERTIBLE = {"mkv", "webm", "avi", "mov", "flv", "wmv", "3gp", "ogv", "ts", "mts", "m2ts"}
+
+
+def codec_family(vcodec: Optional[str]) -> str:
+    """Map a yt-dlp vcodec string to a filter codec ("avc1", "av01", "vp9"), "none" or ""."""
+    vcodec = (vcodec or "").lower()
+    if not vcodec or vcodec == "none":
+        return "none"
+    for family, prefixes in _CODEC_FAMILIES:
+        if vcodec.startswith(prefixes):
+            return family
+    return ""
+
+
+def container_family(ext: Optional[str]) -> str:
+    """Map a format extension to the EXT filter value ("mp4", "mkv") or ""."""
+    ext = (ext or "").lower()
+    if ext == "mp4":
+        return "mp4"
+    if ext in _MKV_CONVERTIBLE:
+        return "mkv"
+    return ""
+
+
+class FormatTable:
+    """Columnar digest of a yt-dlp formats list."""
+
+    __slots__ = ("format_ids", "exts", "width", "height", "filesize",
+                 "codec_idx", "ext_idx", "_codecs", "_ext_names", "_containers", "_quality_cache")
+
+    def __init__(self, formats: List[Dict[str, Any]]):
+        self.format_ids: List[str] = []
+        self.exts: List[str] = []
+        self.width = array("I")
+        self.height = array("I")
+        self.filesize = array("q")
+        self.codec_idx = array("B")
+        self.ext_idx = array("B")
+        # Interned codec families / container families, indexed by the columns above
+        self._codecs: List[str] = []
+        self._ext_names: List[str] = []
+        self._containers: Optional[Set[str]] = None
+        self._quality_cache: Dict[Tuple[str, str], Set[str]] = {}
+        for f in formats or []:
+            if isinstance(f, dict):
+                self._append(f)
+
+    @staticmethod
+    def _intern(table: List[str], value: str) -> int:
+        try:
+            return table.index(value)
+        except ValueError:
+            table.append(value)
+            return len(table) - 1
+
+    @staticmethod
+    def _int(value: Any) -> int:
+        try:
+            return max(0, int(value or 0))
+        except (TypeError, ValueError):
+            return 0
+
+    def _append(self, f: Dict[str, Any]) -> None:
+        self.format_ids.append(str(f.get("format_id") or ""))
+        self.exts.append((f.get("ext") or "").lower())
+        self.width.append(self._int(f.get("width")))
+        self.height.append(self._int(f.get("height")))
+        self.filesize.append(self._int(f.get("filesize") or f.get("filesize_approx")))
+        self.codec_idx.append(self._intern(self._codecs, codec_family(f.get("vcodec"))))
+        self.ext_idx.append(self._intern(self._ext_names, container_family(f.get("ext"))))
+
+    def __len__(self) -> int:
+        return len(self.format_ids)
+
+    def codec(self, i: int) -> str:
+        return self._codecs[self.codec_idx[i]]
+
+    def container(self, i: int) -> str:
+        return self._ext_names[self.ext_idx[i]]
+
+    def quality(self, i: int) -> Optional[str]:
+        """Quality key ("720p", ...) of a video format, None for audio-only/unknown size."""
+        w, h = self.width[i], self.height[i]
+        if not w or not h:
+            return None
+        quality = get_quality_by_min_side(w, h)
+        return f"{min(w, h)}p" if quality == "best" else quality
+
+    def codecs(self) -> Set[str]:
+        """Filter codecs present among the video formats."""
+        return {c for c in self._codecs if c and c != "none"}
+
+    def containers(self) -> Set[str]:
+        """Filter containers ("mp4"/"mkv") present among the video formats."""
+        if self._containers is None:
+            self._containers = {self.container(i) for i in range(len(self))
+                                if self.codec(i) != "none" and self.container(i)}
+        return self._containers
+
+    def qualities_for(self, codec: str, ext: str) -> Set[str]:
+        """Quality keys available for a codec/container filter combination."""
+        key = (codec, ext)
+        cached = self._quality_cache.get(key)
+        if cached is not None:
+            return cached
+        codec_i = self._codecs.index(codec) if codec in self._codecs else -1
+        ext_i = self._ext_names.index(ext) if ext in self._ext_names else -1
+        found = set()
+        if codec_i >= 0 and ext_i >= 0:
+            for i in range(len(self)):
+                if self.codec_idx[i] == codec_i and self.ext_idx[i] == ext_i:
+                    quality = self.quality(i)
+                    if quality:
+                        found.add(quality)
+        self._quality_cache[key] = found
+        return found
+
+    def find(self, format_id: str) -> int:
+        """Row index of a format_id, or -1."""
+        try:
+            return self.format_ids.index(str(format_id))
+        except ValueError:
+            return -1
+
+
+class _MenuEntry:
+    __slots__ = ("info", "table")
+
+    def __init__(self, info: Dict[str, Any]):
+        self.info = info
+        self.table = FormatTable(info.get("formats") or [])
+
+
+class AskMenuCache:
+    """(user_id, url) -> info + FormatTable of the open Always Ask menus."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max(1, int(max_entries))
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], _MenuEntry]" = OrderedDict()
+
+    def put(self, user_id, url: str, info: Dict[str, Any]) -> FormatTable:
+        entry = _MenuEntry(info)
+        with self._lock:
+            key = (str(user_id), url)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry.table
+
+    def _get(self, user_id, url: str) -> Optional[_MenuEntry]:
+        with self._lock:
+            key = (str(user_id), url)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def get_info(self, user_id, url: str) -> Optional[Dict[str, Any]]:
+        entry = self._get(user_id, url)
+        # Shallow copy: callers may add keys, the formats list is shared read-only
+        return dict(entry.info) if entry is not None else None
+
+    def get_table(self, user_id, url: str) -> Optional[FormatTable]:
+        entry = self._get(user_id, url)
+        return entry.table if entry is not None else None
+
+    def evict(self, user_id, url: Optional[str] = None) -> int:
+        """Drop one menu of a user, or all of them when url is None."""
+        uid = str(user_id)
+        with self._lock:
+            keys = [k for k in self._entries if k[0] == uid and (url is None or k[1] == url)]
+            for key in keys:
+                del self._entries[key]
+        return len(keys)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+ask_menu_cache = AskMenuCache(getattr(LimitsConfig, 'ASK_MENU_CACHE_MAX_ENTRIES', 256))
@@ -14,6 +14,8 @@ from HELPERS.app_instance import get_app
 from HELPERS.logger import logger, send_to_logger, send_to_user, send_to_all, send_error_to_user, log_error_to_channel
 from HELPERS.limitter import TimeFormatter, humanbytes, check_user
 from HELPERS.download_status import set_active_download, clear_download_start_time, check_download_timeout, start_hourglass_animation, start_cycle_progress, playlist_errors, playlist_errors_lock
+from HELPERS.progress_renderer import progress_renderer
+from HELPERS.download_queue import scheduled_download
 from HELPERS.safe_messeger import safe_delete_messages, safe_edit_message_text, safe_forward_messages
 from HELPERS.filesystem_hlp import sanitize_filename, sanitize_filename_strict, create_directory, check_disk_space, cleanup_user_temp_files
 from DATABASE.firebase_init import write_logs
@@ -167,6 +169,7 @@ def embed_cover_mp3(mp3_path, cover_path, title=None, artist=None, album=None):
         return False
 
 # @reply_with_keyboard
+@scheduled_download
 def down_and_audio(app, message, url, tags, quality_key=None, playlist_name=None, video_count=1, video_start_with=1, format_override=None, cookies_already_checked=False, use_proxy=False, cached_video_info=None):
     # Reset the checked cookie-source cache for a new download task
     user_id = message.chat.id
@@ -481,18 +484,17 @@ def down_and_audio(app, message, url, tags, quality_key=None, playlist_name=None
     audio_files = []
     try:
         # Check if there is a saved waiting time
-        user_dir = os.path.join("users", str(user_id))
-        flood_time_file = os.path.join(user_dir, "flood_wait.txt")
+        from HELPERS.user_settings import user_settings, get_user_settings, FLOOD_WAIT
+        flood_settings = get_user_settings(user_id)
+        wait_time = flood_settings.flood_wait
 
         # We send the initial message
-        if os.path.exists(flood_time_file):
-            with open(flood_time_file, 'r') as f:
-                wait_time = int(f.read().strip())
-                hours = wait_time // 3600
-                minutes = (wait_time % 3600) // 60
-                seconds = wait_time % 60
-                time_str = f"{hours}h {minutes}m {seconds}s"
-                proc_msg = safe_send_message(user_id, safe_get_messages(user_id).RATE_LIMIT_WITH_TIME_MSG.format(time=time_str), message=message)
+        if wait_time is not None:
+            hours = wait_time // 3600
+            minutes = (wait_time % 3600) // 60
+            seconds = wait_time % 60
+            time_str = f"{hours}h {minutes}m {seconds}s"
+            proc_msg = safe_send_message(user_id, safe_get_messages(user_id).RATE_LIMIT_WITH_TIME_MSG.format(time=time_str), message=message)
         else:
             proc_msg = safe_send_message(user_id, safe_get_messages(user_id).RATE_LIMIT_NO_TIME_MSG, message=message)
 
@@ -510,13 +512,11 @@ def down_and_audio(app, message, url, tags, quality_key=None, playlist_name=None
                 schedule_delete_message(user_id, proc_msg.id, delete_after_seconds=5)
             except Exception as e:
                 logger.error(f"Error scheduling download started message deletion: {e}")
-            if os.path.exists(flood_time_file):
-                os.remove(flood_time_file)
+            if flood_settings.exists(FLOOD_WAIT):
+                user_settings.remove(user_id, FLOOD_WAIT)
         except FloodWait as e:
             wait_time = e.value
-            os.makedirs(user_dir, exist_ok=True)
-            with open(flood_time_file, 'w') as f:
-                f.write(str(wait_time))
+            user_settings.write(user_id, FLOOD_WAIT, str(wait_time))
             return
         except Exception as e:
             logger.error(f"Error editing message: {e}")
@@ -784,22 +784,32 @@ def down_and_audio(app, message, url, tags, quality_key=None, playlist_name=None
             elapsed = max(0, current_time - progress_start_time)
             minutes_passed = int(elapsed // 60)
             
-            # Adaptive throttle: linear; after 1h fixed 90s
+            # Adaptive throttle of stats updates: linear; after 1h fixed 90s
             if minutes_passed and minutes_passed >= 60:
                 interval = 90.0
             else:
                 interval = 3.0 + max(0, minutes_passed // 5)
             
-            if current_time - last_update < interval:
-                return
-                
             if d.get("status") == "downloading":
                 downloaded = d.get("downloaded_bytes", 0)
                 total = d.get("total_bytes") or d.get("total_bytes_estimate") or 0
                 percent = (downloaded / total * 100) if total else 0
                 blocks = int(percent // 10)
                 bar = "🟩" * blocks + "⬜️" * (10 - blocks)
-                
+
+                # For HLS audio, update progress data for cycle animation
+                if hasattr(progress_hook, 'progress_data') and progress_hook.progress_data:
+                    progress_hook.progress_data['downloaded_bytes'] = downloaded
+                    progress_hook.progress_data['total_bytes'] = total
+                # The progress renderer decides when the message is edited; a running cycle animation shows the percentage itself
+                cycle_stop = getattr(progress_hook, 'cycle_stop', None)
+                if cycle_stop is None or cycle_stop.is_set():
+                    progress_renderer.update(user_id, proc_msg_id, safe_get_messages(user_id).AUDIO_DOWNLOADING_PROGRESS_MSG.format(process=current_total_process, bar=bar, percent=percent))
+
+                if current_time - last_update < interval:
+                    return
+                last_update = current_time
+
                 # Update progress in stats
                 try:
                     update_download_progress(
@@ -811,17 +821,6 @@ def down_and_audio(app, message, url, tags, quality_key=None, playlist_name=None
                     )
                 except Exception as e:
                     logger.debug(f"Failed to update download progress: {e}")
-                
-                # For HLS audio, update progress data for cycle animation
-                if hasattr(progress_hook, 'progress_data') and progress_hook.progress_data:
-                    progress_hook.progress_data['downloaded_bytes'] = downloaded
-                    progress_hook.progress_data['total_bytes'] = total
-                
-                try:
-                    safe_edit_message_text(user_id, proc_msg_id, safe_get_messages(user_id).AUDIO_DOWNLOADING_PROGRESS_MSG.format(process=current_total_process, bar=bar, percent=percent))
-                except Exception as e:
-                    logger.error(f"Error updating progress: {e}")
-                last_update = current_time
             elif d.get("status") == "finished":
                 # Update progress to 100% on completion
                 total = d.get("total_bytes") or d.get("total_bytes_estimate") or 0
@@ -835,13 +834,9 @@ def down_and_audio(app, message, url, tags, quality_key=None, playlist_name=None
                     )
                 except Exception as e:
                     logger.debug(f"Failed to update download progress on finish: {e}")
-                try:
-                    full_bar = "🟩" * 10
-                    safe_edit_message_text(user_id, proc_msg_id,
-                        f"{current_total_process}\n{safe_get_messages(user_id).ALWAYS_ASK_DOWNLOADING_QUALITY_MSG} audio:\n{full_bar}   100.0%\n{safe_get_messages(user_id).AUDIO_DOWNLOAD_FINISHED_PROCESSING_MSG}")
-                except Exception as e:
-                    logger.error(f"Error updating progress: {e}")
-                last_update = current_time
+                full_bar = "🟩" * 10
+                progress_renderer.update(user_id, proc_msg_id,
+                    f"{current_total_process}\n{safe_get_messages(user_id).ALWAYS_ASK_DOWNLOADING_QUALITY_MSG} audio:\n{full_bar}   100.0%\n{safe_get_messages(user_id).AUDIO_DOWNLOAD_FINISHED_PROCESSING_MSG}", final=True)
             elif d.get("status") == "error":
                 # Reset progress on error
                 downloaded = d.get("downloaded_bytes", 0)
@@ -856,11 +851,7 @@ def down_and_audio(app, message, url, tags, quality_key=None, playlist_name=None
                     )
                 except Exception as e:
                     logger.debug(f"Failed to update download progress on error: {e}")
-                try:
-                    safe_edit_message_text(user_id, proc_msg_id, safe_get_messages(user_id).AUDIO_DOWNLOAD_ERROR_MSG)
-                except Exception as e:
-                    logger.error(f"Error updating progress: {e}")
-                last_update = current_time
+                progress_renderer.update(user_id, proc_msg_id, safe_get_messages(user_id).AUDIO_DOWNLOAD_ERROR_MSG, final=True)
 
         # One-time retry guards to avoid infinite retry loops across attempts
         # (already initialized at the beginning of the function)
@@ -1008,9 +999,10 @@ def down_and_audio(app, message, url, tags, quality_key=None, playlist_name=None
             
             # match_filter will be added later for domain filtering only
             
+            from HELPERS.extraction_cache import cached_extract_info, cached_download
             try:
                 with yt_dlp.YoutubeDL(ytdl_opts) as ydl:
-                    info_dict = ydl.extract_info(url, download=False)
+                    info_dict = cached_extract_info(ydl, url)
                 # Normalize info_dict to dict
                 if isinstance(info_dict, list):
                     info_dict = (info_dict[0] if len(info_dict) > 0 else {})
@@ -1074,12 +1066,12 @@ def down_and_audio(app, message, url, tags, quality_key=None, playlist_name=None
                             progress_hook.cycle_stop = cycle_stop
                             progress_hook.progress_data = progress_data
                             try:
-                                ydl.download([url])
+                                cached_download(ydl, url)
                             finally:
                                 cycle_stop.set()
                                 cycle_thread.join(timeout=1)
                         else:
-                            ydl.download([url])
+                            cached_download(ydl, url)
                     return True
                 
                 from HELPERS.proxy_helper import try_with_proxy_fallback
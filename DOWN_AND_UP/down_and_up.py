@@ -18,7 +18,9 @@ from CONFIG.logger_msg import LoggerMsg
 from CONFIG.messages import Messages, safe_get_messages
 from HELPERS.limitter import TimeFormatter, humanbytes, check_user, check_file_size_limit, check_subs_limits
 from HELPERS.download_status import set_active_download, clear_download_start_time, check_download_timeout, start_hourglass_animation, start_cycle_progress, playlist_errors_lock, playlist_errors
+from HELPERS.download_queue import scheduled_download
 from HELPERS.safe_messeger import safe_delete_messages, safe_edit_message_text, safe_forward_messages
+from HELPERS.progress_renderer import progress_renderer
 from HELPERS.filesystem_hlp import sanitize_filename, sanitize_filename_strict, cleanup_user_temp_files, cleanup_subtitle_files, create_directory, check_disk_space
 from DOWN_AND_UP.ffmpeg import get_duration_thumb, get_video_info_ffprobe, embed_subs_to_video, create_default_thumbnail, split_video_2
 from DOWN_AND_UP.sender import send_videos
@@ -156,6 +158,7 @@ def determine_need_subs(subs_enabled, found_type, user_id):
     return need_subs
 
 #@reply_with_keyboard
+@scheduled_download
 def down_and_up(app, message, url, playlist_name, video_count, video_start_with, tags_text, force_no_title=False, format_override=None, quality_key=None, cookies_already_checked=False, use_proxy=False, cached_video_info=None, clear_subs_cache_on_start=True):
     # Reset the checked cookie-source cache for a new download task
     user_id = message.chat.id
@@ -501,18 +504,17 @@ def down_and_up(app, message, url, playlist_name, video_count, video_start_with,
     proc_msg_id = None
     try:
         # Check if there is a saved waiting time
-        user_dir = os.path.join("users", str(user_id))
-        flood_time_file = os.path.join(user_dir, "flood_wait.txt")
+        from HELPERS.user_settings import user_settings, get_user_settings, FLOOD_WAIT
+        flood_settings = get_user_settings(user_id)
+        wait_time = flood_settings.flood_wait
 
         # We send the initial message
-        if os.path.exists(flood_time_file):
-            with open(flood_time_file, 'r') as f:
-                wait_time = int(f.read().strip())
-                hours = wait_time // 3600
-                minutes = (wait_time % 3600) // 60
-                seconds = wait_time % 60
-                time_str = f"{hours}h {minutes}m {seconds}s"
-                proc_msg = safe_send_message(user_id, safe_get_messages(user_id).RATE_LIMIT_WITH_TIME_MSG.format(time=time_str), message=message)
+        if wait_time is not None:
+            hours = wait_time // 3600
+            minutes = (wait_time % 3600) // 60
+            seconds = wait_time % 60
+            time_str = f"{hours}h {minutes}m {seconds}s"
+            proc_msg = safe_send_message(user_id, safe_get_messages(user_id).RATE_LIMIT_WITH_TIME_MSG.format(time=time_str), message=message)
         else:
             proc_msg = safe_send_message(user_id, safe_get_messages(user_id).RATE_LIMIT_NO_TIME_MSG, message=message)
 
@@ -531,14 +533,12 @@ def down_and_up(app, message, url, playlist_name, video_count, video_start_with,
             except Exception:
                 pass
             # If you managed to replace, then there is no flood error
-            if os.path.exists(flood_time_file):
-                os.remove(flood_time_file)
+            if flood_settings.exists(FLOOD_WAIT):
+                user_settings.remove(user_id, FLOOD_WAIT)
         except FloodWait as e:
             # Update the counter
             wait_time = e.value
-            os.makedirs(user_dir, exist_ok=True)
-            with open(flood_time_file, 'w') as f:
-                f.write(str(wait_time))
+            user_settings.write(user_id, FLOOD_WAIT, str(wait_time))
             return
         except Exception as e:
             logger.error(f"Error editing message: {e}")
@@ -754,8 +754,9 @@ def down_and_up(app, message, url, playlist_name, video_count, video_start_with,
             elif os.path.exists(user_cookie_path):
                 ydl_opts['cookiefile'] = user_cookie_path
                 logger.info(f"Using cookies from user directory: {user_cookie_path}")
+            from HELPERS.extraction_cache import cached_extract_info
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                pre_info = ydl.extract_info(url, download=False)
+                pre_info = cached_extract_info(ydl, url)
             # Normalize to dict and check None
             if isinstance(pre_info, list):
                 pre_info = (pre_info[0] if len(pre_info) > 0 else {})
@@ -907,16 +908,13 @@ def down_and_up(app, message, url, playlist_name, video_count, video_start_with,
             elapsed = max(0, current_time - progress_start_time)
             minutes_passed = int(elapsed // 60)
             
-            # Adaptive throttle: linear slow-down; after 1h fixed 90s
+            # Adaptive throttle of stats updates: linear slow-down; after 1h fixed 90s
             if minutes_passed and minutes_passed >= 60:
                 interval = 90.0
             else:
                 # 0-4 min: 3s, 5-9: 4s, ..., 55-59: 14s
                 interval = 3.0 + max(0, minutes_passed // 5)
             
-            if current_time - last_update < interval:
-                return
-                
             if d.get("status") == "downloading":
                 downloaded = d.get("downloaded_bytes", 0)
                 # yt-dlp may provide only total_bytes_estimate for some sites
@@ -924,7 +922,20 @@ def down_and_up(app, message, url, playlist_name, video_count, video_start_with,
                 percent = (downloaded / total * 100) if total else 0
                 blocks = int(percent // 10)
                 bar = "🟩" * blocks + "⬜️" * (10 - blocks)
-                
+
+                # For HLS, update progress data for cycle animation
+                if is_hls and hasattr(progress_func, 'progress_data') and progress_func.progress_data:
+                    progress_func.progress_data['downloaded_bytes'] = downloaded
+                    progress_func.progress_data['total_bytes'] = total
+                # The progress renderer decides when the message is edited; a running cycle animation shows the percentage itself
+                cycle_stop = getattr(progress_func, 'cycle_stop', None)
+                if cycle_stop is None or cycle_stop.is_set():
+                    progress_renderer.update(user_id, proc_msg_id, f"{current_total_process}\n{bar}   {percent:.1f}%")
+
+                if current_time - last_update < interval:
+                    return
+                last_update = current_time
+
                 # Update progress in stats
                 try:
                     update_download_progress(
@@ -936,34 +947,13 @@ def down_and_up(app, message, url, playlist_name, video_count, video_start_with,
                     )
                 except Exception as e:
                     logger.debug(f"Failed to update download progress: {e}")
-                
-                # For HLS, update progress data for cycle animation
-                if is_hls and hasattr(progress_func, 'progress_data') and progress_func.progress_data:
-                    progress_func.progress_data['downloaded_bytes'] = downloaded
-                    progress_func.progress_data['total_bytes'] = total
-                try:
-                    # With the first renewal of progress, we delete the first posts Processing
-                    if first_progress_update:
-                        try:
-                            # Bots can't use get_chat_history here, so we only log
-                            logger.info("Skipping message cleanup - bots cannot use get_chat_history")
-                        except Exception as e:
-                            logger.error(f"Error in message cleanup: {e}")
-                            # Check if error is related to quality_key
-                            if "'quality_key'" in str(e):
-                                _handle_quality_key_error(e, split_msg_ids, is_playlist, successful_uploads, indices_to_download, video_count, user_id, proc_msg_id, message, app)
-                        first_progress_update = False
-
-                    progress_text = f"{current_total_process}\n{bar}   {percent:.1f}%"
-                    logger.info(f"Updating progress for user {user_id}, message {proc_msg_id}: {progress_text}")
-                    result = safe_edit_message_text(user_id, proc_msg_id, progress_text)
-                    if result is None:
-                        logger.warning(f"Failed to update progress message {proc_msg_id} for user {user_id} - message may have been deleted")
-                except Exception as e:
-                    logger.error(f"Error updating progress: {e}")
-                    # Check if error is related to quality_key
-                    if "'quality_key'" in str(e):
-                        _handle_quality_key_error(e, split_msg_ids, is_playlist, successful_uploads, indices_to_download, video_count, user_id, proc_msg_id, message, app)
+
+                # With the first renewal of progress, we delete the first posts Processing
+                if first_progress_update:
+                    # Bots can't use get_chat_history here, so we only log
+                    logger.info("Skipping message cleanup - bots cannot use get_chat_history")
+                    first_progress_update = False
+                logger.info(f"Updating progress for user {user_id}, message {proc_msg_id}: {percent:.1f}%")
             elif d.get("status") == "finished":
                 # Update progress to 100% on completion
                 total = d.get("total_bytes") or d.get("total_bytes_estimate") or 0
@@ -977,13 +967,7 @@ def down_and_up(app, message, url, playlist_name, video_count, video_start_with,
                     )
                 except Exception as e:
                     logger.debug(f"Failed to update download progress on finish: {e}")
-                try:
-                    safe_edit_message_text(user_id, proc_msg_id, safe_get_messages(user_id).VIDEO_DOWNLOAD_COMPLETE_MSG.format(process=current_total_process, bar=full_bar))
-                except Exception as e:
-                    logger.error(f"Error updating progress: {e}")
-                    # Check if error is related to quality_key
-                    if "'quality_key'" in str(e):
-                        _handle_quality_key_error(e, split_msg_ids, is_playlist, successful_uploads, indices_to_download, video_count, user_id, proc_msg_id, message, app)
+                progress_renderer.update(user_id, proc_msg_id, safe_get_messages(user_id).VIDEO_DOWNLOAD_COMPLETE_MSG.format(process=current_total_process, bar=full_bar), final=True)
             elif d.get("status") == "error":
                 # Reset progress on error
                 downloaded = d.get("downloaded_bytes", 0)
@@ -1000,7 +984,6 @@ def down_and_up(app, message, url, playlist_name, video_count, video_start_with,
                     logger.debug(f"Failed to update download progress on error: {e}")
                 logger.error("Error occurred during download.")
                 send_error_to_user(message, safe_get_messages(user_id).DOWNLOAD_ERROR_GENERIC)
-            last_update = current_time
 
         successful_uploads = 0
 
@@ -1425,11 +1408,12 @@ def down_and_up(app, message, url, playlist_name, video_count, video_start_with,
                             return None
                 
                 # Try with proxy fallback if user proxy is enabled
+                from HELPERS.extraction_cache import cached_extract_info, cached_download
                 def extract_info_operation(opts):
                     messages = safe_get_messages(message.chat.id)
                     with yt_dlp.YoutubeDL(opts) as ydl:
                         logger.info("yt-dlp instance created, starting extract_info...")
-                        info_dict = ydl.extract_info(url, download=False)
+                        info_dict = cached_extract_info(ydl, url)
                         logger.info("extract_info completed successfully")
                         return info_dict
                 
@@ -1526,12 +1510,12 @@ def down_and_up(app, message, url, playlist_name, video_count, video_start_with,
                             progress_func.cycle_stop = cycle_stop
                             progress_func.progress_data = progress_data
                             try:
-                                ydl.download([url])
+                                cached_download(ydl, url)
                             finally:
                                 cycle_stop.set()
                                 cycle_thread.join(timeout=1)
                         else:
-                            ydl.download([url])
+                            cached_download(ydl, url)
                         return True
                 
                 from HELPERS.proxy_helper import try_with_proxy_fallback
@@ -2866,14 +2850,9 @@ def down_and_up(app, message, url, playlist_name, video_count, video_start_with,
                                             blocks = int(progress * 10)
                                             bar = '🟩' * blocks + '⬜️' * (10 - blocks)
                                             percent = int(progress * 100)
-                                            try:
-                                                app.edit_message_text(
-                                                    chat_id=user_id,
-                                                    message_id=status_msg.id,
-                                                    text=f"🔥 Embedding subtitles...\n{bar} {percent}%\nETA: {eta} min"
-                                                )
-                                            except Exception as e:
-                                                logger.error(f"Failed to update subtitle progress: {e}")
+                                            progress_renderer.update(user_id, status_msg.id,
+                                                f"🔥 Embedding subtitles...\n{bar} {percent}%\nETA: {eta} min",
+                                                final=progress >= 1.0)
                                         # Embed subtitles and get the result
                                         logger.info(f"Calling embed_subs_to_video with path: {after_rename_abs_path}")
                                         logger.info(f"File exists check: {os.path.exists(after_rename_abs_path)}")
@@ -16,6 +16,7 @@ from CONFIG.messages import Messages, safe_get_messages
 from HELPERS.safe_messeger import safe_forward_messages
 from COMMANDS.format_cmd import get_user_mkv_preference
 from pyrogram import enums
+from app.services.media.split_planner import escape_segment_name, largest_gop_size, parse_packet_index, plan_cut_times, probe_args, segment_args
 
 # Get app instance for decorators
 app = get_app()
@@ -136,6 +137,64 @@ def get_ytdlp_path():
     
     return ytdlp_path
 
+# Keyframe split plans tried when a part comes out over the size limit
+SPLIT_MAX_ATTEMPTS = 3
+
+def probe_split_index(video_path):
+    """Read the packet index of a video once (no decoding) for keyframe splitting"""
+    ffprobe_path = shutil.which('ffprobe')
+    if not ffprobe_path:
+        return None
+    try:
+        result = subprocess.run(probe_args(ffprobe_path, video_path), capture_output=True, text=True, encoding='utf-8', errors='replace')
+        if result.returncode != 0:
+            logger.warning(f"Packet index probe failed: {result.stderr[-500:]}")
+            return None
+        return parse_packet_index(result.stdout)
+    except Exception as e:
+        logger.error(f"Packet index probe failed: {e}")
+        return None
+
+def split_video_by_keyframes(dir, video_name, video_path, max_size, index):
+    """
+    Split a video into parts under max_size with one ffmpeg segment muxer run.
+    Cut points are video keyframes chosen from cumulative packet sizes.
+
+    Returns:
+        dict: Dictionary with video parts information, or None if ffmpeg failed
+    """
+    ffmpeg_path = get_ffmpeg_path()
+    if not ffmpeg_path:
+        return None
+    budget = max_size
+    # With a GOP over the limit some part is oversized whatever the plan
+    unsplittable = largest_gop_size(index) > max_size
+    for attempt in range(SPLIT_MAX_ATTEMPTS):
+        cut_times = plan_cut_times(index, budget)
+        parts = len(cut_times) + 1
+        pattern = os.path.join(dir, escape_segment_name(video_name) + " - Part %d.mp4")
+        logger.info(f"Splitting {video_path} into {parts} parts at keyframes {cut_times}")
+        result = subprocess.run(segment_args(ffmpeg_path, video_path, index, cut_times, pattern), capture_output=True, text=True, encoding='utf-8', errors='replace')
+        caption_lst = [video_name + " - Part " + str(x + 1) for x in range(parts)]
+        path_lst = [os.path.join(dir, cap_name + ".mp4") for cap_name in caption_lst]
+        if result.returncode != 0 or not all(os.path.exists(p) for p in path_lst):
+            logger.error(f"Segment split failed (code {result.returncode}): {result.stderr[-500:]}")
+            return None
+        largest = max(os.path.getsize(p) for p in path_lst)
+        if largest <= max_size or attempt == SPLIT_MAX_ATTEMPTS - 1 or unsplittable:
+            if largest > max_size:
+                # A single GOP larger than the limit cannot be cut with stream copy
+                logger.warning(f"Split part of {largest} bytes still exceeds {max_size}")
+            return {
+                "video": caption_lst,
+                "path": path_lst
+            }
+        # Container overhead was underestimated: plan again with a smaller budget
+        logger.warning(f"Split part of {largest} bytes exceeds {max_size}, retrying")
+        for p in path_lst:
+            os.remove(p)
+        budget = int(budget * max_size / largest * 0.98)
+
 def split_video_2(dir, video_name, video_path, video_size, max_size, duration, user_id):
     messages = safe_get_messages(None)
     """
@@ -152,6 +211,21 @@ def split_video_2(dir, video_name, video_path, video_size, max_size, duration, u
     Returns:
         dict: Dictionary with video parts information
     """
+    index = probe_split_index(video_path)
+    if index is not None:
+        try:
+            split_vid_dict = split_video_by_keyframes(dir, video_name, video_path, max_size, index)
+            if split_vid_dict is not None:
+                if len(split_vid_dict["path"]) > 20:
+                    logger.warning(safe_get_messages(user_id).FFMPEG_VIDEO_SPLIT_EXCESSIVE_MSG.format(rounds=len(split_vid_dict["path"])))
+                for x, target_name in enumerate(split_vid_dict["path"]):
+                    logger.info(safe_get_messages(user_id).FFMPEG_SUCCESSFULLY_CREATED_SPLIT_PART_MSG.format(part=x+1, target_name=target_name, size=os.path.getsize(target_name)))
+                logger.info(safe_get_messages(user_id).FFMPEG_VIDEO_SPLIT_SUCCESS_MSG.format(count=len(split_vid_dict["path"])))
+                return split_vid_dict
+        except Exception as e:
+            logger.error(safe_get_messages(user_id).FFMPEG_ERROR_VIDEO_SPLITTING_PROCESS_MSG.format(error=e))
+        logger.warning(f"Keyframe split failed, falling back to fixed-duration parts: {video_path}")
+
     rounds = (math.floor(video_size / max_size)) + 1
     n = duration / rounds
     caption_lst = []
@@ -583,14 +657,12 @@ def embed_subs_to_video(video_path, user_id, tg_update_callback=None, app=None,
             logger.error(f"Video file not found: {video_path}")
             return False
         
-        user_dir = os.path.join("users", str(user_id))
-        subs_file = os.path.join(user_dir, "subs.txt")
-        if not os.path.exists(subs_file):
+        from HELPERS.user_settings import get_user_settings
+        subs_lang = get_user_settings(user_id).subs_language
+        if subs_lang is None:
             logger.info(f"No subs.txt for user {user_id}, skipping embed_subs_to_video")
             return False
         
-        with open(subs_file, "r", encoding="utf-8") as f:
-            subs_lang = f.read().strip()
         if not subs_lang or subs_lang == "OFF":
             logger.info(f"Subtitles disabled for user {user_id}")
             return False
@@ -21,6 +21,7 @@ from URL_PARSERS.youtube import is_youtube_url
 import subprocess
 import sys
 import tempfile
+import threading
 
 
 # ---------- Low-level helpers ----------
@@ -601,6 +602,21 @@ def get_total_media_count(url: str, user_id=None, use_proxy: bool = False) -> in
     Estimate total media count using gallery-dl extractor to get all media (images + videos).
     Returns integer or None if failed.
     """
+    # Count by iterating the user's in-process session: the items it finds are
+    # reused by the range downloads that follow. Instagram keeps its own method.
+    if 'instagram.com' not in url.lower():
+        session = _get_gallery_session(url, user_id, use_proxy)
+        if session is not None:
+            timeout_sec = 30 if 'vk.com' in url.lower() else 15
+            total = session.count(timeout_sec)
+            if total:
+                logger.info(f"Detected {total} total media items via gallery-dl session")
+                return total
+            if total is None:
+                logger.warning(f"[gallery-dl session] counting timed out after {timeout_sec}s")
+                return None
+            logger.warning("[gallery-dl session] no media items found, trying CLI counting")
+
     cfg = {
         "extractor": {
             "timeout": 30,
@@ -1108,10 +1124,53 @@ def _get_error_type(stderr_text: str, user_id=None) -> str:
     return safe_get_messages(user_id).GALLERY_DL_UNKNOWN_ERROR_MSG
 
 
-def download_image_range_cli(url: str, range_expr: str, user_id=None, use_proxy: bool = False, output_dir: str | None = None) -> bool | str:
+def _run_cli_streaming(cmd: list, on_file, timeout: int) -> subprocess.CompletedProcess:
+    """
+    subprocess.run(cmd, capture_output=True, text=True, timeout=timeout) that also calls
+    on_file(path) for every file gallery-dl reports on stdout (one path per line,
+    "# path" for files that already existed) while it is still running.
+    """
+    env = dict(os.environ, PYTHONUNBUFFERED="1")
+    timed_out = threading.Event()
+    stdout_lines = []
+    with tempfile.TemporaryFile(mode="w+") as stderr_file:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr_file, text=True, env=env)
+
+        def kill():
+            timed_out.set()
+            proc.kill()
+
+        timer = threading.Timer(timeout, kill)
+        timer.daemon = True
+        timer.start()
+        try:
+            for line in proc.stdout:
+                stdout_lines.append(line)
+                path = line.rstrip("\n")
+                if path.startswith("# "):
+                    path = path[2:]
+                if path and os.path.isfile(path):
+                    try:
+                        on_file(path)
+                    except Exception as e:
+                        logger.warning(f"[gallery-dl] file callback failed for {path}: {e}")
+            proc.wait()
+        finally:
+            timer.cancel()
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(cmd, timeout)
+        stderr_file.seek(0)
+        return subprocess.CompletedProcess(cmd, proc.returncode, "".join(stdout_lines), stderr_file.read())
+
+
+def download_image_range_cli(url: str, range_expr: str, user_id=None, use_proxy: bool = False, output_dir: str | None = None, on_file=None) -> bool | str:
     """
     Strict range download using gallery-dl CLI with --range to avoid Python API variances.
     Returns True if exit code 0, False for other errors, or error message string for 401 Unauthorized.
+    If on_file is given it is called with each file path as soon as gallery-dl has written it.
     """
     # Validate range expression to avoid accidental full downloads
     import re as _re
@@ -1148,7 +1207,10 @@ def download_image_range_cli(url: str, range_expr: str, user_id=None, use_proxy:
                 logger.error(f"Safety check failed for command (missing --range): {cmd_pretty}")
                 return False
             logger.info(f"Downloading range via CLI: {cmd_pretty}")
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
+            if on_file is not None:
+                result = _run_cli_streaming(cmd, on_file, timeout=600)
+            else:
+                result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
             if result.returncode != 0:
                 stderr_text = result.stderr[:400]
                 logger.warning(f"CLI range download failed [{result.returncode}]: {stderr_text}")
@@ -1188,3 +1250,76 @@ def download_image_range_cli(url: str, range_expr: str, user_id=None, use_proxy:
     except Exception as e:
         logger.error(f"download_image_range_cli error: {e}")
         return False
+
+
+# ---------- In-process extraction sessions (see gallery_dl_session) ----------
+
+def _get_gallery_session(url: str, user_id, use_proxy: bool):
+    """Session of this user/URL, or None when sessions are disabled or unavailable."""
+    from CONFIG.limits import LimitsConfig
+    if user_id is None or not getattr(LimitsConfig, 'GALLERY_DL_SESSION_ENABLED', True):
+        return None
+    if getattr(getattr(gallery_dl, "job", None), "DownloadJob", None) is None:
+        return None
+    from DOWN_AND_UP.gallery_dl_session import gallery_dl_sessions, merge_global_config
+
+    def build_config():
+        cfg = {"extractor": {"timeout": 30, "retries": 3}}
+        cfg = _prepare_user_cookies_and_proxy(url, user_id, use_proxy, cfg)
+        # Same cookie file the CLI path passes with --cookies
+        user_cookie_path = os.path.join("users", str(user_id), "cookie.txt")
+        if os.path.exists(user_cookie_path):
+            cfg.setdefault("extractor", {})["cookies"] = user_cookie_path
+        logger.info(f"[gallery-dl session] starting session for {url}, cookies: {cfg.get('extractor', {}).get('cookies')}")
+        return merge_global_config(cfg)
+
+    return gallery_dl_sessions.get(user_id, url, use_proxy, build_config)
+
+
+def download_image_range_session(url: str, range_expr: str, user_id=None, use_proxy: bool = False, output_dir: str | None = None, on_file=None) -> bool | str | None:
+    """
+    Range download from the user's long-lived gallery-dl session.
+    Same results as download_image_range_cli(); None when no session could be used
+    (callers then fall back to the CLI). on_file(path) is called for every file as
+    soon as it is in output_dir.
+    """
+    import re as _re
+    match = _re.fullmatch(r"(\d+)-(\d*)", range_expr or "")
+    if not match or not output_dir:
+        return None
+    session = _get_gallery_session(url, user_id, use_proxy)
+    if session is None:
+        return None
+    from CONFIG.limits import LimitsConfig
+    start = int(match.group(1))
+    end = int(match.group(2)) if match.group(2) else None
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+        files, errors = session.download_range(
+            start, end, output_dir,
+            timeout=getattr(LimitsConfig, 'GALLERY_DL_SESSION_RANGE_TIMEOUT', 600),
+            on_file=on_file,
+        )
+    except Exception as e:
+        logger.error(f"download_image_range_session error: {e}")
+        return None
+    logger.info(f"[gallery-dl session] range {range_expr}: {len(files)} files for {url}")
+    if files:
+        return True
+    stderr_text = "\n".join(errors)[:400]
+    if stderr_text and _is_fatal_error(stderr_text):
+        error_msg = f"{_get_error_type(stderr_text)}: {stderr_text}"
+        logger.error(f"Fatal error in gallery-dl session: {error_msg}")
+        return error_msg
+    if session.failed:
+        return False
+    return not errors
+
+
+def close_image_session(user_id, url: str | None = None) -> None:
+    """Release the gallery-dl session(s) of a finished /img run."""
+    try:
+        from DOWN_AND_UP.gallery_dl_session import gallery_dl_sessions
+        gallery_dl_sessions.close(user_id, url)
+    except Exception as e:
+        logger.debug(f"close_image_session failed: {e}")
@@ -0,0 +1,452 @@
+"""
+Long-lived in-process gallery-dl extraction sessions for /img.
+
+One session per (user_id, url) keeps a gallery-dl DownloadJob running in a
+worker thread. Instead of downloading every file the job reaches, the worker
+records it (job, url, metadata, directory metadata) under its 1-based index
+and pauses once it is ahead of what consumers asked for; pages are therefore
+fetched once per session, not once per batch.
+
+- download_range(start, end, output_dir) downloads the recorded items of the
+  range in the worker thread (the job that produced an item also downloads
+  it, so child extractors, cookies and sessions are reused) and moves each
+  file into output_dir as soon as it is written,
+- count() lets the iterator run to the end without downloading and returns
+  the number of items as a by-product; later ranges are served from what was
+  recorded.
+
+Each session binds its own gallery-dl config to its extractors, so
+concurrent sessions with different cookies/proxies do not touch the global
+gallery_dl.config. Sessions are closed explicitly or after
+GALLERY_DL_SESSION_IDLE_TIMEOUT seconds without use.
+"""
+
+import copy
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from CONFIG.limits import LimitsConfig
+from HELPERS.logger import logger
+
+# Index used as "iterate everything"
+_UNBOUNDED = sys.maxsize
+
+
+class _SessionClosed(BaseException):
+    """Raised inside the worker to unwind gallery-dl when the session closes."""
+
+
+class _LogCapture:
+    """Logger adapter proxy keeping warning/error lines for error classification."""
+
+    def __init__(self, log, session: "GalleryDLSession"):
+        self._log = log
+        self._session = session
+
+    def _record(self, msg, args):
+        try:
+            text = str(msg) % args if args else str(msg)
+        except Exception:
+            text = str(msg)
+        self._session._add_error(text)
+
+    def warning(self, msg, *args, **kwargs):
+        self._record(msg, args)
+        return self._log.warning(msg, *args, **kwargs)
+
+    def error(self, msg, *args, **kwargs):
+        self._record(msg, args)
+        return self._log.error(msg, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._log, name)
+
+
+def _bind_config(extr, conf: Dict[str, Any]) -> None:
+    """Make an extractor read options from conf instead of the global config."""
+    from gallery_dl import config as gdl_config
+
+    def config(key, default=None):
+        return gdl_config.interpolate(extr._cfgpath, key, default, conf=conf)
+
+    def config_accumulate(key):
+        return gdl_config.accumulate(extr._cfgpath, key, conf=conf)
+
+    def config_shared(key, default=None):
+        return gdl_config.interpolate_common(("extractor",), extr._cfgpath, key, default, conf=conf)
+
+    def config_shared_accumulate(key):
+        values = []
+        for i, path in enumerate(extr._cfgpath):
+            if i == 0:
+                values = gdl_config.accumulate(("extractor",) + tuple(path), key, conf=conf)
+            else:
+                sub = gdl_config.get(("extractor",), path[0], conf=conf)
+                if sub:
+                    values[:0] = gdl_config.accumulate((extr.subcategory,), key, conf=sub)
+        return values
+
+    extr.config = config
+    extr.config_accumulate = config_accumulate
+    # Job.__init__ switches child extractors with a list config path to these
+    if hasattr(extr, "_config_shared") and hasattr(gdl_config, "interpolate_common"):
+        extr._config_shared = config_shared
+        extr._config_shared_accumulate = config_shared_accumulate
+
+
+def _session_job_class():
+    """DownloadJob subclass recording items instead of downloading them."""
+    from gallery_dl import job as gdl_job, output as gdl_output
+
+    class SessionJob(gdl_job.DownloadJob):
+
+        def __init__(self, extr, parent=None, session=None):
+            self.session = session if session is not None else parent.session
+            _bind_config(extr, self.session.conf)
+            gdl_job.DownloadJob.__init__(self, extr, parent)
+            null_output = getattr(gdl_output, "NullOutput", None)
+            if null_output is not None:
+                self.out = null_output()
+            extr.log = _LogCapture(extr.log, self.session)
+            self.log = _LogCapture(self.log, self.session)
+            self.current_directory = None
+            self.active_directory = None
+            self.session.jobs.append(self)
+
+        def handle_directory(self, kwdict):
+            # Directories are set up lazily, when an item of the post is downloaded
+            self.current_directory = kwdict.copy()
+
+        def handle_url(self, url, kwdict):
+            self.session._on_item(self, url, kwdict)
+
+        def handle_finalize(self):
+            # Recorded items may still be downloaded after iteration ended;
+            # the session finalizes every job when it closes.
+            pass
+
+        def download_item(self, url, kwdict, directory):
+            if self.pathfmt is None or self.active_directory is not directory:
+                gdl_job.DownloadJob.handle_directory(self, directory)
+                self.active_directory = directory
+            gdl_job.DownloadJob.handle_url(self, url, kwdict)
+            return getattr(self.pathfmt, "realpath", None)
+
+        def finalize(self):
+            gdl_job.DownloadJob.handle_finalize(self)
+
+    return SessionJob
+
+
+class GalleryDLSession:
+    """One extractor iterator handing out items on demand."""
+
+    def __init__(self, url: str, conf: Dict[str, Any], staging_dir: str):
+        self.url = url
+        self.conf = conf
+        self.staging_dir = staging_dir
+        self.conf["base-directory"] = staging_dir
+        self.jobs: List[Any] = []
+        self.produced = 0
+        self.exhausted = False
+        self.failed = False
+        self.status = 0
+        self.last_used = time.time()
+
+        self._cond = threading.Condition()
+        self._records: Dict[int, Tuple[Any, str, Dict[str, Any], Optional[Dict[str, Any]]]] = {}
+        self._wanted: set = set()
+        self._done: Dict[int, Optional[str]] = {}
+        self._claimed: set = set()
+        self._delivered: set = set()
+        self._errors: List[str] = []
+        self._want = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True, name="GalleryDL-Session")
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+
+    def _add_error(self, text: str) -> None:
+        with self._cond:
+            self._errors.append(text)
+
+    def _run(self) -> None:
+        try:
+            from gallery_dl import extractor as gdl_extractor
+            extr = gdl_extractor.find(self.url)
+            if extr is None:
+                self._add_error(f"No suitable extractor found for '{self.url}'")
+                self.failed = True
+            else:
+                self.status = _session_job_class()(extr, session=self).run()
+        except _SessionClosed:
+            pass
+        except Exception as e:
+            logger.warning(f"[gallery-dl session] extraction failed for {self.url}: {e}")
+            self._add_error(f"{e.__class__.__name__}: {e}")
+            self.failed = True
+        with self._cond:
+            self.exhausted = True
+            self._cond.notify_all()
+        logger.info(f"[gallery-dl session] iteration finished for {self.url}: {self.produced} items, status {self.status}")
+
+        # Keep serving downloads of recorded items until closed
+        try:
+            while True:
+                with self._cond:
+                    while not self._closed and not self._ready():
+                        self._cond.wait()
+                    if self._closed:
+                        break
+                self._serve()
+        except _SessionClosed:
+            pass
+        finally:
+            for job in self.jobs:
+                try:
+                    job.finalize()
+                except Exception as e:
+                    logger.debug(f"[gallery-dl session] finalize failed: {e}")
+            shutil.rmtree(self.staging_dir, ignore_errors=True)
+
+    def _ready(self) -> List[int]:
+        """Wanted indices already recorded (caller holds the lock)."""
+        return sorted(i for i in self._wanted if i in self._records)
+
+    def _on_item(self, job, url: str, kwdict: Dict[str, Any]) -> None:
+        with self._cond:
+            if self._closed:
+                raise _SessionClosed()
+            self.produced += 1
+            index = self.produced
+            self._records[index] = (job, url, kwdict.copy(), job.current_directory)
+            self._cond.notify_all()
+        while True:
+            self._serve()
+            with self._cond:
+                while not self._closed and index >= self._want and not self._ready():
+                    self._cond.wait()
+                if self._closed:
+                    raise _SessionClosed()
+                if not self._ready():
+                    return
+
+    def _serve(self) -> None:
+        """Download every wanted item that has been recorded."""
+        while True:
+            with self._cond:
+                ready = self._ready()
+                if not ready:
+                    return
+                index = ready[0]
+                self._wanted.discard(index)
+                # The record stays until the result is in, so the index never looks settled early
+                job, url, kwdict, directory = self._records[index]
+            path = None
+            try:
+                path = job.download_item(url, kwdict, directory)
+            except _SessionClosed:
+                raise
+            except Exception as e:
+                logger.warning(f"[gallery-dl session] item {index} of {self.url} failed: {e}")
+                self._add_error(f"{e.__class__.__name__}: {e}")
+            with self._cond:
+                del self._records[index]
+                if path and path not in self._claimed and os.path.isfile(path):
+                    self._claimed.add(path)
+                    self._done[index] = path
+                else:
+                    self._done[index] = None
+                self._cond.notify_all()
+
+    # ------------------------------------------------------------------
+    # Consumer side
+    # ------------------------------------------------------------------
+
+    def _settled(self, index: int) -> bool:
+        return (index in self._done or index in self._delivered
+                or (self.exhausted and index not in self._records))
+
+    def download_range(self, start: int, end: Optional[int], output_dir: str, timeout: float = 600,
+                       on_file: Optional[Callable[[str], None]] = None) -> Tuple[List[str], List[str]]:
+        """Download items start..end (1-based, inclusive) into output_dir.
+
+        Each file is moved into output_dir (and passed to on_file) as soon as it
+        is written. Returns (moved file paths, warning/error lines logged meanwhile).
+        """
+        self.last_used = time.time()
+        deadline = time.time() + timeout
+        moved = []
+        indices: set = set()
+        with self._cond:
+            errors_mark = len(self._errors)
+            self._want = max(self._want, _UNBOUNDED if end is None else end)
+        while True:
+            with self._cond:
+                # Open ranges grow with the items the iterator produces
+                last = end if end is not None else self.produced
+                new = set(range(start, last + 1)) - indices - self._delivered
+                if new:
+                    indices |= new
+                    self._wanted |= new
+                    self._cond.notify_all()
+                ready = [(i, self._done.pop(i)) for i in sorted(indices) if i in self._done]
+                self._delivered.update(i for i, _ in ready)
+                finished = self._closed or (
+                    all(self._settled(i) for i in indices) and (end is not None or self.exhausted))
+                if not ready and not finished:
+                    remaining = deadline - time.time()
+                    if remaining > 0:
+                        self._cond.wait(remaining)
+                        continue
+                    logger.warning(f"[gallery-dl session] range {start}-{end or ''} timed out for {self.url}")
+                    self._wanted -= indices
+                    finished = True
+                if finished:
+                    self._delivered.update(i for i in indices if self._settled(i))
+                    errors = self._errors[errors_mark:]
+            for _, path in ready:
+                target = self._deliver(path, output_dir) if path else None
+                if target is None:
+                    continue
+                moved.append(target)
+                if on_file is not None:
+                    try:
+                        on_file(target)
+                    except Exception as e:
+                        logger.warning(f"[gallery-dl session] file callback failed for {target}: {e}")
+            if finished:
+                break
+        self.last_used = time.time()
+        return moved, errors
+
+    def _deliver(self, path: str, output_dir: str) -> Optional[str]:
+        target = os.path.join(output_dir, os.path.relpath(path, self.staging_dir))
+        try:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(path, target)
+            return target
+        except OSError as e:
+            logger.warning(f"[gallery-dl session] failed to move {path} to {target}: {e}")
+            return None
+
+    def count(self, timeout: float = 15) -> Optional[int]:
+        """Iterate to the end without downloading; None if it did not finish in time."""
+        self.last_used = time.time()
+        deadline = time.time() + timeout
+        with self._cond:
+            previous_want = self._want
+            self._want = _UNBOUNDED
+            self._cond.notify_all()
+            while not self.exhausted and not self._closed:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    # Pause again where consumers left it
+                    self._want = previous_want
+                    return None
+                self._cond.wait(remaining)
+            return self.produced if self.exhausted else None
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+
+class GalleryDLSessionRegistry:
+    """(user_id, url, use_proxy) -> GalleryDLSession with idle expiry."""
+
+    def __init__(self, idle_timeout: float = 600, max_sessions: int = 32):
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max(1, int(max_sessions))
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[Tuple[str, str, bool], GalleryDLSession]" = OrderedDict()
+
+    def get(self, user_id, url: str, use_proxy: bool,
+            build_config: Callable[[], Dict[str, Any]]) -> Optional[GalleryDLSession]:
+        """Existing session for the key, or a new one started with build_config()."""
+        key = (str(user_id), url, bool(use_proxy))
+        expired = []
+        with self._lock:
+            now = time.time()
+            for other_key, other in list(self._sessions.items()):
+                if other.closed or now - other.last_used > self.idle_timeout:
+                    expired.append(self._sessions.pop(other_key))
+            session = self._sessions.get(key)
+            if session is not None:
+                self._sessions.move_to_end(key)
+                session.last_used = now
+        for other in expired:
+            other.close()
+        if session is not None:
+            return session
+
+        try:
+            conf = build_config()
+            user_dir = os.path.join("users", str(user_id))
+            os.makedirs(user_dir, exist_ok=True)
+            staging_dir = tempfile.mkdtemp(prefix=".gallery_dl_session_", dir=user_dir)
+            session = GalleryDLSession(url, conf, staging_dir)
+        except Exception as e:
+            logger.warning(f"[gallery-dl session] cannot start session for {url}: {e}")
+            return None
+
+        evicted = []
+        with self._lock:
+            current = self._sessions.get(key)
+            if current is not None:
+                # Another thread started one meanwhile
+                evicted.append(session)
+                session = current
+            else:
+                self._sessions[key] = session
+                while len(self._sessions) > self.max_sessions:
+                    evicted.append(self._sessions.popitem(last=False)[1])
+        for other in evicted:
+            other.close()
+        return session
+
+    def close(self, user_id, url: Optional[str] = None) -> int:
+        """Close one URL's sessions of a user, or all of them when url is None."""
+        uid = str(user_id)
+        with self._lock:
+            keys = [k for k in self._sessions if k[0] == uid and (url is None or k[1] == url)]
+            sessions = [self._sessions.pop(k) for k in keys]
+        for session in sessions:
+            session.close()
+        return len(sessions)
+
+
+gallery_dl_sessions = GalleryDLSessionRegistry(
+    idle_timeout=getattr(LimitsConfig, 'GALLERY_DL_SESSION_IDLE_TIMEOUT', 600),
+    max_sessions=getattr(LimitsConfig, 'GALLERY_DL_SESSION_MAX_SESSIONS', 32),
+)
+
+
+def merge_global_config(conf: Dict[str, Any]) -> Dict[str, Any]:
+    """Deep copy of the global gallery-dl config with conf merged on top."""
+    from gallery_dl import config as gdl_config
+    merged = copy.deepcopy(getattr(gdl_config, "_config", {}) or {})
+
+    def merge(target, source):
+        for key, value in source.items():
+            if isinstance(value, dict) and isinstance(target.get(key), dict):
+                merge(target[key], value)
+            else:
+                target[key] = copy.deepcopy(value)
+
+    merge(merged, conf)
+    return merged
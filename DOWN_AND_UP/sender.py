@@ -25,20 +25,11 @@ app = get_app()
 def get_user_args(user_id: int):
     """Get user's saved args settings"""
     messages = safe_get_messages(user_id)
-    import os
-    import json
-    user_dir = os.path.join("users", str(user_id))
-    args_file = os.path.join(user_dir, "args.txt")
-    
-    if not os.path.exists(args_file):
-        return {}
-    
-    try:
-        with open(args_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        logger.error(safe_get_messages(user_id).SENDER_ERROR_READING_USER_ARGS_MSG.format(user_id=user_id, error=e))
-        return {}
+    from HELPERS.user_settings import get_user_settings
+    settings = get_user_settings(user_id)
+    if settings.args_error is not None:
+        logger.error(safe_get_messages(user_id).SENDER_ERROR_READING_USER_ARGS_MSG.format(user_id=user_id, error=settings.args_error))
+    return settings.get_args()
 
 def send_videos(
     message,
@@ -315,8 +315,9 @@ def get_video_formats(url, user_id=None, playlist_start_index=1, cookies_already
             logger.info(f"   url: {url}")
             logger.info(f"   opts keys: {list(opts.keys())}")
             
+            from HELPERS.extraction_cache import cached_extract_info
             with yt_dlp.YoutubeDL(opts) as ydl:
-                info = ydl.extract_info(url, download=False)
+                info = cached_extract_info(ydl, url)
             
             logger.info("✅ [DEBUG] extract_info_operation: extraction finished")
             logger.info(f"   info type: {type(info)}")
@@ -0,0 +1,435 @@
+"""
+Resumable admin broadcast (/broadcast) for the Pyrogram bot.
+
+A broadcast is a job in BROADCAST_DB_FILE (SQLite): the message the admin
+replied to (sent with copy_message, so every media type works the same
+way) and/or a text, plus one delivery row per recipient with its state
+(pending, sent, failed, blocked). One worker thread sends the pending rows
+at BROADCAST_RATE messages per second and commits every result, so after a
+crash or restart the job continues with the recipients not reached yet.
+
+The admin gets a status message with live delivered/failed/blocked counts
+and Pause/Resume/Cancel buttons; /broadcast_job [pause|resume|cancel] does
+the same. Recipients that blocked the bot or deleted their account are
+remembered and skipped by later broadcasts until they write to the bot
+again.
+"""
+import os
+import sqlite3
+import threading
+import time
+from pyrogram.errors import FloodWait, InputUserDeactivated, UserDeactivated, UserDeactivatedBan, UserIsBlocked
+from pyrogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+from CONFIG.config import Config
+from CONFIG.limits import LimitsConfig
+from CONFIG.messages import safe_get_messages
+from HELPERS.logger import logger
+from HELPERS.send_dispatcher import dispatch
+
+# Errors meaning the recipient will not get messages from the bot any more
+_UNREACHABLE_ERRORS = (UserIsBlocked, InputUserDeactivated, UserDeactivated, UserDeactivatedBan)
+# FloodWaits for one recipient before it is counted as failed
+_MAX_FLOOD_WAITS = 3
+STATES = ("pending", "sent", "failed", "blocked")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    admin_id INTEGER NOT NULL,
+    from_chat_id INTEGER,
+    message_id INTEGER,
+    text TEXT,
+    status TEXT NOT NULL,
+    status_chat_id INTEGER,
+    status_message_id INTEGER,
+    created REAL NOT NULL,
+    finished REAL
+);
+CREATE TABLE IF NOT EXISTS deliveries (
+    job_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    error TEXT,
+    PRIMARY KEY (job_id, user_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_deliveries_state ON deliveries(job_id, state, user_id);
+CREATE TABLE IF NOT EXISTS unreachable (
+    user_id INTEGER PRIMARY KEY,
+    reason TEXT,
+    since REAL NOT NULL
+);
+"""
+
+
+class BroadcastStore:
+    """Broadcast jobs, per-recipient delivery state and unreachable users in one SQLite file."""
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def create_job(self, admin_id, from_chat_id, message_id, text, recipients):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                job_id = self._conn.execute(
+                    "INSERT INTO jobs (admin_id, from_chat_id, message_id, text, status, created) VALUES (?, ?, ?, ?, 'running', ?)",
+                    (admin_id, from_chat_id, message_id, text, time.time()),
+                ).lastrowid
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO deliveries (job_id, user_id) VALUES (?, ?)",
+                    ((job_id, user_id) for user_id in recipients),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return job_id
+
+    def get_job(self, job_id):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def active_job(self):
+        """The running or paused job, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE status IN ('running', 'paused') ORDER BY id DESC LIMIT 1"
+            ).fetchone()
+        return dict(row) if row else None
+
+    def last_job(self):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs ORDER BY id DESC LIMIT 1").fetchone()
+        return dict(row) if row else None
+
+    def set_status(self, job_id, status):
+        finished = time.time() if status in ("completed", "cancelled") else None
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET status = ?, finished = ? WHERE id = ?", (status, finished, job_id))
+
+    def set_status_message(self, job_id, chat_id, message_id):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status_chat_id = ?, status_message_id = ? WHERE id = ?",
+                (chat_id, message_id, job_id),
+            )
+
+    def pending(self, job_id, limit=100):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT user_id FROM deliveries WHERE job_id = ? AND state = 'pending' ORDER BY user_id LIMIT ?",
+                (job_id, limit),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def record(self, job_id, user_id, state, error=None):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute(
+                "UPDATE deliveries SET state = ?, error = ? WHERE job_id = ? AND user_id = ?",
+                (state, error, job_id, user_id),
+            )
+            if state == "blocked":
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO unreachable (user_id, reason, since) VALUES (?, ?, ?)",
+                    (user_id, error, time.time()),
+                )
+            self._conn.execute("COMMIT")
+
+    def counts(self, job_id):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT state, COUNT(*) FROM deliveries WHERE job_id = ? GROUP BY state", (job_id,)
+            ).fetchall()
+        counts = dict.fromkeys(STATES, 0)
+        counts.update({state: count for state, count in rows})
+        return counts
+
+    def unreachable_ids(self):
+        with self._lock:
+            return {row[0] for row in self._conn.execute("SELECT user_id FROM unreachable")}
+
+    def clear_unreachable(self, user_id):
+        with self._lock:
+            self._conn.execute("DELETE FROM unreachable WHERE user_id = ?", (user_id,))
+
+
+_store = None
+_store_lock = threading.Lock()
+# In-memory copy of the unreachable table: checked for every incoming message
+_unreachable = None
+
+_lock = threading.Lock()
+_app = None
+_worker = None
+_status = {}
+_wake = threading.Event()
+_stop = threading.Event()
+
+
+def get_store():
+    global _store, _unreachable
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                store = BroadcastStore(getattr(Config, 'BROADCAST_DB_FILE', 'broadcasts.sqlite3'))
+                _unreachable = store.unreachable_ids()
+                _store = store
+    return _store
+
+
+def note_user_reachable(user_id):
+    """The user wrote to the bot: include them in broadcasts again."""
+    try:
+        store = get_store()
+        if int(user_id) not in _unreachable:
+            return
+        _unreachable.discard(int(user_id))
+        store.clear_unreachable(int(user_id))
+    except Exception as e:
+        logger.debug(f"[BROADCAST] Failed to clear unreachable mark of {user_id}: {e}")
+
+
+def _recipients():
+    from DATABASE.firebase_init import membership_index
+    recipients = set()
+    for key in membership_index.registered_ids():
+        try:
+            recipients.add(int(key))
+        except (TypeError, ValueError):
+            continue
+    recipients.update(int(admin) for admin in Config.ADMIN)
+    recipients.discard(0)
+    return sorted(recipients - _unreachable)
+
+
+def start_broadcast(app, message, text, reply=None):
+    """Create a job for the admin's /broadcast and start sending. Returns the job, or None if one is active."""
+    store = get_store()
+    with _lock:
+        if store.active_job() is not None:
+            return None
+        job_id = store.create_job(
+            admin_id=message.chat.id,
+            from_chat_id=message.chat.id if reply else None,
+            message_id=reply.id if reply else None,
+            text=text or None,
+            recipients=_recipients(),
+        )
+        _start_worker(app, job_id)
+    return store.get_job(job_id)
+
+
+def control_broadcast(action, job_id=None):
+    """pause / resume / cancel the active job; returns the job after the change (None if there is none)."""
+    store = get_store()
+    with _lock:
+        job = store.active_job()
+        if job is None or (job_id is not None and job["id"] != job_id):
+            return None
+        status = {"pause": "paused", "resume": "running", "cancel": "cancelled"}.get(action)
+        if status is not None and status != job["status"]:
+            store.set_status(job["id"], status)
+            if status == "running" and _app is not None:
+                # Also restarts a worker that stopped on an error
+                _start_worker(_app, job["id"])
+            else:
+                _status[job["id"]] = status
+                _wake.set()
+        return store.get_job(job["id"])
+
+
+def get_broadcast_status():
+    """The active job (or the last finished one) with its delivery counts."""
+    store = get_store()
+    job = store.active_job() or store.last_job()
+    if job is None:
+        return None
+    job["counts"] = store.counts(job["id"])
+    return job
+
+
+def resume_broadcasts(app):
+    """After a restart, continue the job that was sending when the bot stopped."""
+    try:
+        job = get_store().active_job()
+    except Exception as e:
+        logger.error(f"[BROADCAST] Failed to open the broadcast store: {e}")
+        return
+    if job is not None and job["status"] == "running":
+        logger.info(f"[BROADCAST] Resuming broadcast #{job['id']}")
+        with _lock:
+            _start_worker(app, job["id"])
+
+
+def stop_broadcasts():
+    """Stop sending after the current recipient; the job resumes on the next start."""
+    _stop.set()
+    _wake.set()
+    worker = _worker
+    if worker is not None:
+        worker.join(timeout=10)
+
+
+def _start_worker(app, job_id):
+    global _app, _worker
+    _app = app
+    _status[job_id] = "running"
+    if _worker is not None and _worker.is_alive():
+        if _worker.name == f"broadcast-{job_id}":
+            _wake.set()
+            return
+        # A cancelled job's worker stops after its current recipient
+        _wake.set()
+        _worker.join(timeout=30)
+    _worker = threading.Thread(target=_run, args=(app, job_id), name=f"broadcast-{job_id}", daemon=True)
+    _worker.start()
+
+
+def status_keyboard(job):
+    messages = safe_get_messages(job["admin_id"])
+    if job["status"] == "running":
+        toggle = InlineKeyboardButton(messages.BROADCAST_JOB_PAUSE_BUTTON_MSG, callback_data=f"bcast|pause|{job['id']}")
+    elif job["status"] == "paused":
+        toggle = InlineKeyboardButton(messages.BROADCAST_JOB_RESUME_BUTTON_MSG, callback_data=f"bcast|resume|{job['id']}")
+    else:
+        return None
+    cancel = InlineKeyboardButton(messages.BROADCAST_JOB_CANCEL_BUTTON_MSG, callback_data=f"bcast|cancel|{job['id']}")
+    return InlineKeyboardMarkup([[toggle, cancel]])
+
+
+def status_text(job, counts):
+    messages = safe_get_messages(job["admin_id"])
+    status = {
+        "running": messages.BROADCAST_JOB_STATUS_RUNNING_MSG,
+        "paused": messages.BROADCAST_JOB_STATUS_PAUSED_MSG,
+        "cancelled": messages.BROADCAST_JOB_STATUS_CANCELLED_MSG,
+        "completed": messages.BROADCAST_JOB_STATUS_COMPLETED_MSG,
+    }.get(job["status"], job["status"])
+    return messages.BROADCAST_JOB_PROGRESS_MSG.format(
+        job_id=job["id"],
+        status=status,
+        sent=counts["sent"],
+        failed=counts["failed"],
+        blocked=counts["blocked"],
+        pending=counts["pending"],
+        total=sum(counts.values()),
+    )
+
+
+class _StatusMessage:
+    """The admin's status message, edited at most every BROADCAST_PROGRESS_INTERVAL seconds."""
+
+    def __init__(self, app, store, job):
+        self.app = app
+        self.store = store
+        self.chat_id = job["status_chat_id"]
+        self.msg_id = job["status_message_id"]
+        self.interval = getattr(LimitsConfig, 'BROADCAST_PROGRESS_INTERVAL', 10)
+        self.last_edit = 0.0
+        self.last_text = None
+
+    def update(self, job, counts, force=False):
+        now = time.time()
+        if not force and now - self.last_edit < self.interval:
+            return
+        text = status_text(job, counts)
+        if text == self.last_text:
+            return
+        self.last_edit = now
+        self.last_text = text
+        from HELPERS.safe_messeger import safe_send_message, safe_edit_message_text
+        try:
+            if self.msg_id is None:
+                sent = safe_send_message(job["admin_id"], text, reply_markup=status_keyboard(job))
+                self.chat_id, self.msg_id = job["admin_id"], getattr(sent, 'id', None)
+                if self.msg_id is not None:
+                    self.store.set_status_message(job["id"], self.chat_id, self.msg_id)
+            else:
+                safe_edit_message_text(self.chat_id, self.msg_id, text, reply_markup=status_keyboard(job))
+        except Exception as e:
+            logger.debug(f"[BROADCAST] Failed to update status message of #{job['id']}: {e}")
+
+
+def _call(func, *args, **kwargs):
+    """Run a send call, sleeping through FloodWait (which applies to the whole bot)."""
+    for attempt in range(_MAX_FLOOD_WAITS + 1):
+        try:
+            return func(*args, **kwargs)
+        except FloodWait as e:
+            if attempt == _MAX_FLOOD_WAITS:
+                raise
+            logger.warning(f"[BROADCAST] FloodWait {e.value}s")
+            time.sleep(e.value + 1)
+
+
+def _deliver(app, job, user_id):
+    try:
+        # Through the send dispatcher, so the broadcast shares the bot-wide rate with other messages
+        if job["message_id"]:
+            _call(dispatch, user_id, app.copy_message, chat_id=user_id, from_chat_id=job["from_chat_id"], message_id=job["message_id"])
+        if job["text"]:
+            _call(dispatch, user_id, app.send_message, user_id, job["text"])
+        return "sent", None
+    except _UNREACHABLE_ERRORS as e:
+        return "blocked", type(e).__name__
+    except Exception as e:
+        logger.warning(f"[BROADCAST] Failed to send to {user_id}: {e}")
+        return "failed", str(e)[:200]
+
+
+def _run(app, job_id):
+    store = get_store()
+    job = store.get_job(job_id)
+    counts = store.counts(job_id)
+    status_message = _StatusMessage(app, store, job)
+    status_message.update(job, counts, force=True)
+    interval = 1.0 / max(0.1, getattr(LimitsConfig, 'BROADCAST_RATE', 20))
+    next_send = time.monotonic()
+    try:
+        while not _stop.is_set():
+            status = _status.get(job_id, job["status"])
+            if status != job["status"]:
+                job["status"] = status
+                status_message.update(job, counts, force=True)
+            if status == "paused":
+                _wake.wait(30)
+                _wake.clear()
+                continue
+            if status != "running":
+                break
+            batch = store.pending(job_id)
+            if not batch:
+                store.set_status(job_id, "completed")
+                job["status"] = "completed"
+                break
+            for user_id in batch:
+                if _stop.is_set() or _status.get(job_id) != "running":
+                    break
+                delay = next_send - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                next_send = max(next_send + interval, time.monotonic())
+                state, error = _deliver(app, job, user_id)
+                store.record(job_id, user_id, state, error)
+                counts["pending"] -= 1
+                counts[state] += 1
+                if state == "blocked":
+                    _unreachable.add(user_id)
+                status_message.update(job, counts)
+    except Exception as e:
+        logger.error(f"[BROADCAST] Broadcast #{job_id} stopped: {e}")
+    finally:
+        _status.pop(job_id, None)
+    logger.info(f"[BROADCAST] Broadcast #{job_id} {job['status']}: {counts}")
+    if job["status"] in ("completed", "cancelled"):
+        status_message.update(job, counts, force=True)
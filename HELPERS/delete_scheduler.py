@@ -0,0 +1,240 @@
+"""
+Scheduled message deletion for the Pyrogram bot.
+
+schedule_delete_message() and safe_send_message_with_auto_delete() used to
+start one sleeping thread per message. They now add the message to one
+hashed timer wheel (DELETE_WHEEL_SLOTS slots of DELETE_WHEEL_TICK seconds)
+served by a single thread:
+  - scheduling and cancelling are O(1),
+  - messages of one chat that are due in the same tick are deleted with one
+    delete_messages call (up to 100 ids), sent through the send dispatcher,
+  - pending deletions are kept in DELETE_SCHEDULE_FILE (SQLite), so after a
+    restart they are deleted on time, or right away if overdue.
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from CONFIG.config import Config
+from CONFIG.limits import LimitsConfig
+
+# Not HELPERS.logger: it imports safe_messeger, which imports this module
+logger = logging.getLogger(__name__)
+
+# Telegram accepts up to 100 message ids per delete_messages call
+DELETE_BATCH_SIZE = 100
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pending_deletes (
+    chat_id INTEGER NOT NULL,
+    message_id INTEGER NOT NULL,
+    due REAL NOT NULL,
+    PRIMARY KEY (chat_id, message_id)
+) WITHOUT ROWID;
+"""
+
+
+class DeleteScheduler:
+    """Hashed timer wheel of (chat_id, message_id) deletions, persisted in SQLite."""
+
+    def __init__(self, path, delete=None, tick=1.0, slots=512, clock=time.time):
+        self.tick = float(tick)
+        self.slots = max(1, int(slots))
+        self._delete = delete or _dispatch_delete
+        self._clock = clock
+        # slot -> {(chat_id, message_id): due tick}
+        self._wheel = [dict() for _ in range(self.slots)]
+        # (chat_id, message_id) -> due tick, to cancel without scanning the wheel
+        self._due = {}
+        self._current = self._tick_of(clock())
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self.stats = {"scheduled": 0, "cancelled": 0, "deleted": 0, "calls": 0, "failed": 0}
+        self._load()
+
+    def schedule(self, chat_id, message_ids, delay):
+        """Delete message_ids of chat_id in delay seconds (rescheduling ones already pending)."""
+        due = self._clock() + max(0.0, float(delay))
+        keys = [(int(chat_id), int(message_id)) for message_id in message_ids if message_id]
+        if not keys:
+            return False
+        with self._lock:
+            self._write(
+                "INSERT OR REPLACE INTO pending_deletes (chat_id, message_id, due) VALUES (?, ?, ?)",
+                [(chat, message, due) for chat, message in keys],
+            )
+            for key in keys:
+                self._add(key, due)
+            self.stats["scheduled"] += len(keys)
+        self.start()
+        return True
+
+    def cancel(self, chat_id, message_ids):
+        """Keep message_ids of chat_id; returns how many pending deletions were cancelled."""
+        keys = [(int(chat_id), int(message_id)) for message_id in message_ids if message_id]
+        cancelled = 0
+        with self._lock:
+            for key in keys:
+                due_tick = self._due.pop(key, None)
+                if due_tick is not None:
+                    self._wheel[due_tick % self.slots].pop(key, None)
+                    cancelled += 1
+            if cancelled:
+                self._write("DELETE FROM pending_deletes WHERE chat_id = ? AND message_id = ?", keys)
+                self.stats["cancelled"] += cancelled
+        return cancelled
+
+    def pending(self):
+        with self._lock:
+            return len(self._due)
+
+    def get_stats(self):
+        with self._lock:
+            return {**self.stats, "pending": len(self._due)}
+
+    def start(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="delete-scheduler", daemon=True)
+                self._thread.start()
+
+    def close(self):
+        """Stop the thread; pending deletions stay in the file for the next start."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        with self._lock:
+            self._conn.close()
+
+    def _write(self, sql, rows):
+        # Caller holds self._lock; one transaction for all rows
+        self._conn.execute("BEGIN")
+        try:
+            self._conn.executemany(sql, rows)
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def _tick_of(self, timestamp):
+        return int(timestamp // self.tick)
+
+    def _add(self, key, due):
+        # Caller holds self._lock; the first tick starting at or after due, overdue deletions go to the next tick
+        due_tick = max(-int(-due // self.tick), self._current + 1)
+        previous = self._due.get(key)
+        if previous is not None:
+            self._wheel[previous % self.slots].pop(key, None)
+        self._due[key] = due_tick
+        self._wheel[due_tick % self.slots][key] = due_tick
+
+    def _load(self):
+        rows = self._conn.execute("SELECT chat_id, message_id, due FROM pending_deletes").fetchall()
+        for chat_id, message_id, due in rows:
+            self._add((chat_id, message_id), due)
+        if rows:
+            logger.info(f"[AUTO-DELETE] Restored {len(rows)} scheduled deletions")
+
+    def _loop(self):
+        while not self._stop.is_set():
+            now_tick = self._tick_of(self._clock())
+            if now_tick <= self._current:
+                self._stop.wait((self._current + 1) * self.tick - self._clock())
+                continue
+            try:
+                self._advance(now_tick)
+            except Exception as e:
+                logger.error(f"[AUTO-DELETE] Timer wheel pass failed: {e}")
+
+    def _advance(self, now_tick):
+        by_chat = defaultdict(list)
+        with self._lock:
+            # After a long stall visit each slot at most once
+            first = max(self._current + 1, now_tick - self.slots + 1)
+            for tick in range(first, now_tick + 1):
+                slot = self._wheel[tick % self.slots]
+                fired = [key for key, due_tick in slot.items() if due_tick <= now_tick]
+                for key in fired:
+                    del slot[key]
+                    del self._due[key]
+                    by_chat[key[0]].append(key[1])
+            self._current = now_tick
+            if by_chat:
+                self._write(
+                    "DELETE FROM pending_deletes WHERE chat_id = ? AND message_id = ?",
+                    [(chat_id, message_id) for chat_id, ids in by_chat.items() for message_id in ids],
+                )
+        calls = deleted = failed = 0
+        for chat_id, message_ids in by_chat.items():
+            for start in range(0, len(message_ids), DELETE_BATCH_SIZE):
+                batch = message_ids[start:start + DELETE_BATCH_SIZE]
+                calls += 1
+                deleted += len(batch)
+                try:
+                    self._delete(chat_id, batch)
+                except Exception as e:
+                    failed += len(batch)
+                    logger.debug(f"[AUTO-DELETE] Failed to delete {batch} in {chat_id}: {e}")
+        if calls:
+            with self._lock:
+                self.stats["calls"] += calls
+                self.stats["deleted"] += deleted
+                self.stats["failed"] += failed
+
+
+def _dispatch_delete(chat_id, message_ids):
+    """delete_messages through the send dispatcher, without waiting for the result."""
+    from HELPERS.app_instance import get_app
+    from HELPERS.progress_renderer import progress_renderer
+    from HELPERS.send_dispatcher import get_send_dispatcher
+    progress_renderer.forget(chat_id, message_ids)
+    app = get_app()
+    future = get_send_dispatcher().submit(chat_id, app.delete_messages, chat_id=chat_id, message_ids=message_ids)
+
+    def done(f):
+        # Already deleted by the user or another cleanup: nothing to report
+        if f.exception() is not None:
+            logger.debug(f"[AUTO-DELETE] Failed to delete {message_ids} in {chat_id}: {f.exception()}")
+    future.add_done_callback(done)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_delete_scheduler():
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = DeleteScheduler(
+                    getattr(Config, 'DELETE_SCHEDULE_FILE', 'scheduled_deletes.sqlite3'),
+                    tick=getattr(LimitsConfig, 'DELETE_WHEEL_TICK', 1.0),
+                    slots=getattr(LimitsConfig, 'DELETE_WHEEL_SLOTS', 512),
+                )
+    return _scheduler
+
+
+def start_delete_scheduler():
+    """Start deleting, including the deletions restored from the last run."""
+    try:
+        get_delete_scheduler().start()
+    except Exception as e:
+        logger.error(f"[AUTO-DELETE] Failed to start the delete scheduler: {e}")
+
+
+def stop_delete_scheduler():
+    if _scheduler is not None:
+        _scheduler.close()
@@ -0,0 +1,342 @@
+"""
+Global download queue for the Pyrogram bot.
+
+down_and_up() / down_and_audio() are wrapped with @scheduled_download: the
+call queues the download in the shared DownloadScheduler
+(app/services/downloader/scheduler.py) and returns, freeing the Pyrogram
+worker thread. The download runs in its own thread once a slot is free
+under the global, per-host and per-user limits; admins and NSFW (paid)
+jobs use their own lanes. While a job waits, the user gets a message with
+its queue position, edited as the position changes.
+
+Requests for a video (same canonical URL and quality as the video cache)
+that is already queued or downloading do not download it again: they wait
+for that download, see its progress bar in their own message, and then get
+the cached copy forwarded.
+
+Callers that clean up after the download pass on_done=callable; it runs
+once the queued job has finished, failed or been cancelled.
+"""
+import inspect
+import threading
+import time
+from functools import wraps
+from CONFIG.config import Config
+from CONFIG.limits import LimitsConfig
+from CONFIG.messages import safe_get_messages
+from HELPERS.logger import logger
+from app.services.downloader.scheduler import DownloadScheduler, SchedulerClosed
+
+_scheduler = DownloadScheduler(
+    max_active=getattr(LimitsConfig, 'DOWNLOAD_MAX_ACTIVE', 4),
+    max_per_host=getattr(LimitsConfig, 'DOWNLOAD_MAX_PER_HOST', 2),
+    max_per_user=getattr(LimitsConfig, 'DOWNLOAD_MAX_PER_USER', 1),
+    lane_weights=getattr(LimitsConfig, 'DOWNLOAD_LANE_WEIGHTS', None),
+)
+
+# Set in download threads so nested calls (down_and_up -> down_and_audio) run inline
+_local = threading.local()
+
+# Queue position messages are edited at most this often
+_POSITION_EDIT_INTERVAL = 10.0
+# Queue metrics are logged this often while there is traffic
+_STATS_LOG_INTERVAL = 300
+
+_stats_logger_started = False
+_stats_logger_lock = threading.Lock()
+
+
+def get_scheduler():
+    return _scheduler
+
+
+def get_download_queue_stats():
+    stats = _scheduler.get_stats()
+    stats['coalesced'] = _coalesced
+    return stats
+
+
+def _stats_loop():
+    last_submitted = 0
+    while True:
+        time.sleep(_STATS_LOG_INTERVAL)
+        stats = get_download_queue_stats()
+        if stats['submitted'] == last_submitted and not stats['active']:
+            continue
+        last_submitted = stats['submitted']
+        logger.info(
+            f"[DOWNLOAD QUEUE] active={stats['active']}/{stats['max_active']} queued={stats['queued']} "
+            f"by_lane={stats['queued_by_lane']} by_host={stats['active_by_host']} "
+            f"wait avg={stats['avg_wait']:.1f}s p95={stats['p95_wait']:.1f}s max={stats['max_wait']:.1f}s "
+            f"service avg={stats['avg_service']:.1f}s p95={stats['p95_service']:.1f}s "
+            f"completed={stats['completed']} failed={stats['failed']} cancelled={stats['cancelled']} "
+            f"coalesced={stats['coalesced']}"
+        )
+
+
+def _ensure_stats_logger():
+    global _stats_logger_started
+    if _stats_logger_started:
+        return
+    with _stats_logger_lock:
+        if _stats_logger_started:
+            return
+        threading.Thread(target=_stats_loop, name="download-queue-stats", daemon=True).start()
+        _stats_logger_started = True
+
+
+def _is_nsfw(url, message):
+    try:
+        text = (getattr(message, 'text', None) or getattr(message, 'caption', None) or "").lower()
+        if "#nsfw" in text or "#porn" in text:
+            return True
+        from HELPERS.porn import is_porn
+        return is_porn(url, "", "")
+    except Exception as e:
+        logger.debug(f"NSFW check failed for {url}: {e}")
+        return False
+
+
+def _lane_for(user_id, url, message):
+    if int(user_id) in getattr(Config, 'ADMIN', []):
+        return "admin"
+    return "paid" if _is_nsfw(url, message) else "default"
+
+
+class _QueueNotice:
+    """The "queued, position N" message of one waiting job."""
+
+    def __init__(self, user_id, message):
+        self.user_id = user_id
+        self.message = message
+        self.msg_id = None
+        self.last_edit = 0.0
+        self.done = False
+        self.lock = threading.Lock()
+
+    def update(self, job, position, queued):
+        from HELPERS.safe_messeger import safe_send_message, safe_edit_message_text
+        text = safe_get_messages(self.user_id).DOWNLOAD_QUEUE_POSITION_MSG.format(position=position, total=queued)
+        with self.lock:
+            if self.done:
+                return
+            now = time.time()
+            if self.msg_id is None:
+                sent = safe_send_message(self.user_id, text, message=self.message)
+                self.msg_id = getattr(sent, 'id', None)
+                self.last_edit = now
+            elif now - self.last_edit >= _POSITION_EDIT_INTERVAL:
+                safe_edit_message_text(self.user_id, self.msg_id, text)
+                self.last_edit = now
+
+    def clear(self):
+        with self.lock:
+            self.done = True
+            msg_id, self.msg_id = self.msg_id, None
+        if msg_id is not None:
+            from HELPERS.safe_messeger import safe_delete_messages
+            safe_delete_messages(self.user_id, [msg_id])
+
+    def cancelled(self, job):
+        self.clear()
+        from HELPERS.safe_messeger import safe_send_message
+        safe_send_message(self.user_id, safe_get_messages(self.user_id).DOWNLOAD_QUEUE_DRAINING_MSG, message=self.message)
+
+
+class _Flight:
+    """
+    A queued or running download of one (video, quality). Requests for the
+    same video made meanwhile wait for it instead of downloading it again,
+    then get it forwarded from the video cache.
+    """
+
+    def __init__(self, key, chat_id):
+        self.key = key
+        # Chat of the request that downloads; its progress is mirrored to followers
+        self.chat_id = chat_id
+        self.started = False
+        self.followers = []
+
+
+class _Follower:
+    def __init__(self, user_id, message, url, resume, on_done=None, leader_chat_id=None):
+        self.user_id = user_id
+        self.message = message
+        self.url = url
+        self.resume = resume
+        self.on_done = on_done
+        self.leader_chat_id = leader_chat_id
+        self.msg_id = None
+
+    def notify(self, started):
+        from HELPERS.safe_messeger import safe_send_message, safe_edit_message_text
+        messages = safe_get_messages(self.user_id)
+        text = messages.DOWNLOAD_COALESCED_STARTED_MSG if started else messages.DOWNLOAD_COALESCED_WAITING_MSG
+        if self.msg_id is None:
+            sent = safe_send_message(self.user_id, text, message=self.message)
+            self.msg_id = getattr(sent, 'id', None)
+        else:
+            safe_edit_message_text(self.user_id, self.msg_id, text)
+        if started and self.leader_chat_id is not None:
+            # Registered after the edit above: a direct edit ends the mirror
+            from HELPERS.progress_renderer import progress_renderer
+            progress_renderer.mirror(self.leader_chat_id, self.user_id, self.msg_id, lambda progress: _progress_line(text, progress))
+
+    def clear(self):
+        if self.msg_id is not None:
+            from HELPERS.safe_messeger import safe_delete_messages
+            safe_delete_messages(self.user_id, [self.msg_id])
+            self.msg_id = None
+
+
+def _progress_line(text, progress):
+    """A follower's own text plus the bar line of the leader's progress message, if it has one."""
+    lines = progress.splitlines()
+    # Progress texts are "<status>\n<bar>   <percent>%"; the status is in the leader's language
+    if len(lines) < 2:
+        return None
+    return f"{text}\n{lines[-1]}"
+
+
+_flights = {}
+_flights_lock = threading.Lock()
+_coalesced = 0
+
+
+def _coalesce_key(signature, app, message, url, args, kwargs):
+    """(canonical video, quality) for downloads that end up in the video cache, else None."""
+    try:
+        bound = signature.bind_partial(app, message, url, *args, **kwargs).arguments
+        quality_key = bound.get('quality_key')
+        if quality_key is None or (bound.get('video_count') or 1) > 1:
+            return None
+        from URL_PARSERS.playlist_utils import is_playlist_with_range
+        if is_playlist_with_range(getattr(message, 'text', None) or getattr(message, 'caption', None) or ""):
+            return None
+        # NSFW downloads are never cached
+        if _is_nsfw(url, message):
+            return None
+        from DATABASE.video_cache_index import resolve_url
+        return (resolve_url(url)[0], quality_key)
+    except Exception as e:
+        logger.debug(f"Download coalescing key failed for {url}: {e}")
+        return None
+
+
+def _flight_started(flight):
+    with _flights_lock:
+        flight.started = True
+        followers = list(flight.followers)
+    for follower in followers:
+        follower.notify(started=True)
+
+
+def _flight_finished(flight, cancelled=False):
+    with _flights_lock:
+        if _flights.get(flight.key) is flight:
+            del _flights[flight.key]
+        followers, flight.followers = flight.followers, []
+    if not followers:
+        return
+    for follower in followers:
+        follower.clear()
+        if cancelled:
+            from HELPERS.safe_messeger import safe_send_message
+            safe_send_message(follower.user_id, safe_get_messages(follower.user_id).DOWNLOAD_QUEUE_DRAINING_MSG, message=follower.message)
+            _run_on_done(follower.on_done, follower.url)
+            continue
+        # The follower's own call goes through the queue like any other: it
+        # forwards the cached copy, or downloads when its settings (subtitles,
+        # send as file, ...) or a failed first download leave nothing to forward
+        follower.resume()
+
+
+def _run_on_done(on_done, url):
+    if on_done is None:
+        return
+    try:
+        on_done()
+    except Exception as e:
+        logger.warning(f"Download cleanup for {url} failed: {e}")
+
+
+def scheduled_download(func):
+    """Run func(app, message, url, ...) through the download queue."""
+    signature = inspect.signature(func)
+
+    def submit(app, message, url, args, kwargs, flight=None, on_done=None):
+        user_id = message.chat.id
+        notice = _QueueNotice(user_id, message)
+
+        def run():
+            notice.clear()
+            if flight is not None:
+                _flight_started(flight)
+            _local.active = True
+            try:
+                func(app, message, url, *args, **kwargs)
+            finally:
+                _local.active = False
+                if flight is not None:
+                    _flight_finished(flight)
+                _run_on_done(on_done, url)
+
+        def cancelled(job):
+            notice.cancelled(job)
+            if flight is not None:
+                _flight_finished(flight, cancelled=True)
+            _run_on_done(on_done, url)
+
+        try:
+            _scheduler.submit(
+                user_id, url, run,
+                lane=_lane_for(user_id, url, message),
+                on_position=notice.update,
+                on_cancel=cancelled,
+                label=func.__name__,
+            )
+        except SchedulerClosed:
+            cancelled(None)
+
+    @wraps(func)
+    def wrapper(app, message, url, *args, on_done=None, **kwargs):
+        global _coalesced
+        if getattr(_local, 'active', False):
+            try:
+                return func(app, message, url, *args, **kwargs)
+            finally:
+                _run_on_done(on_done, url)
+        _ensure_stats_logger()
+        key = _coalesce_key(signature, app, message, url, args, kwargs)
+        if key is None:
+            return submit(app, message, url, args, kwargs, on_done=on_done)
+
+        def resume():
+            submit(app, message, url, args, kwargs, on_done=on_done)
+
+        with _flights_lock:
+            flight = _flights.get(key)
+            if flight is None:
+                flight = _flights[key] = _Flight(key, message.chat.id)
+                follower = None
+            else:
+                follower = _Follower(message.chat.id, message, url, resume, on_done, flight.chat_id)
+                flight.followers.append(follower)
+                _coalesced += 1
+                started = flight.started
+        if follower is not None:
+            logger.info(f"[DOWNLOAD QUEUE] {url} ({key[1]}) for user {message.chat.id} joins the running download")
+            follower.notify(started)
+            return
+        submit(app, message, url, args, kwargs, flight=flight, on_done=on_done)
+
+    return wrapper
+
+
+def drain_downloads(timeout=None):
+    """Stop taking downloads and wait for the running ones (restart/shutdown)."""
+    if timeout is None:
+        timeout = getattr(LimitsConfig, 'DOWNLOAD_DRAIN_TIMEOUT', 60)
+    if not _scheduler.drain(timeout):
+        logger.warning(f"Downloads still running after {timeout}s drain: {_scheduler.get_stats()['active']}")
+    return _scheduler.get_stats()
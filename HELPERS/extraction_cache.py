@@ -0,0 +1,264 @@
+"""
+Process-wide cache of yt-dlp extraction results shared between users.
+
+The raw extractor result (extract_info(..., process=False)) of a single video
+is cached under its canonical video key (see DATABASE/video_cache_index) plus
+everything that changes what the extractor sees: cookie file contents, proxy
+and extractor-related options.
+Every caller then runs format selection with its own YoutubeDL instance
+(process_ie_result), so per-user format/outtmpl/hooks still apply, and the
+actual download can start from the cached info without re-extracting.
+
+- entries live at most EXTRACTION_CACHE_TTL seconds and never past the
+  earliest "expire" timestamp found in their format URLs (minus a margin),
+- concurrent identical extractions wait for one in-flight call,
+- playlists, live and upcoming streams are extracted normally and not cached.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from CONFIG.limits import LimitsConfig
+from HELPERS.logger import logger
+
+# YoutubeDL params that change the extraction result
+_KEY_PARAMS = (
+    "proxy", "geo_verification_proxy", "source_address", "impersonate",
+    "extractor_args", "cookiesfrombrowser", "username", "http_headers",
+    "geo_bypass", "geo_bypass_country", "geo_bypass_ip_block", "age_limit",
+    "noplaylist", "playlist_items", "playliststart", "playlistend",
+    "playlistreverse", "extract_flat", "allow_unplayable_formats",
+)
+_EXPIRE_RE = re.compile(r"[?&/](?:expire|expires|exp)[=/](\d{10})(?!\d)", re.IGNORECASE)
+_CACHEABLE_LIVE_STATUS = (None, "not_live", "was_live", "post_live")
+# Download errors that mean the cached format URLs went stale
+_STALE_URL_ERRORS = ("HTTP Error 403", "HTTP Error 410", "expired")
+
+
+class _InFlight:
+    __slots__ = ("event", "raw", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.raw = None
+        self.error = None
+
+
+class ExtractionCache:
+    """TTL/LRU cache of raw yt-dlp info dicts with in-flight coalescing."""
+
+    def __init__(self, ttl: float = 300, max_entries: int = 128, expiry_margin: float = 60):
+        self.ttl = ttl
+        self.max_entries = max(1, int(max_entries))
+        self.expiry_margin = expiry_margin
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._inflight: Dict[str, _InFlight] = {}
+        self._cookie_digests: Dict[str, tuple] = {}
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "stored": 0, "expired": 0, "stale_downloads": 0}
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+
+    def _cookie_identity(self, path: Optional[str]) -> str:
+        """Digest of the cookie file contents, so identical cookies share entries."""
+        if not path:
+            return ""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return f"missing:{path}"
+        stamp = (st.st_mtime_ns, st.st_size)
+        cached = self._cookie_digests.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        try:
+            with open(path, "rb") as f:
+                digest = hashlib.sha1(f.read()).hexdigest()
+        except OSError:
+            return f"unreadable:{path}"
+        self._cookie_digests[path] = (stamp, digest)
+        return digest
+
+    def make_key(self, url: str, params: Dict[str, Any]) -> str:
+        # Same canonical video key as the video cache (watch?v=, youtu.be/, shorts/ share it)
+        from DATABASE.video_cache_index import resolve_url
+        kind, ident = resolve_url(url)[0]
+        identity = {name: params.get(name) for name in _KEY_PARAMS if params.get(name) is not None}
+        identity["cookies"] = self._cookie_identity(params.get("cookiefile"))
+        blob = json.dumps(identity, sort_keys=True, default=str)
+        return f"{kind}:{ident or url}|{hashlib.sha1(blob.encode()).hexdigest()}"
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def _entry_ttl(self, raw: Any) -> float:
+        """Seconds the raw result may be reused; 0 when it must not be cached."""
+        if not isinstance(raw, dict) or raw.get("_type", "video") != "video":
+            return 0
+        if raw.get("is_live") or raw.get("live_status") not in _CACHEABLE_LIVE_STATUS:
+            return 0
+        formats = raw.get("formats") or []
+        if not formats and not raw.get("url"):
+            return 0
+        ttl = float(self.ttl)
+        now = time.time()
+        for item in [raw, *formats]:
+            if not isinstance(item, dict):
+                continue
+            for field in ("url", "manifest_url", "fragment_base_url"):
+                value = item.get(field)
+                if not isinstance(value, str):
+                    continue
+                match = _EXPIRE_RE.search(value)
+                if match:
+                    ttl = min(ttl, int(match.group(1)) - now - self.expiry_margin)
+        return max(0.0, ttl)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a private copy of a fresh raw entry, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            if entry[0] <= time.time():
+                del self._entries[key]
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            raw = entry[1]
+        return copy.deepcopy(raw)
+
+    def put(self, key: str, raw: Any) -> Optional[Dict[str, Any]]:
+        """Store a private copy of a raw result if it is cacheable; returns the copy."""
+        ttl = self._entry_ttl(raw)
+        if ttl <= 0:
+            return None
+        stored = copy.deepcopy(raw)
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, stored)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self.stats["stored"] += 1
+        return stored
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    # ------------------------------------------------------------------
+    # yt-dlp integration
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _process(ydl, raw: Dict[str, Any], download: bool):
+        """process_ie_result() with extract_info()'s error reporting."""
+        from yt_dlp.utils import DownloadError, ExtractorError
+        try:
+            return ydl.process_ie_result(raw, download=download)
+        except DownloadError:
+            raise
+        except ExtractorError as e:
+            # Inside extract_info() these are turned into DownloadError the same way
+            ydl.report_error(str(e), e.format_traceback())
+            return None
+
+    def extract_info(self, ydl, url: str):
+        """Drop-in for ydl.extract_info(url, download=False)."""
+        key = self.make_key(url, ydl.params)
+        raw = self.get(key)
+        if raw is not None:
+            return self._process(ydl, raw, download=False)
+
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _InFlight()
+            else:
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            if flight.raw is not None:
+                return self._process(ydl, copy.deepcopy(flight.raw), download=False)
+            # Leader's result was not cacheable (playlist, live, ...)
+            return ydl.extract_info(url, download=False)
+
+        try:
+            raw = ydl.extract_info(url, download=False, process=False)
+            flight.raw = self.put(key, raw)
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+        if raw is None:
+            return None
+        return self._process(ydl, raw, download=False)
+
+    def download(self, ydl, url: str) -> None:
+        """Drop-in for ydl.download([url]) that starts from a cached info dict."""
+        from yt_dlp.utils import DownloadError
+        key = self.make_key(url, ydl.params)
+        raw = self.get(key)
+        if raw is None:
+            ydl.download([url])
+            return
+        try:
+            self._process(ydl, raw, download=True)
+        except DownloadError as e:
+            if not any(marker in str(e) for marker in _STALE_URL_ERRORS):
+                raise
+            # Format URLs expired earlier than advertised: extract again
+            self.invalidate(key)
+            with self._lock:
+                self.stats["stale_downloads"] += 1
+            logger.warning(f"Cached extraction for {url} is stale ({e}), re-extracting")
+            ydl.download([url])
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["entries"] = len(self._entries)
+            stats["in_flight"] = len(self._inflight)
+        return stats
+
+
+extraction_cache = ExtractionCache(
+    ttl=getattr(LimitsConfig, 'EXTRACTION_CACHE_TTL', 300),
+    max_entries=getattr(LimitsConfig, 'EXTRACTION_CACHE_MAX_ENTRIES', 128),
+    expiry_margin=getattr(LimitsConfig, 'EXTRACTION_CACHE_EXPIRY_MARGIN', 60),
+)
+
+
+def cached_extract_info(ydl, url: str):
+    """ydl.extract_info(url, download=False) through the shared extraction cache."""
+    if not getattr(LimitsConfig, 'EXTRACTION_CACHE_ENABLED', True):
+        return ydl.extract_info(url, download=False)
+    return extraction_cache.extract_info(ydl, url)
+
+
+def cached_download(ydl, url: str) -> None:
+    """ydl.download([url]) reusing a cached extraction when one is fresh."""
+    if not getattr(LimitsConfig, 'EXTRACTION_CACHE_ENABLED', True):
+        ydl.download([url])
+        return
+    extraction_cache.download(ydl, url)
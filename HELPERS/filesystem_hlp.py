@@ -7,6 +7,7 @@ import threading
 
 from HELPERS.app_instance import get_app
 from HELPERS.logger import logger
+from HELPERS.user_settings import user_settings
 from HELPERS.limitter import humanbytes
 from CONFIG.config import Config
 from CONFIG.logger_msg import LoggerMsg
@@ -254,6 +255,7 @@ def remove_media(message, only=None, force_clean=False):
                     logger.info(LoggerMsg.FILESYSTEM_REMOVED_FILE_LOG_MSG.format(file_path=file_path))
                 except Exception as e:
                     logger.error(LoggerMsg.FILESYSTEM_FAILED_REMOVE_FILE_LOG_MSG.format(file_path=file_path, error=e))
+        user_settings.invalidate(message.chat.id)
         return
     
     # Check if parallel downloads are allowed and we're not forcing cleanup
@@ -317,6 +319,8 @@ def remove_media(message, only=None, force_clean=False):
                 except Exception as e:
                     logger.error(LoggerMsg.FILESYSTEM_FAILED_REMOVE_FILE_LOG_MSG.format(file_path=file_path, error=e))
     
+    # Setting files may have been deleted above
+    user_settings.invalidate(message.chat.id)
     logger.info(LoggerMsg.FILESYSTEM_MEDIA_CLEANUP_COMPLETED_LOG_MSG.format(user_id=message.chat.id))
 
 # Helper function to sanitize and shorten filenames
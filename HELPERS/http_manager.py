@@ -1,17 +1,220 @@
 """
 HTTP Session Manager with forced connection cleanup
 Prevents hanging connections and CLOSE-WAIT states
+
+LimitsConfig.HTTP_POOL_MODE = "pooled" keeps connections alive in per-host
+pools (with DNS caching and idle reaping); "close" restores the legacy
+Connection: close behaviour.
 """
 
+import ipaddress
+import queue
+import socket
 import threading
 import time
+import weakref
+from urllib.parse import urlsplit
 import requests
 from requests.adapters import HTTPAdapter
+from urllib3 import PoolManager
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.connection import allowed_gai_family, is_connection_dropped
 from urllib3.util.retry import Retry
 from CONFIG.limits import LimitsConfig
 from HELPERS.logger import logger
 
 
+# ----------------------------------------------------------------------
+# Pooled keep-alive mode: per-host counters, DNS cache, idle reaping
+# ----------------------------------------------------------------------
+
+_host_stats = {}
+_host_stats_lock = threading.Lock()
+
+
+def _count(host, field, amount=1):
+    with _host_stats_lock:
+        stats = _host_stats.get(host)
+        if stats is None:
+            stats = _host_stats[host] = {"checkouts": 0, "opened": 0, "errors": 0, "reaped": 0}
+        stats[field] += amount
+
+
+def get_http_pool_stats():
+    """Per-host connection counters: opened, reused, errors, reaped."""
+    with _host_stats_lock:
+        result = {}
+        for host, stats in _host_stats.items():
+            item = dict(stats)
+            item["reused"] = max(0, item.pop("checkouts") - item["opened"])
+            result[host] = item
+        return result
+
+
+class DNSCache:
+    """Small TTL cache in front of getaddrinfo() for pooled connections."""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _is_ip(host):
+        try:
+            ipaddress.ip_address(host.strip("[]"))
+            return True
+        except ValueError:
+            return False
+
+    def resolve(self, host, port):
+        if self.ttl <= 0 or not host or self._is_ip(host):
+            return host
+        key = (host, port)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[1] > now:
+            return entry[0]
+        try:
+            infos = socket.getaddrinfo(host, port, allowed_gai_family(), socket.SOCK_STREAM)
+        except OSError:
+            # Let the connection attempt report the resolution error as usual
+            return host
+        if not infos:
+            return host
+        address = infos[0][4][0]
+        with self._lock:
+            self._entries[key] = (address, now + self.ttl)
+        return address
+
+    def invalidate(self, host):
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == host]:
+                del self._entries[key]
+
+
+_dns_cache = DNSCache(getattr(LimitsConfig, 'HTTP_DNS_CACHE_TTL', 300))
+
+
+class _PooledConnectionMixin:
+    """Counts connection checkouts/opens and connects through the DNS cache."""
+
+    def _new_conn(self):
+        conn = super()._new_conn()
+        _count(self.host, "opened")
+        dns_host = getattr(conn, "_dns_host", None)
+        if dns_host:
+            # TLS still verifies against conn.host; only the socket address is cached
+            conn._dns_host = _dns_cache.resolve(dns_host, conn.port)
+        return conn
+
+    def _get_conn(self, timeout=None):
+        _count(self.host, "checkouts")
+        return super()._get_conn(timeout=timeout)
+
+    def _put_conn(self, conn):
+        if conn is not None:
+            conn._idle_since = time.monotonic()
+        return super()._put_conn(conn)
+
+    def reap_idle(self, idle_timeout):
+        """Close pooled connections idle for too long or closed by the server."""
+        pool = self.pool
+        if pool is None:
+            return
+        taken = []
+        while True:
+            try:
+                taken.append(pool.get(block=False))
+            except queue.Empty:
+                break
+        now = time.monotonic()
+        for conn in taken:
+            if conn is not None and (now - getattr(conn, "_idle_since", now) > idle_timeout
+                                     or is_connection_dropped(conn)):
+                # Closing here is what keeps sockets out of CLOSE-WAIT
+                conn.close()
+                _count(self.host, "reaped")
+                conn = None
+            try:
+                pool.put(conn, block=False)
+            except queue.Full:
+                if conn is not None:
+                    conn.close()
+
+
+class _PooledHTTPConnectionPool(_PooledConnectionMixin, HTTPConnectionPool):
+    pass
+
+
+class _PooledHTTPSConnectionPool(_PooledConnectionMixin, HTTPSConnectionPool):
+    pass
+
+
+_POOL_CLASSES = {"http": _PooledHTTPConnectionPool, "https": _PooledHTTPSConnectionPool}
+_pooled_adapters = weakref.WeakSet()
+_reaper_thread = None
+_reaper_lock = threading.Lock()
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter with keep-alive per-host pools, counters and idle reaping."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = _POOL_CLASSES
+        _pooled_adapters.add(self)
+        _start_reaper()
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+        # SOCKS managers bring their own pool classes
+        if isinstance(manager, PoolManager) and not proxy.lower().startswith("socks"):
+            manager.pool_classes_by_scheme = _POOL_CLASSES
+        return manager
+
+    def send(self, request, *args, **kwargs):
+        try:
+            return super().send(request, *args, **kwargs)
+        except Exception:
+            host = urlsplit(request.url).hostname or ""
+            _count(host, "errors")
+            # The cached address may be stale
+            _dns_cache.invalidate(host)
+            raise
+
+    def reap_idle(self, idle_timeout):
+        managers = [self.poolmanager, *list(self.proxy_manager.values())]
+        for manager in managers:
+            pools = getattr(manager, "pools", None)
+            if pools is None:
+                continue
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if isinstance(pool, _PooledConnectionMixin):
+                    pool.reap_idle(idle_timeout)
+
+
+def _reaper_worker():
+    idle_timeout = getattr(LimitsConfig, 'HTTP_POOL_IDLE_TIMEOUT', 60)
+    while True:
+        time.sleep(max(1, idle_timeout / 2))
+        for adapter in list(_pooled_adapters):
+            try:
+                adapter.reap_idle(idle_timeout)
+            except Exception as e:
+                logger.warning(f"Error reaping idle HTTP connections: {e}")
+
+
+def _start_reaper():
+    global _reaper_thread
+    with _reaper_lock:
+        if _reaper_thread is None or not _reaper_thread.is_alive():
+            _reaper_thread = threading.Thread(target=_reaper_worker, daemon=True, name="HTTP-Idle-Reaper")
+            _reaper_thread.start()
+
+
 class ManagedHTTPSession:
     """
     HTTP Session with automatic cleanup and connection lifetime limits
@@ -29,12 +232,12 @@ class ManagedHTTPSession:
     def _create_session(self):
         """Create a new requests session with proper configuration"""
         session = requests.Session()
+        pooled = getattr(LimitsConfig, 'HTTP_POOL_MODE', 'pooled') == 'pooled'
         
-        # Set headers to minimize connection reuse
-        session.headers.update({
-            'User-Agent': 'tg-ytdlp-bot/1.0',
-            'Connection': 'close'  # Force close connections
-        })
+        session.headers.update({'User-Agent': 'tg-ytdlp-bot/1.0'})
+        if not pooled:
+            # Set headers to minimize connection reuse
+            session.headers['Connection'] = 'close'  # Force close connections
         
         # Configure retry strategy
         retry_strategy = Retry(
@@ -43,13 +246,22 @@ class ManagedHTTPSession:
             status_forcelist=[429, 500, 502, 503, 504],
         )
         
-        # Configure HTTP adapter with connection limits
-        adapter = HTTPAdapter(
-            pool_connections=2,      # Minimal connection pools
-            pool_maxsize=5,          # Small pool size
-            max_retries=retry_strategy,
-            pool_block=False,         # Don't block when pool is full
-        )
+        if pooled:
+            # Keep-alive pools per host; idle sockets are closed by the reaper thread
+            adapter = PooledHTTPAdapter(
+                pool_connections=getattr(LimitsConfig, 'HTTP_POOL_HOSTS', 32),
+                pool_maxsize=getattr(LimitsConfig, 'HTTP_POOL_MAXSIZE', 16),
+                max_retries=retry_strategy,
+                pool_block=False,
+            )
+        else:
+            # Configure HTTP adapter with connection limits
+            adapter = HTTPAdapter(
+                pool_connections=2,      # Minimal connection pools
+                pool_maxsize=5,          # Small pool size
+                max_retries=retry_strategy,
+                pool_block=False,         # Don't block when pool is full
+            )
         
         session.mount('http://', adapter)
         session.mount('https://', adapter)
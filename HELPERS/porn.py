@@ -42,15 +42,33 @@ from CONFIG.domains import DomainsConfig
 import importlib
 import types
 from HELPERS.logger import logger
+from app.services.nsfw.classifier import NSFWClassifier, WHITE, PORN
 
 # --- global lists of domains and keywords ---
 PORN_DOMAINS = set()
 SUPPORTED_SITES = set()
 PORN_KEYWORDS = set()
+# Compiled keyword/domain lists; replaced as a whole by load_domain_lists()
+CLASSIFIER = NSFWClassifier()
+
+
+def build_classifier():
+    """Compile the current keyword/domain lists (whitelists as applied to Config)."""
+    white_keywords = getattr(Config, 'WHITE_KEYWORDS', None)
+    if white_keywords is None:
+        white_keywords = getattr(DomainsConfig, 'WHITE_KEYWORDS', [])
+    return NSFWClassifier(
+        keywords=PORN_KEYWORDS,
+        porn_domains=PORN_DOMAINS,
+        whitelist=getattr(Config, 'WHITELIST', []) or [],
+        greylist=getattr(Config, 'GREYLIST', []) or [],
+        white_keywords=white_keywords or [],
+    )
+
 
 # --- loading lists at start ---
 def load_domain_lists():
-    global PORN_DOMAINS, SUPPORTED_SITES, PORN_KEYWORDS
+    global PORN_DOMAINS, SUPPORTED_SITES, PORN_KEYWORDS, CLASSIFIER
     try:
         with open(Config.PORN_DOMAINS_FILE, 'r', encoding='utf-8', errors='ignore') as f:
             PORN_DOMAINS = set(line.strip().lower() for line in f if line.strip())
@@ -72,6 +90,10 @@ def load_domain_lists():
     except Exception as e:
         logger.error(f"Failed to load {Config.SUPPORTED_SITES_FILE}: {e}")
         SUPPORTED_SITES = set()
+    try:
+        CLASSIFIER = build_classifier()
+    except Exception as e:
+        logger.error(f"Failed to compile porn keyword/domain lists: {e}")
 
 load_domain_lists()
 
@@ -108,37 +130,30 @@ def extract_domain_parts(url):
 # Now we take from config.py
 
 def is_porn_domain(domain_parts):
-    # If any suffix domain is on a whitelist, it is not porn
-    for dom in domain_parts:
-        if dom in Config.WHITELIST:
-            return False
-    # GREYLIST: exclude from domain list check entirely (keywords still apply via is_porn)
-    for dom in domain_parts:
-        if dom in Config.GREYLIST:
-            return False
-    # If any suffix domain is in the porn domains list, treat as porn
-    for dom in domain_parts:
-        if dom in PORN_DOMAINS:
-            return True
-    return False
+    # Whitelist wins over everything, GREYLIST excludes the host from the domain
+    # list check (keywords still apply via is_porn), otherwise any suffix domain
+    # in the porn domains list means porn
+    verdict, _ = CLASSIFIER.domain_verdict(domain_parts)
+    return verdict == PORN
 
 # --- a new function for checking for porn ---
 def is_porn(url, title, description, caption=None, tags=None):
     """
-    Checks content for pornography by domain and keywords (word-boundary regex search)
+    Checks content for pornography by domain and keywords (word-boundary search)
     in title, description, caption, tags and URL. Domain whitelist has highest priority.
     White keywords list can override porn detection for false positive correction.
-    URL keywords are checked with spaces replaced by underscores and dashes.
+    URL keywords match with any non-alphanumeric delimiters (spaces, underscores, dashes...).
     Tags are checked with underscores treated as word separators.
     """
+    classifier = CLASSIFIER
     # 1. Checking the domain (with redirect unwrapping)
     clean_url = unwrap_redirect_url(url).lower()
     domain_parts, _ = extract_domain_parts(clean_url)
-    for dom in Config.WHITELIST:
-        if dom in domain_parts:
-            logger.info(f"is_porn: domain in WHITELIST: {dom}")
-            return False
-    if is_porn_domain(domain_parts):
+    verdict, dom = classifier.domain_verdict(domain_parts)
+    if verdict == WHITE:
+        logger.info(f"is_porn: domain in WHITELIST: {dom}")
+        return False
+    if verdict == PORN:
         logger.info(f"is_porn: domain match: {domain_parts}")
         return True
 
@@ -153,9 +168,8 @@ def is_porn(url, title, description, caption=None, tags=None):
         # Replace underscores with spaces for matching
         tags_lower = tags.lower().replace("_", " ")
     
-    # 3. Prepare URL for keyword checking (replace spaces with underscores and dashes)
+    # 3. URL is checked with delimiter-aware matching
     url_lower = clean_url
-    logger.debug(f"is_porn URL for keyword check: '{url_lower}'")
     
     if not (title_lower or description_lower or caption_lower or tags_lower or url_lower):
         logger.info("is_porn: all text fields and URL empty")
@@ -164,53 +178,31 @@ def is_porn(url, title, description, caption=None, tags=None):
     # 4. We collect a single text for search (including URL and tags)
     combined = " ".join([title_lower, description_lower, caption_lower, tags_lower, url_lower])
     logger.debug(f"is_porn combined text: '{combined}'")
-    logger.debug(f"is_porn keywords: {PORN_KEYWORDS}")
 
     # 5. Check for white keywords first (override porn detection)
-    white_keywords = getattr(DomainsConfig, 'WHITE_KEYWORDS', [])
-    if white_keywords:
-        white_kws = [re.escape(kw.lower()) for kw in white_keywords if kw.strip()]
-        if white_kws:
-            white_pattern = re.compile(r"\b(" + "|".join(white_kws) + r")\b", flags=re.IGNORECASE)
-            if white_pattern.search(combined):
-                logger.info(f"is_porn: white keyword match found, content considered clean: {white_pattern.pattern}")
-                return False
-
-    # 6. Preparing regex patterns
-    # For text fields we use word boundaries with escaped keywords
-    text_kws = [re.escape(kw.lower()) for kw in PORN_KEYWORDS if kw.strip()]
-    # For URL checks we need raw lowercase keywords to build custom delimiter-aware patterns
-    url_kws = [kw.lower() for kw in PORN_KEYWORDS if kw.strip()]
-    if not text_kws:
+    white_match = classifier.white_keyword(combined)
+    if white_match:
+        logger.info(f"is_porn: white keyword match found, content considered clean: {white_match}")
+        return False
+
+    if not classifier.has_keywords:
         # There is not a single valid key
         return False
 
-    # 7. Check for keyword matches in text fields (with word boundaries)
+    # 6. Check for keyword matches in text fields (with word boundaries)
     # Include tags in text fields check (tags already have underscores replaced with spaces)
-    text_pattern = re.compile(r"\b(" + "|".join(text_kws) + r")\b", flags=re.IGNORECASE)
     text_to_check = " ".join([title_lower, description_lower, caption_lower, tags_lower])
-    if text_pattern.search(text_to_check):
-        logger.info(f"is_porn: keyword match in text fields (regex): {text_pattern.pattern}")
+    text_match = classifier.text_keyword(text_to_check)
+    if text_match:
+        logger.info(f"is_porn: keyword match in text fields: {text_match}")
         return True
 
-    # 8. Check for keyword matches in URL with delimiter-aware patterns
+    # 7. Check for keyword matches in URL with delimiter-aware patterns
     # We only trigger when keyword is delimited on both sides by non-alphanumeric chars (e.g. _, -, symbols) or string edges.
-    def _compile_url_keyword_regex(raw_keyword: str) -> re.Pattern:
-        words = [re.escape(w) for w in raw_keyword.split() if w]
-        if not words:
-            # Fallback: compile something that never matches
-            return re.compile(r"a^")
-        # allow ANY non-alphanumeric delimiters between words inside URL
-        joiner = r"[^A-Za-z0-9]+"
-        core = joiner.join(words)
-        # Require non-alphanumeric (or start/end) around the whole keyword
-        return re.compile(rf"(?<![A-Za-z0-9])(?:{core})(?![A-Za-z0-9])", flags=re.IGNORECASE)
-
-    for raw_kw in url_kws:
-        url_pattern = _compile_url_keyword_regex(raw_kw)
-        if url_pattern.search(url_lower):
-            logger.info(f"is_porn: keyword match in URL with delimiters: {raw_kw}")
-            return True
+    url_match = classifier.url_keyword(url_lower)
+    if url_match:
+        logger.info(f"is_porn: keyword match in URL with delimiters: {url_match}")
+        return True
 
     logger.info("is_porn: no keyword matches found")
     return False
@@ -223,19 +215,20 @@ def check_porn_detailed(url, title, description, caption=None):
     Returns: (is_porn: bool, explanation: str)
     """
     explanation_parts = []
+    classifier = CLASSIFIER
     
     # 1. Checking the domain (with redirect unwrapping)
     clean_url = unwrap_redirect_url(url).lower()
     domain_parts, _ = extract_domain_parts(clean_url)
+    verdict, dom = classifier.domain_verdict(domain_parts)
     
     # Check whitelist first
-    for dom in Config.WHITELIST:
-        if dom in domain_parts:
-            explanation_parts.append(messages.PORN_DOMAIN_WHITELIST_MSG.format(domain=dom))
-            return False, " | ".join(explanation_parts)
+    if verdict == WHITE:
+        explanation_parts.append(messages.PORN_DOMAIN_WHITELIST_MSG.format(domain=dom))
+        return False, " | ".join(explanation_parts)
     
     # Check if domain is in porn domains
-    if is_porn_domain(domain_parts):
+    if verdict == PORN:
         explanation_parts.append(messages.PORN_DOMAIN_BLACKLIST_MSG.format(domain_parts=domain_parts))
         return True, " | ".join(explanation_parts)
 
@@ -253,46 +246,25 @@ def check_porn_detailed(url, title, description, caption=None):
     combined = " ".join([title_lower, description_lower, caption_lower])
     
     # 4. Check for white keywords first (override porn detection)
-    white_keywords = getattr(DomainsConfig, 'WHITE_KEYWORDS', [])
-    if white_keywords:
-        white_kws = [re.escape(kw.lower()) for kw in white_keywords if kw.strip()]
-        if white_kws:
-            white_pattern = re.compile(r"\b(" + "|".join(white_kws) + r")\b", flags=re.IGNORECASE)
-            white_matches = white_pattern.findall(combined)
-            if white_matches:
-                explanation_parts.append(messages.PORN_WHITELIST_KEYWORDS_MSG.format(keywords=', '.join(set(white_matches))))
-                return False, " | ".join(explanation_parts)
+    white_matches = classifier.white_keywords_in(combined)
+    if white_matches:
+        explanation_parts.append(messages.PORN_WHITELIST_KEYWORDS_MSG.format(keywords=', '.join(set(white_matches))))
+        return False, " | ".join(explanation_parts)
 
     # 5. Check for porn keywords in text fields
-    text_kws = [re.escape(kw.lower()) for kw in PORN_KEYWORDS if kw.strip()]
-    if not text_kws:
+    if not classifier.has_keywords:
         explanation_parts.append("ℹ️ No porn keywords loaded")
         return False, " | ".join(explanation_parts)
 
     # Check text fields with word boundaries
-    text_pattern = re.compile(r"\b(" + "|".join(text_kws) + r")\b", flags=re.IGNORECASE)
-    text_matches = text_pattern.findall(combined)
+    text_matches = classifier.text_keywords_in(combined)
     
     if text_matches:
         explanation_parts.append(messages.PORN_KEYWORDS_FOUND_MSG.format(keywords=', '.join(set(text_matches))))
         return True, " | ".join(explanation_parts)
 
     # 6. Check for porn keywords in URL with delimiter-aware patterns
-    url_matches = []
-    def _compile_url_keyword_regex(raw_keyword: str) -> re.Pattern:
-        words = [re.escape(w) for w in raw_keyword.split() if w]
-        if not words:
-            return re.compile(r"a^")
-        # allow ANY non-alphanumeric delimiters between words inside URL
-        joiner = r"[^A-Za-z0-9]+"
-        core = joiner.join(words)
-        return re.compile(rf"(?<![A-Za-z0-9])(?:{core})(?![A-Za-z0-9])", flags=re.IGNORECASE)
-
-    for raw_kw in [kw.lower() for kw in PORN_KEYWORDS if kw.strip()]:
-        url_pattern = _compile_url_keyword_regex(raw_kw)
-        matches = url_pattern.findall(url_lower)
-        if matches:
-            url_matches.extend(matches)
+    url_matches = classifier.url_keywords_in(url_lower)
     
     if url_matches:
         explanation_parts.append(f"🔗 NSFW keywords found in URL: {', '.join(set(url_matches))}")
@@ -338,7 +310,7 @@ def reload_all_porn_caches():
     except Exception as e:
         logger.error(f"Failed to apply DomainsConfig to Config: {e}")
 
-    # 3) Reload file-based caches
+    # 3) Reload file-based caches and swap in the recompiled classifier
     load_domain_lists()
 
     # 4) Build counts snapshot
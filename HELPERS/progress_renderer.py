@@ -0,0 +1,315 @@
+"""
+Progress message rendering for the Pyrogram bot.
+
+One renderer thread owns every progress message (download progress, HLS
+cycle animation, hourglass, upload progress). Hooks and animations only
+record the latest state with update() / animate(); every PROGRESS_TICK the
+renderer decides which messages to edit:
+  - a message is edited at most once per adaptive interval (3 s, one more
+    second every 5 minutes, 90 s after an hour; at least 5 s in groups),
+  - edits whose text equals what the message already shows are skipped,
+  - at most PROGRESS_EDIT_RATE edits per second go out for the whole bot;
+    when more messages are due, final states and then the messages edited
+    longest ago go first.
+Edits are sent through the send dispatcher, so they keep their order with
+the other messages of the chat. A direct edit or delete of a message
+(safe_edit_message_text, safe_delete_messages) drops its pending state.
+mirror() also shows the progress of one chat in messages of other chats
+(users waiting for a coalesced download follow its progress).
+A render pass picks its edits and queues them in the dispatcher under one
+hold of the renderer lock, so an edit is either queued before the
+forget() of a direct edit (and sent before it) or never picked at all.
+"""
+import logging
+import threading
+import time
+from pyrogram.errors import FloodWait
+from CONFIG.limits import LimitsConfig
+
+# Not HELPERS.logger: it imports safe_messeger, which imports this module
+logger = logging.getLogger(__name__)
+
+# Seconds between render passes
+PROGRESS_TICK = 0.5
+# Minimum interval between edits of one group message
+_GROUP_INTERVAL = 5.0
+# Failed edits in a row after which a message is dropped
+_MAX_FAILURES = 3
+# Messages showing their latest text are forgotten after this long without updates
+_IDLE_TIMEOUT = 600
+# Errors meaning the message is gone
+_GONE_ERRORS = ("MESSAGE_ID_INVALID", "MESSAGE_EDIT_TIME_EXPIRED", "message to edit not found")
+
+
+def progress_interval(age):
+    """Seconds between edits of a message shown for age seconds."""
+    minutes_passed = int(age // 60)
+    if minutes_passed >= 60:
+        return 90.0
+    # 0-4 min: 3s, 5-9: 4s, ..., 55-59: 14s
+    return 3.0 + minutes_passed // 5
+
+
+class _Entry:
+    __slots__ = ("chat_id", "message_id", "text", "final", "frame", "counter", "stop_event", "max_duration",
+                 "done", "created", "updated", "last_edit", "shown", "in_flight", "failures", "not_before")
+
+    def __init__(self, chat_id, message_id, now):
+        self.chat_id = chat_id
+        self.message_id = message_id
+        self.text = None
+        self.final = False
+        # frame(counter) -> text of an animation, None for static text
+        self.frame = None
+        self.counter = 0
+        self.stop_event = None
+        self.max_duration = None
+        self.done = threading.Event()
+        self.created = now
+        self.updated = now
+        self.last_edit = 0.0
+        self.shown = None
+        self.in_flight = False
+        self.failures = 0
+        self.not_before = 0.0
+
+
+class Animation:
+    """Handle of an animation; join() / is_alive() like the animation threads it replaces."""
+
+    def __init__(self, done):
+        self._done = done
+
+    def join(self, timeout=None):
+        self._done.wait(timeout)
+
+    def is_alive(self):
+        return not self._done.is_set()
+
+
+class ProgressRenderer:
+    """Latest state per progress message, rendered by one thread under a global edit budget."""
+
+    def __init__(self, edit_rate=10.0, edit_burst=10, tick=PROGRESS_TICK, submit=None, clock=time.monotonic):
+        self.edit_rate = float(edit_rate)
+        self.edit_burst = max(1, int(edit_burst))
+        self.tick = tick
+        self._submit = submit or _dispatch_edit
+        self._clock = clock
+        self._tokens = float(self.edit_burst)
+        self._refilled = clock()
+        self._entries = {}
+        # source chat_id -> {(chat_id, message_id): render(text) -> text or None}
+        self._mirrors = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self.stats = {"updates": 0, "edits": 0, "skipped_identical": 0, "deferred": 0, "failed": 0}
+
+    def update(self, chat_id, message_id, text, final=False):
+        """Record the text a progress message should show; final texts are rendered once, then forgotten."""
+        if message_id is None or text is None:
+            return
+        with self._lock:
+            self._set_text(self._entry(chat_id, message_id), text, final)
+            for (target_chat_id, target_message_id), render in list(self._mirrors.get(chat_id, {}).items()):
+                try:
+                    mirrored = render(text)
+                except Exception as e:
+                    logger.warning(f"[PROGRESS] Mirror of {chat_id} to message {target_message_id} failed: {e}")
+                    continue
+                if mirrored is not None:
+                    self._set_text(self._entry(target_chat_id, target_message_id), mirrored, False)
+        self._ensure_thread()
+
+    def mirror(self, source_chat_id, chat_id, message_id, render):
+        """Show render(text) in a message whenever a progress message of source_chat_id gets text.
+
+        render returns None for texts the mirror should skip. The mirror ends
+        with forget() of its message (any direct edit or delete of it).
+        """
+        if message_id is None:
+            return
+        with self._lock:
+            self._mirrors.setdefault(source_chat_id, {})[(chat_id, message_id)] = render
+
+    def animate(self, chat_id, message_id, frame, stop_event=None, max_duration=None):
+        """Edit a message with frame(counter) at the progress interval until stop_event is set."""
+        if message_id is None:
+            done = threading.Event()
+            done.set()
+            return Animation(done)
+        with self._lock:
+            entry = self._entry(chat_id, message_id)
+            entry.frame = frame
+            entry.stop_event = stop_event
+            entry.max_duration = max_duration
+            entry.done = threading.Event()
+            done = entry.done
+        self._ensure_thread()
+        return Animation(done)
+
+    def forget(self, chat_id, message_ids):
+        """Drop pending state of messages edited or deleted directly."""
+        with self._lock:
+            for message_id in message_ids or ():
+                entry = self._entries.pop((chat_id, message_id), None)
+                if entry is not None:
+                    entry.done.set()
+                for source, targets in list(self._mirrors.items()):
+                    if targets.pop((chat_id, message_id), None) is not None and not targets:
+                        del self._mirrors[source]
+
+    def get_stats(self):
+        with self._lock:
+            return {**self.stats, "messages": len(self._entries)}
+
+    def _entry(self, chat_id, message_id):
+        # Caller holds self._lock
+        key = (chat_id, message_id)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _Entry(chat_id, message_id, self._clock())
+        return entry
+
+    def _set_text(self, entry, text, final):
+        # Caller holds self._lock
+        if entry.frame is not None:
+            # Real progress replaces the animation of the same message
+            entry.frame = None
+            entry.done.set()
+        entry.text = text
+        entry.final = entry.final or final
+        entry.updated = self._clock()
+        self.stats["updates"] += 1
+        if text == entry.shown:
+            self.stats["skipped_identical"] += 1
+
+    def _ensure_thread(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="progress-renderer", daemon=True)
+                self._thread.start()
+
+    def _loop(self):
+        while True:
+            time.sleep(self.tick)
+            try:
+                self.render()
+            except Exception as e:
+                logger.error(f"[PROGRESS] Render pass failed: {e}")
+
+    def render(self):
+        """One render pass: edit the due messages the budget allows."""
+        now = self._clock()
+        due = []
+        with self._lock:
+            self._tokens = min(self.edit_burst, self._tokens + (now - self._refilled) * self.edit_rate)
+            self._refilled = now
+            for key, entry in list(self._entries.items()):
+                if entry.frame is not None and self._animation_over(entry, now):
+                    del self._entries[key]
+                    entry.done.set()
+                    continue
+                if entry.in_flight or now < entry.not_before:
+                    continue
+                if entry.frame is None and entry.text == entry.shown and now - entry.updated > _IDLE_TIMEOUT:
+                    del self._entries[key]
+                    entry.done.set()
+                    continue
+                interval = progress_interval(now - entry.created)
+                if entry.chat_id < 0:
+                    interval = max(interval, _GROUP_INTERVAL)
+                if not entry.final and now - entry.last_edit < interval:
+                    continue
+                if entry.frame is not None:
+                    try:
+                        text = entry.frame(entry.counter)
+                    except Exception as e:
+                        logger.warning(f"[PROGRESS] Animation of message {entry.message_id} failed: {e}")
+                        del self._entries[key]
+                        entry.done.set()
+                        continue
+                    entry.counter += 1
+                else:
+                    text = entry.text
+                if text is None or text == entry.shown:
+                    if entry.final:
+                        del self._entries[key]
+                        entry.done.set()
+                    continue
+                due.append((not entry.final, entry.last_edit, entry, text))
+            # Final states first, then the messages edited longest ago
+            due.sort(key=lambda item: item[:2])
+            budget = int(self._tokens)
+            self.stats["deferred"] += max(0, len(due) - budget)
+            due = due[:budget]
+            self._tokens -= len(due)
+            submitted = []
+            for _, _, entry, text in due:
+                entry.in_flight = True
+                entry.last_edit = now
+                if entry.final and entry.text == text:
+                    # Nothing newer can follow a final state
+                    self._entries.pop((entry.chat_id, entry.message_id), None)
+                    entry.done.set()
+                self.stats["edits"] += 1
+                # Queued before the lock is released: a forget() cannot slip in between
+                try:
+                    submitted.append((entry, text, self._submit(entry.chat_id, entry.message_id, text), None))
+                except Exception as e:
+                    submitted.append((entry, text, None, e))
+        # Callbacks take the lock, so they are attached (and may run) only now
+        for entry, text, future, error in submitted:
+            if future is None:
+                self._edited(entry, text, error)
+                continue
+            future.add_done_callback(lambda f, entry=entry, text=text: self._edited(entry, text, f.exception()))
+
+    def _animation_over(self, entry, now):
+        if entry.stop_event is not None and entry.stop_event.is_set():
+            return True
+        if entry.max_duration and now - entry.created > entry.max_duration:
+            logger.warning(f"Animation force-stopped after {entry.max_duration}s for user {entry.chat_id}")
+            return True
+        return False
+
+    def _edited(self, entry, text, error):
+        with self._lock:
+            entry.in_flight = False
+            if error is None or "MESSAGE_NOT_MODIFIED" in str(error):
+                entry.shown = text
+                entry.failures = 0
+                return
+            self.stats["failed"] += 1
+            entry.failures += 1
+            wait = error.value if isinstance(error, FloodWait) else None
+            if wait is not None:
+                # This message waits, the others keep their turns
+                entry.not_before = self._clock() + float(wait)
+            gone = any(marker in str(error) for marker in _GONE_ERRORS)
+            if gone or entry.failures >= _MAX_FAILURES:
+                if self._entries.get((entry.chat_id, entry.message_id)) is entry:
+                    del self._entries[(entry.chat_id, entry.message_id)]
+                entry.done.set()
+        if wait is not None:
+            try:
+                from HELPERS.user_settings import user_settings, FLOOD_WAIT
+                user_settings.write(entry.chat_id, FLOOD_WAIT, str(wait))
+            except Exception:
+                pass
+        logger.debug(f"[PROGRESS] Edit of message {entry.message_id} in {entry.chat_id} failed: {error}")
+
+
+def _dispatch_edit(chat_id, message_id, text):
+    from HELPERS.app_instance import get_app
+    from HELPERS.send_dispatcher import get_send_dispatcher
+    app = get_app()
+    return get_send_dispatcher().submit(chat_id, app.edit_message_text, chat_id, message_id, text)
+
+
+progress_renderer = ProgressRenderer(
+    edit_rate=getattr(LimitsConfig, 'PROGRESS_EDIT_RATE', 10),
+    edit_burst=getattr(LimitsConfig, 'PROGRESS_EDIT_BURST', 10),
+)
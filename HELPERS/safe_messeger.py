@@ -11,14 +11,13 @@ from pyrogram.errors import FloodWait
 import os
 from pyrogram.types import ReplyParameters
 from pyrogram import enums
+from HELPERS.send_dispatcher import dispatch
+from HELPERS.progress_renderer import progress_renderer
+from HELPERS.delete_scheduler import get_delete_scheduler
 
 # Configure local logger
 logger = logging.getLogger(__name__)
 
-# Global message sending throttle to prevent msg_seqno issues
-_last_message_sent = {}
-_message_send_lock = threading.Lock()
-
 # Get app instance dynamically to avoid None issues
 def get_app_safe():
     messages = safe_get_messages(None)
@@ -165,27 +164,16 @@ def safe_send_message(chat_id, text, **kwargs):
         if isinstance(k, str) and k.startswith('_'):
             kwargs.pop(k, None)
 
-    # Throttle message sending to prevent msg_seqno issues
-    with _message_send_lock:
-        last_sent = _last_message_sent.get(chat_id, 0)
-        now = time.time()
-        # Increase minimum spacing to reduce RANDOM_ID_DUPLICATE in high-throughput chats
-        min_spacing = 0.25  # seconds
-        if now - last_sent < min_spacing:
-            time.sleep(min_spacing - (now - last_sent))
-        _last_message_sent[chat_id] = time.time()
-
     for attempt in range(max_retries):
         try:
             app = get_app_safe()
-            return app.send_message(chat_id, text, **kwargs)
+            # Queued per chat: spacing (against RANDOM_ID_DUPLICATE), global rate and short FloodWaits
+            return dispatch(chat_id, app.send_message, chat_id, text, **kwargs)
         except FloodWait as e:
             # Write FloodWait seconds to per-user file and do not spin retries for huge waits
             try:
-                user_dir = os.path.join("users", str(chat_id))
-                os.makedirs(user_dir, exist_ok=True)
-                with open(os.path.join(user_dir, "flood_wait.txt"), 'w') as f:
-                    f.write(str(e.value))
+                from HELPERS.user_settings import user_settings, FLOOD_WAIT
+                user_settings.write(chat_id, FLOOD_WAIT, str(e.value))
             except Exception:
                 pass
             logger.warning(f"Flood wait detected ({e.value}s) while sending message to {chat_id}")
@@ -252,7 +240,7 @@ def safe_forward_messages(chat_id, from_chat_id, message_ids, **kwargs):
     for attempt in range(max_retries):
         try:
             app = get_app_safe()
-            return app.forward_messages(chat_id, from_chat_id, message_ids, **kwargs)
+            return dispatch(chat_id, app.forward_messages, chat_id, from_chat_id, message_ids, **kwargs)
         except Exception as e:
             if "FLOOD_WAIT" in str(e):
                 # Extract wait time
@@ -313,17 +301,20 @@ def safe_edit_message_text(chat_id, message_id, text, **kwargs):
                 pass
         _last_edit_ts_per_chat[chat_id] = time.time()
 
+    # This edit replaces any progress the renderer still has to show in the message
+    progress_renderer.forget(chat_id, [message_id])
+
     for attempt in range(max_retries):
         try:
             app = get_app_safe()
-            return app.edit_message_text(chat_id, message_id, text, **kwargs)
+            # Same chat queue as the renderer's edits: any progress edit the renderer picked
+            # before the forget() above is already queued, so it lands before this one
+            return dispatch(chat_id, app.edit_message_text, chat_id, message_id, text, **kwargs)
         except FloodWait as e:
             # Persist FloodWait info and stop
             try:
-                user_dir = os.path.join("users", str(chat_id))
-                os.makedirs(user_dir, exist_ok=True)
-                with open(os.path.join(user_dir, "flood_wait.txt"), 'w') as f:
-                    f.write(str(e.value))
+                from HELPERS.user_settings import user_settings, FLOOD_WAIT
+                user_settings.write(chat_id, FLOOD_WAIT, str(e.value))
             except Exception:
                 pass
             logger.warning(f"Flood wait detected ({e.value}s) while editing message for {chat_id}")
@@ -370,10 +361,8 @@ def safe_edit_reply_markup(chat_id, message_id, reply_markup=None, **kwargs):
             return app.edit_message_reply_markup(chat_id, message_id, reply_markup=reply_markup, **kwargs)
         except FloodWait as e:
             try:
-                user_dir = os.path.join("users", str(chat_id))
-                os.makedirs(user_dir, exist_ok=True)
-                with open(os.path.join(user_dir, "flood_wait.txt"), 'w') as f:
-                    f.write(str(e.value))
+                from HELPERS.user_settings import user_settings, FLOOD_WAIT
+                user_settings.write(chat_id, FLOOD_WAIT, str(e.value))
             except Exception:
                 pass
             logger.warning(f"Flood wait detected ({e.value}s) while editing reply markup for {chat_id}")
@@ -416,6 +405,8 @@ def safe_delete_messages(chat_id, message_ids, **kwargs):
     max_retries = 3
     retry_delay = 5
 
+    progress_renderer.forget(chat_id, message_ids if isinstance(message_ids, (list, tuple, set)) else [message_ids])
+
     for attempt in range(max_retries):
         try:
             app = get_app_safe()
@@ -466,24 +457,7 @@ def safe_send_message_with_auto_delete(chat_id, text, delete_after_seconds=60, *
     message = safe_send_message(chat_id, text, **kwargs)
     
     if message and hasattr(message, 'id'):
-        # Schedule deletion in a separate thread with better error handling
-        def delete_message_after_delay():
-            try:
-                logger.info(f"[AUTO-DELETE] Scheduling message {message.id} for deletion in {delete_after_seconds} seconds")
-                time.sleep(delete_after_seconds)
-                logger.info(f"[AUTO-DELETE] Attempting to delete message {message.id}")
-                result = safe_delete_messages(chat_id, [message.id])
-                if result:
-                    logger.info(f"[AUTO-DELETE] Successfully deleted message {message.id}")
-                else:
-                    logger.warning(f"[AUTO-DELETE] Failed to delete message {message.id}")
-            except Exception as e:
-                logger.error(f"[AUTO-DELETE] Error in auto-delete thread for message {message.id}: {e}")
-        
-        # Start the deletion thread
-        delete_thread = threading.Thread(target=delete_message_after_delay, daemon=True)
-        delete_thread.start()
-        logger.info(f"[AUTO-DELETE] Started auto-delete thread for message {message.id} (thread: {delete_thread.name})")
+        schedule_delete_message(chat_id, message.id, delete_after_seconds=delete_after_seconds)
     else:
         logger.warning(f"[AUTO-DELETE] Failed to send message or message has no ID: {message}")
     
@@ -503,21 +477,31 @@ def schedule_delete_message(chat_id, message_id, delete_after_seconds=60):
     try:
         if not chat_id or not message_id:
             return False
-
-        def _del():
-            try:
-                logger.info(f"[AUTO-DELETE] Scheduling message {message_id} for deletion in {delete_after_seconds} seconds")
-                time.sleep(delete_after_seconds)
-                safe_delete_messages(chat_id, [message_id])
-            except Exception as e:
-                logger.error(f"[AUTO-DELETE] Error while deleting message {message_id}: {e}")
-
-        t = threading.Thread(target=_del, daemon=True)
-        t.start()
-        return True
-    except Exception:
+        logger.info(f"[AUTO-DELETE] Scheduling message {message_id} for deletion in {delete_after_seconds} seconds")
+        # One timer wheel for all scheduled deletions, kept across restarts
+        return get_delete_scheduler().schedule(chat_id, [message_id], delete_after_seconds)
+    except Exception as e:
+        logger.error(f"[AUTO-DELETE] Error while scheduling deletion of message {message_id}: {e}")
         return False
 
+def cancel_scheduled_delete(chat_id, message_ids):
+    """
+    Keep messages whose deletion was scheduled.
+
+    Args:
+        chat_id: The chat ID
+        message_ids: Message ID or list of message IDs
+    Returns:
+        Number of scheduled deletions cancelled
+    """
+    try:
+        if not isinstance(message_ids, (list, tuple, set)):
+            message_ids = [message_ids]
+        return get_delete_scheduler().cancel(chat_id, message_ids)
+    except Exception as e:
+        logger.error(f"[AUTO-DELETE] Error while cancelling deletion of {message_ids}: {e}")
+        return 0
+
 def schedule_delete_processing_messages(chat_id, delete_after_seconds=5):
     messages = safe_get_messages(None)
     """
@@ -534,27 +518,10 @@ def schedule_delete_processing_messages(chat_id, delete_after_seconds=5):
         if not chat_id:
             return False
 
-        def _del_processing_messages():
-            try:
-                logger.info(f"[AUTO-DELETE] Scheduling deletion of all processing messages for user {chat_id} in {delete_after_seconds} seconds")
-                time.sleep(delete_after_seconds)
-                
-                # Get app instance
-                app = get_app_safe()
-                if not app:
-                    logger.error("[AUTO-DELETE] Cannot get app instance for deleting processing messages")
-                    return
-                
-                # Bots cannot use get_chat_history, so we'll skip this functionality
-                # Instead, we'll rely on the individual message deletion that's already scheduled
-                logger.info(f"[AUTO-DELETE] Skipping chat history scan for user {chat_id} (bots cannot use get_chat_history)")
-                logger.info(f"[AUTO-DELETE] Individual processing messages will be deleted by their own timers")
-                    
-            except Exception as e:
-                logger.error(f"[AUTO-DELETE] Error while deleting processing messages for user {chat_id}: {e}")
-
-        t = threading.Thread(target=_del_processing_messages, daemon=True)
-        t.start()
+        # Bots cannot use get_chat_history, so we'll skip this functionality
+        # Instead, we'll rely on the individual message deletion that's already scheduled
+        logger.info(f"[AUTO-DELETE] Skipping chat history scan for user {chat_id} (bots cannot use get_chat_history)")
+        logger.info(f"[AUTO-DELETE] Individual processing messages will be deleted by their own timers")
         return True
     except Exception:
         return False
@@ -0,0 +1,241 @@
+"""
+Outbound message dispatcher for the Pyrogram bot.
+
+safe_send_message() and safe_forward_messages() hand their API call to the
+dispatcher and wait for its result. Every chat has its own FIFO queue with
+at most one call in flight, so messages to a chat keep their order and a
+busy chat only delays itself:
+  - SEND_WORKERS threads serve the chats whose next call is due, oldest first,
+  - every call takes a token from one bucket for the whole bot
+    (SEND_GLOBAL_RATE per second, bursts of SEND_GLOBAL_BURST), below
+    Telegram's bot-wide limit,
+  - calls to one chat are at least SEND_CHAT_INTERVAL seconds apart,
+  - a FloodWait pauses only the chat that got it. The call is retried after
+    the wait when it is at most SEND_FLOOD_RETRY_MAX seconds; otherwise it,
+    the calls queued behind it and new calls until the wait is over fail
+    with the FloodWait, as a direct call would.
+"""
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from pyrogram.errors import FloodWait
+from CONFIG.limits import LimitsConfig
+
+# Not HELPERS.logger: it imports safe_messeger, which imports this module
+logger = logging.getLogger(__name__)
+
+# Retries of one call after short FloodWaits
+_MAX_FLOOD_RETRIES = 3
+# Idle chat entries are dropped every this many submitted calls
+_PRUNE_EVERY = 1000
+
+
+class TokenBucket:
+    """Thread-safe token bucket; reserve() takes a token and returns how long to wait for it."""
+
+    def __init__(self, rate, burst=1, clock=time.monotonic):
+        self.rate = float(rate)
+        self.capacity = max(1, int(burst))
+        self._clock = clock
+        self._tokens = float(self.capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Going negative queues the caller behind the tokens already promised
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class _Call:
+    __slots__ = ("fn", "args", "kwargs", "future", "flood_retries")
+
+    def __init__(self, fn, args, kwargs):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+        self.flood_retries = 0
+
+
+class _Chat:
+    __slots__ = ("chat_id", "calls", "busy", "scheduled", "not_before", "flood")
+
+    def __init__(self, chat_id):
+        self.chat_id = chat_id
+        self.calls = deque()
+        self.busy = False
+        self.scheduled = False
+        self.not_before = 0.0
+        # FloodWait failing this chat's calls until not_before
+        self.flood = None
+
+
+class SendDispatcher:
+    """Per-chat FIFO queues served by a worker pool under one global token bucket."""
+
+    def __init__(self, workers=8, rate=25.0, burst=5, chat_interval=0.25, flood_retry_max=10,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.workers = max(1, int(workers))
+        self.chat_interval = chat_interval
+        self.flood_retry_max = flood_retry_max
+        self._bucket = TokenBucket(rate, burst, clock)
+        self._clock = clock
+        self._sleep = sleep
+        self._chats = {}
+        # (due time, seq, chat) of chats with a call to run
+        self._due = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._threads = []
+        self._local = threading.local()
+        self.stats = {"submitted": 0, "completed": 0, "failed": 0, "flood_waits": 0, "flood_retries": 0}
+
+    def call(self, chat_id, fn, /, *args, **kwargs):
+        """Run fn(*args, **kwargs) in chat_id's queue and return its result (or raise its error)."""
+        if getattr(self._local, "worker", False):
+            # Called from a dispatched call: queueing it would wait for itself
+            return fn(*args, **kwargs)
+        return self.submit(chat_id, fn, *args, **kwargs).result()
+
+    def submit(self, chat_id, fn, /, *args, **kwargs):
+        call = _Call(fn, args, kwargs)
+        with self._cond:
+            self._ensure_workers()
+            self.stats["submitted"] += 1
+            if self.stats["submitted"] % _PRUNE_EVERY == 0:
+                self._prune()
+            chat = self._chats.get(chat_id)
+            if chat is None:
+                chat = self._chats[chat_id] = _Chat(chat_id)
+            if chat.flood is not None and self._clock() < chat.not_before:
+                self.stats["failed"] += 1
+                call.future.set_exception(chat.flood)
+                return call.future
+            chat.flood = None
+            chat.calls.append(call)
+            self._schedule(chat)
+        return call.future
+
+    def get_stats(self):
+        with self._cond:
+            return {
+                **self.stats,
+                "queued": sum(len(chat.calls) for chat in self._chats.values()),
+                "chats": len(self._chats),
+                "workers": len(self._threads),
+            }
+
+    def _ensure_workers(self):
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, name=f"send-dispatcher-{len(self._threads)}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _schedule(self, chat):
+        # Caller holds self._cond
+        if chat.busy or chat.scheduled or not chat.calls:
+            return
+        chat.scheduled = True
+        heapq.heappush(self._due, (max(chat.not_before, self._clock()), next(self._seq), chat))
+        self._cond.notify()
+
+    def _prune(self):
+        now = self._clock()
+        for chat_id, chat in list(self._chats.items()):
+            if not chat.calls and not chat.busy and chat.not_before <= now:
+                del self._chats[chat_id]
+
+    def _next(self):
+        with self._cond:
+            while True:
+                now = self._clock()
+                if self._due and self._due[0][0] <= now:
+                    chat = heapq.heappop(self._due)[2]
+                    chat.scheduled = False
+                    chat.busy = True
+                    return chat, chat.calls.popleft()
+                self._cond.wait(self._due[0][0] - now if self._due else None)
+
+    def _work(self):
+        self._local.worker = True
+        while True:
+            chat, call = self._next()
+            wait = self._bucket.reserve()
+            if wait > 0:
+                self._sleep(wait)
+            try:
+                result = call.fn(*call.args, **call.kwargs)
+            except FloodWait as e:
+                self._flood(chat, call, e)
+                continue
+            except BaseException as e:
+                self._finish(chat, call, error=e)
+                continue
+            self._finish(chat, call, result=result)
+
+    def _finish(self, chat, call, result=None, error=None):
+        with self._cond:
+            chat.busy = False
+            chat.not_before = max(chat.not_before, self._clock() + self.chat_interval)
+            self._schedule(chat)
+            self.stats["failed" if error is not None else "completed"] += 1
+        if error is not None:
+            call.future.set_exception(error)
+        else:
+            call.future.set_result(result)
+
+    def _flood(self, chat, call, error):
+        seconds = float(getattr(error, "value", 0) or 0)
+        failed = []
+        with self._cond:
+            self.stats["flood_waits"] += 1
+            chat.busy = False
+            chat.not_before = max(chat.not_before, self._clock() + seconds)
+            if seconds <= self.flood_retry_max and call.flood_retries < _MAX_FLOOD_RETRIES:
+                # Retried first so the chat keeps its order
+                call.flood_retries += 1
+                self.stats["flood_retries"] += 1
+                chat.calls.appendleft(call)
+            else:
+                chat.flood = error
+                failed = [call, *chat.calls]
+                chat.calls.clear()
+                self.stats["failed"] += len(failed)
+            self._schedule(chat)
+        logger.warning(f"[SEND] FloodWait {seconds:.0f}s for chat {chat.chat_id}, "
+                       f"{'failing ' + str(len(failed)) + ' queued calls' if failed else 'retrying after the wait'}")
+        for failed_call in failed:
+            failed_call.future.set_exception(error)
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_send_dispatcher():
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                _dispatcher = SendDispatcher(
+                    workers=getattr(LimitsConfig, 'SEND_WORKERS', 8),
+                    rate=getattr(LimitsConfig, 'SEND_GLOBAL_RATE', 25),
+                    burst=getattr(LimitsConfig, 'SEND_GLOBAL_BURST', 5),
+                    chat_interval=getattr(LimitsConfig, 'SEND_CHAT_INTERVAL', 0.25),
+                    flood_retry_max=getattr(LimitsConfig, 'SEND_FLOOD_RETRY_MAX', 10),
+                )
+    return _dispatcher
+
+
+def dispatch(chat_id, fn, /, *args, **kwargs):
+    """Run an outbound API call for chat_id through the dispatcher."""
+    return get_send_dispatcher().call(chat_id, fn, *args, **kwargs)
@@ -0,0 +1,329 @@
+"""
+Per-user settings store.
+
+Settings keep their historical on-disk layout, one small file per setting in
+users/<id>/ (format.txt, split.txt, subs.txt, ..., args.txt as JSON), so
+backups, /clean and the cleanup_user_files whitelist work unchanged.
+
+The store reads all setting files of a user once into an immutable
+UserSettings record and keeps the most recently used records in memory:
+
+- writes go through the store: the file is replaced atomically, the cached
+  record is swapped for an updated copy and listeners are notified,
+- code that deletes files in a user folder (remove_media, /clean) calls
+  invalidate(); records also expire after USER_SETTINGS_CACHE_TTL so edits
+  made by other processes (dashboard cleanup, admin scripts) are picked up.
+"""
+
+import copy
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from CONFIG.limits import LimitsConfig
+from HELPERS.logger import logger
+
+FORMAT = "format.txt"
+SPLIT = "split.txt"
+SUBS = "subs.txt"
+SUBS_AUTO = "subs_auto.txt"
+SUBS_ALWAYS_ASK = "subs_always_ask.txt"
+MEDIAINFO = "mediainfo.txt"
+PROXY = "proxy.txt"
+NSFW_BLUR = "nsfw_blur.txt"
+LINK_MODE = "link_mode.txt"
+TAGS = "tags.txt"
+ARGS = "args.txt"
+LANG = "lang.txt"
+FLOOD_WAIT = "flood_wait.txt"
+
+SETTINGS_FILES = (
+    FORMAT, SPLIT, SUBS, SUBS_AUTO, SUBS_ALWAYS_ASK, MEDIAINFO, PROXY,
+    NSFW_BLUR, LINK_MODE, TAGS, ARGS, LANG, FLOOD_WAIT,
+)
+
+DEFAULT_SPLIT_SIZE = 1950 * 1024 * 1024  # 1.95GB
+
+
+class UserSettings:
+    """Snapshot of one user's setting files with typed accessors."""
+
+    __slots__ = ("user_id", "files", "args", "args_error")
+
+    def __init__(self, user_id: str, files: Dict[str, str]):
+        self.user_id = user_id
+        # File name -> raw file contents, only for files that exist
+        self.files = files
+        self.args: Dict[str, Any] = {}
+        self.args_error: Optional[Exception] = None
+        raw_args = files.get(ARGS)
+        if raw_args is not None:
+            try:
+                args = json.loads(raw_args)
+                if isinstance(args, dict):
+                    self.args = args
+                else:
+                    self.args_error = ValueError(f"{ARGS} is not a JSON object")
+            except ValueError as e:
+                self.args_error = e
+
+    def exists(self, name: str) -> bool:
+        return name in self.files
+
+    def text(self, name: str) -> Optional[str]:
+        """Stripped contents of a setting file, None when it does not exist."""
+        raw = self.files.get(name)
+        return raw.strip() if raw is not None else None
+
+    def get_args(self) -> Dict[str, Any]:
+        """Private copy of the saved /args settings."""
+        return copy.deepcopy(self.args)
+
+    @property
+    def format(self) -> Optional[str]:
+        return self.text(FORMAT)
+
+    @property
+    def split_size(self) -> int:
+        try:
+            return int(self.text(SPLIT))
+        except (TypeError, ValueError):
+            return DEFAULT_SPLIT_SIZE
+
+    @property
+    def subs_language(self) -> Optional[str]:
+        return self.text(SUBS)
+
+    @property
+    def subs_auto(self) -> bool:
+        return self.text(SUBS_AUTO) == "ON"
+
+    @property
+    def subs_always_ask(self) -> bool:
+        return (self.text(SUBS_ALWAYS_ASK) or "").upper() == "ON"
+
+    @property
+    def mediainfo(self) -> bool:
+        return (self.text(MEDIAINFO) or "").upper() == "ON"
+
+    @property
+    def proxy(self) -> bool:
+        return (self.text(PROXY) or "").upper() == "ON"
+
+    @property
+    def nsfw_blur(self) -> bool:
+        # "ON" in nsfw_blur.txt means the blur is switched off; blurred by default
+        return (self.text(NSFW_BLUR) or "").upper() != "ON"
+
+    @property
+    def link_mode(self) -> bool:
+        return self.text(LINK_MODE) == "enabled"
+
+    @property
+    def tags(self) -> List[str]:
+        raw = self.files.get(TAGS) or ""
+        return [line.strip() for line in raw.splitlines() if line.strip()]
+
+    @property
+    def lang(self) -> Optional[str]:
+        return self.text(LANG)
+
+    @property
+    def flood_wait(self) -> Optional[int]:
+        try:
+            return int(self.text(FLOOD_WAIT))
+        except (TypeError, ValueError):
+            return None
+
+
+class UserSettingsStore:
+    """LRU of UserSettings records with write-through file updates."""
+
+    def __init__(self, root: str = "users", max_users: int = 4096, ttl: float = 300):
+        self.root = root
+        self.max_users = max(1, int(max_users))
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._listeners: List[Callable[[str, Optional[str]], None]] = []
+        # Bumped by every write/remove/invalidate; a load that overlapped one is not cached
+        self._generation = 0
+        self.stats = {"hits": 0, "loads": 0, "writes": 0, "invalidations": 0}
+
+    def user_dir(self, user_id) -> str:
+        return os.path.join(self.root, str(user_id))
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def _load(self, uid: str) -> UserSettings:
+        user_dir = self.user_dir(uid)
+        files = {}
+        for name in SETTINGS_FILES:
+            try:
+                with open(os.path.join(user_dir, name), "r", encoding="utf-8") as f:
+                    files[name] = f.read()
+            except FileNotFoundError:
+                continue
+            except (OSError, UnicodeDecodeError) as e:
+                logger.warning(f"Failed to read {name} for user {uid}: {e}")
+        return UserSettings(uid, files)
+
+    def get(self, user_id) -> UserSettings:
+        uid = str(user_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(uid)
+            if entry is not None and now - entry[0] < self.ttl:
+                self._entries.move_to_end(uid)
+                self.stats["hits"] += 1
+                return entry[1]
+            generation = self._generation
+        settings = self._load(uid)
+        with self._lock:
+            self.stats["loads"] += 1
+            if generation == self._generation:
+                self._store(uid, settings, time.monotonic())
+        return settings
+
+    def _store(self, uid: str, settings: UserSettings, stamp: float) -> None:
+        self._entries[uid] = (stamp, settings)
+        self._entries.move_to_end(uid)
+        while len(self._entries) > self.max_users:
+            self._entries.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def _update(self, uid: str, name: str, content: Optional[str]) -> None:
+        with self._lock:
+            self._generation += 1
+            entry = self._entries.get(uid)
+            if entry is None:
+                return
+            files = dict(entry[1].files)
+            if content is None:
+                files.pop(name, None)
+            else:
+                files[name] = content
+            self._store(uid, UserSettings(uid, files), time.monotonic())
+
+    def write(self, user_id, name: str, content: str) -> None:
+        """Replace a setting file atomically and update the cached record."""
+        uid = str(user_id)
+        self._replace(uid, name, content)
+        self._notify(uid, name)
+
+    def _replace(self, uid: str, name: str, content: str) -> None:
+        user_dir = self.user_dir(uid)
+        with self._lock:
+            os.makedirs(user_dir, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                mode="w", encoding="utf-8", dir=user_dir, prefix=f".{name}.", delete=False
+            ) as tmp:
+                tmp.write(content)
+            try:
+                os.replace(tmp.name, os.path.join(user_dir, name))
+            except OSError:
+                try:
+                    os.remove(tmp.name)
+                except OSError:
+                    pass
+                raise
+            self._update(uid, name, content)
+            self.stats["writes"] += 1
+
+    def write_json(self, user_id, name: str, value: Any) -> None:
+        self.write(user_id, name, json.dumps(value, ensure_ascii=False, indent=2))
+
+    def append_lines(self, user_id, name: str, lines: List[str],
+                     key: Callable[[str], str] = lambda line: line) -> List[str]:
+        """Append the lines not yet in a line-per-entry setting file (compared by key).
+
+        The file is read and rewritten under the store lock, so concurrent
+        appends for the same user cannot drop each other's lines. Returns the
+        lines that were added.
+        """
+        uid = str(user_id)
+        with self._lock:
+            try:
+                with open(os.path.join(self.user_dir(uid), name), "r", encoding="utf-8") as f:
+                    content = f.read()
+            except FileNotFoundError:
+                content = ""
+            seen = {key(line.strip()) for line in content.splitlines() if line.strip()}
+            added = []
+            for line in lines:
+                if line and key(line) not in seen:
+                    seen.add(key(line))
+                    added.append(line)
+            if added:
+                if content and not content.endswith("\n"):
+                    content += "\n"
+                self._replace(uid, name, content + "".join(line + "\n" for line in added))
+        if added:
+            self._notify(uid, name)
+        return added
+
+    def remove(self, user_id, name: str) -> bool:
+        """Delete a setting file; returns True if it existed."""
+        uid = str(user_id)
+        with self._lock:
+            try:
+                os.remove(os.path.join(self.user_dir(uid), name))
+                existed = True
+            except FileNotFoundError:
+                existed = False
+            self._update(uid, name, None)
+        self._notify(uid, name)
+        return existed
+
+    def invalidate(self, user_id=None) -> None:
+        """Drop the cached record of a user (all users when None) after out-of-band file changes."""
+        with self._lock:
+            self._generation += 1
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(str(user_id), None)
+            self.stats["invalidations"] += 1
+        self._notify(None if user_id is None else str(user_id), None)
+
+    # ------------------------------------------------------------------
+    # Change notifications
+    # ------------------------------------------------------------------
+
+    def add_listener(self, callback: Callable[[Optional[str], Optional[str]], None]) -> None:
+        """callback(user_id, file_name) after a write/remove; None means "all" after invalidate()."""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def _notify(self, uid: Optional[str], name: Optional[str]) -> None:
+        for callback in list(self._listeners):
+            try:
+                callback(uid, name)
+            except Exception as e:
+                logger.warning(f"User settings listener failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["users"] = len(self._entries)
+        return stats
+
+
+user_settings = UserSettingsStore(
+    max_users=getattr(LimitsConfig, 'USER_SETTINGS_CACHE_MAX_USERS', 4096),
+    ttl=getattr(LimitsConfig, 'USER_SETTINGS_CACHE_TTL', 300),
+)
+
+
+def get_user_settings(user_id) -> UserSettings:
+    """Cached settings record of a user (or chat, for per-chat settings like NSFW blur)."""
+    return user_settings.get(user_id)
@@ -31,24 +31,24 @@ def normalize_url_for_cache(url: str) -> str:
     if domain.endswith('.pornhub.com'):
         base_domain = 'pornhub.com'
         result = urlunparse((parsed.scheme, base_domain, path, parsed.params, parsed.query, parsed.fragment))
-        logger.info(f"normalize_url_for_cache: '{original_url}' -> '{result}' (pornhub)")
+        logger.debug(f"normalize_url_for_cache: '{original_url}' -> '{result}' (pornhub)")
         return result
 
     # TikTok: always strip all params, keep only path
     if 'tiktok.com' in domain:
         result = urlunparse((parsed.scheme, domain, path, '', '', ''))
-        logger.info(f"normalize_url_for_cache: '{original_url}' -> '{result}' (tiktok)")
+        logger.debug(f"normalize_url_for_cache: '{original_url}' -> '{result}' (tiktok)")
         return result
 
     # Shorts and youtu.be: always strip all params
     if ("youtube.com" in domain and path.startswith('/shorts/')):
         result = urlunparse((parsed.scheme, domain, path, '', '', ''))
-        logger.info(f"normalize_url_for_cache: '{original_url}' -> '{result}' (shorts)")
+        logger.debug(f"normalize_url_for_cache: '{original_url}' -> '{result}' (shorts)")
         return result
     if domain == 'youtu.be':
         # For youtu.be always remove query
         result = urlunparse((parsed.scheme, domain, path, '', '', ''))
-        logger.info(f"normalize_url_for_cache: '{original_url}' -> '{result}' (youtu.be)")
+        logger.debug(f"normalize_url_for_cache: '{original_url}' -> '{result}' (youtu.be)")
         return result
 
     # /watch: only v
@@ -61,42 +61,42 @@ def normalize_url_for_cache(url: str) -> str:
         if v:
             new_query = urlencode({'v': v}, doseq=True)
             result = urlunparse((parsed.scheme, domain, path, '', new_query, ''))
-            logger.info(f"normalize_url_for_cache: '{original_url}' -> '{result}' (watch)")
+            logger.debug(f"normalize_url_for_cache: '{original_url}' -> '{result}' (watch)")
             return result
         result = urlunparse((parsed.scheme, domain, path, '', '', ''))
-        logger.info(f"normalize_url_for_cache: '{original_url}' -> '{result}' (watch no v)")
+        logger.debug(f"normalize_url_for_cache: '{original_url}' -> '{result}' (watch no v)")
         return result
     # /playlist: list only
     if 'youtube.com' in domain and path == '/playlist':
         if 'list' in query_params:
             new_query = urlencode({'list': query_params['list']}, doseq=True)
             result = urlunparse((parsed.scheme, domain, path, '', new_query, ''))
-            logger.info(f"normalize_url_for_cache: '{original_url}' -> '{result}' (playlist)")
+            logger.debug(f"normalize_url_for_cache: '{original_url}' -> '{result}' (playlist)")
             return result
         result = urlunparse((parsed.scheme, domain, path, '', '', ''))
-        logger.info(f"normalize_url_for_cache: '{original_url}' -> '{result}' (playlist no list)")
+        logger.debug(f"normalize_url_for_cache: '{original_url}' -> '{result}' (playlist no list)")
         return result
     # /embed: playlist only
     if 'youtube.com' in domain and path.startswith('/embed/'):
         allowed_params = {k: v for k, v in query_params.items() if k == 'playlist'}
         new_query = urlencode(allowed_params, doseq=True)
         result = urlunparse((parsed.scheme, domain, path, '', new_query, ''))
-        logger.info(f"normalize_url_for_cache: '{original_url}' -> '{result}' (embed)")
+        logger.debug(f"normalize_url_for_cache: '{original_url}' -> '{result}' (embed)")
         return result
     # live: only way
     if 'youtube.com' in domain and (path.startswith('/live/') or path.endswith('/live')):
         result = urlunparse((parsed.scheme, domain, path, '', '', ''))
-        logger.info(f"normalize_url_for_cache: '{original_url}' -> '{result}' (live)")
+        logger.debug(f"normalize_url_for_cache: '{original_url}' -> '{result}' (live)")
         return result
     # fallback for CLEAN_QUERY domains (suffix match)
     for clean_domain in getattr(Config, 'CLEAN_QUERY', []):
         if domain == clean_domain or domain.endswith('.' + clean_domain):
             result = urlunparse((parsed.scheme, domain, parsed.path, '', '', ''))
-            logger.info(f"normalize_url_for_cache: '{original_url}' -> '{result}' (clean domain)")
+            logger.debug(f"normalize_url_for_cache: '{original_url}' -> '{result}' (clean domain)")
             return result
     # For all other URLs, return them as they are
     result = urlunparse((parsed.scheme, domain, parsed.path, parsed.params, parsed.query, ''))
-    logger.info(f"normalize_url_for_cache: '{original_url}' -> '{result}' (fallback)")
+    logger.debug(f"normalize_url_for_cache: '{original_url}' -> '{result}' (fallback)")
     return result
 
 
@@ -7,6 +7,7 @@ from URL_PARSERS.tiktok import is_tiktok_url, extract_tiktok_profile, get_clean_
 from HELPERS.filesystem_hlp import create_directory
 from HELPERS.porn import is_porn_domain, extract_domain_parts, SUPPORTED_SITES, unwrap_redirect_url
 from HELPERS.logger import logger
+from HELPERS.user_settings import user_settings, TAGS
 
 def sanitize_autotag(tag: str) -> str:
     # Leave only letters (any language), numbers and _
@@ -237,23 +238,8 @@ def extract_url_range_tags(text: str):
 def save_user_tags(user_id, tags):
     if not tags:
         return
-    user_dir = os.path.join("users", str(user_id))
-    create_directory(user_dir)
-    tags_file = os.path.join(user_dir, "tags.txt")
-    # We read already saved tags
-    existing = set()
-    if os.path.exists(tags_file):
-        with open(tags_file, "r", encoding="utf-8") as f:
-            for line in f:
-                tag = line.strip()
-                if tag:
-                    existing.add(tag.lower())
     # Add new tags (without registering and without repetitions)
-    new_tags = [t for t in tags if t and t.lower() not in existing]
-    if new_tags:
-        with open(tags_file, "a", encoding="utf-8") as f:
-            for tag in new_tags:
-                f.write(tag + "\n")
+    user_settings.append_lines(user_id, TAGS, tags, key=str.lower)
 
 
 # --- an auxiliary function for searching for car tues ---
@@ -14,6 +14,12 @@ from CONFIG.logger_msg import LoggerMsg
 from HELPERS.logger import logger
 
 
+def _http_get(url: str, timeout: int = 10) -> requests.Response:
+    """GET through the shared keep-alive session used for thumbnail fetches."""
+    from HELPERS.http_manager import get_managed_session
+    return get_managed_session("thumbnails").get_session().get(url, timeout=timeout)
+
+
 def extract_service_info(url: str) -> Tuple[str, str]:
     """
     Extract service type and video ID from URL
@@ -395,14 +401,14 @@ def download_vimeo_thumbnail(video_id: str, dest: str) -> bool:
     try:
         # Vimeo API endpoint for video info
         api_url = f"https://vimeo.com/api/v2/video/{video_id}.json"
-        response = requests.get(api_url, timeout=10)
+        response = _http_get(api_url, timeout=10)
         if response.status_code == 200:
             data = response.json()
             if data and len(data) > 0:
                 video_info = data[0]
                 thumbnail_url = video_info.get('thumbnail_large') or video_info.get('thumbnail_medium')
                 if thumbnail_url:
-                    img_response = requests.get(thumbnail_url, timeout=10)
+                    img_response = _http_get(thumbnail_url, timeout=10)
                     if img_response.status_code == 200:
                         with open(dest, 'wb') as f:
                             f.write(img_response.content)
@@ -418,12 +424,12 @@ def download_dailymotion_thumbnail(video_id: str, dest: str) -> bool:
     try:
         # Dailymotion API endpoint
         api_url = f"https://api.dailymotion.com/video/{video_id}?fields=thumbnail_large_url"
-        response = requests.get(api_url, timeout=10)
+        response = _http_get(api_url, timeout=10)
         if response.status_code == 200:
             data = response.json()
             thumbnail_url = data.get('thumbnail_large_url')
             if thumbnail_url:
-                img_response = requests.get(thumbnail_url, timeout=10)
+                img_response = _http_get(thumbnail_url, timeout=10)
                 if img_response.status_code == 200:
                     with open(dest, 'wb') as f:
                         f.write(img_response.content)
@@ -547,7 +553,7 @@ def download_youtube_thumbnail(video_id: str, dest: str) -> bool:
         
         for url in thumbnail_urls:
             try:
-                response = requests.get(url, timeout=10)
+                response = _http_get(url, timeout=10)
                 if response.status_code == 200 and len(response.content) > 1000:  # Check if image is valid
                     with open(dest, 'wb') as f:
                         f.write(response.content)
@@ -10,6 +10,7 @@ from CONFIG.logger_msg import LoggerMsg, get_logger_msg
 from CONFIG.messages import Messages, safe_get_messages
 from HELPERS.caption import caption_editor
 from HELPERS.filesystem_hlp import remove_media
+from HELPERS.user_settings import user_settings
 from COMMANDS.cookies_cmd import save_as_cookie_file, download_cookie, checking_cookie_file, cookies_from_browser
 from COMMANDS.subtitles_cmd import subs_command, clear_subs_check_cache
 from COMMANDS.other_handlers import audio_command_handler, playlist_command
@@ -23,9 +24,10 @@ from COMMANDS.keyboard_cmd import keyboard_command, keyboard_callback_handler
 from COMMANDS.proxy_cmd import proxy_command
 from COMMANDS.link_cmd import link_command
 from COMMANDS.image_cmd import image_command
-from COMMANDS.admin_cmd import get_user_log, send_promo_message, block_user, unblock_user, check_runtime, get_user_details, uncache_command, reload_firebase_cache_command, ban_time_command
+from COMMANDS.admin_cmd import get_user_log, send_promo_message, broadcast_job_command, block_user, unblock_user, check_runtime, get_user_details, uncache_command, reload_firebase_cache_command, ban_time_command
 from DATABASE.cache_db import auto_cache_command
 from DATABASE.firebase_init import is_user_blocked
+from HELPERS.broadcast_job import note_user_reachable
 import os
 from URL_PARSERS.video_extractor import video_url_extractor
 from URL_PARSERS.playlist_utils import is_playlist_with_range
@@ -47,6 +49,8 @@ app = get_app()
 def url_distractor(app, message):
     user_id = message.chat.id
     is_admin = int(user_id) in Config.ADMIN
+    # A user who had blocked the bot is back: include them in broadcasts again
+    note_user_reachable(user_id)
     logger.info(f"🔍 [DEBUG] url_distractor: message.text at function start='{message.text}'")
     text = message.text.strip()
     logger.info(f"🔍 [DEBUG] url_distractor: text after strip='{text}'")
@@ -226,6 +230,7 @@ def url_distractor(app, message):
                 if item not in ["keyboard.txt", "tags.txt", "logs.txt", "lang.txt"]:
                     sub_items = scan_and_remove_recursive_emoji(item_path)
                     removed_items.extend(sub_items)
+            user_settings.invalidate(fake_msg.chat.id)
 
             # Clear YouTube cookie validation cache for this user
             try:
@@ -901,6 +906,7 @@ def url_distractor(app, message):
                 if item not in ["keyboard.txt", "tags.txt", "logs.txt", "lang.txt"]:
                     sub_items = scan_and_remove_recursive(item_path)
                     removed_items.extend(sub_items)
+            user_settings.invalidate(message.chat.id)
 
             # Clear YouTube cookie validation cache for this user
             try:
@@ -1112,6 +1118,11 @@ def url_distractor(app, message):
 
     # ----- Admin Commands -----
     if is_admin:
+        # /broadcast_job Command (checked first: it also starts with /broadcast)
+        if text.startswith(Config.BROADCAST_JOB_COMMAND):
+            broadcast_job_command(app, message)
+            return
+
         # If the message begins with /BroadCast, we process it as BroadCast, regardless
         if text.startswith(Config.BROADCAST_MESSAGE):
             send_promo_message(app, message)
@@ -1171,7 +1182,7 @@ def url_distractor(app, message):
     # Reframed processing for all users (admins and ordinary users)
     if message.reply_to_message:
         # If the reference text begins with /broadcast, then:
-        if text.startswith(Config.BROADCAST_MESSAGE):
+        if text.startswith(Config.BROADCAST_MESSAGE) and not text.startswith(Config.BROADCAST_JOB_COMMAND):
             # Only for admins we call send_promo_message
             if is_admin:
                 send_promo_message(app, message)
@@ -31,14 +31,13 @@ def video_url_extractor(app, message):
     # Create user directory (subscription already checked in url_distractor)
     if not os.path.exists(user_dir):
         os.makedirs(user_dir, exist_ok=True)
-    format_file = os.path.join(user_dir, "format.txt")
+    from HELPERS.user_settings import get_user_settings
 
     # By default, ask for quality if a specific format is not selected
     should_ask = True
     saved_format = None
-    if os.path.exists(format_file):
-        with open(format_file, "r", encoding="utf-8") as f:
-            fmt = f.read().strip()
+    fmt = get_user_settings(user_id).format
+    if fmt is not None:
         # Do not ask only if the format is set and it is NOT "ALWAYS_ASK"
         if fmt != "ALWAYS_ASK":
             should_ask = False
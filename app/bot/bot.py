@@ -1,3 +1,4 @@
+import asyncio
 import logging
 
 from aiogram import Bot, Dispatcher
@@ -9,9 +10,11 @@ from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.types import BotCommand, BotCommandScopeDefault
 from aiogram_dialog import setup_dialogs
 
-from app.core.config import get_config
+from app.core.config import AppConfig, get_config
 from app.core.logging import setup_logging
-from app.infrastructure.database import get_pg_pool, PsycopgConnection, DatabaseSchema
+from app.infrastructure.database import get_pg_pool, PsycopgConnection, DatabaseSchema, DB, MeteredPool
+from app.services.downloader.download_manager import get_download_scheduler
+from app.services.scheduler.broadcast_scheduler import BroadcastScheduler
 
 logger = logging.getLogger(__name__)
 
@@ -50,14 +53,32 @@ async def on_startup(bot: Bot, db_pool) -> None:
     await set_bot_commands(bot)
 
 
-async def on_shutdown(bot: Bot, db_pool=None) -> None:
+async def on_shutdown(bot: Bot, db_pool=None, pool_stats=None) -> None:
     logger.info("Bot shutting down...")
 
+    if pool_stats:
+        logger.info("Database pool usage: %s", pool_stats)
+
     if db_pool:
         await db_pool.close()
         logger.info("Database pool closed")
 
 
+async def drain_downloads(config: AppConfig) -> None:
+    scheduler = get_download_scheduler(config)
+    timeout = config.limits.download_drain_timeout
+    if not await scheduler.drain_async(timeout):
+        logger.warning("Downloads still running after %ds drain", timeout)
+    logger.info("Download queue: %s", scheduler.get_stats())
+
+
+def resume_broadcasts(bot: Bot, db_pool, config: AppConfig) -> asyncio.Task:
+    """Continue broadcasts interrupted by the last shutdown, alongside polling."""
+    db = DB.from_pool(MeteredPool(db_pool))
+    scheduler = BroadcastScheduler(bot, db, config.limits)
+    return asyncio.create_task(scheduler.resume_interrupted())
+
+
 async def start_polling(dp: Dispatcher, bot: Bot) -> None:
     await bot.delete_webhook(drop_pending_updates=True)
     allowed_updates = dp.resolve_used_update_types()
@@ -109,11 +130,13 @@ async def main() -> None:
     from app.bot.middlewares.command_limiter import CommandLimiterMiddleware
 
     dp.update.middleware(ErrorHandlerMiddleware())
-    dp.update.middleware(DataBaseMiddleware())
+    db_middleware = DataBaseMiddleware()
+    dp.update.middleware(db_middleware)
     dp.message.middleware(UserRegistrationMiddleware())
     dp.message.middleware(BlockCheckMiddleware())
     dp.message.middleware(ChatTypeMiddleware())
-    dp.message.middleware(RateLimiterMiddleware(config.limits))
+    rate_limiter = RateLimiterMiddleware(config.limits)
+    dp.message.middleware(rate_limiter)
     dp.message.middleware(CommandLimiterMiddleware(config.limits))
 
     from app.bot.handlers import routers
@@ -121,11 +144,18 @@ async def main() -> None:
 
     setup_dialogs(dp)
 
+    broadcasts: asyncio.Task | None = None
     try:
         dp["db_pool"] = db_pool
         dp["config"] = config
         await on_startup(bot, db_pool)
+        broadcasts = resume_broadcasts(bot, db_pool, config)
         await start_polling(dp, bot)
     finally:
-        await on_shutdown(bot, db_pool)
+        if broadcasts is not None:
+            # Resumed from its last checkpoint on the next start
+            broadcasts.cancel()
+        await drain_downloads(config)
+        await rate_limiter.close()
+        await on_shutdown(bot, db_pool, db_middleware.get_pool_stats())
         await bot.session.close()
@@ -41,7 +41,7 @@ async def get_broadcast_confirm_data(dialog_manager: DialogManager, **kwargs) ->
     data = dialog_manager.dialog_data
     return {
         "broadcast_text": data.get("broadcast_text", ""),
-        "segment": data.get("segment", "all"),
+        "segment": data.get("segment", "everyone"),
     }
 
 
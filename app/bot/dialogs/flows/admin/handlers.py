@@ -1,4 +1,3 @@
-import asyncio
 import logging
 
 from aiogram import Bot
@@ -8,7 +7,9 @@ from aiogram_dialog.widgets.input import ManagedTextInput
 from aiogram_dialog.widgets.kbd import Button
 
 from app.bot.dialogs.flows.admin.states import AdminSG
+from app.core.config import AppConfig
 from app.infrastructure.database.db import DB
+from app.services.scheduler.broadcast_scheduler import BroadcastScheduler
 
 logger = logging.getLogger(__name__)
 
@@ -178,7 +179,7 @@ async def on_select_segment_all(
     button: Button,
     manager: DialogManager,
 ) -> None:
-    manager.dialog_data["segment"] = "all"
+    manager.dialog_data["segment"] = "everyone"
     await manager.switch_to(AdminSG.broadcast_confirm)
 
 
@@ -202,44 +203,26 @@ async def on_send_broadcast(
         return
 
     text = manager.dialog_data.get("broadcast_text", "")
-    segment = manager.dialog_data.get("segment", "all")
-
-    try:
-        if segment == "active":
-            result = await db.users.get_active_users(days=30)
-        else:
-            result = await db.users.get_active_users(days=9999)
-
-        users = result.as_dicts() if result else []
-        sent = 0
-        failed = 0
-        blocked = 0
-
-        for user in users:
-            uid = user.get("id")
-            if not uid:
-                continue
-            try:
-                await bot.send_message(chat_id=uid, text=text)
-                sent += 1
-                await asyncio.sleep(0.04)
-            except Exception as e:
-                if "blocked" in str(e).lower() or "deactivated" in str(e).lower():
-                    blocked += 1
-                else:
-                    failed += 1
-
-        manager.dialog_data.update({
-            "sent": sent,
-            "failed": failed,
-            "blocked": blocked,
-        })
-        await manager.switch_to(
-            AdminSG.broadcast_result, show_mode=ShowMode.DELETE_AND_SEND,
-        )
-    except Exception as e:
-        logger.error("Broadcast error: %s", e)
+    segment = manager.dialog_data.get("segment", "everyone")
+    config: AppConfig | None = manager.middleware_data.get("config")
+
+    scheduler = BroadcastScheduler(bot, db, config.limits if config else None)
+    broadcast_id = await scheduler.create_broadcast(
+        admin_id=callback.from_user.id, text=text, segment=segment,
+    )
+    if broadcast_id is None:
         await callback.answer("Broadcast failed")
+        return
+
+    stats = await scheduler.execute_broadcast(broadcast_id)
+    manager.dialog_data.update({
+        "sent": stats["sent"],
+        "failed": stats["failed"],
+        "blocked": stats["blocked"],
+    })
+    await manager.switch_to(
+        AdminSG.broadcast_result, show_mode=ShowMode.DELETE_AND_SEND,
+    )
 
 
 async def on_add_admin_success(
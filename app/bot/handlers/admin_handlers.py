@@ -7,7 +7,9 @@ from aiogram_dialog import DialogManager, StartMode
 
 from app.bot.dialogs.flows.admin.states import AdminSG
 from app.bot.filters.admin import IsAdmin
+from app.core.config import get_config
 from app.infrastructure.database.db import DB
+from app.services.downloader.download_manager import get_download_scheduler
 
 logger = logging.getLogger(__name__)
 
@@ -71,14 +73,15 @@ async def cmd_unblock_user(message: Message, db: DB) -> None:
 
 @admin_router.message(Command("all"))
 async def cmd_all_stats(message: Message, db: DB) -> None:
-    total = await db.users.get_users_count()
-    day = await db.users.get_users_by_period("day")
-    week = await db.users.get_users_by_period("week")
-    month = await db.users.get_users_by_period("month")
+    async with db.session() as session:
+        total = await session.users.get_users_count()
+        day = await session.users.get_users_by_period("day")
+        week = await session.users.get_users_by_period("week")
+        month = await session.users.get_users_by_period("month")
 
-    downloads_day = await db.downloads.get_count_by_period("day")
-    downloads_week = await db.downloads.get_count_by_period("week")
-    downloads_total = await db.downloads.get_total_count()
+        downloads_day = await session.downloads.get_count_by_period("day")
+        downloads_week = await session.downloads.get_count_by_period("week")
+        downloads_total = await session.downloads.get_total_count()
 
     text = (
         f"<b>Statistics</b>\n\n"
@@ -92,6 +95,23 @@ async def cmd_all_stats(message: Message, db: DB) -> None:
         f"Today: {downloads_day}\n"
         f"Week: {downloads_week}"
     )
+    if db.pool is not None:
+        pool = db.pool.get_stats()
+        text += (
+            f"\n\n<b>DB pool:</b>\n"
+            f"In use: {pool['in_use']}/{pool['max_size']} (peak {pool['peak_in_use']})\n"
+            f"Wait: avg {pool['avg_wait'] * 1000:.0f} ms, max {pool['max_wait'] * 1000:.0f} ms\n"
+            f"Saturated: {pool['saturated']}, timeouts: {pool['timeouts']}"
+        )
+    queue = get_download_scheduler(get_config()).get_stats()
+    text += (
+        f"\n\n<b>Download queue:</b>\n"
+        f"Active: {queue['active']}/{queue['max_active']}, queued: {queue['queued']} "
+        f"(admin {queue['queued_by_lane']['admin']}, paid {queue['queued_by_lane']['paid']})\n"
+        f"Wait: avg {queue['avg_wait']:.1f}s, p95 {queue['p95_wait']:.1f}s, max {queue['max_wait']:.1f}s\n"
+        f"Service: avg {queue['avg_service']:.1f}s, p95 {queue['p95_service']:.1f}s\n"
+        f"Completed: {queue['completed']}, failed: {queue['failed']}, cancelled: {queue['cancelled']}"
+    )
     await message.answer(text)
 
 
@@ -68,16 +68,17 @@ async def _process_download(
                     except Exception as e:
                         logger.warning("Cache forward failed for msg %d: %s", msg_id, e)
                 await progress.stop("Done!")
-                await db.downloads.add(
-                    user_id=user_id, url=url, url_hash=url_hash(url),
-                    title="(cached)", quality="best", media_type=media_type,
-                )
-                await db.users.increment_downloads(user_id, media_type)
+                async with db.session() as session:
+                    await session.downloads.add(
+                        user_id=user_id, url=url, url_hash=url_hash(url),
+                        title="(cached)", quality="best", media_type=media_type,
+                    )
+                    await session.users.increment_downloads(user_id, media_type)
                 return
 
         await progress.start(f"Downloading {media_type}")
 
-        manager = DownloadManager(config)
+        manager = DownloadManager(config, progress=progress)
 
         if media_type == "audio":
             result = await manager.download_audio(url, user_id=user_id)
@@ -128,13 +129,14 @@ async def _process_download(
                         title=result.title,
                     )
 
-        await db.downloads.add(
-            user_id=user_id, url=url, url_hash=url_hash(url),
-            title=result.title, quality="best", media_type=media_type,
-            file_size_bytes=result.file_size, duration_sec=result.duration,
-            is_nsfw=nsfw,
-        )
-        await db.users.increment_downloads(user_id, media_type)
+        async with db.session() as session:
+            await session.downloads.add(
+                user_id=user_id, url=url, url_hash=url_hash(url),
+                title=result.title, quality="best", media_type=media_type,
+                file_size_bytes=result.file_size, duration_sec=result.duration,
+                is_nsfw=nsfw,
+            )
+            await session.users.increment_downloads(user_id, media_type)
 
         await progress.stop(f"Done! {len(msg_ids)} file(s) sent.")
 
@@ -55,7 +55,7 @@ async def group_url_handler(message: Message, bot: Bot, db: DB) -> None:
         try:
             await progress.start("Downloading")
 
-            manager = DownloadManager(config)
+            manager = DownloadManager(config, progress=progress)
             result = await manager.download_video(url, user_id=message.from_user.id)
 
             if not result.success:
@@ -73,13 +73,14 @@ async def group_url_handler(message: Message, bot: Bot, db: DB) -> None:
                 media_type="video",
             )
 
-            await db.downloads.add(
-                user_id=message.from_user.id, url=url,
-                url_hash=url_hash(url), title=result.title,
-                quality="best", media_type="video",
-                file_size_bytes=result.file_size, duration_sec=result.duration,
-            )
-            await db.users.increment_downloads(message.from_user.id, "video")
+            async with db.session() as session:
+                await session.downloads.add(
+                    user_id=message.from_user.id, url=url,
+                    url_hash=url_hash(url), title=result.title,
+                    quality="best", media_type="video",
+                    file_size_bytes=result.file_size, duration_sec=result.duration,
+                )
+                await session.users.increment_downloads(message.from_user.id, "video")
 
             await progress.stop(f"Done! {len(result.files)} file(s) sent.")
             manager.cleanup_files(result.files)
@@ -48,7 +48,7 @@ async def cmd_img(message: Message, bot: Bot, db: DB) -> None:
             config = get_config()
             await progress.start("Downloading images")
 
-            manager = DownloadManager(config)
+            manager = DownloadManager(config, progress=progress)
             result = await manager.download_images(
                 url, count=max_count, user_id=message.from_user.id
             )
@@ -80,13 +80,14 @@ async def cmd_img(message: Message, bot: Bot, db: DB) -> None:
                 except Exception as e:
                     logger.warning("Image log forward failed: %s", e)
 
-            await db.downloads.add(
-                user_id=message.from_user.id, url=url,
-                url_hash=url_hash(url),
-                title=f"{len(result.files)} images", quality="original",
-                media_type="image", file_size_bytes=result.file_size,
-            )
-            await db.users.increment_downloads(message.from_user.id, "image")
+            async with db.session() as session:
+                await session.downloads.add(
+                    user_id=message.from_user.id, url=url,
+                    url_hash=url_hash(url),
+                    title=f"{len(result.files)} images", quality="original",
+                    media_type="image", file_size_bytes=result.file_size,
+                )
+                await session.users.increment_downloads(message.from_user.id, "image")
 
             await progress.stop(f"Done! {len(result.files)} image(s) sent.")
             manager.cleanup_files(result.files)
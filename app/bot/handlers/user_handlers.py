@@ -211,17 +211,18 @@ async def _process_url_download(
                     except Exception as e:
                         logger.warning("Cache forward failed: %s", e)
                 await progress.stop("Done!")
-                await db.downloads.add(
-                    user_id=message.from_user.id, url=url,
-                    url_hash=url_hash(url), title="(cached)",
-                    quality="best", media_type="video",
-                )
-                await db.users.increment_downloads(message.from_user.id, "video")
+                async with db.session() as session:
+                    await session.downloads.add(
+                        user_id=message.from_user.id, url=url,
+                        url_hash=url_hash(url), title="(cached)",
+                        quality="best", media_type="video",
+                    )
+                    await session.users.increment_downloads(message.from_user.id, "video")
                 return
 
         await progress.start("Downloading")
 
-        manager = DownloadManager(config)
+        manager = DownloadManager(config, progress=progress)
         result = await manager.download_video(url, user_id=message.from_user.id)
 
         if not result.success:
@@ -262,14 +263,15 @@ async def _process_url_download(
                         title=result.title,
                     )
 
-        await db.downloads.add(
-            user_id=message.from_user.id, url=url,
-            url_hash=url_hash(url), title=result.title,
-            quality="best", media_type="video",
-            file_size_bytes=result.file_size, duration_sec=result.duration,
-            is_nsfw=nsfw,
-        )
-        await db.users.increment_downloads(message.from_user.id, "video")
+        async with db.session() as session:
+            await session.downloads.add(
+                user_id=message.from_user.id, url=url,
+                url_hash=url_hash(url), title=result.title,
+                quality="best", media_type="video",
+                file_size_bytes=result.file_size, duration_sec=result.duration,
+                is_nsfw=nsfw,
+            )
+            await session.users.increment_downloads(message.from_user.id, "video")
 
         await progress.stop(f"Done! {len(msg_ids)} file(s) sent.")
         manager.cleanup_files(result.files)
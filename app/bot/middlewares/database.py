@@ -6,12 +6,24 @@ from aiogram.types import Update
 from psycopg_pool import AsyncConnectionPool
 
 from app.infrastructure.database.db import DB
-from app.infrastructure.database.connection.psycopg_connection import PsycopgConnection
+from app.infrastructure.database.connection.pool import MeteredPool
 
 logger = logging.getLogger(__name__)
 
 
 class DataBaseMiddleware(BaseMiddleware):
+    """Provides `db` to handlers without pinning a pool connection.
+
+    Each query borrows a connection for its own short transaction; handlers
+    group related queries with `async with db.session() as session:`. A
+    handler awaiting a download or upload (or a task it spawned) therefore
+    holds no connection meanwhile.
+    """
+
+    def __init__(self) -> None:
+        self._db_pool: AsyncConnectionPool | None = None
+        self._db: DB | None = None
+
     async def __call__(
         self,
         handler: Callable[[Update, dict[str, Any]], Awaitable[Any]],
@@ -24,8 +36,12 @@ class DataBaseMiddleware(BaseMiddleware):
             logger.error("Database pool is not provided in middleware data")
             raise RuntimeError("Missing db_pool in middleware context")
 
-        async with db_pool.connection() as raw_connection:
-            async with raw_connection.transaction():
-                connection = PsycopgConnection(raw_connection)
-                data["db"] = DB(connection)
-                return await handler(event, data)
+        if self._db is None or self._db_pool is not db_pool:
+            self._db_pool = db_pool
+            self._db = DB.from_pool(MeteredPool(db_pool))
+
+        data["db"] = self._db
+        return await handler(event, data)
+
+    def get_pool_stats(self) -> dict[str, Any] | None:
+        return self._db.pool.get_stats() if self._db is not None else None
@@ -1,5 +1,7 @@
+import asyncio
 import logging
 import re
+from datetime import datetime, timezone
 from typing import Any, Awaitable, Callable
 
 from aiogram import BaseMiddleware
@@ -7,15 +9,33 @@ from aiogram.types import Message, TelegramObject
 
 from app.core.config import LimitsConfig
 from app.infrastructure.database.db import DB
+from app.services.rate_limit.limiter import PERIODS, WINDOWS, SlidingWindowLimiter
 
 logger = logging.getLogger(__name__)
 
 URL_PATTERN = re.compile(r"https?://\S+")
 
+# Counters older than the previous day window no longer affect any estimate
+_MAX_COUNTER_AGE = 2 * WINDOWS[-1]
+
 
 class RateLimiterMiddleware(BaseMiddleware):
-    def __init__(self, limits: LimitsConfig) -> None:
+    """URL rate limits checked in memory; counters are saved to rate_limits periodically."""
+
+    def __init__(self, limits: LimitsConfig, save_interval: float = 30.0) -> None:
         self.limits = limits
+        self.limiter = SlidingWindowLimiter(
+            limits=(limits.rate_limit_per_minute, limits.rate_limit_per_hour, limits.rate_limit_per_day),
+            cooldowns=(
+                limits.rate_limit_cooldown_minute,
+                limits.rate_limit_cooldown_hour,
+                limits.rate_limit_cooldown_day,
+            ),
+        )
+        self.save_interval = save_interval
+        self._db: DB | None = None
+        self._restore_lock = asyncio.Lock()
+        self._save_task: asyncio.Task | None = None
         super().__init__()
 
     async def __call__(
@@ -37,34 +57,93 @@ class RateLimiterMiddleware(BaseMiddleware):
         if db is None:
             return await handler(event, data)
 
-        user_id = event.from_user.id
+        if self._db is None:
+            await self._restore(db)
+
         is_group = data.get("is_group", False)
         multiplier = self.limits.group_multiplier if is_group else 1
 
-        checks = [
-            ("minute", 60, self.limits.rate_limit_per_minute // multiplier),
-            ("hour", 3600, self.limits.rate_limit_per_hour // multiplier),
-            ("day", 86400, self.limits.rate_limit_per_day // multiplier),
-        ]
-
-        for period, window, limit in checks:
-            if await db.rate_limits.is_on_cooldown(user_id, period):
-                await event.answer(f"Rate limited. Please wait before sending more URLs.")
-                return None
-
-            result = await db.rate_limits.increment_or_create(user_id, period, window)
-            if result and not result.is_empty():
-                count = result.data.get("request_count", 0)
-                if count > limit:
-                    cooldowns = {
-                        "minute": self.limits.rate_limit_cooldown_minute,
-                        "hour": self.limits.rate_limit_cooldown_hour,
-                        "day": self.limits.rate_limit_cooldown_day,
-                    }
-                    from datetime import datetime, timedelta, timezone
-                    cooldown_until = datetime.now(timezone.utc) + timedelta(seconds=cooldowns[period])
-                    await db.rate_limits.set_cooldown(user_id, period, cooldown_until)
-                    await event.answer(f"Too many URLs. Cooldown: {cooldowns[period] // 60} min.")
-                    return None
-
-        return await handler(event, data)
+        decision = self.limiter.check(event.from_user.id, divisor=multiplier)
+        if decision.allowed:
+            return await handler(event, data)
+
+        if decision.new_cooldown:
+            await event.answer(f"Too many URLs. Cooldown: {int(decision.retry_after) // 60} min.")
+        else:
+            await event.answer(f"Rate limited. Please wait before sending more URLs.")
+        return None
+
+    async def _restore(self, db: DB) -> None:
+        async with self._restore_lock:
+            if self._db is not None:
+                return
+            try:
+                result = await db.rate_limits.get_active_counters(_MAX_COUNTER_AGE)
+                self.limiter.restore(_rows_from_table(result.data))
+            except Exception as e:
+                logger.error("Failed to load rate limit counters: %s", e)
+            self._db = db
+            self._save_task = asyncio.create_task(self._save_loop())
+
+    async def _save_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.save_interval)
+            await self.flush()
+            self.limiter.prune()
+
+    async def flush(self) -> None:
+        """Write counters changed since the last flush in one statement."""
+        if self._db is None:
+            return
+        dirty = self.limiter.dirty_keys()
+        if not dirty:
+            return
+        columns: tuple[list, ...] = ([], [], [], [], [], [])
+        for user_id in dirty:
+            row = self.limiter.export(user_id)
+            if row is None:
+                continue
+            cooldown_until, cooldown_period = row[0], row[1]
+            for i, period in enumerate(PERIODS):
+                start, count, previous = row[2 + 3 * i: 5 + 3 * i]
+                columns[0].append(user_id)
+                columns[1].append(period)
+                columns[2].append(count)
+                columns[3].append(previous)
+                columns[4].append(datetime.fromtimestamp(start * WINDOWS[i], timezone.utc))
+                columns[5].append(
+                    datetime.fromtimestamp(cooldown_until, timezone.utc) if cooldown_period == i else None
+                )
+        try:
+            await self._db.rate_limits.save_counters(*columns)
+            await self._db.rate_limits.delete_expired(_MAX_COUNTER_AGE)
+        except Exception as e:
+            self.limiter.mark_dirty(dirty)
+            logger.error("Failed to save rate limit counters: %s", e)
+
+    async def close(self) -> None:
+        if self._save_task is not None:
+            self._save_task.cancel()
+            self._save_task = None
+        await self.flush()
+
+
+def _rows_from_table(records: list[dict[str, Any]]) -> dict[int, list[Any]]:
+    """rate_limits rows -> SlidingWindowLimiter.restore() rows."""
+    rows: dict[int, list[Any]] = {}
+    for record in records:
+        period = record.get("period")
+        if period not in PERIODS:
+            continue
+        i = PERIODS.index(period)
+        row = rows.setdefault(record["user_id"], [0.0, -1] + [0, 0, 0] * len(PERIODS))
+        window_start = record.get("window_start")
+        if window_start is not None:
+            row[2 + 3 * i] = int(window_start.timestamp() // WINDOWS[i])
+        row[3 + 3 * i] = record.get("request_count") or 0
+        row[4 + 3 * i] = record.get("previous_count") or 0
+        cooldown_until = record.get("cooldown_until")
+        if cooldown_until is not None and cooldown_until.timestamp() > row[0]:
+            row[0] = cooldown_until.timestamp()
+            row[1] = i
+    return rows
@@ -208,6 +208,16 @@ class LimitsConfig(BaseSettings):
     cookie_cache_max_lifetime: int = Field(default=7200)
     youtube_cookie_retry_limit_per_hour: int = Field(default=8)
     youtube_cookie_retry_window: int = Field(default=3600)
+    download_max_active: int = Field(default=4)
+    download_max_per_host: int = Field(default=2)
+    download_max_per_user: int = Field(default=1)
+    download_weight_admin: int = Field(default=8)
+    download_weight_paid: int = Field(default=4)
+    download_drain_timeout: int = Field(default=60)
+    broadcast_rate: float = Field(default=25.0)
+    broadcast_burst: int = Field(default=5)
+    broadcast_workers: int = Field(default=8)
+    broadcast_page_size: int = Field(default=250)
 
     model_config = {"extra": "ignore"}
 
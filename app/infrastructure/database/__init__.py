@@ -2,6 +2,7 @@ from .db import DB
 from .connection.base import BaseConnection
 from .connection.psycopg_connection import PsycopgConnection
 from .connection.connect_to_pg import get_pg_pool
+from .connection.pool import MeteredPool, PooledConnection
 from .schema import DatabaseSchema
 
 __all__ = [
@@ -9,5 +10,7 @@ __all__ = [
     "BaseConnection",
     "PsycopgConnection",
     "get_pg_pool",
+    "MeteredPool",
+    "PooledConnection",
     "DatabaseSchema",
 ]
@@ -0,0 +1,158 @@
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator
+
+from psycopg import AsyncConnection
+from psycopg_pool import AsyncConnectionPool, PoolTimeout
+
+from app.infrastructure.database.connection.base import BaseConnection
+from app.infrastructure.database.connection.psycopg_connection import PsycopgConnection
+from app.infrastructure.database.query.results import (
+    MultipleQueryResult,
+    SingleQueryResult,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PoolMetrics:
+    acquisitions: int = 0
+    in_use: int = 0
+    peak_in_use: int = 0
+    waiting: int = 0
+    peak_waiting: int = 0
+    # Acquisitions requested while every connection was in use or promised to an earlier waiter
+    saturated: int = 0
+    timeouts: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+    total_hold: float = 0.0
+    max_hold: float = 0.0
+
+
+class MeteredPool:
+    """AsyncConnectionPool wrapper recording wait time, usage and saturation."""
+
+    def __init__(self, pool: AsyncConnectionPool, slow_wait: float = 1.0) -> None:
+        self._pool = pool
+        self._slow_wait = slow_wait
+        self.metrics = PoolMetrics()
+
+    @property
+    def pool(self) -> AsyncConnectionPool:
+        return self._pool
+
+    @property
+    def max_size(self) -> int:
+        return self._pool.max_size
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[AsyncConnection]:
+        metrics = self.metrics
+        if metrics.in_use + metrics.waiting >= self.max_size:
+            metrics.saturated += 1
+        metrics.waiting += 1
+        metrics.peak_waiting = max(metrics.peak_waiting, metrics.waiting)
+        waiting = True
+        started = time.monotonic()
+        try:
+            async with self._pool.connection() as raw_connection:
+                acquired = time.monotonic()
+                metrics.waiting -= 1
+                waiting = False
+                self._record_wait(acquired - started)
+                metrics.in_use += 1
+                metrics.peak_in_use = max(metrics.peak_in_use, metrics.in_use)
+                try:
+                    yield raw_connection
+                finally:
+                    metrics.in_use -= 1
+                    hold = time.monotonic() - acquired
+                    metrics.total_hold += hold
+                    metrics.max_hold = max(metrics.max_hold, hold)
+        except PoolTimeout:
+            if not waiting:
+                raise
+            metrics.timeouts += 1
+            logger.error(
+                "Timed out waiting for a database connection after %.1fs (%d/%d in use)",
+                time.monotonic() - started, metrics.in_use, self.max_size,
+            )
+            raise
+        finally:
+            if waiting:
+                metrics.waiting -= 1
+
+    def _record_wait(self, wait: float) -> None:
+        metrics = self.metrics
+        metrics.acquisitions += 1
+        metrics.total_wait += wait
+        metrics.max_wait = max(metrics.max_wait, wait)
+        if wait >= self._slow_wait:
+            logger.warning(
+                "Waited %.2fs for a database connection (%d/%d in use)",
+                wait, metrics.in_use, self.max_size,
+            )
+
+    def get_stats(self) -> dict[str, Any]:
+        stats: dict[str, Any] = asdict(self.metrics)
+        acquisitions = self.metrics.acquisitions
+        stats["max_size"] = self.max_size
+        stats["saturation"] = self.metrics.in_use / self.max_size if self.max_size else 0.0
+        stats["avg_wait"] = self.metrics.total_wait / acquisitions if acquisitions else 0.0
+        stats["avg_hold"] = self.metrics.total_hold / acquisitions if acquisitions else 0.0
+        try:
+            stats["pool"] = self._pool.get_stats()
+        except Exception:
+            pass
+        return stats
+
+
+class PooledConnection(BaseConnection):
+    """Borrows a pool connection per statement; each statement commits on its own."""
+
+    def __init__(self, pool: MeteredPool) -> None:
+        self._pool = pool
+
+    async def execute(
+        self,
+        sql: str,
+        params: tuple[Any, ...] | None = None,
+    ) -> int:
+        async with self._pool.connection() as raw_connection:
+            return await PsycopgConnection(raw_connection).execute(sql, params)
+
+    async def fetchone(
+        self,
+        sql: str,
+        params: tuple[Any, ...] | None = None,
+    ) -> SingleQueryResult:
+        async with self._pool.connection() as raw_connection:
+            return await PsycopgConnection(raw_connection).fetchone(sql, params)
+
+    async def fetchmany(
+        self,
+        sql: str,
+        params: tuple[Any, ...] | None = None,
+    ) -> MultipleQueryResult:
+        async with self._pool.connection() as raw_connection:
+            return await PsycopgConnection(raw_connection).fetchmany(sql, params)
+
+    async def insert_and_fetchone(
+        self,
+        sql: str,
+        params: tuple[Any, ...],
+    ) -> SingleQueryResult:
+        async with self._pool.connection() as raw_connection:
+            return await PsycopgConnection(raw_connection).insert_and_fetchone(sql, params)
+
+    async def update_and_fetchone(
+        self,
+        sql: str,
+        params: tuple[Any, ...],
+    ) -> SingleQueryResult:
+        async with self._pool.connection() as raw_connection:
+            return await PsycopgConnection(raw_connection).update_and_fetchone(sql, params)
@@ -1,4 +1,9 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from app.infrastructure.database.connection.base import BaseConnection
+from app.infrastructure.database.connection.pool import MeteredPool, PooledConnection
+from app.infrastructure.database.connection.psycopg_connection import PsycopgConnection
 from app.infrastructure.database.tables.users import UsersTable
 from app.infrastructure.database.tables.admins import AdminsTable
 from app.infrastructure.database.tables.downloads import DownloadsTable
@@ -9,8 +14,9 @@ from app.infrastructure.database.tables.rate_limits import RateLimitsTable
 
 
 class DB:
-    def __init__(self, connection: BaseConnection) -> None:
+    def __init__(self, connection: BaseConnection, pool: MeteredPool | None = None) -> None:
         self.connection = connection
+        self.pool = pool
         self.users = UsersTable(connection=connection)
         self.admins = AdminsTable(connection=connection)
         self.downloads = DownloadsTable(connection=connection)
@@ -18,3 +24,22 @@ class DB:
         self.video_cache = VideoCacheTable(connection=connection)
         self.statistics = StatisticsTable(connection=connection)
         self.rate_limits = RateLimitsTable(connection=connection)
+
+    @classmethod
+    def from_pool(cls, pool: MeteredPool) -> "DB":
+        """DB holding no connection: every query borrows one from the pool."""
+        return cls(PooledConnection(pool), pool=pool)
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator["DB"]:
+        """Unit of work: one connection and transaction for the queries in the block.
+
+        Keep the block around the queries only; a DB bound to a single
+        connection (no pool) is its own session.
+        """
+        if self.pool is None:
+            yield self
+            return
+        async with self.pool.connection() as raw_connection:
+            async with raw_connection.transaction():
+                yield DB(PsycopgConnection(raw_connection))
@@ -20,5 +20,8 @@ class BroadcastModel(BaseModel):
     sent_count: int = 0
     failed_count: int = 0
     blocked_count: int = 0
+    last_user_id: int | None = None
+    started_at: datetime | None = None
+    checkpoint_at: datetime | None = None
     created_at: datetime | None = None
     completed_at: datetime | None = None
@@ -18,6 +18,8 @@ class DatabaseSchema:
         "006_create_broadcasts_table.sql",
         "007_create_video_cache_table.sql",
         "008_reconcile_schema.sql",
+        "009_rate_limits_sliding_window.sql",
+        "010_broadcasts_checkpoint.sql",
     ]
 
     def __init__(self, connection: BaseConnection) -> None:
@@ -72,6 +72,58 @@ class BroadcastsTable(BaseTable):
             params=(total_recipients, sent_count, failed_count, blocked_count, broadcast_id),
         )
 
+    async def start(self, broadcast_id: int) -> SingleQueryResult:
+        """Mark a broadcast as sending; also matches one interrupted while sending."""
+        return await self._connection.update_and_fetchone(
+            sql="""
+                UPDATE broadcasts SET
+                    status = 'sending', started_at = COALESCE(started_at, NOW())
+                WHERE id = %s AND status IN ('draft', 'pending', 'scheduled', 'sending')
+                RETURNING *
+            """,
+            params=(broadcast_id,),
+        )
+
+    async def checkpoint(
+        self,
+        broadcast_id: int,
+        last_user_id: int,
+        sent_count: int = 0,
+        failed_count: int = 0,
+        blocked_count: int = 0,
+    ) -> SingleQueryResult:
+        """Add the results of recipients up to last_user_id to the counters."""
+        return await self._connection.update_and_fetchone(
+            sql="""
+                UPDATE broadcasts SET
+                    last_user_id = %s,
+                    sent_count = sent_count + %s,
+                    failed_count = failed_count + %s,
+                    blocked_count = blocked_count + %s,
+                    total_recipients = total_recipients + %s,
+                    checkpoint_at = NOW()
+                WHERE id = %s RETURNING *
+            """,
+            params=(
+                last_user_id, sent_count, failed_count, blocked_count,
+                sent_count + failed_count + blocked_count, broadcast_id,
+            ),
+        )
+
+    async def complete(self, broadcast_id: int) -> SingleQueryResult:
+        return await self._connection.update_and_fetchone(
+            sql="""
+                UPDATE broadcasts SET status = 'completed', completed_at = NOW()
+                WHERE id = %s RETURNING *
+            """,
+            params=(broadcast_id,),
+        )
+
+    async def get_interrupted(self) -> MultipleQueryResult:
+        return await self._connection.fetchmany(
+            sql="SELECT * FROM broadcasts WHERE status = 'sending' ORDER BY started_at",
+        )
+
     async def get_history(self, limit: int = 20) -> MultipleQueryResult:
         return await self._connection.fetchmany(
             sql="SELECT * FROM broadcasts ORDER BY created_at DESC LIMIT %s",
@@ -2,7 +2,7 @@ import logging
 from datetime import datetime
 
 from app.infrastructure.database.tables.base import BaseTable
-from app.infrastructure.database.query.results import SingleQueryResult
+from app.infrastructure.database.query.results import SingleQueryResult, MultipleQueryResult
 
 logger = logging.getLogger(__name__)
 
@@ -61,3 +61,50 @@ class RateLimitsTable(BaseTable):
             sql="UPDATE rate_limits SET cooldown_until = NULL WHERE user_id = %s AND period = %s",
             params=(user_id, period),
         )
+
+    async def save_counters(
+        self,
+        user_ids: list[int],
+        periods: list[str],
+        request_counts: list[int],
+        previous_counts: list[int],
+        window_starts: list[datetime],
+        cooldowns_until: list[datetime | None],
+    ) -> int:
+        """Upsert sliding-window counters of many (user, period) pairs in one statement."""
+        return await self._connection.execute(
+            sql="""
+                INSERT INTO rate_limits (user_id, period, request_count, previous_count, window_start, cooldown_until)
+                SELECT * FROM unnest(
+                    %s::bigint[], %s::varchar[], %s::integer[], %s::integer[], %s::timestamptz[], %s::timestamptz[]
+                )
+                ON CONFLICT (user_id, period) DO UPDATE SET
+                    request_count = EXCLUDED.request_count,
+                    previous_count = EXCLUDED.previous_count,
+                    window_start = EXCLUDED.window_start,
+                    cooldown_until = EXCLUDED.cooldown_until
+            """,
+            params=(user_ids, periods, request_counts, previous_counts, window_starts, cooldowns_until),
+        )
+
+    async def get_active_counters(self, max_age_seconds: int) -> MultipleQueryResult:
+        """Counters whose window started within max_age_seconds, or with a running cooldown."""
+        return await self._connection.fetchmany(
+            sql="""
+                SELECT user_id, period, request_count, previous_count, window_start, cooldown_until
+                FROM rate_limits
+                WHERE window_start >= NOW() - INTERVAL '1 second' * %s
+                   OR cooldown_until > NOW()
+            """,
+            params=(max_age_seconds,),
+        )
+
+    async def delete_expired(self, max_age_seconds: int) -> int:
+        return await self._connection.execute(
+            sql="""
+                DELETE FROM rate_limits
+                WHERE window_start < NOW() - INTERVAL '1 second' * %s
+                  AND (cooldown_until IS NULL OR cooldown_until < NOW())
+            """,
+            params=(max_age_seconds,),
+        )
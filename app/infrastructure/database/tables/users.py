@@ -140,6 +140,28 @@ class UsersTable(BaseTable):
             params=(days,),
         )
 
+    async def get_broadcast_recipients(
+        self,
+        after_id: int | None = None,
+        limit: int = 250,
+        active_days: int | None = None,
+    ) -> list[int]:
+        """Next page of non-banned user ids in id order, starting after after_id."""
+        conditions = ["is_banned = FALSE"]
+        params: list = []
+        if after_id is not None:
+            conditions.append("id > %s")
+            params.append(after_id)
+        if active_days is not None:
+            conditions.append("last_activity >= NOW() - make_interval(days => %s)")
+            params.append(active_days)
+        params.append(limit)
+        result = await self._connection.fetchmany(
+            sql=f"SELECT id FROM users WHERE {' AND '.join(conditions)} ORDER BY id LIMIT %s",
+            params=tuple(params),
+        )
+        return [row["id"] for row in result.data] if result else []
+
     async def get_all_user_ids(self) -> list[int]:
         result = await self._connection.fetchmany(
             sql="SELECT id FROM users WHERE is_banned = FALSE",
@@ -1,13 +1,21 @@
-import asyncio
+from __future__ import annotations
+
 import hashlib
 import logging
 import os
 from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Awaitable, Callable
 
 from app.core.config import AppConfig
+from app.services.downloader.scheduler import DownloadJob, DownloadScheduler, SchedulerClosed
+
+if TYPE_CHECKING:
+    from app.services.downloader.progress import ProgressTracker
 
 logger = logging.getLogger(__name__)
 
+_scheduler: DownloadScheduler | None = None
+
 
 @dataclass
 class DownloadResult:
@@ -26,12 +34,61 @@ def url_hash(url: str) -> str:
     return hashlib.sha256(url.encode()).hexdigest()[:16]
 
 
+def get_download_scheduler(config: AppConfig) -> DownloadScheduler:
+    """The process-wide download scheduler, built from config.limits on first use."""
+    global _scheduler
+    if _scheduler is None:
+        limits = config.limits
+        _scheduler = DownloadScheduler(
+            max_active=limits.download_max_active,
+            max_per_host=limits.download_max_per_host,
+            max_per_user=limits.download_max_per_user,
+            lane_weights={
+                "admin": limits.download_weight_admin,
+                "paid": limits.download_weight_paid,
+                "default": 1,
+            },
+        )
+    return _scheduler
+
+
 class DownloadManager:
-    def __init__(self, config: AppConfig) -> None:
+    def __init__(self, config: AppConfig, progress: ProgressTracker | None = None) -> None:
         self._config = config
         self._save_dir = config.save_dir
+        self._progress = progress
         os.makedirs(self._save_dir, exist_ok=True)
 
+    def _lane(self, url: str, user_id: int) -> str:
+        if user_id in self._config.admin.admin_ids:
+            return "admin"
+        from app.services.nsfw.detector import is_porn
+
+        return "paid" if is_porn(url) else "default"
+
+    def _on_position(self, job: DownloadJob, position: int, queued: int) -> None:
+        if self._progress is not None:
+            self._progress.set_status(f"Queued: position {position} of {queued}")
+
+    async def _scheduled(
+        self,
+        url: str,
+        user_id: int,
+        download: Callable[[], Awaitable[DownloadResult]],
+    ) -> DownloadResult:
+        """Run download() once the scheduler gives this job a slot."""
+        scheduler = get_download_scheduler(self._config)
+        try:
+            async with scheduler.slot(
+                user_id, url, self._lane(url, user_id),
+                on_position=self._on_position, label=url_hash(url),
+            ):
+                if self._progress is not None:
+                    self._progress.set_status(None)
+                return await download()
+        except SchedulerClosed:
+            return DownloadResult(error="The bot is restarting, please try again in a minute")
+
     async def download_video(
         self,
         url: str,
@@ -42,7 +99,7 @@ class DownloadManager:
             from app.services.downloader.ytdlp_downloader import YtdlpDownloader
 
             downloader = YtdlpDownloader(self._config)
-            return await downloader.download(url, quality=quality, user_id=user_id)
+            return await self._scheduled(url, user_id, lambda: downloader.download(url, quality=quality, user_id=user_id))
         except Exception as e:
             logger.error("Download failed for %s: %s", url, e)
             return DownloadResult(error=str(e))
@@ -56,7 +113,7 @@ class DownloadManager:
             from app.services.downloader.audio_downloader import AudioDownloader
 
             downloader = AudioDownloader(self._config)
-            return await downloader.download(url, user_id=user_id)
+            return await self._scheduled(url, user_id, lambda: downloader.download(url, user_id=user_id))
         except Exception as e:
             logger.error("Audio download failed for %s: %s", url, e)
             return DownloadResult(error=str(e))
@@ -71,7 +128,7 @@ class DownloadManager:
             from app.services.downloader.gallery_dl_downloader import GalleryDlDownloader
 
             downloader = GalleryDlDownloader(self._config)
-            return await downloader.download(url, max_count=count, user_id=user_id)
+            return await self._scheduled(url, user_id, lambda: downloader.download(url, max_count=count, user_id=user_id))
         except Exception as e:
             logger.error("Image download failed for %s: %s", url, e)
             return DownloadResult(error=str(e))
@@ -86,7 +143,7 @@ class DownloadManager:
             from app.services.downloader.ytdlp_downloader import YtdlpDownloader
 
             downloader = YtdlpDownloader(self._config)
-            return await downloader.download_playlist(url, indices=indices, user_id=user_id)
+            return await self._scheduled(url, user_id, lambda: downloader.download_playlist(url, indices=indices, user_id=user_id))
         except Exception as e:
             logger.error("Playlist download failed for %s: %s", url, e)
             return DownloadResult(error=str(e))
@@ -18,6 +18,7 @@ class ProgressTracker:
         self._running = False
         self._task: asyncio.Task | None = None
         self._last_text = ""
+        self._status: str | None = None
 
     async def start(self, prefix: str = "Downloading") -> None:
         self._running = True
@@ -37,12 +38,16 @@ class ProgressTracker:
     async def update(self, text: str) -> None:
         await self._safe_edit(text)
 
+    def set_status(self, text: str | None) -> None:
+        """Show text instead of the animation (e.g. queue position) until reset with None."""
+        self._status = text
+
     async def _animate(self, prefix: str) -> None:
         frame_idx = 0
         try:
             while self._running:
                 frame = ANIMATION_FRAMES[frame_idx % len(ANIMATION_FRAMES)]
-                text = f"{prefix}{frame}"
+                text = self._status or f"{prefix}{frame}"
                 await self._safe_edit(text)
                 frame_idx += 1
                 await asyncio.sleep(2)
@@ -0,0 +1,426 @@
+"""Admission control for downloads: global, per-host and per-user limits with fair queueing.
+
+Jobs wait in one queue and are started in weighted fair queueing order
+(by virtual finish tag) across flows, a flow being one user in one lane.
+Each flow gets a share of the download slots proportional to its lane
+weight, so one user with a long playlist cannot starve the others and
+admin / paid jobs overtake ordinary ones without shutting them out. A job
+is only started when its host and its user are below their limits; other
+jobs may pass it meanwhile.
+
+The scheduler is thread-safe and has a blocking interface (submit(), for
+the Pyrogram bot, whose handlers run in worker threads) and an asyncio
+one (slot(), for the aiogram bot).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Callable, Hashable, Mapping
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LANE_WEIGHTS = {"admin": 8, "paid": 4, "default": 1}
+
+# Latency samples kept for the percentiles in get_stats()
+_SAMPLES = 1000
+
+
+class SchedulerClosed(Exception):
+    """The scheduler is draining and no longer accepts jobs."""
+
+
+def host_of(url: str) -> str:
+    try:
+        host = (urlparse(url).hostname or "").lower()
+    except ValueError:
+        return ""
+    for prefix in ("www.", "m."):
+        if host.startswith(prefix):
+            return host[len(prefix):]
+    return host
+
+
+@dataclass
+class SchedulerMetrics:
+    submitted: int = 0
+    started: int = 0
+    completed: int = 0
+    failed: int = 0
+    cancelled: int = 0
+    rejected: int = 0
+    peak_queued: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+    total_service: float = 0.0
+    max_service: float = 0.0
+
+
+class DownloadJob:
+    """One queued or running download."""
+
+    __slots__ = (
+        "user_id", "host", "lane", "label", "start_tag", "finish_tag", "seq",
+        "enqueued_at", "started_at", "state", "position",
+        "_on_start", "_on_position", "_on_cancel",
+    )
+
+    def __init__(self, user_id: Hashable, host: str, lane: str, label: str) -> None:
+        self.user_id = user_id
+        self.host = host
+        self.lane = lane
+        self.label = label
+        self.start_tag = 0.0
+        self.finish_tag = 0.0
+        self.seq = 0
+        self.enqueued_at = 0.0
+        self.started_at = 0.0
+        # queued -> running -> done, or queued -> cancelled
+        self.state = "queued"
+        # 1-based place in the start order while queued
+        self.position = 0
+        self._on_start: Callable[[DownloadJob], None] | None = None
+        self._on_position: Callable[[DownloadJob, int, int], None] | None = None
+        self._on_cancel: Callable[[DownloadJob], None] | None = None
+
+    def __repr__(self) -> str:
+        return f"<DownloadJob {self.label or self.host} user={self.user_id} lane={self.lane} {self.state}>"
+
+
+class DownloadScheduler:
+    def __init__(
+        self,
+        max_active: int = 4,
+        max_per_host: int = 2,
+        max_per_user: int = 1,
+        lane_weights: Mapping[str, float] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_active = max(1, max_active)
+        self.max_per_host = max(1, max_per_host)
+        self.max_per_user = max(1, max_per_user)
+        self.lane_weights = dict(DEFAULT_LANE_WEIGHTS)
+        if lane_weights:
+            self.lane_weights.update(lane_weights)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._queue: list[DownloadJob] = []
+        self._running: set[DownloadJob] = set()
+        self._per_host: dict[str, int] = {}
+        self._per_user: dict[Hashable, int] = {}
+        # Fair queueing: system virtual time and each flow's last finish tag
+        self._vtime = 0.0
+        self._finish_tags: dict[tuple[str, Hashable], float] = {}
+        self._seq = 0
+        self._closed = False
+        self.metrics = SchedulerMetrics()
+        self._waits: deque[float] = deque(maxlen=_SAMPLES)
+        self._services: deque[float] = deque(maxlen=_SAMPLES)
+
+    # ------------------------------------------------------------------
+    # Queueing
+    # ------------------------------------------------------------------
+
+    def enqueue(
+        self,
+        user_id: Hashable,
+        url: str,
+        lane: str = "default",
+        on_start: Callable[[DownloadJob], None] | None = None,
+        on_position: Callable[[DownloadJob, int, int], None] | None = None,
+        on_cancel: Callable[[DownloadJob], None] | None = None,
+        label: str = "",
+    ) -> DownloadJob:
+        """Queue a job; on_start(job) is called (under no lock) once it may run.
+
+        on_position(job, position, queued) is called while the job waits,
+        whenever its place in the queue changes; on_cancel(job) if the job is
+        dropped by drain(). Raises SchedulerClosed while draining.
+        """
+        if lane not in self.lane_weights:
+            lane = "default"
+        job = DownloadJob(user_id, host_of(url), lane, label)
+        job._on_start = on_start
+        job._on_position = on_position
+        job._on_cancel = on_cancel
+        with self._lock:
+            if self._closed:
+                self.metrics.rejected += 1
+                raise SchedulerClosed("download scheduler is draining")
+            flow = (lane, user_id)
+            job.start_tag = max(self._vtime, self._finish_tags.get(flow, 0.0))
+            job.finish_tag = job.start_tag + 1.0 / self.lane_weights[lane]
+            self._finish_tags[flow] = job.finish_tag
+            self._seq += 1
+            job.seq = self._seq
+            job.enqueued_at = self._clock()
+            self._queue.append(job)
+            self.metrics.submitted += 1
+            self.metrics.peak_queued = max(self.metrics.peak_queued, len(self._queue))
+            started, moved = self._dispatch()
+        self._notify(started, moved)
+        return job
+
+    def release(self, job: DownloadJob, failed: bool = False) -> None:
+        """Mark a running job finished and start whatever can run next."""
+        with self._lock:
+            if job.state != "running":
+                return
+            job.state = "done"
+            self._running.discard(job)
+            self._decrement(self._per_host, job.host)
+            self._decrement(self._per_user, job.user_id)
+            service = self._clock() - job.started_at
+            self.metrics.total_service += service
+            self.metrics.max_service = max(self.metrics.max_service, service)
+            self._services.append(service)
+            if failed:
+                self.metrics.failed += 1
+            else:
+                self.metrics.completed += 1
+            started, moved = self._dispatch()
+            if not self._running:
+                self._idle.notify_all()
+        self._notify(started, moved)
+
+    def cancel(self, job: DownloadJob) -> bool:
+        """Drop a job that has not started yet; returns False if it already runs or ended."""
+        with self._lock:
+            if job.state != "queued":
+                return False
+            self._queue.remove(job)
+            job.state = "cancelled"
+            self.metrics.cancelled += 1
+            moved = self._reposition()
+        self._notify([], moved)
+        return True
+
+    def _dispatch(self) -> tuple[list[DownloadJob], list[DownloadJob]]:
+        """Start every queued job that fits (lock held); returns (started, repositioned)."""
+        started = []
+        while len(self._running) < self.max_active and self._queue:
+            best = None
+            for job in self._queue:
+                if self._per_host.get(job.host, 0) >= self.max_per_host:
+                    continue
+                if self._per_user.get(job.user_id, 0) >= self.max_per_user:
+                    continue
+                if best is None or (job.finish_tag, job.seq) < (best.finish_tag, best.seq):
+                    best = job
+            if best is None:
+                break
+            self._queue.remove(best)
+            best.state = "running"
+            best.position = 0
+            best.started_at = self._clock()
+            self._vtime = max(self._vtime, best.start_tag)
+            self._running.add(best)
+            self._per_host[best.host] = self._per_host.get(best.host, 0) + 1
+            self._per_user[best.user_id] = self._per_user.get(best.user_id, 0) + 1
+            wait = best.started_at - best.enqueued_at
+            self.metrics.started += 1
+            self.metrics.total_wait += wait
+            self.metrics.max_wait = max(self.metrics.max_wait, wait)
+            self._waits.append(wait)
+            started.append(best)
+        if started:
+            self._forget_idle_flows()
+        return started, self._reposition()
+
+    def _reposition(self) -> list[DownloadJob]:
+        """Recompute queue positions (lock held); returns jobs whose position changed."""
+        moved = []
+        self._queue.sort(key=lambda job: (job.finish_tag, job.seq))
+        for position, job in enumerate(self._queue, 1):
+            if job.position != position:
+                job.position = position
+                moved.append(job)
+        return moved
+
+    def _forget_idle_flows(self) -> None:
+        # A flow whose last finish tag is behind virtual time would restart at vtime anyway
+        if len(self._finish_tags) > 4 * (len(self._queue) + len(self._running)) + 64:
+            vtime = self._vtime
+            self._finish_tags = {flow: tag for flow, tag in self._finish_tags.items() if tag > vtime}
+
+    def _notify(self, started: list[DownloadJob], moved: list[DownloadJob]) -> None:
+        queued = len(self._queue)
+        for job in started:
+            try:
+                job._on_start(job)
+            except Exception as e:
+                logger.error("Failed to start %r: %s", job, e)
+                self.release(job, failed=True)
+        for job in moved:
+            if job.state == "queued" and job._on_position is not None:
+                try:
+                    job._on_position(job, job.position, queued)
+                except Exception as e:
+                    logger.debug("Queue position callback failed for %r: %s", job, e)
+
+    @staticmethod
+    def _decrement(counts: dict, key: Hashable) -> None:
+        value = counts.get(key, 0) - 1
+        if value > 0:
+            counts[key] = value
+        else:
+            counts.pop(key, None)
+
+    # ------------------------------------------------------------------
+    # Blocking interface
+    # ------------------------------------------------------------------
+
+    def submit(
+        self,
+        user_id: Hashable,
+        url: str,
+        func: Callable[[], Any],
+        lane: str = "default",
+        on_position: Callable[[DownloadJob, int, int], None] | None = None,
+        on_cancel: Callable[[DownloadJob], None] | None = None,
+        label: str = "",
+    ) -> DownloadJob:
+        """Queue func() and return at once; it runs in its own thread when admitted."""
+
+        def run(job: DownloadJob) -> None:
+            failed = False
+            try:
+                func()
+            except Exception:
+                failed = True
+                logger.exception("Download job %r crashed", job)
+            finally:
+                self.release(job, failed=failed)
+
+        def start(job: DownloadJob) -> None:
+            threading.Thread(target=run, args=(job,), name=f"download-{job.user_id}", daemon=True).start()
+
+        return self.enqueue(
+            user_id, url, lane,
+            on_start=start, on_position=on_position, on_cancel=on_cancel, label=label,
+        )
+
+    # ------------------------------------------------------------------
+    # asyncio interface
+    # ------------------------------------------------------------------
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        user_id: Hashable,
+        url: str,
+        lane: str = "default",
+        on_position: Callable[[DownloadJob, int, int], None] | None = None,
+        label: str = "",
+    ) -> AsyncIterator[DownloadJob]:
+        """Wait for a download slot and hold it for the body of the block.
+
+        Raises SchedulerClosed if the scheduler is (or starts) draining
+        before the job starts. on_position is called from the event loop.
+        """
+        loop = asyncio.get_running_loop()
+        granted: asyncio.Future = loop.create_future()
+
+        def resolve(result: Any) -> None:
+            if not granted.done():
+                if isinstance(result, BaseException):
+                    granted.set_exception(result)
+                else:
+                    granted.set_result(result)
+
+        def on_start(job: DownloadJob) -> None:
+            loop.call_soon_threadsafe(resolve, job)
+
+        def on_cancel(job: DownloadJob) -> None:
+            loop.call_soon_threadsafe(resolve, SchedulerClosed("download scheduler is draining"))
+
+        position_cb = None
+        if on_position is not None:
+            def position_cb(job: DownloadJob, position: int, queued: int) -> None:
+                loop.call_soon_threadsafe(on_position, job, position, queued)
+
+        job = self.enqueue(
+            user_id, url, lane,
+            on_start=on_start, on_position=position_cb, on_cancel=on_cancel, label=label,
+        )
+        try:
+            await granted
+        except BaseException:
+            if not self.cancel(job):
+                # Started between the cancellation and now: give the slot back
+                self.release(job, failed=True)
+            raise
+        failed = False
+        try:
+            yield job
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self.release(job, failed=failed)
+
+    # ------------------------------------------------------------------
+    # Shutdown and metrics
+    # ------------------------------------------------------------------
+
+    def drain(self, timeout: float | None = None) -> bool:
+        """Stop accepting jobs, drop queued ones and wait for running ones.
+
+        Returns True if nothing was running anymore before the timeout.
+        """
+        with self._lock:
+            self._closed = True
+            dropped, self._queue = self._queue, []
+            for job in dropped:
+                job.state = "cancelled"
+            self.metrics.cancelled += len(dropped)
+        for job in dropped:
+            if job._on_cancel is not None:
+                try:
+                    job._on_cancel(job)
+                except Exception as e:
+                    logger.debug("Cancel callback failed for %r: %s", job, e)
+        if dropped:
+            logger.info("Download scheduler draining: dropped %d queued job(s)", len(dropped))
+        with self._lock:
+            if self._running:
+                logger.info("Download scheduler draining: waiting for %d running job(s)", len(self._running))
+            return self._idle.wait_for(lambda: not self._running, timeout)
+
+    async def drain_async(self, timeout: float | None = None) -> bool:
+        return await asyncio.to_thread(self.drain, timeout)
+
+    def queue_position(self, job: DownloadJob) -> int:
+        """1-based place of a queued job in the start order, 0 if it is not queued."""
+        with self._lock:
+            return job.position if job.state == "queued" else 0
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            stats: dict[str, Any] = asdict(self.metrics)
+            now = self._clock()
+            stats.update(
+                active=len(self._running),
+                queued=len(self._queue),
+                max_active=self.max_active,
+                draining=self._closed,
+                queued_by_lane={lane: sum(1 for job in self._queue if job.lane == lane) for lane in self.lane_weights},
+                active_by_host=dict(self._per_host),
+                oldest_wait=max((now - job.enqueued_at for job in self._queue), default=0.0),
+            )
+            waits = sorted(self._waits)
+            services = sorted(self._services)
+        started, finished = self.metrics.started, self.metrics.completed + self.metrics.failed
+        stats["avg_wait"] = self.metrics.total_wait / started if started else 0.0
+        stats["avg_service"] = self.metrics.total_service / finished if finished else 0.0
+        stats["p95_wait"] = waits[int(len(waits) * 0.95)] if waits else 0.0
+        stats["p95_service"] = services[int(len(services) * 0.95)] if services else 0.0
+        return stats
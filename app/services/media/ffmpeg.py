@@ -7,8 +7,21 @@ import os
 import re
 import shutil
 
+from app.services.media.split_planner import (
+    SplitIndex,
+    escape_segment_name,
+    largest_gop_size,
+    parse_packet_index,
+    plan_cut_times,
+    probe_args,
+    segment_args,
+)
+
 logger = logging.getLogger(__name__)
 
+# Keyframe split plans tried when a part comes out over the size limit
+SPLIT_MAX_ATTEMPTS = 3
+
 
 def get_ffmpeg_path() -> str | None:
     path = shutil.which("ffmpeg")
@@ -214,6 +227,70 @@ async def _create_default_thumbnail(
         logger.error("Failed to create default thumbnail: %s", e)
 
 
+async def probe_split_index(video_path: str) -> SplitIndex | None:
+    """Read the packet index of a video once (no decoding)."""
+    ffprobe = get_ffprobe_path()
+    if not ffprobe:
+        return None
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *probe_args(ffprobe, video_path),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        stdout, _ = await proc.communicate()
+        if proc.returncode != 0:
+            return None
+        return parse_packet_index(stdout.decode("utf-8", errors="replace"))
+    except Exception as e:
+        logger.error("Packet index probe failed: %s", e)
+        return None
+
+
+async def _split_by_keyframes(
+    ffmpeg: str,
+    output_dir: str,
+    video_name: str,
+    video_path: str,
+    index: SplitIndex,
+    max_size: int,
+) -> dict | None:
+    budget = max_size
+    # With a GOP over the limit some part is oversized whatever the plan
+    unsplittable = largest_gop_size(index) > max_size
+    for attempt in range(SPLIT_MAX_ATTEMPTS):
+        cut_times = plan_cut_times(index, budget)
+        parts = len(cut_times) + 1
+        if parts > 20:
+            logger.warning("Excessive split rounds: %d", parts)
+        pattern = os.path.join(output_dir, f"{escape_segment_name(video_name)} - Part %d.mp4")
+        logger.info("Splitting %s into %d parts at keyframes %s", video_path, parts, cut_times)
+        proc = await asyncio.create_subprocess_exec(
+            *segment_args(ffmpeg, video_path, index, cut_times, pattern),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        _, stderr = await proc.communicate()
+        caption_list = [f"{video_name} - Part {i + 1}" for i in range(parts)]
+        path_list = [os.path.join(output_dir, f"{name}.mp4") for name in caption_list]
+        if proc.returncode != 0 or not all(os.path.exists(p) for p in path_list):
+            logger.error("Segment split failed: %s", stderr.decode(errors="replace")[-500:])
+            return None
+        largest = max(os.path.getsize(p) for p in path_list)
+        if largest <= max_size or attempt == SPLIT_MAX_ATTEMPTS - 1 or unsplittable:
+            if largest > max_size:
+                # A single GOP larger than the limit cannot be cut with stream copy
+                logger.warning("Split part of %d bytes still exceeds %d", largest, max_size)
+            for i, path in enumerate(path_list):
+                logger.info("Part %d created: %s (%d bytes)", i + 1, path, os.path.getsize(path))
+            return {"video": caption_list, "path": path_list}
+        # Container overhead was underestimated: plan again with a smaller budget
+        logger.warning("Split part of %d bytes exceeds %d, retrying", largest, max_size)
+        for path in path_list:
+            os.remove(path)
+        budget = int(budget * max_size / largest * 0.98)
+
+
 async def split_video(
     output_dir: str,
     video_name: str,
@@ -221,6 +298,31 @@ async def split_video(
     video_size: int,
     max_size: int,
     duration: float,
+) -> dict:
+    ffmpeg = get_ffmpeg_path()
+    if not ffmpeg:
+        return {"video": [], "path": []}
+
+    index = await probe_split_index(video_path)
+    if index is not None:
+        try:
+            result = await _split_by_keyframes(ffmpeg, output_dir, video_name, video_path, index, max_size)
+            if result is not None:
+                return result
+        except Exception as e:
+            logger.error("Keyframe split failed: %s", e)
+        logger.warning("Falling back to fixed-duration split for %s", video_path)
+    return await _split_by_duration(ffmpeg, output_dir, video_name, video_path, video_size, max_size, duration)
+
+
+async def _split_by_duration(
+    ffmpeg: str,
+    output_dir: str,
+    video_name: str,
+    video_path: str,
+    video_size: int,
+    max_size: int,
+    duration: float,
 ) -> dict:
     rounds = math.floor(video_size / max_size) + 1
     segment_duration = duration / rounds
@@ -230,10 +332,6 @@ async def split_video(
     if rounds > 20:
         logger.warning("Excessive split rounds: %d", rounds)
 
-    ffmpeg = get_ffmpeg_path()
-    if not ffmpeg:
-        return {"video": caption_list, "path": path_list}
-
     for i in range(rounds):
         start_time = i * segment_duration
         end_time = min((i + 1) * segment_duration, duration)
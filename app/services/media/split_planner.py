@@ -0,0 +1,198 @@
+"""Keyframe-aware planning of size-limited video splits.
+
+The source is probed once for its packet index (ffprobe -show_entries packet);
+cut points are then chosen among video keyframes from cumulative packet sizes
+so that every part stays under the size limit, and all parts are written by a
+single ffmpeg run with the segment muxer and stream copy.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+# Estimated MP4 container cost: moov/mdat headers plus sample table entries
+MP4_FIXED_OVERHEAD = 256 * 1024
+MP4_PER_PACKET_OVERHEAD = 16
+
+PROBE_ENTRIES = (
+    "packet=stream_index,pts_time,dts_time,size,flags"
+    ":stream=index,codec_type:stream_disposition=attached_pic"
+    ":format=start_time"
+)
+
+# Stream types the MP4 parts carry; data streams and attachments are dropped
+MAPPED_TYPES = ("video", "audio", "subtitle")
+
+
+def probe_args(ffprobe: str, video_path: str) -> list[str]:
+    return [
+        ffprobe, "-v", "error",
+        "-show_entries", PROBE_ENTRIES,
+        "-of", "compact=p=1:nk=0",
+        video_path,
+    ]
+
+
+@dataclass
+class SplitIndex:
+    """Keyframe index of one video stream; sizes cover every stream kept in the parts."""
+
+    video_stream: int
+    # Cover art streams, excluded from the parts
+    attached_pics: list[int] = field(default_factory=list)
+    # format.start_time; ffmpeg subtracts it before the segment muxer sees timestamps
+    start_time: float = 0.0
+    total_bytes: int = 0
+    total_packets: int = 0
+    # Per video keyframe: time, bytes and packets before it in file order
+    key_times: list[float] = field(default_factory=list)
+    key_offsets: list[int] = field(default_factory=list)
+    key_packets: list[int] = field(default_factory=list)
+
+
+def _float(value: str | None) -> float | None:
+    try:
+        return float(value) if value not in (None, "", "N/A") else None
+    except ValueError:
+        return None
+
+
+def parse_packet_index(output: str) -> SplitIndex | None:
+    """Build a SplitIndex from `ffprobe -of compact` packet/stream output."""
+    packets: list[tuple[int, float | None, int, bool]] = []
+    stream_types: dict[int, str] = {}
+    attached: set[int] = set()
+    start_time = None
+    for line in output.splitlines():
+        section, _, rest = line.partition("|")
+        fields = dict(item.partition("=")[::2] for item in rest.split("|"))
+        if section == "packet":
+            try:
+                index = int(fields.get("stream_index", ""))
+                size = int(fields.get("size", "0"))
+            except ValueError:
+                continue
+            time = _float(fields.get("pts_time"))
+            if time is None:
+                time = _float(fields.get("dts_time"))
+            packets.append((index, time, size, "K" in fields.get("flags", "")))
+        elif section == "stream":
+            try:
+                index = int(fields.get("index", ""))
+            except ValueError:
+                continue
+            stream_types[index] = fields.get("codec_type", "")
+            if any(k.endswith("attached_pic") and v == "1" for k, v in fields.items()):
+                attached.add(index)
+        elif section == "format":
+            start_time = _float(fields.get("start_time"))
+
+    videos = sorted(i for i, t in stream_types.items() if t == "video" and i not in attached)
+    if not videos:
+        return None
+    index = SplitIndex(
+        video_stream=videos[0],
+        attached_pics=sorted(attached),
+        start_time=start_time or 0.0,
+    )
+    kept = {i for i, t in stream_types.items() if t in MAPPED_TYPES and i not in attached}
+    for stream, time, size, key in packets:
+        if stream not in kept:
+            continue
+        if stream == index.video_stream and key and time is not None:
+            index.key_times.append(time)
+            index.key_offsets.append(index.total_bytes)
+            index.key_packets.append(index.total_packets)
+        index.total_bytes += size
+        index.total_packets += 1
+    return index if index.key_times else None
+
+
+def plan_cut_times(index: SplitIndex, max_size: int) -> list[float]:
+    """Greedy keyframe cut points keeping each estimated MP4 part <= max_size.
+
+    A part whose first GOP alone exceeds the limit is cut at the next keyframe
+    anyway; the caller is expected to check the resulting sizes.
+    """
+    def part_size(start: int, end_bytes: int, end_packets: int) -> int:
+        return (end_bytes - index.key_offsets[start]
+                + (end_packets - index.key_packets[start]) * MP4_PER_PACKET_OVERHEAD
+                + MP4_FIXED_OVERHEAD)
+
+    cuts: list[int] = []
+    start = 0
+    last_fit = None
+    j = 1
+    while j < len(index.key_times):
+        if part_size(start, index.key_offsets[j], index.key_packets[j]) <= max_size:
+            last_fit = j
+            j += 1
+            continue
+        # Keyframe j no longer fits: close the part at the last keyframe that did
+        cut = last_fit if last_fit is not None else j
+        cuts.append(cut)
+        start = cut
+        last_fit = None
+        if cut == j:
+            j += 1
+    if last_fit is not None and part_size(start, index.total_bytes, index.total_packets) > max_size:
+        cuts.append(last_fit)
+
+    times = []
+    for cut in cuts:
+        previous = index.key_times[cut - 1] if cut > 0 else 0.0
+        # The segment muxer cuts at the first keyframe at/after the given time;
+        # aim between the two keyframes so small shifts of the output timeline
+        # (audio priming, rounding) cannot move the cut to another keyframe.
+        time = (previous + index.key_times[cut]) / 2 - index.start_time
+        times.append(max(0.0, time))
+    return times
+
+
+def largest_gop_size(index: SplitIndex) -> int:
+    """Estimated size of the largest keyframe interval (the smallest possible part)."""
+    bounds = list(zip(index.key_offsets, index.key_packets)) + [(index.total_bytes, index.total_packets)]
+    return max(
+        (end_bytes - start_bytes + (end_packets - start_packets) * MP4_PER_PACKET_OVERHEAD
+         for (start_bytes, start_packets), (end_bytes, end_packets) in zip(bounds, bounds[1:])),
+        default=0,
+    ) + MP4_FIXED_OVERHEAD
+
+
+def segment_args(
+    ffmpeg: str,
+    video_path: str,
+    index: SplitIndex,
+    cut_times: list[float],
+    output_pattern: str,
+) -> list[str]:
+    """Single ffmpeg run writing every part (output_pattern contains %d)."""
+    cmd = [
+        ffmpeg, "-y",
+        "-i", video_path,
+        # All audio and subtitle tracks; MP4 cannot hold data streams or attachments
+        "-map", "0", "-map", "-0:d?", "-map", "-0:t?",
+    ]
+    for stream in index.attached_pics:
+        cmd += ["-map", f"-0:{stream}"]
+    cmd += [
+        "-c", "copy",
+        # Text subtitles (SRT, ASS, WebVTT) cannot be stream-copied into MP4
+        "-c:s", "mov_text",
+        "-f", "segment",
+        "-segment_format", "mp4",
+        "-segment_start_number", "1",
+        "-reset_timestamps", "1",
+    ]
+    if cut_times:
+        cmd += ["-segment_times", ",".join(f"{t:.6f}" for t in cut_times)]
+    else:
+        # One part: make sure the muxer does not cut on its default 2s interval
+        cmd += ["-segment_time", "1000000000"]
+    cmd.append(output_pattern)
+    return cmd
+
+
+def escape_segment_name(name: str) -> str:
+    """Escape a literal file name for use in a segment muxer output pattern."""
+    return name.replace("%", "%%")
@@ -0,0 +1,156 @@
+"""Precompiled NSFW keyword/domain classifier.
+
+Keyword lists are compiled once (on list load/reload) into prefix-factored
+alternations, i.e. a keyword trie that the regex engine walks as a single
+automaton per input instead of one alternation rebuilt per call plus one
+pattern per keyword for URLs:
+
+- text fields: whole keywords on regex word boundaries (\\b),
+- URLs: keyword words separated by any run of non-alphanumeric characters and
+  delimited by non-alphanumerics or the string edges (so "big tits" matches
+  "/big_tits-1" but not "/bigtitsx"),
+- white keywords: same word-boundary semantics as the text fields.
+
+Keywords are lowercased at compile time and inputs are expected to be
+lowercased by the caller (as is_porn() does), so the patterns are compiled
+without re.IGNORECASE, which would make every literal a case-folding test.
+
+Domain lists are folded into one map from domain to verdict; every suffix of
+a URL host (see extract_domain_parts) is looked up once, whitelist first,
+then greylist, then the porn domains.
+
+Instances are immutable: a reload builds a new classifier and swaps the
+module-level reference, so readers never see a half-built one.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Iterable
+
+WHITE = "white"
+GREY = "grey"
+PORN = "porn"
+
+_VERDICT_PRIORITY = {WHITE: 0, GREY: 1, PORN: 2}
+
+_END = ""
+_URL_JOIN = None
+_URL_JOIN_RE = r"[^A-Za-z0-9]+"
+
+
+def _build_trie(sequences: Iterable[list]) -> dict:
+    root: dict = {}
+    for tokens in sequences:
+        node = root
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node[_END] = True
+    return root
+
+
+def _render(node: dict) -> str:
+    alternatives = []
+    for token in sorted((t for t in node if t != _END), key=lambda t: (t is None, t or "")):
+        head = _URL_JOIN_RE if token is _URL_JOIN else re.escape(token)
+        alternatives.append(head + _render(node[token]))
+    if not alternatives:
+        return ""
+    body = alternatives[0] if len(alternatives) == 1 else "(?:" + "|".join(alternatives) + ")"
+    # Keyword ends here but longer ones continue: greedy optional tries the longest first
+    return "(?:" + body + ")?" if _END in node else body
+
+
+def _compile(sequences: list, prefix: str, suffix: str) -> re.Pattern | None:
+    if not sequences:
+        return None
+    return re.compile(prefix + "(?:" + _render(_build_trie(sequences)) + ")" + suffix)
+
+
+def compile_word_keywords(keywords: Iterable[str]) -> re.Pattern | None:
+    """One pattern matching any keyword between \\b word boundaries, None if empty."""
+    words = {kw.lower() for kw in keywords if kw and kw.strip()}
+    return _compile([list(w) for w in words], r"\b", r"\b")
+
+
+def compile_url_keywords(keywords: Iterable[str]) -> re.Pattern | None:
+    """One pattern matching any keyword inside a URL with non-alphanumeric delimiters."""
+    sequences = []
+    for kw in {kw.lower() for kw in keywords if kw and kw.strip()}:
+        tokens: list = []
+        for word in kw.split():
+            if tokens:
+                tokens.append(_URL_JOIN)
+            tokens.extend(word)
+        sequences.append(tokens)
+    return _compile(sequences, r"(?<![A-Za-z0-9])", r"(?![A-Za-z0-9])")
+
+
+def _matches(pattern: re.Pattern | None, text: str) -> list[str]:
+    return [m.group(0) for m in pattern.finditer(text)] if pattern is not None and text else []
+
+
+class NSFWClassifier:
+    """Compiled porn keyword, white keyword and domain lists."""
+
+    __slots__ = ("keyword_count", "domain_count", "_text", "_url", "_white", "_domains")
+
+    def __init__(
+        self,
+        keywords: Iterable[str] = (),
+        porn_domains: Iterable[str] = (),
+        whitelist: Iterable[str] = (),
+        greylist: Iterable[str] = (),
+        white_keywords: Iterable[str] = (),
+    ):
+        keywords = [kw for kw in keywords if kw and kw.strip()]
+        self.keyword_count = len(keywords)
+        self._text = compile_word_keywords(keywords)
+        self._url = compile_url_keywords(keywords)
+        self._white = compile_word_keywords(white_keywords or ())
+        domains: dict[str, str] = {}
+        for verdict, names in ((PORN, porn_domains), (GREY, greylist), (WHITE, whitelist)):
+            for name in names or ():
+                domains[name] = verdict
+        self.domain_count = len(domains)
+        self._domains = domains
+
+    @property
+    def has_keywords(self) -> bool:
+        return self._text is not None
+
+    def domain_verdict(self, domain_parts: Iterable[str]) -> tuple[str | None, str | None]:
+        """(WHITE/GREY/PORN or None, matching domain) for the suffixes of one host."""
+        best = None
+        best_domain = None
+        lookup = self._domains.get
+        for dom in domain_parts:
+            verdict = lookup(dom)
+            if verdict is not None and (best is None or _VERDICT_PRIORITY[verdict] < _VERDICT_PRIORITY[best]):
+                best, best_domain = verdict, dom
+                if verdict == WHITE:
+                    break
+        return best, best_domain
+
+    def white_keyword(self, text: str) -> str | None:
+        m = self._white.search(text) if self._white is not None and text else None
+        return m.group(0) if m else None
+
+    def white_keywords_in(self, text: str) -> list[str]:
+        return _matches(self._white, text)
+
+    def text_keyword(self, text: str) -> str | None:
+        """First porn keyword found in text on word boundaries, or None."""
+        m = self._text.search(text) if self._text is not None and text else None
+        return m.group(0) if m else None
+
+    def text_keywords_in(self, text: str) -> list[str]:
+        return _matches(self._text, text)
+
+    def url_keyword(self, url: str) -> str | None:
+        """First porn keyword found in a URL between non-alphanumeric delimiters, or None."""
+        m = self._url.search(url) if self._url is not None and url else None
+        return m.group(0) if m else None
+
+    def url_keywords_in(self, url: str) -> list[str]:
+        return _matches(self._url, url)
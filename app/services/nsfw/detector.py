@@ -1,19 +1,22 @@
 import logging
 import re
+from functools import lru_cache
 from urllib.parse import urlparse, parse_qs, unquote
 
 import tldextract
 
 from app.core.constants import WHITELIST, GREYLIST, PORN_DOMAINS_FILE, PORN_KEYWORDS_FILE
+from app.services.nsfw.classifier import NSFWClassifier, WHITE, PORN, compile_word_keywords
 
 logger = logging.getLogger(__name__)
 
 _porn_domains: set[str] = set()
 _porn_keywords: set[str] = set()
+_classifier = NSFWClassifier()
 
 
 def load_domain_lists() -> None:
-    global _porn_domains, _porn_keywords
+    global _porn_domains, _porn_keywords, _classifier
 
     try:
         with open(PORN_DOMAINS_FILE, "r", encoding="utf-8", errors="ignore") as f:
@@ -31,6 +34,13 @@ def load_domain_lists() -> None:
         logger.error("Failed to load %s: %s", PORN_KEYWORDS_FILE, e)
         _porn_keywords = set()
 
+    _classifier = NSFWClassifier(
+        keywords=_porn_keywords,
+        porn_domains=_porn_domains,
+        whitelist={d.lower() for d in WHITELIST},
+        greylist={d.lower() for d in GREYLIST},
+    )
+
 
 def _unwrap_redirect_url(url: str) -> str:
     try:
@@ -87,34 +97,18 @@ def _extract_domain_parts(url: str) -> tuple[list[str], str]:
 
 
 def _is_porn_domain(domain_parts: list[str]) -> bool:
-    whitelist_lower = {d.lower() for d in WHITELIST}
-    greylist_lower = {d.lower() for d in GREYLIST}
-
-    for dom in domain_parts:
-        if dom in whitelist_lower:
-            return False
-
-    for dom in domain_parts:
-        if dom in greylist_lower:
-            return False
+    verdict, _ = _classifier.domain_verdict(domain_parts)
+    return verdict == PORN
 
-    for dom in domain_parts:
-        if dom in _porn_domains:
-            return True
 
-    return False
+@lru_cache(maxsize=32)
+def _white_pattern(white_keywords: tuple[str, ...]) -> re.Pattern | None:
+    return compile_word_keywords(white_keywords)
 
 
-def _compile_url_keyword_regex(raw_keyword: str) -> re.Pattern:
-    words = [re.escape(w) for w in raw_keyword.split() if w]
-    if not words:
-        return re.compile(r"a^")
-    joiner = r"[^A-Za-z0-9]+"
-    core = joiner.join(words)
-    return re.compile(
-        rf"(?<![A-Za-z0-9])(?:{core})(?![A-Za-z0-9])",
-        flags=re.IGNORECASE,
-    )
+def _white_matches(white_keywords: list[str] | None, text: str) -> list[str]:
+    pattern = _white_pattern(tuple(white_keywords)) if white_keywords else None
+    return [m.group(0) for m in pattern.finditer(text)] if pattern is not None else []
 
 
 def is_porn(
@@ -125,15 +119,15 @@ def is_porn(
     tags: str | None = None,
     white_keywords: list[str] | None = None,
 ) -> bool:
+    classifier = _classifier
     clean_url = _unwrap_redirect_url(url).lower()
     domain_parts, _ = _extract_domain_parts(clean_url)
 
-    whitelist_lower = {d.lower() for d in WHITELIST}
-    for dom in domain_parts:
-        if dom in whitelist_lower:
-            return False
+    verdict, _ = classifier.domain_verdict(domain_parts)
+    if verdict == WHITE:
+        return False
 
-    if _is_porn_domain(domain_parts):
+    if verdict == PORN:
         logger.info("is_porn: domain match: %s", domain_parts)
         return True
 
@@ -149,35 +143,22 @@ def is_porn(
     combined = " ".join([title_lower, description_lower, caption_lower, tags_lower, url_lower])
 
     if white_keywords:
-        white_kws = [re.escape(kw.lower()) for kw in white_keywords if kw.strip()]
-        if white_kws:
-            white_pattern = re.compile(
-                r"\b(" + "|".join(white_kws) + r")\b",
-                flags=re.IGNORECASE,
-            )
-            if white_pattern.search(combined):
-                return False
-
-    text_kws = [re.escape(kw.lower()) for kw in _porn_keywords if kw.strip()]
-    url_kws = [kw.lower() for kw in _porn_keywords if kw.strip()]
-
-    if not text_kws:
+        pattern = _white_pattern(tuple(white_keywords))
+        if pattern is not None and pattern.search(combined):
+            return False
+
+    if not classifier.has_keywords:
         return False
 
-    text_pattern = re.compile(
-        r"\b(" + "|".join(text_kws) + r")\b",
-        flags=re.IGNORECASE,
-    )
     text_to_check = " ".join([title_lower, description_lower, caption_lower, tags_lower])
-    if text_pattern.search(text_to_check):
+    if classifier.text_keyword(text_to_check):
         logger.info("is_porn: keyword match in text fields")
         return True
 
-    for raw_kw in url_kws:
-        url_pattern = _compile_url_keyword_regex(raw_kw)
-        if url_pattern.search(url_lower):
-            logger.info("is_porn: keyword match in URL: %s", raw_kw)
-            return True
+    url_match = classifier.url_keyword(url_lower)
+    if url_match:
+        logger.info("is_porn: keyword match in URL: %s", url_match)
+        return True
 
     return False
 
@@ -189,15 +170,15 @@ def check_porn_detailed(
     caption: str | None = None,
     white_keywords: list[str] | None = None,
 ) -> tuple[bool, str]:
+    classifier = _classifier
     clean_url = _unwrap_redirect_url(url).lower()
     domain_parts, _ = _extract_domain_parts(clean_url)
 
-    whitelist_lower = {d.lower() for d in WHITELIST}
-    for dom in domain_parts:
-        if dom in whitelist_lower:
-            return False, f"Domain in whitelist: {dom}"
+    verdict, dom = classifier.domain_verdict(domain_parts)
+    if verdict == WHITE:
+        return False, f"Domain in whitelist: {dom}"
 
-    if _is_porn_domain(domain_parts):
+    if verdict == PORN:
         return True, f"Domain in porn list: {domain_parts}"
 
     title_lower = title.lower() if title else ""
@@ -209,37 +190,18 @@ def check_porn_detailed(
 
     combined = " ".join([title_lower, description_lower, caption_lower])
 
-    if white_keywords:
-        white_kws = [re.escape(kw.lower()) for kw in white_keywords if kw.strip()]
-        if white_kws:
-            white_pattern = re.compile(
-                r"\b(" + "|".join(white_kws) + r")\b",
-                flags=re.IGNORECASE,
-            )
-            matches = white_pattern.findall(combined)
-            if matches:
-                return False, f"White keywords found: {', '.join(set(matches))}"
-
-    text_kws = [re.escape(kw.lower()) for kw in _porn_keywords if kw.strip()]
-    if not text_kws:
+    matches = _white_matches(white_keywords, combined)
+    if matches:
+        return False, f"White keywords found: {', '.join(set(matches))}"
+
+    if not classifier.has_keywords:
         return False, "No porn keywords loaded"
 
-    text_pattern = re.compile(
-        r"\b(" + "|".join(text_kws) + r")\b",
-        flags=re.IGNORECASE,
-    )
-    matches = text_pattern.findall(combined)
+    matches = classifier.text_keywords_in(combined)
     if matches:
         return True, f"Keywords found: {', '.join(set(matches))}"
 
-    url_lower = clean_url
-    url_matches: list[str] = []
-    for raw_kw in [kw.lower() for kw in _porn_keywords if kw.strip()]:
-        url_pattern = _compile_url_keyword_regex(raw_kw)
-        found = url_pattern.findall(url_lower)
-        if found:
-            url_matches.extend(found)
-
+    url_matches = classifier.url_keywords_in(clean_url)
     if url_matches:
         return True, f"NSFW keywords in URL: {', '.join(set(url_matches))}"
 
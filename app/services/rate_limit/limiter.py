@@ -0,0 +1,215 @@
+"""Per-user URL rate limiting over the minute/hour/day windows.
+
+Each window is a sliding-window counter: the count of the current fixed
+window plus the previous window's count weighted by how much of it still
+overlaps the sliding window. A user therefore costs three (start, count,
+previous) triples and a cooldown, whatever their request rate, and one
+check reads and updates all three windows under a single lock.
+
+A request is refused (and not counted) while a cooldown runs, or when it
+would push any window over its limit; the first such window, in
+minute/hour/day order, starts its cooldown.
+
+The limiter is storage-agnostic: snapshot()/restore() and dirty_keys()
+let callers persist state periodically (JSON file for the legacy bot,
+the rate_limits table for the aiogram bot).
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Iterable, Sequence
+
+PERIODS = ("minute", "hour", "day")
+WINDOWS = (60, 3600, 86400)
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    allowed: bool
+    # Window that refused the request (or whose cooldown is running)
+    period: str | None = None
+    # Seconds until the cooldown ends
+    retry_after: float = 0.0
+    # True when this request started the cooldown
+    new_cooldown: bool = False
+
+
+ALLOWED = RateLimitDecision(True)
+
+
+class _UserState:
+    __slots__ = ("starts", "counts", "previous", "cooldown_until", "cooldown_period")
+
+    def __init__(self) -> None:
+        # Per window: index of the current fixed window (now // size), its count, the previous one's count
+        self.starts = [0, 0, 0]
+        self.counts = [0, 0, 0]
+        self.previous = [0, 0, 0]
+        self.cooldown_until = 0.0
+        self.cooldown_period = -1
+
+    def roll(self, now: float) -> None:
+        for i, size in enumerate(WINDOWS):
+            index = int(now // size)
+            gap = index - self.starts[i]
+            if gap == 0:
+                continue
+            self.previous[i] = self.counts[i] if gap == 1 else 0
+            self.counts[i] = 0
+            self.starts[i] = index
+
+    def estimate(self, i: int, now: float) -> float:
+        size = WINDOWS[i]
+        overlap = 1.0 - (now % size) / size
+        return self.previous[i] * overlap + self.counts[i]
+
+    def idle(self, now: float) -> bool:
+        """No cooldown and nothing counted in any sliding window."""
+        if self.cooldown_until > now:
+            return False
+        for i, size in enumerate(WINDOWS):
+            if int(now // size) - self.starts[i] <= 1 and (self.counts[i] or self.previous[i]):
+                return False
+        return True
+
+
+class SlidingWindowLimiter:
+    """Minute/hour/day sliding-window counters and cooldowns for every user."""
+
+    def __init__(
+        self,
+        limits: Sequence[int],
+        cooldowns: Sequence[float],
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.limits = tuple(limits)
+        self.cooldowns = tuple(cooldowns)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._users: dict[Hashable, _UserState] = {}
+        self._dirty: set[Hashable] = set()
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    def check(self, key: Hashable, divisor: int = 1, now: float | None = None) -> RateLimitDecision:
+        """Admit and count one request of `key`, or refuse it.
+
+        `divisor` scales every limit down (group chats share the limits).
+        """
+        if now is None:
+            now = self._clock()
+        with self._lock:
+            state = self._users.get(key)
+            if state is None:
+                state = self._users[key] = _UserState()
+            if state.cooldown_until > now:
+                return RateLimitDecision(
+                    False, PERIODS[state.cooldown_period], state.cooldown_until - now,
+                )
+            state.roll(now)
+            for i, limit in enumerate(self.limits):
+                if state.estimate(i, now) + 1 > limit // divisor:
+                    state.cooldown_until = now + self.cooldowns[i]
+                    state.cooldown_period = i
+                    self._dirty.add(key)
+                    return RateLimitDecision(False, PERIODS[i], float(self.cooldowns[i]), True)
+            for i in range(len(WINDOWS)):
+                state.counts[i] += 1
+            self._dirty.add(key)
+            return ALLOWED
+
+    def prune(self, now: float | None = None) -> int:
+        """Forget idle users; returns how many were dropped."""
+        if now is None:
+            now = self._clock()
+        with self._lock:
+            idle = [key for key, state in self._users.items() if state.idle(now)]
+            for key in idle:
+                del self._users[key]
+            return len(idle)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def dirty_keys(self) -> set[Hashable]:
+        """Keys changed since the last call."""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            return dirty
+
+    def mark_dirty(self, keys: Iterable[Hashable]) -> None:
+        """Re-queue keys whose save failed."""
+        with self._lock:
+            self._dirty.update(keys)
+
+    def export(self, key: Hashable) -> list[Any] | None:
+        """[cooldown_until, cooldown_period, start, count, previous * 3] or None if unknown."""
+        with self._lock:
+            state = self._users.get(key)
+            if state is None:
+                return None
+            row: list[Any] = [state.cooldown_until, state.cooldown_period]
+            for i in range(len(WINDOWS)):
+                row += [state.starts[i], state.counts[i], state.previous[i]]
+            return row
+
+    def snapshot(self) -> dict[Hashable, list[Any]]:
+        with self._lock:
+            keys = list(self._users)
+        rows = {}
+        for key in keys:
+            row = self.export(key)
+            if row is not None:
+                rows[key] = row
+        return rows
+
+    def restore(self, rows: dict[Hashable, Sequence[Any]]) -> None:
+        """Load rows produced by export()/snapshot(); malformed rows are skipped."""
+        with self._lock:
+            for key, row in rows.items():
+                try:
+                    state = _UserState()
+                    state.cooldown_until = float(row[0])
+                    state.cooldown_period = int(row[1])
+                    for i in range(len(WINDOWS)):
+                        state.starts[i] = int(row[2 + 3 * i])
+                        state.counts[i] = int(row[3 + 3 * i])
+                        state.previous[i] = int(row[4 + 3 * i])
+                except (IndexError, TypeError, ValueError):
+                    continue
+                if not -1 <= state.cooldown_period < len(PERIODS):
+                    continue
+                self._users[key] = state
+
+    def restore_timestamps(self, key: Hashable, timestamps: Iterable[float], now: float | None = None) -> None:
+        """Rebuild counters from request timestamps (older per-request storage)."""
+        if now is None:
+            now = self._clock()
+        state = _UserState()
+        state.roll(now)
+        for ts in timestamps:
+            for i, size in enumerate(WINDOWS):
+                gap = state.starts[i] - int(ts // size)
+                if gap == 0:
+                    state.counts[i] += 1
+                elif gap == 1:
+                    state.previous[i] += 1
+        with self._lock:
+            current = self._users.get(key)
+            if current is not None:
+                state.cooldown_until = current.cooldown_until
+                state.cooldown_period = current.cooldown_period
+            self._users[key] = state
+
+    def set_cooldown(self, key: Hashable, period: str, until: float) -> None:
+        with self._lock:
+            state = self._users.get(key)
+            if state is None:
+                state = self._users[key] = _UserState()
+            state.cooldown_until = until
+            state.cooldown_period = PERIODS.index(period) if period in PERIODS else 0
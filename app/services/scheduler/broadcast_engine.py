@@ -0,0 +1,217 @@
+"""Broadcast delivery.
+
+Recipients are read in pages in user id order (keyset pagination, so no
+pool connection is held for the hours a large broadcast takes) and sent by
+a small pool of workers that all take tokens from one TokenBucket. The
+bucket keeps the bot under Telegram's global bulk limit (about 30 messages
+a second), and a TelegramRetryAfter on any worker pauses all of them for
+retry_after before the recipient is tried again.
+
+After each page the per-page counters and the last user id of the page are
+written in one UPDATE. A broadcast left in 'sending' by a crash or restart
+continues after that id, so at most one page is sent twice.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
+
+from app.infrastructure.database.db import DB
+
+logger = logging.getLogger(__name__)
+
+# Recipients of a broadcast for the "active" segment were seen within this many days
+ACTIVE_SEGMENT_DAYS = 30
+
+# Activity window (days) per segment; None means every non-banned user.
+# "all" keeps its historical meaning for scheduled broadcasts (users active
+# in the last 30 days); "everyone" is what the admin dialog's "All users" sends.
+SEGMENT_ACTIVE_DAYS = {
+    "all": ACTIVE_SEGMENT_DAYS,
+    "active": ACTIVE_SEGMENT_DAYS,
+    "everyone": None,
+}
+
+
+class TokenBucket:
+    """Async token bucket; pause() stops every caller of acquire() until it expires."""
+
+    def __init__(self, rate: float, burst: int = 1, clock: Callable[[], float] = time.monotonic) -> None:
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._clock = clock
+        self._tokens = float(self.capacity)
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        # Waiters queue on the lock, so tokens are handed out in arrival order
+        async with self._lock:
+            while True:
+                now = self._clock()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        until = self._clock() + seconds
+        if until > self._paused_until:
+            self._paused_until = until
+            # Resume at the paced rate instead of with a burst
+            self._tokens = 0.0
+            self._updated = until
+
+    @property
+    def paused(self) -> bool:
+        return self._clock() < self._paused_until
+
+
+@dataclass(slots=True)
+class BroadcastPayload:
+    text: str
+    media_file_id: str | None = None
+    media_type: str | None = None
+
+    @classmethod
+    def from_row(cls, row: dict[str, Any]) -> "BroadcastPayload":
+        return cls(
+            text=row.get("text") or "",
+            media_file_id=row.get("media_file_id"),
+            media_type=row.get("media_type"),
+        )
+
+    async def send(self, bot: Bot, chat_id: int) -> None:
+        if not self.media_file_id:
+            await bot.send_message(chat_id=chat_id, text=self.text)
+        elif self.media_type == "video":
+            await bot.send_video(chat_id=chat_id, video=self.media_file_id, caption=self.text)
+        elif self.media_type == "animation":
+            await bot.send_animation(chat_id=chat_id, animation=self.media_file_id, caption=self.text)
+        elif self.media_type == "document":
+            await bot.send_document(chat_id=chat_id, document=self.media_file_id, caption=self.text)
+        else:
+            await bot.send_photo(chat_id=chat_id, photo=self.media_file_id, caption=self.text)
+
+
+class BroadcastEngine:
+
+    def __init__(
+        self,
+        bot: Bot,
+        db: DB,
+        bucket: TokenBucket,
+        workers: int = 8,
+        page_size: int = 250,
+        max_retries: int = 5,
+    ) -> None:
+        self._bot = bot
+        self._db = db
+        self._bucket = bucket
+        self.workers = max(1, workers)
+        self.page_size = max(1, page_size)
+        self.max_retries = max_retries
+
+    async def run(self, broadcast_id: int) -> dict:
+        """Send a broadcast (or the rest of an interrupted one); returns its total stats."""
+        result = await self._db.broadcasts.start(broadcast_id)
+        row = result.as_dict() if result else None
+        if not row:
+            logger.warning("Broadcast %d not found or already finished", broadcast_id)
+            return {"sent": 0, "failed": 0, "blocked": 0}
+
+        payload = BroadcastPayload.from_row(row)
+        active_days = SEGMENT_ACTIVE_DAYS.get(row.get("segment") or "all", ACTIVE_SEGMENT_DAYS)
+        last_user_id = row.get("last_user_id")
+        totals = {
+            "sent": row.get("sent_count") or 0,
+            "failed": row.get("failed_count") or 0,
+            "blocked": row.get("blocked_count") or 0,
+        }
+        if last_user_id is not None:
+            logger.info("Resuming broadcast %d after user %d: %s", broadcast_id, last_user_id, totals)
+
+        page_stats = {"sent": 0, "failed": 0, "blocked": 0}
+        queue: asyncio.Queue[int] = asyncio.Queue()
+        workers = [
+            asyncio.create_task(self._worker(queue, payload, page_stats))
+            for _ in range(self.workers)
+        ]
+        started = time.monotonic()
+        try:
+            while True:
+                user_ids = await self._db.users.get_broadcast_recipients(
+                    after_id=last_user_id, limit=self.page_size, active_days=active_days,
+                )
+                if not user_ids:
+                    break
+                for user_id in user_ids:
+                    queue.put_nowait(user_id)
+                await queue.join()
+
+                last_user_id = user_ids[-1]
+                await self._db.broadcasts.checkpoint(
+                    broadcast_id,
+                    last_user_id=last_user_id,
+                    sent_count=page_stats["sent"],
+                    failed_count=page_stats["failed"],
+                    blocked_count=page_stats["blocked"],
+                )
+                for key in totals:
+                    totals[key] += page_stats[key]
+                    page_stats[key] = 0
+                if len(user_ids) < self.page_size:
+                    break
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        await self._db.broadcasts.complete(broadcast_id)
+        logger.info(
+            "Broadcast %d completed in %.0fs: sent=%d, failed=%d, blocked=%d",
+            broadcast_id, time.monotonic() - started, totals["sent"], totals["failed"], totals["blocked"],
+        )
+        return totals
+
+    async def _worker(self, queue: asyncio.Queue, payload: BroadcastPayload, stats: dict) -> None:
+        while True:
+            user_id = await queue.get()
+            try:
+                stats[await self._deliver(user_id, payload)] += 1
+            except Exception as e:
+                stats["failed"] += 1
+                logger.warning("Broadcast to %d failed: %s", user_id, e)
+            finally:
+                queue.task_done()
+
+    async def _deliver(self, user_id: int, payload: BroadcastPayload) -> str:
+        for _ in range(self.max_retries + 1):
+            await self._bucket.acquire()
+            try:
+                await payload.send(self._bot, user_id)
+                return "sent"
+            except TelegramRetryAfter as e:
+                # Flood control applies to the whole bot: every worker waits
+                logger.warning("Broadcast paused for %ss by flood control", e.retry_after)
+                self._bucket.pause(e.retry_after)
+            except TelegramForbiddenError:
+                return "blocked"
+            except Exception as e:
+                error_str = str(e).lower()
+                if "blocked" in error_str or "deactivated" in error_str:
+                    return "blocked"
+                logger.warning("Broadcast to %d failed: %s", user_id, e)
+                return "failed"
+        return "failed"
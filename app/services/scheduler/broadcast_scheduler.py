@@ -3,17 +3,36 @@ from datetime import datetime
 
 from aiogram import Bot
 
+from app.core.config import LimitsConfig
 from app.infrastructure.database.db import DB
+from app.services.scheduler.broadcast_engine import BroadcastEngine, TokenBucket
 
 logger = logging.getLogger(__name__)
 
+# Shared by every broadcast so that concurrent ones do not add up past the limit
+_bucket: TokenBucket | None = None
+
+
+def get_broadcast_bucket(limits: LimitsConfig) -> TokenBucket:
+    global _bucket
+    if _bucket is None:
+        _bucket = TokenBucket(rate=limits.broadcast_rate, burst=limits.broadcast_burst)
+    return _bucket
+
 
 class BroadcastScheduler:
 
-    def __init__(self, bot: Bot, db: DB) -> None:
+    def __init__(self, bot: Bot, db: DB, limits: LimitsConfig | None = None) -> None:
+        limits = limits or LimitsConfig()
         self._bot = bot
         self._db = db
-        self._running = False
+        self._engine = BroadcastEngine(
+            bot,
+            db,
+            bucket=get_broadcast_bucket(limits),
+            workers=limits.broadcast_workers,
+            page_size=limits.broadcast_page_size,
+        )
 
     async def create_broadcast(
         self,
@@ -29,7 +48,6 @@ class BroadcastScheduler:
                 text=text,
                 media_file_id=media_file_id,
                 segment=segment,
-                status="scheduled" if scheduled_at else "pending",
                 scheduled_at=scheduled_at,
             )
             row = result.as_dict()
@@ -39,67 +57,23 @@ class BroadcastScheduler:
             return None
 
     async def execute_broadcast(self, broadcast_id: int) -> dict:
-        stats = {"sent": 0, "failed": 0, "blocked": 0}
-
         try:
-            result = await self._db.users.get_active_users(days=30)
-            users = result.as_dicts() or []
+            return await self._engine.run(broadcast_id)
         except Exception as e:
-            logger.error("Failed to get users for broadcast: %s", e)
-            return stats
-
-        await self._db.broadcasts.update_status(broadcast_id, "sending")
-
-        for user in users:
-            user_id = user.get("id")
-            if not user_id:
-                continue
-
-            try:
-                broadcast_result = await self._db.broadcasts.get_scheduled()
-                rows = broadcast_result.as_dicts() or []
-                broadcast_data = next(
-                    (r for r in rows if r.get("id") == broadcast_id), None,
-                )
-                if not broadcast_data:
-                    break
+            # Left in 'sending': resume_interrupted() continues from the last checkpoint
+            logger.error("Broadcast %d interrupted: %s", broadcast_id, e)
+            return {"sent": 0, "failed": 0, "blocked": 0}
 
-                text = broadcast_data.get("text", "")
-                media_file_id = broadcast_data.get("media_file_id")
-
-                if media_file_id:
-                    await self._bot.send_photo(
-                        chat_id=user_id,
-                        photo=media_file_id,
-                        caption=text,
-                    )
-                else:
-                    await self._bot.send_message(
-                        chat_id=user_id,
-                        text=text,
-                    )
-                stats["sent"] += 1
-            except Exception as e:
-                error_str = str(e).lower()
-                if "blocked" in error_str or "deactivated" in error_str:
-                    stats["blocked"] += 1
-                else:
-                    stats["failed"] += 1
-                    logger.warning("Broadcast to %d failed: %s", user_id, e)
-
-        await self._db.broadcasts.update_stats(
-            broadcast_id,
-            total_recipients=stats["sent"] + stats["failed"] + stats["blocked"],
-            sent_count=stats["sent"],
-            failed_count=stats["failed"],
-            blocked_count=stats["blocked"],
-        )
-
-        logger.info(
-            "Broadcast %d completed: sent=%d, failed=%d, blocked=%d",
-            broadcast_id, stats["sent"], stats["failed"], stats["blocked"],
-        )
-        return stats
+    async def resume_interrupted(self) -> None:
+        """Finish broadcasts that were still sending when the bot stopped."""
+        try:
+            result = await self._db.broadcasts.get_interrupted()
+            rows = result.as_dicts() or []
+        except Exception as e:
+            logger.error("Failed to get interrupted broadcasts: %s", e)
+            return
+        for row in rows:
+            await self.execute_broadcast(row["id"])
 
     async def get_scheduled(self) -> list[dict]:
         try:
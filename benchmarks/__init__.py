@@ -0,0 +1,2 @@
+# benchmarks package
+# Stand-alone benchmark and stress harnesses, run with python -m benchmarks.<name>
@@ -0,0 +1,115 @@
+"""
+Stress test: 50k scheduled deletions through DeleteScheduler.
+
+Schedules --count deletions over --chats chats, due --delay to --delay +
+--spread seconds later, into a temporary schedule file, with a fake
+delete_messages that records the calls. A share of them (--cancel) is
+cancelled, and halfway
+the scheduler is closed and reopened from the file, as after a restart.
+Checks that every remaining message is deleted exactly once, no cancelled
+one is, the thread count does not grow with the number of deletions, and
+reports memory per pending deletion, batching and lateness.
+
+    python -m benchmarks.delete_scheduler_stress --count 50000
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+import tracemalloc
+from HELPERS.delete_scheduler import DeleteScheduler
+
+
+class FakeDeleter:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.deleted = {}
+        self.calls = 0
+
+    def __call__(self, chat_id, message_ids):
+        now = time.time()
+        with self.lock:
+            self.calls += 1
+            for message_id in message_ids:
+                key = (chat_id, message_id)
+                self.deleted[key] = self.deleted.get(key, ()) + (now,)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=50000)
+    parser.add_argument("--chats", type=int, default=500)
+    parser.add_argument("--delay", type=float, default=15.0, help="first deletions are due after scheduling is done")
+    parser.add_argument("--spread", type=float, default=20.0, help="deletions are due within this many seconds")
+    parser.add_argument("--cancel", type=float, default=0.1, help="share of deletions cancelled")
+    parser.add_argument("--tick", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    directory = tempfile.mkdtemp(prefix="delete_scheduler_stress_")
+    path = os.path.join(directory, "scheduled_deletes.sqlite3")
+    deleter = FakeDeleter()
+    try:
+        threads_before = threading.active_count()
+        tracemalloc.start()
+        scheduler = DeleteScheduler(path, delete=deleter, tick=args.tick)
+        due = {}
+        first_due = time.time() + args.delay
+        started = time.perf_counter()
+        for message_id in range(1, args.count + 1):
+            chat_id = rng.randrange(1, args.chats + 1)
+            when = first_due + rng.uniform(0, args.spread)
+            scheduler.schedule(chat_id, [message_id], when - time.time())
+            due[(chat_id, message_id)] = when
+        schedule_time = time.perf_counter() - started
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        threads_during = threading.active_count()
+
+        cancelled = set(rng.sample(sorted(due), int(args.count * args.cancel)))
+        by_chat = {}
+        for chat_id, message_id in cancelled:
+            by_chat.setdefault(chat_id, []).append(message_id)
+        cancel_count = sum(scheduler.cancel(chat_id, ids) for chat_id, ids in by_chat.items())
+
+        print(f"scheduled {args.count} in {schedule_time:.2f}s ({schedule_time / args.count * 1e6:.0f} us each), "
+              f"{memory / args.count:.0f} bytes traced per deletion (wheel, index and SQLite cache)")
+        print(f"threads: {threads_before} before, {threads_during} while {scheduler.pending()} deletions were pending")
+
+        # Restart halfway: pending deletions come back from the file
+        time.sleep(max(0.0, first_due + args.spread / 2 - time.time()))
+        stats = scheduler.get_stats()
+        scheduler.close()
+        scheduler = DeleteScheduler(path, delete=deleter, tick=args.tick)
+        restored = scheduler.pending()
+        scheduler.start()
+        print(f"restart halfway: {stats['deleted']} deleted, {restored} restored from the file")
+
+        deadline = first_due + args.spread + 5
+        while scheduler.pending() and time.time() < deadline:
+            time.sleep(0.2)
+        time.sleep(args.tick * 2)
+        scheduler.close()
+
+        expected = set(due) - cancelled
+        deleted = set(deleter.deleted)
+        twice = sum(1 for times in deleter.deleted.values() if len(times) > 1)
+        late = sorted(deleter.deleted[key][0] - due[key] for key in deleted & expected)
+        n = len(late)
+        print(f"cancelled {cancel_count}/{len(cancelled)}; deleted {len(deleted & expected)}/{len(expected)}, "
+              f"{len(deleted & cancelled)} cancelled ones deleted, {twice} deleted twice")
+        print(f"{deleter.calls} delete_messages calls for {len(deleted)} messages; "
+              f"lateness p50 {late[n // 2] * 1e3:.0f} ms, p99 {late[int(n * 0.99)] * 1e3:.0f} ms, "
+              f"min {late[0] * 1e3:.0f} ms, max {late[-1] * 1e3:.0f} ms")
+        ok = deleted == expected and not twice and late[0] >= 0 and threads_during <= threads_before + 1
+        print("OK" if ok else "FAILED")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+Benchmark: /img albums of 10, 100 and 1000 items.
+
+Serves a local album page (a "generic:" gallery-dl URL; every file is served
+after --file-delay seconds) and sends the files in groups of 10 through an
+upload stand-in (0.25 s + 20 ms per file, like send_media_group), with:
+  - "sleep+scan": the former /img loop, one gallery-dl CLI run per range,
+    then time.sleep(2) (plus 3 s after the first range), a run directory
+    scan and a 0.5 s sleep per loop iteration,
+  - "events, CLI": ranges downloaded in the background while albums are
+    sent, files reported by _run_cli_streaming as gallery-dl writes them,
+  - "events, session": the same with a GalleryDLSession, which fetches the
+    album page once for all ranges.
+
+Reports total time, time to the first album and album page fetches.
+gallery-dl's generic extractor takes no port in the URL, so the server
+listens on --port 80 by default (root or CAP_NET_BIND_SERVICE).
+
+    python -m benchmarks.img_pickup_benchmark --items 10 100 1000
+"""
+
+import argparse
+import http.server
+import json
+import os
+import queue
+import shutil
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+
+from DOWN_AND_UP.gallery_dl_hook import _run_cli_streaming
+from DOWN_AND_UP.gallery_dl_session import GalleryDLSessionRegistry, merge_global_config
+
+BATCH = 10
+_DONE = object()
+
+
+class AlbumServer:
+    """Local album page with one <img> per item; counts page and file requests."""
+
+    def __init__(self, port, file_delay):
+        self.hits = {"page": 0, "file": 0}
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                if self.path.startswith("/album"):
+                    server.hits["page"] += 1
+                    count = int(self.path.split("=")[1])
+                    body = ("<html><body>" + "".join(
+                        f'<img src="/img/{i:05d}.jpg">' for i in range(count)) + "</body></html>").encode()
+                    content_type = "text/html"
+                else:
+                    server.hits["file"] += 1
+                    time.sleep(file_delay)
+                    body = b"\xff\xd8" + os.urandom(20000)
+                    content_type = "image/jpeg"
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Content-Type", content_type)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        socketserver.ThreadingTCPServer.daemon_threads = True
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    @staticmethod
+    def url(items):
+        return f"generic:http://127.0.0.1/album?n={items}"
+
+
+def upload(group):
+    """send_media_group stand-in."""
+    time.sleep(0.25 + 0.02 * len(group))
+
+
+def cli_range(url, first, last, run_dir, on_file=None):
+    """One gallery-dl CLI run for first..last, as download_image_range_cli builds it."""
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump({"extractor": {"timeout": 30, "retries": 3}, "base-directory": run_dir}, f)
+        cfg_path = f.name
+    try:
+        cmd = [sys.executable, "-m", "gallery_dl", "--config", cfg_path, "--range", f"{first}-{last}", url]
+        return _run_cli_streaming(cmd, on_file or (lambda path: None), timeout=600).returncode == 0
+    finally:
+        os.unlink(cfg_path)
+
+
+def sleep_and_scan(url, items, run_dir):
+    """The former loop: download a range, sleep, scan the run directory."""
+    seen, buffer, sent, current, first_album, empty = set(), [], 0, 1, None, 0
+    started = time.time()
+    while True:
+        if not buffer:
+            if current > items:
+                break
+            last = min(current + BATCH - 1, items)
+            cli_range(url, current, last, run_dir)
+            current = last + 1
+            time.sleep(2)
+            if current == BATCH + 1 or items <= BATCH:
+                time.sleep(3)
+        found = 0
+        for root, _, files in os.walk(run_dir):
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                if path in seen:
+                    continue
+                seen.add(path)
+                buffer.append(path)
+                found += 1
+                if len(buffer) >= BATCH:
+                    upload(buffer[:BATCH])
+                    sent, buffer = sent + BATCH, buffer[BATCH:]
+                    first_album = first_album or time.time() - started
+        if current > items and buffer:
+            upload(buffer)
+            sent, buffer = sent + len(buffer), []
+            first_album = first_album or time.time() - started
+        empty = empty + 1 if found == 0 else 0
+        if empty >= 3:
+            break
+        time.sleep(0.5)
+    return sent, time.time() - started, first_album
+
+
+def event_driven(url, items, run_dir, download_range):
+    """The current loop: the next range downloads while the finished files are sent."""
+    completed = queue.Queue()
+    seen, buffer, sent, current, first_album = set(), [], 0, 1, None
+    worker, last_full, expected, before = None, False, 0, 0
+    started = time.time()
+
+    def run(first, last):
+        try:
+            download_range(first, last, completed.put)
+        finally:
+            completed.put(_DONE)
+
+    while True:
+        more = current <= items
+        if worker is None and (not buffer or (last_full and more)):
+            if not more:
+                break
+            last = min(current + BATCH - 1, items)
+            before, expected = len(seen), last - current + 1
+            worker = threading.Thread(target=run, args=(current, last), daemon=True)
+            worker.start()
+            current = last + 1
+        paths, finished, block = [], False, worker is not None
+        while True:
+            try:
+                item = completed.get(timeout=60) if block else completed.get_nowait()
+            except queue.Empty:
+                break
+            block = False
+            if item is _DONE:
+                worker, finished = None, True
+                break
+            paths.append(item)
+        for path in paths:
+            path = os.path.normpath(path)
+            if path in seen:
+                continue
+            seen.add(path)
+            buffer.append(path)
+            if len(buffer) >= BATCH:
+                upload(buffer[:BATCH])
+                sent, buffer = sent + BATCH, buffer[BATCH:]
+                first_album = first_album or time.time() - started
+        if finished:
+            last_full = len(seen) - before >= expected
+            if not last_full and not paths and not buffer:
+                break
+        if worker is None and current > items and buffer:
+            upload(buffer)
+            sent, buffer = sent + len(buffer), []
+            first_album = first_album or time.time() - started
+        if worker is None and current > items and not buffer:
+            break
+    return sent, time.time() - started, first_album
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--port", type=int, default=80, help="album server port; only 80 works with generic:")
+    parser.add_argument("--file-delay", type=float, default=0.005, help="seconds to serve one file")
+    args = parser.parse_args()
+
+    server = AlbumServer(args.port, args.file_delay)
+    os.environ["NO_PROXY"] = "127.0.0.1"
+    workdir = tempfile.mkdtemp(prefix="img_pickup_benchmark_")
+    cwd = os.getcwd()
+    # Sessions stage files under users/<id> of the working directory, like the bot
+    os.chdir(workdir)
+    try:
+        for items in args.items:
+            url = server.url(items)
+            registry = GalleryDLSessionRegistry()
+
+            def session_range(first, last, on_file, url=url, registry=registry):
+                session = registry.get(1, url, False, lambda: merge_global_config({"extractor": {"timeout": 30}}))
+                session.download_range(first, last, run_dir, on_file=on_file)
+
+            variants = [
+                ("sleep+scan     ", lambda: sleep_and_scan(url, items, run_dir)),
+                ("events, CLI    ", lambda: event_driven(
+                    url, items, run_dir, lambda a, b, on_file: cli_range(url, a, b, run_dir, on_file))),
+                ("events, session", lambda: event_driven(url, items, run_dir, session_range)),
+            ]
+            print(f"{items} items:")
+            for label, variant in variants:
+                run_dir = os.path.join(workdir, f"run_{items}")
+                shutil.rmtree(run_dir, ignore_errors=True)
+                os.makedirs(run_dir)
+                server.hits.update(page=0, file=0)
+                sent, total, first_album = variant()
+                print(f"  {label}: {sent} sent in {total:.1f}s, first album after {first_album or 0:.1f}s, "
+                      f"{server.hits['page']} page fetches, {server.hits['file']} file fetches")
+            registry.close(1)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
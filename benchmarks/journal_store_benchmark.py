@@ -0,0 +1,101 @@
+"""
+Benchmark: local-mode log writes by database size.
+
+Fills a temporary dump.json with N log entries (bot/<name>/logs/<uid>/<ts>,
+like write_logs()) and times new log writes through LocalDBAdapter with:
+  - "json": the former engine, which re-reads and rewrites the whole file
+    for every write (LOCAL_DB_ENGINE = "json"),
+  - "journal": JournaledStore, one appended journal line per write.
+
+Reports writes/s and p50/p99 latency. The json engine takes seconds per write
+at 100k entries, so it gets only --json-writes writes.
+
+    python -m benchmarks.journal_store_benchmark --entries 10000 100000 1000000
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from DATABASE.firebase_init import LocalDBAdapter
+from DATABASE.journal_store import JournaledStore
+
+BOT_NAME = "journal_benchmark"
+ENTRIES_PER_USER = 10
+
+
+def log_entry(user_id, ts):
+    return {
+        "ID": str(user_id),
+        "timestamp": str(ts),
+        "name": f"user {user_id}",
+        "urls": "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        "title": "Some video title",
+    }
+
+
+def make_dump(path, entries):
+    users = max(1, entries // ENTRIES_PER_USER)
+    logs = {
+        str(user_id): {str(ts): log_entry(user_id, ts) for ts in range(ENTRIES_PER_USER)}
+        for user_id in range(users)
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"bot": {BOT_NAME: {"logs": logs}}}, f, ensure_ascii=False, indent=2)
+    return users
+
+
+def run(db, users, writes):
+    logs = db.child("bot").child(BOT_NAME).child("logs")
+    latencies = []
+    started = time.perf_counter()
+    for i in range(writes):
+        user_id = i % users
+        ts = 10 ** 9 + i
+        call_started = time.perf_counter()
+        logs.child(str(user_id)).child(str(ts)).set(log_entry(user_id, ts))
+        latencies.append(time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    n = len(latencies)
+    return (
+        f"{n} writes, {n / elapsed:.1f} writes/s, p50 {latencies[n // 2] * 1e3:.3f} ms, "
+        f"p99 {latencies[min(n - 1, int(n * 0.99))] * 1e3:.3f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--writes", type=int, default=5000, help="writes through the journaled store")
+    parser.add_argument("--json-writes", type=int, default=3, help="writes through the json engine")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="journal_store_benchmark_")
+    try:
+        for entries in args.entries:
+            print(f"{entries} log entries:")
+            json_dump = os.path.join(directory, f"json_{entries}.json")
+            users = make_dump(json_dump, entries)
+            print(f"  json:    {run(LocalDBAdapter(json_dump, '/'), users, args.json_writes)}")
+            os.remove(json_dump)
+
+            journal_dump = os.path.join(directory, f"journal_{entries}.json")
+            make_dump(journal_dump, entries)
+            started = time.perf_counter()
+            store = JournaledStore(journal_dump, compact_interval=3600)
+            print(f"  journal: load {time.perf_counter() - started:.2f}s")
+            print(f"  journal: {run(LocalDBAdapter(journal_dump, '/', store=store), users, args.writes)}")
+            started = time.perf_counter()
+            store.close()
+            print(f"  journal: final compaction {time.perf_counter() - started:.2f}s")
+            os.remove(journal_dump)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
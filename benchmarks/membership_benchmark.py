@@ -0,0 +1,114 @@
+"""
+Benchmark: per-message cost of check_user() + is_user_blocked() by user count.
+
+Fills a temporary journaled LocalDBAdapter with N registered users (1% of
+them blocked) and replays messages, 1% of them from new users (which get
+registered), through:
+  - "full fetch": the former checks, which read the whole users and
+    blocked_users subtrees for every message,
+  - "index": MembershipIndex following the writes through the wrapped adapter.
+
+    python -m benchmarks.membership_benchmark --users 1000 10000 100000
+"""
+
+import argparse
+import math
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from DATABASE.firebase_init import LocalDBAdapter
+from DATABASE.journal_store import JournaledStore
+from DATABASE.membership_index import MembershipIndex
+from services.stats_events import add_db_listener, wrap_db_adapter
+
+BOT_NAME = "membership_benchmark"
+
+
+def make_db(directory, users):
+    snapshot = os.path.join(directory, f"dump_{users}.json")
+    store = JournaledStore(snapshot, compact_interval=3600)
+    store.set(f"/bot/{BOT_NAME}", {
+        "users": {str(uid): {"ID": uid, "timestamp": 0} for uid in range(1, users + 1)},
+        "blocked_users": {str(uid): {"ID": str(uid), "timestamp": "0"} for uid in range(100, users + 1, 100)},
+    })
+    return wrap_db_adapter(LocalDBAdapter(snapshot, "/", store=store)), store
+
+
+def full_fetch_checks(db):
+    def check(user_id):
+        users_node = db.child("bot").child(BOT_NAME).child("users")
+        user_db = users_node.get().each()
+        users = [user.key() for user in user_db] if user_db else []
+        if str(user_id) not in users:
+            users_node.child(str(user_id)).set({"ID": user_id, "timestamp": math.floor(time.time())})
+        blocked = db.child("bot").child(BOT_NAME).child("blocked_users").get().each()
+        blocked_users = [int(b_user.key()) for b_user in blocked] if blocked else []
+        return int(user_id) in blocked_users
+    return check
+
+
+def index_checks(db):
+    def load_keys(section):
+        data = db.child("bot").child(BOT_NAME).child(section).get().val()
+        return data.keys() if isinstance(data, dict) else ()
+
+    index = MembershipIndex(BOT_NAME, load_keys, refresh_interval=0)
+    add_db_listener(index.handle_db_event)
+    started = time.perf_counter()
+    index.reload()
+    print(f"  index load: {(time.perf_counter() - started) * 1e3:.0f} ms")
+
+    def check(user_id):
+        if not index.is_registered(user_id):
+            db.child("bot").child(BOT_NAME).child("users").child(str(user_id)).set(
+                {"ID": user_id, "timestamp": math.floor(time.time())})
+        return index.is_blocked(user_id)
+    return check
+
+
+def replay(check, users, messages, seed):
+    rng = random.Random(seed)
+    next_new = users + 1
+    latencies = []
+    blocked = 0
+    for _ in range(messages):
+        if rng.random() < 0.01:
+            user_id, next_new = next_new, next_new + 1
+        else:
+            user_id = rng.randint(1, users)
+        started = time.perf_counter()
+        blocked += check(user_id)
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    n = len(latencies)
+    return (
+        f"{n} messages, {blocked} blocked, p50 {latencies[n // 2] * 1e6:.1f} us, "
+        f"p99 {latencies[int(n * 0.99)] * 1e6:.1f} us, mean {sum(latencies) / n * 1e6:.1f} us"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--messages", type=int, default=20000, help="messages replayed through the index")
+    parser.add_argument("--full-fetch-messages", type=int, default=50, help="messages replayed through full fetches")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="membership_benchmark_")
+    try:
+        for users in args.users:
+            print(f"{users} users:")
+            db, store = make_db(directory, users)
+            print(f"  full fetch: {replay(full_fetch_checks(db), users, args.full_fetch_messages, args.seed)}")
+            print(f"  index:      {replay(index_checks(db), users, args.messages, args.seed)}")
+            store.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark: NSFW keyword checks over 100k titles.
+
+Generates a random keyword list (single words, multi-word phrases, Cyrillic
+and punctuated keywords) and --titles random titles with URLs, about 5% of
+them carrying a keyword, and runs the keyword part of is_porn() with:
+  - "per call": the former check, which rebuilt the keyword alternation on
+    every call and compiled one more pattern per keyword for the URL,
+  - "compiled": NSFWClassifier, built once per list load.
+
+The per-call check recompiles every keyword pattern once the re module
+cache overflows and takes over a second per title with 1500 keywords, so it
+runs on the first --per-call-titles titles and its time is extrapolated;
+its verdicts on those titles must match the compiled ones.
+
+    python -m benchmarks.nsfw_benchmark --keywords 1500 --titles 100000
+"""
+
+import argparse
+import random
+import re
+import time
+
+from app.services.nsfw.classifier import NSFWClassifier
+
+ALPHA = "abcdefghijklmnopqrstuvwxyz"
+CYRILLIC = "абвгдежзиклмнопрстуфхцчшщыэюя"
+WHITE_KEYWORDS = ["a55", "Hassas", "assasinate", "assasinated", "assassinate", "assassinated", "assassination"]
+
+
+def word(low=3, high=9, alphabet=ALPHA):
+    return "".join(random.choice(alphabet) for _ in range(random.randint(low, high)))
+
+
+def make_keywords(count):
+    keywords = set()
+    while len(keywords) < count:
+        r = random.random()
+        if r < 0.6:
+            keywords.add(word())
+        elif r < 0.85:
+            keywords.add(f"{word()} {word()}")
+        elif r < 0.95:
+            keywords.add(word(3, 8, CYRILLIC))
+        else:
+            keywords.add(word(2, 4) + random.choice("+-.") + word(1, 3))
+    return keywords
+
+
+def make_samples(count, keywords):
+    vocabulary = [word() for _ in range(20000)] + [word(3, 8, CYRILLIC) for _ in range(3000)]
+    keyword_list = sorted(keywords)
+    samples = []
+    for _ in range(count):
+        words = [random.choice(vocabulary) for _ in range(random.randint(3, 14))]
+        if random.random() < 0.05:
+            words.insert(random.randrange(len(words) + 1), random.choice(keyword_list))
+        title = " ".join(words).title() + random.choice(["", " (Official Video)", " | 4K", " #shorts"])
+        slug = "-".join(title.lower().split()[:6])
+        url = random.choice([
+            f"https://example{random.randint(1, 500)}.com/video/{slug}",
+            f"https://www.youtube.com/watch?v={word(11, 11)}",
+            f"https://cdn.site{random.randint(1, 50)}.net/v/{word(8, 8)}_{slug.replace('-', '_')}.mp4",
+        ])
+        samples.append((url.lower(), title.lower()))
+    return samples
+
+
+def per_call_check(keywords, url_lower, title_lower):
+    """The former keyword part of is_porn(): every pattern compiled on each call."""
+    combined = " ".join([title_lower, "", "", "", url_lower])
+    white = [re.escape(kw.lower()) for kw in WHITE_KEYWORDS if kw.strip()]
+    if re.compile(r"\b(" + "|".join(white) + r")\b", flags=re.IGNORECASE).search(combined):
+        return False
+    text = [re.escape(kw.lower()) for kw in keywords if kw.strip()]
+    if re.compile(r"\b(" + "|".join(text) + r")\b", flags=re.IGNORECASE).search(" ".join([title_lower, "", "", ""])):
+        return True
+    for raw in keywords:
+        core = r"[^A-Za-z0-9]+".join(re.escape(w) for w in raw.lower().split() if w)
+        if re.compile(rf"(?<![A-Za-z0-9])(?:{core})(?![A-Za-z0-9])", flags=re.IGNORECASE).search(url_lower):
+            return True
+    return False
+
+
+def compiled_check(classifier, url_lower, title_lower):
+    """The keyword part of is_porn() with a prebuilt NSFWClassifier."""
+    if classifier.white_keyword(" ".join([title_lower, "", "", "", url_lower])):
+        return False
+    if classifier.text_keyword(" ".join([title_lower, "", "", ""])):
+        return True
+    return classifier.url_keyword(url_lower) is not None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keywords", type=int, default=1500)
+    parser.add_argument("--titles", type=int, default=100000)
+    parser.add_argument("--per-call-titles", type=int, default=50, help="titles run through the former check")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    keywords = make_keywords(args.keywords)
+    samples = make_samples(args.titles, keywords)
+
+    started = time.perf_counter()
+    classifier = NSFWClassifier(keywords=keywords, white_keywords=WHITE_KEYWORDS)
+    build = time.perf_counter() - started
+
+    started = time.perf_counter()
+    compiled = [compiled_check(classifier, url, title) for url, title in samples]
+    compiled_time = time.perf_counter() - started
+
+    subset = samples[:args.per_call_titles]
+    started = time.perf_counter()
+    per_call = [per_call_check(keywords, url, title) for url, title in subset]
+    per_call_time = (time.perf_counter() - started) / len(subset) * len(samples)
+    mismatches = sum(a != b for a, b in zip(per_call, compiled))
+
+    n = len(samples)
+    print(f"{len(keywords)} keywords, {n} titles, {sum(compiled)} flagged, classifier built in {build * 1e3:.1f} ms")
+    print(f"  per call: {per_call_time:7.2f}s ({per_call_time / n * 1e6:.1f} us/title, "
+          f"extrapolated from {len(subset)} titles)")
+    print(f"  compiled: {compiled_time:7.2f}s ({compiled_time / n * 1e6:.1f} us/title), "
+          f"{per_call_time / compiled_time:.0f}x faster")
+    print(f"  verdict mismatches on the shared titles: {mismatches}")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
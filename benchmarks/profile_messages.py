@@ -0,0 +1,130 @@
+"""
+Profile the CPU share of localized message lookups.
+
+Runs a synthetic download-like workload (progress lines, split loops) that
+reads messages through safe_get_messages(user_id).X, once with the previous
+lookup path (new Messages per call, lang.txt read from disk, placeholders
+formatted on every attribute access) and once with the current one (shared
+pre-formatted bundle per language, cached user settings), and reports which
+part of the CPU time is spent on message lookup (workload CPU time minus
+the same workload with a no-op lookup; no profiler, whose per-call overhead
+would dwarf a dictionary read).
+
+Usage:
+    python -m benchmarks.profile_messages [--users 200] [--iterations 20000]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from CONFIG import messages as messages_module
+# Same router instance CONFIG.messages uses (imported through the LANGUAGES path)
+from language_router import language_router
+
+
+class LegacyMessages(object):
+    """Lookup path before bundles were cached (kept here for comparison)."""
+
+    def __init__(self, user_id=None):
+        language_code = language_router.default_language
+        lang_file = os.path.join(f'./users/{str(user_id)}', 'lang.txt')
+        if os.path.exists(lang_file):
+            with open(lang_file, 'r', encoding='utf-8') as f:
+                code = f.read().strip()
+                if code in language_router.available_languages:
+                    language_code = code
+        self._messages = language_router.load_messages(language_code)
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            return super().__getattribute__(name)
+        if name in self._messages:
+            value = self._messages[name]
+            if isinstance(value, str):
+                return messages_module._format_message(value)
+            return value
+        return f"[{name}]"
+
+
+class StubMessages(object):
+    """No-op lookup used to measure the cost of the rest of the workload."""
+
+    def __getattr__(self, name):
+        return name
+
+
+def lookup(get_messages, user_id, key):
+    """One message read as done across the code base: safe_get_messages(user_id).KEY"""
+    return getattr(get_messages(user_id), key)
+
+
+def workload(get_messages, user_ids, keys, iterations):
+    """Message reads interleaved with the string work of a progress/split loop."""
+    rnd = random.Random(1)
+    out = 0
+    for i in range(iterations):
+        text = lookup(get_messages, user_ids[i % len(user_ids)], keys[i % len(keys)])
+        downloaded = rnd.randrange(1, 1 << 30)
+        filled = downloaded % 20
+        line = f"{text[:40]} {downloaded / (1 << 20):.2f} MiB {'█' * filled}{'░' * (20 - filled)}"
+        out += len(line.encode("utf-8"))
+    return out
+
+
+def cpu_time(get_messages, user_ids, keys, iterations, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.process_time()
+        workload(get_messages, user_ids, keys, iterations)
+        elapsed = time.process_time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run(label, get_messages, user_ids, keys, iterations, baseline):
+    """CPU share of message lookup: workload time minus the same workload with a no-op lookup."""
+    get_messages(user_ids[0])  # load the language files outside the measurement
+    total = cpu_time(get_messages, user_ids, keys, iterations)
+    lookup_time = max(0.0, total - baseline)
+    share = lookup_time / total * 100 if total else 0.0
+    print(f"{label:>6}: {total:.3f}s CPU, {lookup_time / iterations * 1e6:.2f} us per lookup, "
+          f"message lookup {share:.1f}% of CPU time")
+    return share
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="profile_messages_")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        languages = list(language_router.available_languages)
+        user_ids = list(range(1000, 1000 + args.users))
+        for user_id in user_ids:
+            os.makedirs(os.path.join("users", str(user_id)))
+            with open(os.path.join("users", str(user_id), "lang.txt"), "w", encoding="utf-8") as f:
+                f.write(languages[user_id % len(languages)])
+        keys = [k for k, v in language_router.load_messages("en").items() if isinstance(v, str)][:50]
+        for code in languages:
+            language_router.load_messages(code)
+
+        stub = StubMessages()
+        baseline = cpu_time(lambda user_id: stub, user_ids, keys, args.iterations)
+        before = run("before", LegacyMessages, user_ids, keys, args.iterations, baseline)
+        after = run("after", messages_module.safe_get_messages, user_ids, keys, args.iterations, baseline)
+        print(f"message lookup CPU share: {before:.1f}% -> {after:.1f}%")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
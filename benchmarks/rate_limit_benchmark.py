@@ -0,0 +1,97 @@
+"""Benchmark: per-message rate limit check latency and memory.
+
+Replays a day of traffic at a fixed message rate spread over a number of
+users (simulated clock) through SlidingWindowLimiter and through the
+former per-request timestamp lists, and prints check latency and
+retained state for both.
+
+    python -m benchmarks.rate_limit_benchmark --rate 1000 --users 5000 --seconds 600
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from app.services.rate_limit.limiter import WINDOWS, SlidingWindowLimiter
+
+
+class TimestampLists:
+    """The former storage: every request timestamp of the last day, filtered on each check."""
+
+    def __init__(self, limits, cooldowns) -> None:
+        self.limits = limits
+        self.cooldowns = cooldowns
+        self.users: dict[int, dict[str, list[float]]] = {}
+        self.cooldown_until: dict[int, float] = {}
+
+    def check(self, key: int, now: float) -> bool:
+        if self.cooldown_until.get(key, 0) > now:
+            return False
+        windows = self.users.setdefault(key, {"minute": [], "hour": [], "day": []})
+        for timestamps, size, limit, cooldown in zip(windows.values(), WINDOWS, self.limits, self.cooldowns):
+            timestamps[:] = [ts for ts in timestamps if ts > now - size]
+            if len(timestamps) >= limit:
+                self.cooldown_until[key] = now + cooldown
+                return False
+        for timestamps in windows.values():
+            timestamps.append(now)
+        return True
+
+
+def replay(check, rate: int, users: int, seconds: int, seed: int, timed: bool) -> tuple[list[float], int]:
+    rng = random.Random(seed)
+    latencies = []
+    allowed = 0
+    now = 1_700_000_000.0
+    for _ in range(rate * seconds):
+        now += 1.0 / rate
+        key = rng.randrange(users)
+        if timed:
+            started = time.perf_counter()
+            allowed += check(key, now)
+            latencies.append(time.perf_counter() - started)
+        else:
+            allowed += check(key, now)
+    return latencies, allowed
+
+
+def run(label: str, make_check, rate: int, users: int, seconds: int, seed: int) -> None:
+    latencies, allowed = replay(make_check(), rate, users, seconds, seed, timed=True)
+    # Memory in a second, untimed pass: tracing slows every allocation down
+    tracemalloc.start()
+    check = make_check()
+    replay(check, rate, users, seconds, seed, timed=False)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    latencies.sort()
+    n = len(latencies)
+    print(
+        f"{label}: {n} checks, {allowed} allowed, "
+        f"p50 {latencies[n // 2] * 1e6:.1f} us, p99 {latencies[int(n * 0.99)] * 1e6:.1f} us, "
+        f"mean {sum(latencies) / n * 1e6:.1f} us, retained state {retained / 1024:.0f} KiB"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=int, default=1000, help="messages per second")
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--seconds", type=int, default=600, help="simulated seconds of traffic")
+    parser.add_argument("--limits", type=int, nargs=3, default=(5, 60, 1000), metavar=("MINUTE", "HOUR", "DAY"))
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    cooldowns = (300, 3600, 86400)
+
+    def sliding_window():
+        limiter = SlidingWindowLimiter(args.limits, cooldowns)
+        return lambda key, now: limiter.check(key, now=now).allowed
+
+    def timestamp_lists():
+        return TimestampLists(args.limits, cooldowns).check
+
+    run("sliding window", sliding_window, args.rate, args.users, args.seconds, args.seed)
+    run("timestamp lists", timestamp_lists, args.rate, args.users, args.seconds, args.seed)
+
+if __name__ == "__main__":
+    main()
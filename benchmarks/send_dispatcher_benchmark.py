@@ -0,0 +1,143 @@
+"""
+Benchmark: outbound messages to many concurrent chats.
+
+A fake client answers send_message after --latency seconds and, like
+Telegram, answers with FloodWait when the bot sends more than
+--server-rate messages in one second, or to one chat less than
+--server-chat-interval seconds after the previous one. One thread per chat
+sends --messages messages; one extra chat sends --busy-messages. Both
+outbound paths are measured:
+  - "global lock": the former throttle, one lock for all chats with a
+    blocking 0.25 s spacing sleep, FloodWait dropping the message,
+  - "dispatcher": SendDispatcher with per-chat queues and the global bucket.
+
+    python -m benchmarks.send_dispatcher_benchmark --chats 500 --messages 3
+"""
+import argparse
+import threading
+import time
+from collections import defaultdict, deque
+from pyrogram.errors import FloodWait
+from HELPERS.send_dispatcher import SendDispatcher
+
+
+class FakeClient:
+    def __init__(self, latency, server_rate, chat_interval):
+        self.latency = latency
+        self.server_rate = server_rate
+        self.chat_interval = chat_interval
+        self.lock = threading.Lock()
+        self.recent = deque()
+        self.last_by_chat = {}
+        self.received = defaultdict(list)
+        self.flood_waits = 0
+
+    def send_message(self, chat_id, text):
+        time.sleep(self.latency)
+        with self.lock:
+            now = time.monotonic()
+            while self.recent and self.recent[0] <= now - 1:
+                self.recent.popleft()
+            if len(self.recent) >= self.server_rate or now - self.last_by_chat.get(chat_id, -1e9) < self.chat_interval:
+                self.flood_waits += 1
+                raise FloodWait(value=1)
+            self.recent.append(now)
+            self.last_by_chat[chat_id] = now
+            self.received[chat_id].append(text)
+        return text
+
+
+class GlobalLockSender:
+    """The former safe_send_message throttle."""
+
+    def __init__(self, client):
+        self.client = client
+        self.lock = threading.Lock()
+        self.last_sent = {}
+
+    def send(self, chat_id, text):
+        with self.lock:
+            last = self.last_sent.get(chat_id, 0)
+            now = time.time()
+            if now - last < 0.25:
+                time.sleep(0.25 - (now - last))
+            self.last_sent[chat_id] = time.time()
+        try:
+            return self.client.send_message(chat_id, text)
+        except FloodWait:
+            return None
+
+
+class DispatcherSender:
+    def __init__(self, client, workers, rate, burst):
+        self.client = client
+        self.dispatcher = SendDispatcher(workers=workers, rate=rate, burst=burst, chat_interval=0.25, flood_retry_max=10)
+
+    def send(self, chat_id, text):
+        try:
+            return self.dispatcher.call(chat_id, self.client.send_message, chat_id, text)
+        except FloodWait:
+            return None
+
+
+def run(label, sender, client, chats, messages, busy_messages):
+    latencies = defaultdict(list)
+    start_barrier = threading.Barrier(chats + 1)
+
+    def chat_thread(chat_id, count):
+        start_barrier.wait()
+        for seq in range(count):
+            started = time.monotonic()
+            sender.send(chat_id, f"{chat_id}:{seq}")
+            latencies[chat_id].append(time.monotonic() - started)
+
+    threads = [threading.Thread(target=chat_thread, args=(0, busy_messages), daemon=True)]
+    threads += [threading.Thread(target=chat_thread, args=(chat_id, messages), daemon=True) for chat_id in range(1, chats)]
+    for thread in threads:
+        thread.start()
+    started = time.monotonic()
+    start_barrier.wait()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    delivered = sum(len(texts) for texts in client.received.values())
+    out_of_order = sum(
+        1 for texts in client.received.values()
+        for previous, current in zip(texts, texts[1:])
+        if int(previous.split(":")[1]) > int(current.split(":")[1])
+    )
+    others = sorted(latency for chat_id, values in latencies.items() if chat_id != 0 for latency in values)
+    n = len(others)
+    print(
+        f"{label}: {delivered}/{messages * (chats - 1) + busy_messages} delivered in {elapsed:.1f}s "
+        f"({delivered / elapsed:.1f} msg/s), {client.flood_waits} FloodWaits, {out_of_order} out of order; "
+        f"other chats latency p50 {others[n // 2]:.2f}s p99 {others[int(n * 0.99)]:.2f}s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chats", type=int, default=500)
+    parser.add_argument("--messages", type=int, default=3, help="messages per chat")
+    parser.add_argument("--busy-messages", type=int, default=60, help="messages of the one busy chat")
+    parser.add_argument("--latency", type=float, default=0.05, help="fake API round trip in seconds")
+    parser.add_argument("--server-rate", type=int, default=30, help="messages per second before FloodWait")
+    parser.add_argument("--server-chat-interval", type=float, default=0.2, help="per-chat spacing before FloodWait")
+    parser.add_argument("--rate", type=float, default=25, help="dispatcher global rate")
+    parser.add_argument("--burst", type=int, default=5, help="dispatcher global burst")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    def client():
+        return FakeClient(args.latency, args.server_rate, args.server_chat_interval)
+
+    lock_client = client()
+    run("global lock", GlobalLockSender(lock_client), lock_client, args.chats, args.messages, args.busy_messages)
+    dispatcher_client = client()
+    run("dispatcher ", DispatcherSender(dispatcher_client, args.workers, args.rate, args.burst), dispatcher_client,
+        args.chats, args.messages, args.busy_messages)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark: splitting oversized variable-bitrate videos for upload.
+
+Generates a synthetic VBR file with ffmpeg (a test pattern with bursts of
+noise every 40 s, so the bitrate jumps roughly tenfold), or takes --source,
+and splits it under each --limit with:
+  - "duration": the former splitter, equal-duration parts with one ffmpeg
+    run per part (_split_by_duration, still the fallback),
+  - "keyframes": split_video, one packet index probe, keyframe cut points
+    from cumulative packet sizes and one segment-muxer run.
+
+Reports wall time, bytes read by the ffmpeg/ffprobe runs (rchar of reaped
+children, Linux only) relative to the source size, and how many parts came
+out over the limit. ffmpeg and ffprobe are taken from PATH, as in the bot.
+
+    python -m benchmarks.split_benchmark --duration 60 --limit 100 50
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+from app.services.media.ffmpeg import _split_by_duration, get_duration, get_ffmpeg_path, split_video
+
+MB = 1024 * 1024
+
+
+def make_vbr_source(ffmpeg, path, duration):
+    subprocess.run([
+        ffmpeg, "-v", "error", "-y",
+        "-f", "lavfi", "-i", "testsrc2=size=1280x720:rate=30",
+        "-f", "lavfi", "-i", "sine=frequency=440:sample_rate=44100",
+        "-filter:v", "noise=alls=80:allf=t+u:enable='lt(mod(t,40),10)'",
+        "-c:v", "libx264", "-preset", "ultrafast", "-crf", "18", "-g", "60",
+        "-c:a", "aac", "-t", str(duration), "-shortest", path,
+    ], check=True)
+
+
+def children_read_bytes():
+    """Bytes read by this process and its reaped children so far."""
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                if line.startswith("rchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def run(label, split, source, max_size):
+    output_dir = tempfile.mkdtemp(prefix="split_benchmark_")
+    try:
+        read_before = children_read_bytes()
+        started = time.perf_counter()
+        result = asyncio.run(split(output_dir, max_size))
+        elapsed = time.perf_counter() - started
+        read_after = children_read_bytes()
+        sizes = [os.path.getsize(path) for path in result["path"] if os.path.exists(path)]
+        source_size = os.path.getsize(source)
+        over = sum(size > max_size for size in sizes)
+        read = (
+            f"read {(read_after - read_before) / source_size:.1f}x source"
+            if read_before is not None else "read n/a"
+        )
+        print(
+            f"  {label}: {elapsed:6.2f}s, {read}, {len(sizes)} parts, {over} over the limit, "
+            f"largest {max(sizes, default=0) / MB:.1f} MB, total {sum(sizes) / source_size:.0%} of source"
+        )
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", help="existing video to split instead of a generated one")
+    parser.add_argument("--duration", type=int, default=60, help="seconds of generated video (about 7 MB/s)")
+    parser.add_argument("--limit", type=float, nargs="+", default=[100, 50], help="part size limits in MB")
+    args = parser.parse_args()
+
+    ffmpeg = get_ffmpeg_path()
+    if not ffmpeg or not shutil.which("ffprobe"):
+        raise SystemExit("ffmpeg and ffprobe must be on PATH")
+    directory = tempfile.mkdtemp(prefix="split_benchmark_src_")
+    try:
+        source = args.source
+        if not source:
+            source = os.path.join(directory, "vbr.mp4")
+            started = time.perf_counter()
+            make_vbr_source(ffmpeg, source, args.duration)
+            print(f"generated {source} in {time.perf_counter() - started:.1f}s")
+        size = os.path.getsize(source)
+        duration = asyncio.run(get_duration(source))
+        print(f"source: {size / MB:.0f} MB, {duration:.0f}s")
+        for limit in args.limit:
+            max_size = int(limit * MB)
+            print(f"limit {limit:g} MB:")
+            run("duration ", lambda out, m: _split_by_duration(ffmpeg, out, "video", source, size, m, duration),
+                source, max_size)
+            run("keyframes", lambda out, m: split_video(out, "video", source, size, m, duration), source, max_size)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
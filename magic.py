@@ -84,6 +84,8 @@ from CONFIG.messages import Messages, safe_get_messages
 from HELPERS.app_instance import set_app
 from HELPERS.download_status import *
 from HELPERS.channel_guard import start_channel_guard, stop_channel_guard
+from HELPERS.broadcast_job import resume_broadcasts
+from HELPERS.delete_scheduler import start_delete_scheduler
 from HELPERS.filesystem_hlp import *
 from HELPERS.limitter import *
 from HELPERS.limitter import ensure_group_admin
@@ -363,7 +365,29 @@ def cleanup_on_exit():
     messages = safe_get_messages(None)
     """Cleanup function to close Firebase connections, HTTP sessions and logger on exit"""
     try:
-        # Close all HTTP sessions first
+        # Stop the broadcast after the current recipient; it resumes on the next start
+        try:
+            from HELPERS.broadcast_job import stop_broadcasts
+            stop_broadcasts()
+        except Exception as e:
+            print(f"⚠️ Error stopping broadcast: {e}")
+
+        # Pending deletions stay on disk and are done after the next start
+        try:
+            from HELPERS.delete_scheduler import stop_delete_scheduler
+            stop_delete_scheduler()
+        except Exception as e:
+            print(f"⚠️ Error stopping delete scheduler: {e}")
+
+        # Let running downloads finish (queued ones are dropped with a notice)
+        try:
+            from HELPERS.download_queue import drain_downloads
+            stats = drain_downloads()
+            print(f"✅ Download queue drained: {stats['completed']} completed, {stats['cancelled']} cancelled, {stats['active']} still running")
+        except Exception as e:
+            print(f"⚠️ Error draining download queue: {e}")
+
+        # Close all HTTP sessions
         try:
             from HELPERS.http_manager import close_all_sessions
             close_all_sessions()
@@ -403,6 +427,8 @@ signal.signal(signal.SIGTERM, signal_handler)
 if __name__ == "__main__":
     app.start()
     start_channel_guard(app)
+    resume_broadcasts(app)
+    start_delete_scheduler()
     idle()
     try:
         app.loop.run_until_complete(stop_channel_guard())
@@ -0,0 +1,5 @@
+-- Sliding-window counters: count of the window before window_start
+ALTER TABLE IF EXISTS rate_limits
+    ADD COLUMN IF NOT EXISTS previous_count INTEGER NOT NULL DEFAULT 0;
+
+CREATE INDEX IF NOT EXISTS idx_rate_limits_window_start ON rate_limits(window_start);
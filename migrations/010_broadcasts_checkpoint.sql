@@ -0,0 +1,6 @@
+-- Broadcast progress: recipients are sent in id order, last_user_id is the
+-- last one whose result is counted in sent/failed/blocked_count
+ALTER TABLE IF EXISTS broadcasts
+    ADD COLUMN IF NOT EXISTS last_user_id BIGINT,
+    ADD COLUMN IF NOT EXISTS started_at TIMESTAMPTZ,
+    ADD COLUMN IF NOT EXISTS checkpoint_at TIMESTAMPTZ;
@@ -15,10 +15,20 @@ import requests
 import logging
 
 from CONFIG.config import Config
+from DATABASE.dump_reader import get_dump_subtree, get_dump_subtrees
 
 logger = logging.getLogger(__name__)
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+
+def _local_sqlite_store():
+    """The SQLite store in local mode on the sqlite engine, which never writes dump.json."""
+    if getattr(Config, "USE_FIREBASE", True) or getattr(Config, "LOCAL_DB_ENGINE", "journal") != "sqlite":
+        return None
+    from DATABASE.sqlite_store import get_sqlite_store
+    return get_sqlite_store(getattr(Config, "LOCAL_DB_SQLITE_FILE", "dump.sqlite3"))
+
+
 # --------------------------------------------------------------------------------------
 # Utilities
 # --------------------------------------------------------------------------------------
@@ -323,6 +333,8 @@ class StatsCollector:
         start_background: bool = True,
     ):
         self.dump_path = dump_path or getattr(Config, "FIREBASE_CACHE_FILE", "dump.json")
+        # With the sqlite engine the bot's data is read from the database itself
+        self._store = _local_sqlite_store() if dump_path is None else None
         self.reload_interval = int(getattr(Config, "STATS_DUMP_RELOAD_INTERVAL", reload_interval))
         self.active_timeout = int(getattr(Config, "STATS_ACTIVE_TIMEOUT", active_timeout))
 
@@ -338,6 +350,7 @@ class StatsCollector:
         self._first_seen: Dict[int, int] = {}
         self._latest_dump_ts: int = 0
         self._last_reload_ts: float = 0
+        self._dump_stamp: Optional[Tuple[int, ...]] = None
         self._profile_fetcher = TelegramProfileFetcher()
         self._active_sessions_file = Path(
             getattr(
@@ -373,19 +386,51 @@ class StatsCollector:
             except Exception as exc:
                 logger.error(f"[stats] dump reload failed: {exc}")
 
+    def _source_stamp(self) -> Optional[Tuple[int, ...]]:
+        """Version of the data source: dump.json, or the SQLite database and its WAL."""
+        if self._store is None:
+            paths = [self.dump_path]
+        else:
+            paths = [self._store.db_file, f"{self._store.db_file}-wal"]
+        stamp: Tuple[int, ...] = ()
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                if path == paths[0]:
+                    return None
+                continue
+            stamp += (st.st_mtime_ns, st.st_size)
+        return stamp
+
+    def _read_subtrees(self, subpaths: List[str]) -> Dict[str, Any]:
+        if self._store is not None:
+            return {path: self._store.get(path) for path in subpaths}
+        # Only the subtrees we aggregate are parsed (shared with other dump readers)
+        return get_dump_subtrees(self.dump_path, subpaths)
+
     def reload_from_dump(self) -> None:
-        if not os.path.exists(self.dump_path):
+        stamp = self._source_stamp()
+        if stamp is None or stamp == self._dump_stamp:
+            # Missing, or the same version as last time: nothing new to aggregate
             return
+        bot_path = f"bot/{getattr(Config, 'BOT_NAME_FOR_USERS', 'tgytdlp_bot')}"
         try:
-            with open(self.dump_path, "r", encoding="utf-8") as fh:
-                data = json.load(fh)
+            subtrees = self._read_subtrees(
+                [f"{bot_path}/logs", f"{bot_path}/blocked_users", f"{bot_path}/channel_guard"],
+            )
         except Exception as exc:
             logger.error(f"[stats] unable to read dump {self.dump_path}: {exc}")
             return
-        bot_root = (
-            data.get("bot", {})
-            .get(getattr(Config, "BOT_NAME_FOR_USERS", "tgytdlp_bot"), {})
-        )
+        bot_root = {
+            key: value
+            for key, value in (
+                ("logs", subtrees.get(f"{bot_path}/logs")),
+                ("blocked_users", subtrees.get(f"{bot_path}/blocked_users")),
+                ("channel_guard", subtrees.get(f"{bot_path}/channel_guard")),
+            )
+            if value is not None
+        }
         download_records: List[DownloadRecord] = []
         first_seen: Dict[int, int] = {}
         blocked_users: Dict[int, BlockRecord] = {}
@@ -463,6 +508,7 @@ class StatsCollector:
             )
             # Update first-seen map
             self._first_seen = first_seen
+            self._dump_stamp = stamp
         logger.debug(
             "[stats] dump reloaded: downloads=%s blocked=%s events=%s latest_ts=%s",
             len(self._historical_downloads),
@@ -1065,28 +1111,23 @@ class StatsCollector:
         """Get a user's download history from dump.json (logs)."""
         result = []
         
-        # Read logs directly from dump.json
-        if not os.path.exists(self.dump_path):
+        # Read logs directly from dump.json (or the SQLite database)
+        if self._store is None and not os.path.exists(self.dump_path):
             return result
         
+        bot_name = getattr(Config, "BOT_NAME_FOR_USERS", "tgytdlp_bot")
         try:
-            with open(self.dump_path, "r", encoding="utf-8") as fh:
-                data = json.load(fh)
+            user_path = f"bot/{bot_name}/logs/{user_id}"
+            if self._store is not None:
+                # One indexed query on the logs table
+                user_logs = self._store.get(user_path)
+            else:
+                # Served from the shared parsed-dump cache, or streamed for this user only
+                user_logs = get_dump_subtree(self.dump_path, user_path)
         except Exception as exc:
             logger.error(f"[stats] unable to read dump {self.dump_path}: {exc}")
             return result
         
-        bot_root = (
-            data.get("bot", {})
-            .get(getattr(Config, "BOT_NAME_FOR_USERS", "tgytdlp_bot"), {})
-        )
-        
-        logs = bot_root.get("logs", {})
-        if not isinstance(logs, dict):
-            return result
-        
-        user_id_str = str(user_id)
-        user_logs = logs.get(user_id_str, {})
         if not isinstance(user_logs, dict):
             return result
         
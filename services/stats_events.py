@@ -3,7 +3,7 @@ from __future__ import annotations
 import threading
 import time
 from dataclasses import dataclass
-from typing import Any, Dict, Optional, Sequence
+from typing import Any, Callable, Dict, List, Optional, Sequence
 
 import logging
 
@@ -20,13 +20,26 @@ class DBWriteEvent:
     timestamp: float = time.time()
 
 
+_db_listeners: List[Callable[[str, str, Any], None]] = []
+
+
+def add_db_listener(listener: Callable[[str, str, Any], None]) -> None:
+    """Call listener(path, operation, payload) after every write through a wrapped adapter."""
+    _db_listeners.append(listener)
+
+
 def emit_db_event(path: str, operation: str, payload: Any) -> None:
-    """Send a DB write event to the stats collector."""
+    """Send a DB write event to the stats collector and the registered listeners."""
     try:
         collector = get_stats_collector()
         collector.handle_db_event(path, operation, payload)
     except Exception as exc:
         logger.debug(f"[stats] failed to handle db event {operation} {path}: {exc}")
+    for listener in _db_listeners:
+        try:
+            listener(path, operation, payload)
+        except Exception as exc:
+            logger.debug(f"[stats] db listener failed for {operation} {path}: {exc}")
 
 
 def emit_download_event(
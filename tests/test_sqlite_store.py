@@ -0,0 +1,76 @@
+import pytest
+
+from DATABASE.sqlite_store import SQLiteStore, _Table
+
+VIDEO = "bot/video_cache"
+PLAYLISTS = "bot/video_cache/playlists"
+IMAGES = "bot/video_cache/images"
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteStore(str(tmp_path / "dump.sqlite3"), [
+        _Table("video_cache", VIDEO, ("url_hash", "quality")),
+        _Table("playlist_cache", PLAYLISTS, ("url_hash", "quality", "idx"), indexes=(("url_hash", "idx"),)),
+        _Table("image_cache", IMAGES, ("url_hash", "post_index")),
+    ])
+
+
+# (path, value) written at every level below the nested prefixes
+PLAYLIST_LEVELS = [
+    (f"{PLAYLISTS}/h1/720p/3", "101"),
+    (f"{PLAYLISTS}/h1/720p", {"3": "101", "4": "102"}),
+    (f"{PLAYLISTS}/h1", {"720p": {"3": "101"}, "1080p": {"1": "201"}}),
+]
+IMAGE_LEVELS = [
+    (f"{IMAGES}/h2/1", "11,12"),
+    (f"{IMAGES}/h2", {"1": "11,12", "2": "13"}),
+]
+
+
+def _leaves(path, value):
+    if isinstance(value, dict):
+        for key, child in value.items():
+            yield from _leaves(f"{path}/{key}", child)
+    else:
+        yield path, value
+
+
+@pytest.mark.parametrize("path, value", PLAYLIST_LEVELS + IMAGE_LEVELS)
+def test_nested_prefix_round_trip(store, path, value):
+    store.set(path, value)
+    assert store.get(path) == value
+    for leaf, leaf_value in _leaves(path, value):
+        assert store.get(leaf) == leaf_value
+        parent = leaf.rsplit("/", 1)[0]
+        assert store.get(parent)[leaf.rsplit("/", 1)[1]] == leaf_value
+    # Nothing lands in video_cache rows keyed by "playlists"/"images"
+    assert store._conn().execute("SELECT COUNT(*) FROM video_cache").fetchone()[0] == 0
+
+    store.remove(path)
+    assert store.get(path) is None
+    for leaf, _ in _leaves(path, value):
+        assert store.get(leaf) is None
+
+
+@pytest.mark.parametrize("path, value", PLAYLIST_LEVELS + IMAGE_LEVELS)
+def test_nested_prefix_remove_from_every_ancestor(store, path, value):
+    root = PLAYLISTS if path.startswith(PLAYLISTS) else IMAGES
+    parts = path[len(root) + 1:].split("/")
+    for depth in range(len(parts), 0, -1):
+        store.set(path, value)
+        ancestor = f"{root}/{'/'.join(parts[:depth])}"
+        store.remove(ancestor)
+        assert store.get(ancestor) is None
+        assert store.get(path) is None
+
+
+def test_video_cache_rows_next_to_playlists(store):
+    store.set(f"{VIDEO}/h3/720p", "7")
+    store.set(f"{PLAYLISTS}/h3/720p/1", "8")
+    assert store.get(f"{VIDEO}/h3/720p") == "7"
+    assert store.get(f"{PLAYLISTS}/h3/720p/1") == "8"
+    assert store.get(VIDEO) == {"h3": {"720p": "7"}, "playlists": {"h3": {"720p": {"1": "8"}}}}
+    store.remove(f"{PLAYLISTS}/h3/720p")
+    assert store.get(f"{VIDEO}/h3/720p") == "7"
+    assert store.get(f"{PLAYLISTS}/h3") is None